@@ -77,8 +77,15 @@ def register():
 
     register_unregister_modules(modules, True)
 
+    # 打开文件后自动恢复已挂载的姿态缓存
+    from .rigs.utils import pose_cache
+    pose_cache.register_handlers()
+
 def unregister():
     """当卸载或禁用NebysseFacer时由Rigify调用。"""
+    from .rigs.utils import pose_cache
+    pose_cache.unregister_handlers()
+
     register_unregister_modules(modules, False)
     try:
         del feature_sets.NebysseFacer
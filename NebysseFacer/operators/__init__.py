@@ -2,10 +2,20 @@
 # 操作器定义
 
 from .face_operators import *
+from .template_operators import *
 
 registry = [
     NEBYSSE_OT_create_face_bone_collections,
     NEBYSSE_OT_assign_bone_to_face_group,
     NEBYSSE_OT_create_face_custom_property,
     NEBYSSE_OT_mirror_face_bones,
+    NEBYSSE_OT_compile_template_snapshot,
+    NEBYSSE_OT_audit_broken_drivers,
+    NEBYSSE_OT_analyze_driver_expressions,
+    NEBYSSE_OT_analyze_rig_graph,
+    NEBYSSE_OT_bake_face_rig,
+    NEBYSSE_OT_restore_face_rig,
+    NEBYSSE_OT_write_pose_cache,
+    NEBYSSE_OT_attach_pose_cache,
+    NEBYSSE_OT_detach_pose_cache,
 ] 
\ No newline at end of file
@@ -0,0 +1,372 @@
+"""
+NebysseFacer 模板操作器
+提供模板文件维护相关的操作功能
+"""
+
+import bpy
+from bpy.props import BoolProperty, IntProperty, StringProperty
+from bpy.types import Operator
+
+
+class NEBYSSE_OT_compile_template_snapshot(Operator):
+    """将模板.blend编译为预编译快照文件"""
+    bl_idname = "nebysse.compile_template_snapshot"
+    bl_label = "编译模板快照"
+    bl_description = "从Nebysse_FaceUP_Tem.blend提取骨骼数据并写出预编译快照，生成绑定时无需再追加模板文件"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        from ..rigs.utils.blend_template_loader import BlendTemplateLoader
+        
+        loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
+
+        try:
+            snapshot_path = loader.compile_template_snapshot()
+        except Exception as e:
+            self.report({'ERROR'}, f"编译模板快照失败: {str(e)}")
+            return {'CANCELLED'}
+        finally:
+            loader.cleanup()
+
+        if not snapshot_path:
+            self.report({'ERROR'}, "编译模板快照失败，请检查模板文件")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"模板快照已写出: {snapshot_path}")
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_audit_broken_drivers(Operator):
+    """审计整个文件的驱动器，查找（并可删除）数据路径无法解析的驱动器"""
+    bl_idname = "nebysse.audit_broken_drivers"
+    bl_label = "审计损坏的驱动器"
+    bl_description = ("检查文件中所有ID的全部驱动器。生成绑定时只修复加载器创建的驱动器，"
+                      "需要全文件检查时使用此操作（大型文件可能较慢）")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    remove: BoolProperty(
+        name="删除损坏的驱动器",
+        description="删除数据路径无法解析的驱动器；关闭时只报告",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        from ..rigs.utils.driver_repair import audit_broken_drivers
+
+        report = audit_broken_drivers(remove=self.remove)
+        broken = report['broken']
+        for id_name, data_path, array_index in broken[:10]:
+            self.report({'WARNING'}, f"损坏的驱动器: {id_name} {data_path}[{array_index}]")
+
+        summary = (f"检查了 {report['checked_ids']} 个ID的 {report['checked_drivers']} 个驱动器，"
+                   f"损坏 {len(broken)} 个，删除 {report['removed']} 个")
+        self.report({'WARNING'} if broken else {'INFO'}, summary)
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_analyze_driver_expressions(Operator):
+    """分析驱动器表达式，找出每帧需要Python求值的驱动器，并可改写为简单表达式或驱动器类型"""
+    bl_idname = "nebysse.analyze_driver_expressions"
+    bl_label = "分析驱动器表达式"
+    bl_description = ("检查驱动器是否在Blender简单表达式快速路径上。clamp/lerp/min/max等常见写法可改写为"
+                      "简单表达式或求和/平均/最小/最大驱动器类型，其余需要Python求值的驱动器会列出")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    rewrite: BoolProperty(
+        name="改写驱动器",
+        description="把可以改写的驱动器改为简单表达式或驱动器类型；关闭时只报告",
+        default=True
+    )
+
+    all_ids: BoolProperty(
+        name="整个文件",
+        description="分析文件中所有ID的驱动器；关闭时只分析活动对象及其数据",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        from ..rigs.utils.driver_expressions import PYTHON, SIMPLE, TYPED, analyze_id_drivers
+        from ..rigs.utils.driver_repair import iter_animated_ids
+
+        if self.all_ids:
+            datablocks = iter_animated_ids()
+        elif context.active_object:
+            obj = context.active_object
+            datablocks = [obj] + ([obj.data] if obj.data else [])
+        else:
+            self.report({'ERROR'}, "没有活动对象")
+            return {'CANCELLED'}
+
+        report = analyze_id_drivers(datablocks, rewrite=self.rewrite)
+        python_drivers = report['python_drivers']
+        for label, expression, reason in python_drivers[:10]:
+            self.report({'WARNING'}, f"需要Python求值: {label} '{expression}'（{reason}）")
+
+        summary = (f"驱动器类型 {report[TYPED]} 个，简单表达式 {report[SIMPLE]} 个，"
+                   f"Python求值 {report[PYTHON]} 个，可改写 {report['rewritable']} 个，"
+                   f"已改写 {report['rewritten']} 个")
+        self.report({'WARNING'} if python_drivers else {'INFO'}, summary)
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_analyze_rig_graph(Operator):
+    """分析活动rig的驱动器与约束依赖图：依赖环、最长求值链、扇入热点和Python驱动器分布"""
+    bl_idname = "nebysse.analyze_rig_graph"
+    bl_label = "分析依赖图"
+    bl_description = ("建立活动rig的 属性 → 驱动器 → 骨骼 → 约束 → 骨骼 依赖图，"
+                      "报告依赖环、最长求值链、扇入热点和每个骨骼需要Python求值的驱动器（详细结果见控制台）")
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'ARMATURE'
+
+    def execute(self, context):
+        from ..rigs.utils.rig_graph import analyze_rig_graph, log_graph_report
+
+        report = analyze_rig_graph(context.active_object)
+        log_graph_report(report)
+
+        for cycle in report['cycles'][:5]:
+            self.report({'WARNING'}, f"依赖环（{len(cycle)} 个节点）: {', '.join(cycle[:4])}")
+        for bone, count in report['python_drivers_per_bone'][:5]:
+            self.report({'WARNING'}, f"{bone}: {count} 个驱动器需要Python求值")
+
+        summary = (f"{report['nodes']} 个节点，{report['edges']} 条边，依赖环 {len(report['cycles'])} 个，"
+                   f"最长求值链 {report['chain_depth']}，Python驱动器 {len(report['python_drivers'])} 个")
+        self.report({'WARNING'} if report['cycles'] else {'INFO'}, summary)
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_bake_face_rig(Operator):
+    """把活动面部rig的NebOffset骨骼和它们驱动的rigify骨骼烘焙为动作，并静音模板驱动器和约束"""
+    bl_idname = "nebysse.bake_face_rig"
+    bl_label = "烘焙面部rig"
+    bl_description = ("逐帧求值并烘焙NebOffset骨骼和它们驱动的rigify骨骼，之后静音这些骨骼的模板驱动器、"
+                      "停用约束，渲染时只播放动画曲线。可以通过还原操作恢复")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame_start: IntProperty(
+        name="起始帧",
+        description="烘焙的起始帧",
+        default=1
+    )
+
+    frame_end: IntProperty(
+        name="结束帧",
+        description="烘焙的结束帧（包含）",
+        default=250
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'ARMATURE'
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        from ..rigs.utils.pose_bake import bake_face_rig
+
+        try:
+            stats = bake_face_rig(context.active_object, self.frame_start, self.frame_end, context.scene)
+        except RuntimeError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"已烘焙 {stats['bones']} 个骨骼 {stats['frames']} 帧到 {stats['action']}，"
+                              f"静音 {stats['drivers_muted']} 个驱动器，停用 {stats['constraints_disabled']} 个约束")
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_restore_face_rig(Operator):
+    """按烘焙时的还原记录恢复活动面部rig的驱动器、约束和原动作"""
+    bl_idname = "nebysse.restore_face_rig"
+    bl_label = "还原烘焙"
+    bl_description = "取消静音烘焙时静音的驱动器，重新启用约束，并换回烘焙前的动作"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    remove_baked_action: BoolProperty(
+        name="删除烘焙动作",
+        description="烘焙动作没有其他使用者时删除",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        from ..rigs.utils.pose_bake import is_baked
+
+        obj = context.active_object
+        return obj is not None and obj.type == 'ARMATURE' and is_baked(obj)
+
+    def execute(self, context):
+        from ..rigs.utils.pose_bake import restore_face_rig
+
+        try:
+            stats = restore_face_rig(context.active_object, remove_baked_action=self.remove_baked_action)
+        except RuntimeError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        summary = f"已还原 {stats['drivers_restored']} 个驱动器，{stats['constraints_restored']} 个约束"
+        if stats['missing']:
+            self.report({'WARNING'}, f"{summary}，{stats['missing']} 项已不存在")
+        else:
+            self.report({'INFO'}, summary)
+        return {'FINISHED'}
+
+
+def _selected_face_rigs(context):
+    """选中的（或活动的）包含面部姿态骨骼的骨架对象"""
+    from ..rigs.utils.pose_cache import find_pose_cache_bones
+
+    objects = context.selected_objects or ([context.active_object] if context.active_object else [])
+    return [obj for obj in objects if obj.type == 'ARMATURE' and find_pose_cache_bones(obj)]
+
+
+class NEBYSSE_OT_write_pose_cache(Operator):
+    """把选中面部rig的NebOffset和Neb_面部骨骼逐帧写入姿态缓存文件，并可直接挂载回放"""
+    bl_idname = "nebysse.write_pose_cache"
+    bl_label = "写入姿态缓存"
+    bl_description = ("逐帧求值选中的面部rig，把面部骨骼的局部变换写入缓存目录中的 .nebpose 文件。"
+                      "挂载后每帧从内存映射的缓存回放，不再求值面部驱动器（用于布局和灯光审阅）")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(
+        name="缓存目录",
+        description="姿态缓存文件的目录（每个rig一个文件）",
+        default="//pose_cache/",
+        subtype='DIR_PATH'
+    )
+
+    frame_start: IntProperty(
+        name="起始帧",
+        description="缓存的起始帧",
+        default=1
+    )
+
+    frame_end: IntProperty(
+        name="结束帧",
+        description="缓存的结束帧（包含）",
+        default=250
+    )
+
+    attach: BoolProperty(
+        name="写入后挂载",
+        description="写入后立即从缓存回放",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(_selected_face_rigs(context))
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        from ..rigs.utils.pose_cache import attach_pose_cache, write_pose_caches
+
+        rigs = _selected_face_rigs(context)
+        try:
+            results = write_pose_caches(rigs, self.directory, self.frame_start, self.frame_end, context.scene)
+            if self.attach:
+                for stats in results:
+                    attach_pose_cache(bpy.data.objects[stats['rig']], stats['path'])
+        except (RuntimeError, OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        total_bytes = sum(stats['bytes'] for stats in results)
+        self.report({'INFO'}, f"已写入 {len(results)} 个rig的姿态缓存（{total_bytes / 1024 / 1024:.1f} MB）"
+                              + ("，已挂载" if self.attach else ""))
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_attach_pose_cache(Operator):
+    """从缓存目录挂载选中面部rig的姿态缓存；已挂载的rig（如重新打开文件后）重新打开缓存"""
+    bl_idname = "nebysse.attach_pose_cache"
+    bl_label = "挂载姿态缓存"
+    bl_description = "静音面部骨骼的驱动器和约束，每帧从内存映射的姿态缓存回放。重新打开文件后用于恢复回放"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(
+        name="缓存目录",
+        description="姿态缓存文件的目录（已挂载的rig使用记录的文件）",
+        default="//pose_cache/",
+        subtype='DIR_PATH'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(_selected_face_rigs(context))
+
+    def execute(self, context):
+        from ..rigs.utils.pose_cache import attach_pose_cache, pose_cache_path
+
+        attached = 0
+        for rig in _selected_face_rigs(context):
+            try:
+                attach_pose_cache(rig, pose_cache_path(self.directory, rig))
+                attached += 1
+            except (RuntimeError, OSError, ValueError) as e:
+                self.report({'WARNING'}, f"{rig.name}: {e}")
+
+        if not attached:
+            self.report({'ERROR'}, "没有挂载任何姿态缓存")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"已挂载 {attached} 个rig的姿态缓存")
+        return {'FINISHED'}
+
+
+class NEBYSSE_OT_detach_pose_cache(Operator):
+    """卸载选中面部rig的姿态缓存，恢复驱动器、约束和旋转模式"""
+    bl_idname = "nebysse.detach_pose_cache"
+    bl_label = "卸载姿态缓存"
+    bl_description = "停止从姿态缓存回放，恢复面部骨骼的驱动器、约束和旋转模式"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        from ..rigs.utils.pose_cache import is_pose_cached
+
+        return any(is_pose_cached(rig) for rig in _selected_face_rigs(context))
+
+    def execute(self, context):
+        from ..rigs.utils.pose_cache import detach_pose_cache, is_pose_cached
+
+        missing = 0
+        rigs = [rig for rig in _selected_face_rigs(context) if is_pose_cached(rig)]
+        for rig in rigs:
+            missing += detach_pose_cache(rig)['missing']
+
+        summary = f"已卸载 {len(rigs)} 个rig的姿态缓存"
+        if missing:
+            self.report({'WARNING'}, f"{summary}，{missing} 项已不存在")
+        else:
+            self.report({'INFO'}, summary)
+        return {'FINISHED'}
+
+
+# 注册所有操作符
+classes = [
+    NEBYSSE_OT_compile_template_snapshot,
+    NEBYSSE_OT_audit_broken_drivers,
+    NEBYSSE_OT_analyze_driver_expressions,
+    NEBYSSE_OT_analyze_rig_graph,
+    NEBYSSE_OT_bake_face_rig,
+    NEBYSSE_OT_restore_face_rig,
+    NEBYSSE_OT_write_pose_cache,
+    NEBYSSE_OT_attach_pose_cache,
+    NEBYSSE_OT_detach_pose_cache,
+]
@@ -3,6 +3,10 @@ NebOffset骨骼配置文件
 用于管理NebysseFacer系统中的NebOffset骨骼名单和映射关系
 """
 
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
+
 # NebOffset骨骼属性名列表（用于bones.wei属性）
 NEBOFFSET_BONE_ATTRIBUTES = [
     # 眉毛NebOffset骨骼
@@ -182,6 +186,107 @@ BONE_GROUPS = {
     ]
 }
 
+# ==================== 细节级别（LOD） ====================
+# 群演角色不需要完整的NebOffset骨骼集合。每个级别按 BONE_GROUPS 分组列出被折叠的骨骼：
+# {分组: {被折叠的骨骼属性名: 保留的骨骼属性名}}
+# 被折叠的骨骼不生成，也不复制模板约束和驱动器；原本跟随它的rigify骨骼改为跟随保留的骨骼，
+# 模板中引用它的驱动器变量和约束子目标也映射到保留的骨骼。折叠关系可以传递（LOW 在 MEDIUM 的基础上继续折叠）。
+LOD_LEVELS = ('FULL', 'MEDIUM', 'LOW')
+
+LOD_FOLDS = {
+    'FULL': {},
+    # 每侧眉毛一个、每个嘴唇象限一个、每侧嘴角一个；眼睑、下颌和中央嘴唇保留
+    'MEDIUM': {
+        'eyebrow_left': {'brow.T.L.003': 'brow.T.L.002', 'brow.T.L.001': 'brow.T.L.002'},
+        'eyebrow_right': {'brow.T.R.003': 'brow.T.R.002', 'brow.T.R.001': 'brow.T.R.002'},
+        'lip_upper_left': {'lip.T.L.002': 'lip.T.L.001'},
+        'lip_lower_left': {'lip.B.L.002': 'lip.B.L.001'},
+        'lip_upper_right': {'lip.T.R.002': 'lip.T.R.001'},
+        'lip_lower_right': {'lip.B.R.002': 'lip.B.R.001'},
+        'lip_corners': {
+            'lip_end.L.001': 'lips.L', 'lip_end.L.002': 'lips.L',
+            'lip_end.R.001': 'lips.R', 'lip_end.R.002': 'lips.R',
+        },
+    },
+    # 在 MEDIUM 的基础上，上下唇各只保留中央骨骼
+    'LOW': {
+        'lip_upper_left': {'lip.T.L.001': 'lip.T'},
+        'lip_lower_left': {'lip.B.L.001': 'lip.B'},
+        'lip_upper_right': {'lip.T.R.001': 'lip.T'},
+        'lip_lower_right': {'lip.B.R.001': 'lip.B'},
+    },
+}
+
+
+def get_lod_fold_map(lod='FULL'):
+    """
+    获取细节级别的折叠关系（已解析传递关系）
+
+    Returns:
+        {被折叠的骨骼属性名: 最终保留的骨骼属性名}
+    """
+    # 较低的级别包含较高级别的全部折叠；未知级别按完整处理
+    levels = LOD_LEVELS[:LOD_LEVELS.index(lod) + 1] if lod in LOD_LEVELS else ()
+    folds = {}
+    for level in levels:
+        for group_folds in LOD_FOLDS[level].values():
+            folds.update(group_folds)
+
+    resolved = {}
+    for attr_name in folds:
+        survivor = attr_name
+        while survivor in folds:
+            survivor = folds[survivor]
+        resolved[attr_name] = survivor
+    return resolved
+
+
+def get_lod_bone_attributes(lod='FULL'):
+    """细节级别保留的NebOffset骨骼属性名（保持 NEBOFFSET_BONE_ATTRIBUTES 的顺序）"""
+    folds = get_lod_fold_map(lod)
+    return [attr_name for attr_name in NEBOFFSET_BONE_ATTRIBUTES if attr_name not in folds]
+
+
+def get_lod_bone_mapping(lod='FULL'):
+    """细节级别保留的NebOffset骨骼映射（属性名 -> 完整骨骼名）"""
+    folds = get_lod_fold_map(lod)
+    return {attr_name: bone_name for attr_name, bone_name in NEBOFFSET_BONE_MAPPING.items()
+            if attr_name not in folds}
+
+
+def get_lod_bone_name_folds(lod='FULL'):
+    """被折叠的NebOffset骨骼完整名称 -> 保留骨骼的完整名称（用于重定向模板驱动器和约束）"""
+    return {NEBOFFSET_BONE_MAPPING[attr_name]: NEBOFFSET_BONE_MAPPING[survivor]
+            for attr_name, survivor in get_lod_fold_map(lod).items()}
+
+
+def get_lod_constraint_mappings(lod='FULL'):
+    """细节级别的复制变换约束映射：所有rigify骨骼保留，被折叠的目标改为保留的骨骼"""
+    name_folds = get_lod_bone_name_folds(lod)
+    return [(source_bone, name_folds.get(target_bone, target_bone))
+            for source_bone, target_bone in CONSTRAINT_MAPPINGS]
+
+
+def get_lod_position_mappings(lod='FULL'):
+    """细节级别的位置映射（只包含保留的骨骼）"""
+    folds = get_lod_fold_map(lod)
+    return [(attr_name, rigify_bone) for attr_name, rigify_bone in POSITION_MAPPINGS
+            if attr_name not in folds]
+
+
+# ==================== 面部姿态骨骼 ====================
+# 面部rig的姿态由NebOffset骨骼和 Neb_ 前缀的面部骨骼（Neb_face-root、Neb_jaw_master 等）决定，
+# 姿态缓存（rigs/utils/pose_cache.py）记录并回放这些骨骼的局部变换
+NEB_FACE_BONE_PREFIX = "Neb_"
+
+_NEBOFFSET_BONE_NAMES = frozenset(NEBOFFSET_BONE_MAPPING.values())
+
+
+def is_face_pose_bone(bone_name):
+    """骨骼是否为面部姿态骨骼（NebOffset骨骼或 Neb_ 前缀的面部骨骼）"""
+    return bone_name.startswith(NEB_FACE_BONE_PREFIX) or bone_name in _NEBOFFSET_BONE_NAMES
+
+
 def get_neboffset_bone_count():
     """获取NebOffset骨骼总数"""
     return len(NEBOFFSET_BONE_ATTRIBUTES)
@@ -229,6 +334,16 @@ def validate_bone_lists():
     if missing_targets:
         errors.append(f"约束映射中未定义的目标骨骼: {missing_targets}")
     
+    # 检查细节级别的折叠关系：被折叠的骨骼属于所在分组，最终保留的骨骼必须存在
+    for level, group_folds in LOD_FOLDS.items():
+        for group_name, folds in group_folds.items():
+            outside_group = set(folds) - set(BONE_GROUPS.get(group_name, ()))
+            if outside_group:
+                errors.append(f"{level} 级别中不属于分组 {group_name} 的骨骼: {outside_group}")
+        unknown = {survivor for survivor in get_lod_fold_map(level).values() if survivor not in attrs_set}
+        if unknown:
+            errors.append(f"{level} 级别中未定义的保留骨骼: {unknown}")
+    
     return errors
 
 def get_summary():
@@ -238,29 +353,31 @@ def get_summary():
         'constraint_mappings': get_constraint_count(),
         'position_mappings': get_position_mapping_count(),
         'bone_groups': len(BONE_GROUPS),
+        'lod_bone_counts': {level: len(get_lod_bone_attributes(level)) for level in LOD_LEVELS},
         'validation_errors': validate_bone_lists()
     }
 
 # 使用示例和测试
 if __name__ == "__main__":
-    print("=== NebOffset骨骼配置摘要 ===")
+    logger.info("=== NebOffset骨骼配置摘要 ===")
     summary = get_summary()
     
-    print(f"📊 总骨骼数: {summary['total_bones']} 个")
-    print(f"🔗 约束映射: {summary['constraint_mappings']} 个")
-    print(f"📍 位置映射: {summary['position_mappings']} 个")
-    print(f"👥 骨骼分组: {summary['bone_groups']} 个")
+    logger.info("📊 总骨骼数: %s 个", summary['total_bones'])
+    logger.info("🔗 约束映射: %s 个", summary['constraint_mappings'])
+    logger.info("📍 位置映射: %s 个", summary['position_mappings'])
+    logger.info("👥 骨骼分组: %s 个", summary['bone_groups'])
+    logger.info("🎚️ 细节级别骨骼数: %s", summary['lod_bone_counts'])
     
     if summary['validation_errors']:
-        print(f"❌ 验证错误: {len(summary['validation_errors'])} 个")
+        logger.error("❌ 验证错误: %s 个", len(summary['validation_errors']))
         for error in summary['validation_errors']:
-            print(f"   - {error}")
+            logger.debug("   - %s", error)
     else:
-        print("✅ 配置验证通过")
+        logger.info("✅ 配置验证通过")
     
-    print("\n=== 骨骼分组详情 ===")
+    logger.info("\n=== 骨骼分组详情 ===")
     group_info = get_bone_group_info()
     for group_name, info in group_info.items():
-        print(f"{group_name}: {info['count']} 个骨骼")
+        logger.debug("%s: %s 个骨骼", group_name, info['count'])
         for bone in info['bones']:
-            print(f"  - {bone}") 
\ No newline at end of file
+            logger.debug("  - %s", bone) 
\ No newline at end of file
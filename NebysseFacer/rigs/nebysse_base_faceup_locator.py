@@ -3,6 +3,9 @@ from rigify.utils.naming import make_derived_name
 from rigify.utils.bones import BoneDict
 from rigify.utils.widgets import create_widget
 from ..utils.face_utils import create_face_control_widget
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
 
 class BaseFaceUPLocator(BaseRig):
     """FaceUP 系统定位器基类"""
@@ -40,11 +43,11 @@ class BaseFaceUPLocator(BaseRig):
                         # 注册当前定位器到主控器
                         if hasattr(owner, 'child_locators'):
                             owner.child_locators[self.base_bone] = self
-                            print(f"✓ {self.base_bone} 已注册到 nebysse_faceup_con 主控器")
+                            logger.debug("✓ %s 已注册到 nebysse_faceup_con 主控器", self.base_bone)
                             return
-            print(f"⚠ 未找到 nebysse_faceup_con 主控器，{self.base_bone} 将独立运行")
+            logger.warning("⚠ 未找到 nebysse_faceup_con 主控器，%s 将独立运行", self.base_bone)
         except Exception as e:
-            print(f"❌ 注册过程出错: {e}")
+            logger.error("❌ 注册过程出错: %s", e)
     
     def register_to_faceroot(self):
         """向 faceroot 注册自己"""
@@ -57,10 +60,10 @@ class BaseFaceUPLocator(BaseRig):
                     if not hasattr(rig, 'child_locators'):
                         rig.child_locators = {}
                     rig.child_locators[self.locator_type] = self
-                    print(f"✓ {self.locator_type} 已注册到 faceUP 主控")
+                    logger.debug("✓ %s 已注册到 faceUP 主控", self.locator_type)
                     return True
         
-        print(f"⚠ 未找到 faceUP 主控，{self.locator_type} 注册失败")
+        logger.warning("⚠ 未找到 faceUP 主控，%s 注册失败", self.locator_type)
         return False
     
     def generate_bones(self):
@@ -6,7 +6,12 @@ from .nebysse_base_faceup_locator import BaseFaceUPLocator
 from .nebysse_collection_utils import BaseFaceUPCollectionMixin
 from rigify.utils.bones import BoneDict
 from rigify.utils.naming import make_derived_name
+from .utils.generation_profiler import profile_stages
+from ..utils.log import get_logger
 
+logger = get_logger(__name__)
+
+@profile_stages()
 class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
     """左眉毛控制定位器"""
     
@@ -37,20 +42,20 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
         
         # 调试信息：显示自定义坐标状态
         use_custom = getattr(self.params, 'use_custom_positions', True)
-        print(f"🔧 左眉毛控制器初始化: use_custom_positions={use_custom}")
+        logger.info("🔧 左眉毛控制器初始化: use_custom_positions=%s", use_custom)
         
         if use_custom:
             # 显示一些关键坐标作为验证
             sample_coords = self.disw_positions.get("DISW-brow.T.L.001")
-            print(f"📍 样本坐标 DISW-brow.T.L.001: {sample_coords}")
+            logger.info("📍 样本坐标 DISW-brow.T.L.001: %s", sample_coords)
             
             # 显示参数读取状态
             x_val = getattr(self.params, 'disw_t_001_x', 'MISSING')
             y_val = getattr(self.params, 'disw_t_001_y', 'MISSING')
             z_val = getattr(self.params, 'disw_t_001_z', 'MISSING')
-            print(f"📊 参数值检查: X={x_val}, Y={y_val}, Z={z_val}")
+            logger.info("📊 参数值检查: X=%s, Y=%s, Z=%s", x_val, y_val, z_val)
         else:
-            print("📍 使用默认坐标位置")
+            logger.info("📍 使用默认坐标位置")
     
     def get_widget_type(self):
         return 'ARROW'
@@ -92,7 +97,7 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                 # 使用默认坐标
                 return self.get_default_disw_positions()
         except Exception as e:
-            print(f"⚠ 读取自定义坐标参数失败，使用默认值: {e}")
+            logger.warning("⚠ 读取自定义坐标参数失败，使用默认值: %s", e)
             return self.get_default_disw_positions()
     
     def get_default_disw_positions(self):
@@ -151,10 +156,10 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                 bone_obj.head = control_bone_obj.head + offset
                 bone_obj.tail = bone_obj.head + Vector((0, 0.005, 0))  # 设置小的尾部偏移
                 
-                print(f"✓ 创建权重骨骼: {bone_name} 位置偏移: {offset} (相对于 {self.control_bone})")
+                logger.debug("✓ 创建权重骨骼: %s 位置偏移: %s (相对于 %s)", bone_name, offset, self.control_bone)
             else:
                 # 如果没有自定义位置，使用默认位置
-                print(f"⚠ 权重骨骼 {bone_name} 没有找到自定义位置，使用默认位置")
+                logger.warning("⚠ 权重骨骼 %s 没有找到自定义位置，使用默认位置", bone_name)
         
         # 将权重骨骼添加到bones字典
         bones.disw = self.disw_bones
@@ -162,7 +167,7 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
         # 注册到父级控制器（nebysse_faceup_con）
         self.register_to_faceup_controller()
         
-        print(f"✓ 左眉骨骼层级生成完成: root={self.root_bone}, ctrl={self.control_bone}, disw={len(self.disw_bones)}个")
+        logger.info("✓ 左眉骨骼层级生成完成: root=%s, ctrl=%s, disw=%s个", self.root_bone, self.control_bone, len(self.disw_bones))
         
         return bones
     
@@ -180,12 +185,12 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                 bone_obj.tail = bone_obj.head + Vector((0, 0, 0.01))  # 设置小的尾部偏移
                 
                 self.disw_bones.append(disw_bone)
-                print(f"✓ 创建 DISW 骨骼: {target_name} at {position}")
+                logger.debug("✓ 创建 DISW 骨骼: %s at %s", target_name, position)
             
-            print(f"✓ 从自定义坐标创建了 {len(self.disw_bones)} 个 DISW 骨骼")
+            logger.info("✓ 从自定义坐标创建了 %s 个 DISW 骨骼", len(self.disw_bones))
             
         except Exception as e:
-            print(f"✗ 创建 DISW 骨骼失败: {e}")
+            logger.warning("✗ 创建 DISW 骨骼失败: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -199,7 +204,7 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
             template_path = os.path.join(parent_dir, "templates", "wei_brow_l.json")
             
             if not os.path.exists(template_path):
-                print(f"✗ 模板文件不存在: {template_path}")
+                logger.warning("✗ 模板文件不存在: %s", template_path)
                 return
             
             import json
@@ -220,12 +225,12 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                         bone_obj.tail = Vector(bone_data['tail'])
                     
                     self.disw_bones.append(disw_bone)
-                    print(f"✓ 从模板创建 DISW 骨骼: {target_name}")
+                    logger.debug("✓ 从模板创建 DISW 骨骼: %s", target_name)
             
-            print(f"✓ 从模板文件创建了 {len(self.disw_bones)} 个 DISW 骨骼")
+            logger.info("✓ 从模板文件创建了 %s 个 DISW 骨骼", len(self.disw_bones))
             
         except Exception as e:
-            print(f"✗ 从模板追加 DISW 骨骼失败: {e}")
+            logger.warning("✗ 从模板追加 DISW 骨骼失败: %s", e)
             import traceback
             traceback.print_exc()
     def rig_bones(self):
@@ -243,12 +248,12 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                 con = self.make_constraint(disw_bone, 'COPY_LOCATION', self.control_bone)
                 con.name = f"Copy Location from {self.control_bone}"
                 con.use_offset = True
-                print(f"✓ 为 {disw_bone} 添加了复制位置约束")
-            print(f"✓ 左眉骨骼约束和驱动器设置完成（包含约束）")
+                logger.debug("✓ 为 %s 添加了复制位置约束", disw_bone)
+            logger.info("✓ 左眉骨骼约束和驱动器设置完成（包含约束）")
         else:
             # DISW骨骼不添加任何约束修改器
             # 它们将通过父子关系和位置偏移来实现正确的变形
-            print(f"✓ 左眉骨骼约束和驱动器设置完成（无约束修改器）")
+            logger.info("✓ 左眉骨骼约束和驱动器设置完成（无约束修改器）")
     def parent_bones(self):
         """设置骨骼父子关系
         
@@ -267,15 +272,15 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
         # 设置控制器骨骼为根骨骼的子级
         if hasattr(self, 'control_bone') and hasattr(self, 'root_bone'):
             self.set_bone_parent(self.control_bone, self.root_bone)
-            print(f"✓ 设置 {self.control_bone} 父骨骼为 {self.root_bone}")
+            logger.info("✓ 设置 %s 父骨骼为 %s", self.control_bone, self.root_bone)
         
         # 设置所有DISW骨骼为根骨骼的子级（与brow-con.L同级）
         if hasattr(self, 'disw_bones') and hasattr(self, 'root_bone'):
             for disw_bone in self.disw_bones:
                 self.set_bone_parent(disw_bone, self.root_bone)
-                print(f"✓ 设置 {disw_bone} 父骨骼为 {self.root_bone}")
+                logger.debug("✓ 设置 %s 父骨骼为 %s", disw_bone, self.root_bone)
         
-        print(f"✓ 左眉骨骼层级关系设置完成")
+        logger.info("✓ 左眉骨骼层级关系设置完成")
     
     def configure_bones(self):
         """配置眉毛控制骨骼"""
@@ -3,6 +3,10 @@ Nebysse FaceUP 集合管理工具类
 提供优化的骨骼集合创建和管理功能
 """
 
+from ..utils.log import get_logger
+
+logger = get_logger(__name__)
+
 class CollectionManager:
     """骨骼集合管理器 - 优化版本"""
     
@@ -26,7 +30,7 @@ class CollectionManager:
             bool: 操作是否成功
         """
         if not bone_names:
-            print("⚠ 没有骨骼需要添加到集合")
+            logger.warning("⚠ 没有骨骼需要添加到集合")
             return False
         
         try:
@@ -37,20 +41,20 @@ class CollectionManager:
             valid_bones, invalid_bones = self._validate_bones(bone_names)
             
             if invalid_bones:
-                print(f"⚠ 发现 {len(invalid_bones)} 个无效骨骼: {invalid_bones}")
+                logger.warning("⚠ 发现 %s 个无效骨骼: %s", len(invalid_bones), invalid_bones)
             
             if not valid_bones:
-                print("✗ 没有有效的骨骼可添加")
+                logger.warning("✗ 没有有效的骨骼可添加")
                 return False
             
             # 添加骨骼到集合
             added_count = self._add_bones_to_collection(valid_bones, target_collection)
             
-            print(f"✅ {collection_name} 集合操作完成: 添加了 {added_count}/{len(valid_bones)} 个骨骼")
+            logger.info("✅ %s 集合操作完成: 添加了 %s/%s 个骨骼", collection_name, added_count, len(valid_bones))
             return added_count > 0
             
         except Exception as e:
-            print(f"✗ 创建骨骼集合失败: {e}")
+            logger.warning("✗ 创建骨骼集合失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -67,12 +71,12 @@ class CollectionManager:
         # 尝试找到现有集合
         for collection in self.armature.collections:
             if collection.name == collection_name:
-                print(f"ℹ 使用现有的 {collection_name} 集合")
+                logger.debug("ℹ 使用现有的 %s 集合", collection_name)
                 return collection
         
         # 创建新集合
         new_collection = self.armature.collections.new(collection_name)
-        print(f"✓ 创建新的 {collection_name} 集合")
+        logger.info("✓ 创建新的 %s 集合", collection_name)
         return new_collection
     
     def _validate_bones(self, bone_names):
@@ -100,7 +104,7 @@ class CollectionManager:
             
             valid_bones.append(bone_name)
         
-        print(f"📋 骨骼验证完成: {len(valid_bones)} 个有效, {len(invalid_bones)} 个无效")
+        logger.info("📋 骨骼验证完成: %s 个有效, %s 个无效", len(valid_bones), len(invalid_bones))
         return valid_bones, invalid_bones
     
     def _add_bones_to_collection(self, bone_names, target_collection):
@@ -120,16 +124,16 @@ class CollectionManager:
             
             # 检查骨骼是否已在目标集合中
             if target_collection in bone.collections:
-                print(f"ℹ {bone_name} 已在集合中，跳过")
+                logger.debug("ℹ %s 已在集合中，跳过", bone_name)
                 continue
             
             # 添加骨骼到集合
             try:
                 target_collection.assign(bone)
                 added_count += 1
-                print(f"✓ 已添加 {bone_name} 到集合")
+                logger.debug("✓ 已添加 %s 到集合", bone_name)
             except Exception as e:
-                print(f"✗ 添加 {bone_name} 失败: {e}")
+                logger.warning("✗ 添加 %s 失败: %s", bone_name, e)
         
         return added_count
     
@@ -152,7 +156,7 @@ class CollectionManager:
                     break
             
             if not target_collection:
-                print(f"⚠ 集合 {collection_name} 不存在")
+                logger.warning("⚠ 集合 %s 不存在", collection_name)
                 return False
             
             removed_count = 0
@@ -162,13 +166,13 @@ class CollectionManager:
                     if target_collection in bone.collections:
                         target_collection.unassign(bone)
                         removed_count += 1
-                        print(f"✓ 从集合中移除 {bone_name}")
+                        logger.debug("✓ 从集合中移除 %s", bone_name)
             
-            print(f"✅ 从 {collection_name} 集合移除了 {removed_count} 个骨骼")
+            logger.info("✅ 从 %s 集合移除了 %s 个骨骼", collection_name, removed_count)
             return removed_count > 0
             
         except Exception as e:
-            print(f"✗ 移除骨骼失败: {e}")
+            logger.warning("✗ 移除骨骼失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -187,11 +191,11 @@ class CollectionManager:
                 if collection.name == collection_name:
                     return [bone.name for bone in collection.bones]
             
-            print(f"⚠ 集合 {collection_name} 不存在")
+            logger.warning("⚠ 集合 %s 不存在", collection_name)
             return []
             
         except Exception as e:
-            print(f"✗ 获取集合骨骼失败: {e}")
+            logger.warning("✗ 获取集合骨骼失败: %s", e)
             return []
     
     def collection_exists(self, collection_name):
@@ -221,14 +225,14 @@ class CollectionManager:
             for collection in self.armature.collections:
                 if collection.name == collection_name:
                     self.armature.collections.remove(collection)
-                    print(f"✓ 删除集合 {collection_name}")
+                    logger.debug("✓ 删除集合 %s", collection_name)
                     return True
             
-            print(f"⚠ 集合 {collection_name} 不存在")
+            logger.warning("⚠ 集合 %s 不存在", collection_name)
             return False
             
         except Exception as e:
-            print(f"✗ 删除集合失败: {e}")
+            logger.warning("✗ 删除集合失败: %s", e)
             return False
 
 
@@ -258,7 +262,7 @@ class BaseFaceUPCollectionMixin:
             bool: 操作是否成功
         """
         if not hasattr(self, 'disw_bones') or not self.disw_bones:
-            print("⚠ 没有DISW骨骼需要添加到集合")
+            logger.warning("⚠ 没有DISW骨骼需要添加到集合")
             return False
         
         manager = self.get_collection_manager()
@@ -274,7 +278,7 @@ class BaseFaceUPCollectionMixin:
             bool: 操作是否成功
         """
         if not hasattr(self, 'disw_bones') or not self.disw_bones:
-            print("⚠ 没有DISW骨骼需要从集合移除")
+            logger.warning("⚠ 没有DISW骨骼需要从集合移除")
             return False
         
         manager = self.get_collection_manager()
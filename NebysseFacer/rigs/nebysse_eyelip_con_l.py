@@ -1,8 +1,14 @@
-import os
 import bpy
 from bpy.props import FloatProperty, BoolProperty, EnumProperty
 from .nebysse_base_faceup_locator import BaseFaceUPLocator
+from .utils.context_guard import ContextGuard
+from .utils.generation_profiler import profile_stages
+from .utils.template_session import TEMPLATE_RIG_NAME, TemplateSession
+from ..utils.log import get_logger
 
+logger = get_logger(__name__)
+
+@profile_stages()
 class Rig(BaseFaceUPLocator):
     """左眼睑控制定位器"""
     
@@ -10,177 +16,35 @@ class Rig(BaseFaceUPLocator):
         super().__init__(generator, pose_bone)
         self.locator_type = "eyelip-con.L"
         self.rig_id = "nebysse_eyelip_con_l"
+        # 生成级模板会话（与faceup主控及其他定位器共享）
+        self.template_session = TemplateSession(generator)
     
     def get_widget_type(self):
         return 'CIRCLE'
     
-    def find_blend_template_file(self):
-        """查找 Blender 模板文件路径"""
-        current_file = os.path.abspath(__file__)
-        current_dir = os.path.dirname(current_file)
-        parent_dir = os.path.dirname(current_dir)
-        template_path = os.path.join(parent_dir, "templates", "Nebysse_FaceUP_Tem.blend")
-        
-        if os.path.exists(template_path):
-            print(f"✓ 找到 Blender 模板文件: {template_path}")
-            return template_path
-        else:
-            print(f"✗ Blender 模板文件不存在: {template_path}")
-            return None
-    
     def load_constraints_from_template(self):
-        """从模板文件加载约束（增强诊断版本）"""
-        template_path = self.find_blend_template_file()
-        if not template_path:
-            return False
+        """从生成级模板会话获取模板rig并复制约束
         
+        模板文件在整个生成中只打开一次，由faceup主控和各定位器共享，生成结束时统一释放。
+        """
         try:
-            print(f"🔄 开始加载模板约束，路径: {template_path}")
-            
-            # 记录加载前的骨架和对象数量
-            armatures_before = set(bpy.data.armatures.keys())
-            objects_before = set(bpy.data.objects.keys())
-            print(f"📊 加载前状态: {len(armatures_before)} 个骨架, {len(objects_before)} 个对象")
-            
-            # 使用 Blender API 追加骨架
-            with bpy.data.libraries.load(template_path) as (data_from, data_to):
-                armature_name = "Nebysse_FaceUP_Tem.Rig"
-                print(f"🔍 模板文件中可用的骨架: {data_from.armatures}")
-                
-                if armature_name in data_from.armatures:
-                    data_to.armatures = [armature_name]
-                    print(f"✓ 找到模板骨架: {armature_name}")
-                else:
-                    print(f"✗ 未找到模板骨架: {armature_name}")
-                    print(f"📋 可用骨架列表: {list(data_from.armatures)}")
-                    return False
-            
-            # 检查加载后的变化
-            armatures_after = set(bpy.data.armatures.keys())
-            objects_after = set(bpy.data.objects.keys())
-            new_armatures = armatures_after - armatures_before
-            new_objects = objects_after - objects_before
-            
-            print(f"📊 加载后状态: {len(armatures_after)} 个骨架, {len(objects_after)} 个对象")
-            print(f"📊 新增内容: {len(new_armatures)} 个骨架, {len(new_objects)} 个对象")
-            
-            if new_armatures:
-                print(f"🔍 新增骨架: {list(new_armatures)}")
-            if new_objects:
-                print(f"🔍 新增对象: {list(new_objects)}")
-            
-            # 获取追加的骨架和对象（改进的查找逻辑）
-            template_armature_data = None
-            template_object = None
-            
-            # 方法1：直接查找新增的骨架
-            for armature_name in new_armatures:
-                if "Nebysse_FaceUP_Tem" in armature_name:
-                    template_armature_data = bpy.data.armatures[armature_name]
-                    print(f"✓ 通过新增列表找到模板骨架数据: {armature_name}")
-                    break
-            
-            # 方法2：如果方法1失败，使用原始方法
-            if not template_armature_data:
-                for armature in bpy.data.armatures:
-                    if armature.name.startswith("Nebysse_FaceUP_Tem.Rig"):
-                        template_armature_data = armature
-                        print(f"✓ 通过遍历找到模板骨架数据: {armature.name}")
-                        break
-            
-            # 查找对应的对象
-            if template_armature_data:
-                # 方法1：在新增对象中查找
-                for obj_name in new_objects:
-                    obj = bpy.data.objects[obj_name]
-                    if obj.type == 'ARMATURE' and obj.data == template_armature_data:
-                        template_object = obj
-                        print(f"✓ 通过新增列表找到模板对象: {obj_name}")
-                        break
-                
-                # 方法2：如果没有新增对象，说明只加载了骨架数据，需要创建对象
-                if not template_object:
-                    print("⚠ 未在新增对象中找到模板对象，尝试创建临时对象...")
-                    
-                    # 创建临时对象
-                    temp_obj_name = f"TempTemplate_{template_armature_data.name}"
-                    template_object = bpy.data.objects.new(temp_obj_name, template_armature_data)
-                    
-                    # 将对象链接到场景
-                    bpy.context.scene.collection.objects.link(template_object)
-                    print(f"✓ 创建并链接临时模板对象: {temp_obj_name}")
-                
-                # 方法3：最后的遍历查找
-                if not template_object:
-                    for obj in bpy.data.objects:
-                        if obj.type == 'ARMATURE' and obj.data == template_armature_data:
-                            template_object = obj
-                            print(f"✓ 通过遍历找到模板对象: {obj.name}")
-                            break
-            
-            # 诊断结果
-            if not template_armature_data:
-                print("❌ 诊断失败：未能获取模板骨架数据")
-                print("🔍 详细诊断:")
-                print(f"   - 模板文件路径: {template_path}")
-                print(f"   - 预期骨架名: Nebysse_FaceUP_Tem.Rig")
-                print(f"   - 实际新增骨架: {list(new_armatures)}")
-                return False
-            
+            template_object = self.template_session.get_template_rig()
             if not template_object:
-                print("❌ 诊断失败：未能获取模板对象")
-                print("🔍 详细诊断:")
-                print(f"   - 骨架数据存在: {template_armature_data.name}")
-                print(f"   - 新增对象: {list(new_objects)}")
-                print(f"   - 尝试创建临时对象: 失败")
-                
-                # 清理骨架数据
-                bpy.data.armatures.remove(template_armature_data)
+                logger.error("❌ 诊断失败：未能获取模板对象")
+                logger.info("   - 预期对象名: %s", TEMPLATE_RIG_NAME)
                 return False
             
-            print(f"✅ 成功获取模板资源:")
-            print(f"   📁 骨架数据: {template_armature_data.name}")
-            print(f"   🎯 对象: {template_object.name}")
-            
-            # 复制约束
-            success = self.copy_constraints_from_template(template_object)
-            
-            # 智能清理临时数据
-            try:
-                print("🧹 开始清理模板数据...")
-                
-                # 先从场景中移除对象
-                if template_object.name in bpy.context.scene.collection.objects:
-                    bpy.context.scene.collection.objects.unlink(template_object)
-                    print(f"   🔗 从场景中取消链接: {template_object.name}")
-                
-                # 删除对象
-                bpy.data.objects.remove(template_object)
-                print(f"   🗑️ 删除对象: {template_object.name}")
-                
-                # 删除骨架数据
-                bpy.data.armatures.remove(template_armature_data)
-                print(f"   🗑️ 删除骨架数据: {template_armature_data.name}")
-                
-                print("✓ 模板数据清理完成")
-                
-            except Exception as cleanup_error:
-                print(f"⚠ 清理模板数据时出错: {cleanup_error}")
-                # 清理错误不影响主要功能的成功
-            
-            return success
+            logger.info("✅ 使用共享模板: %s", template_object.name)
+            return self.copy_constraints_from_template(template_object)
             
         except Exception as e:
-            print(f"❌ 从模板加载约束失败: {e}")
+            logger.error("❌ 从模板加载约束失败: %s", e)
             import traceback
             traceback.print_exc()
             
             # 增强错误诊断
-            print("🔍 错误诊断信息:")
-            print(f"   - 模板文件存在: {os.path.exists(template_path) if template_path else False}")
-            print(f"   - 当前工作目录: {os.getcwd()}")
-            print(f"   - Blender版本: {bpy.app.version_string}")
-            
+            logger.info("🔍 错误诊断信息:")
+            logger.info("   - Blender版本: %s", bpy.app.version_string)
             return False
     
     def copy_constraints_from_template(self, template_object):
@@ -188,16 +52,16 @@ class Rig(BaseFaceUPLocator):
         try:
             # 首先验证模板对象的有效性
             if not template_object:
-                print(f"❌ 模板对象为空")
+                logger.error("❌ 模板对象为空")
                 return False
             
             if template_object.type != 'ARMATURE':
-                print(f"❌ 模板对象不是骨架类型: {template_object.type}")
+                logger.error("❌ 模板对象不是骨架类型: %s", template_object.type)
                 return False
             
             # 确保对象有有效的姿态数据
             if not template_object.pose:
-                print(f"⚠ 模板对象缺少姿态数据，尝试更新...")
+                logger.warning("⚠ 模板对象缺少姿态数据，尝试更新...")
                 
                 # 尝试刷新对象数据
                 import bpy
@@ -205,66 +69,49 @@ class Rig(BaseFaceUPLocator):
                 
                 # 如果还是没有姿态数据，尝试切换到姿态模式再切回来
                 if not template_object.pose:
-                    print(f"🔧 尝试通过模式切换初始化姿态数据...")
-                    
-                    # 保存当前状态
-                    original_active = bpy.context.view_layer.objects.active
-                    original_mode = bpy.context.mode
+                    logger.info("🔧 尝试通过模式切换初始化姿态数据...")
                     
                     try:
-                        # 设置模板对象为活动对象
-                        bpy.context.view_layer.objects.active = template_object
-                        
-                        # 尝试进入姿态模式来初始化姿态数据
-                        if bpy.context.mode != 'POSE':
-                            bpy.ops.object.mode_set(mode='POSE')
+                        # 模板对象临时设为活动对象并进入姿态模式来初始化姿态数据，
+                        # 退出时由上下文保护恢复模板对象的模式和原活动对象
+                        with ContextGuard(active=template_object, mode='POSE'):
                             bpy.context.view_layer.update()
-                        
-                        # 再次检查姿态数据
-                        if template_object.pose:
-                            print(f"✓ 通过模式切换成功初始化姿态数据")
-                        else:
-                            print(f"❌ 仍无法获取姿态数据")
-                            return False
+                            
+                            # 再次检查姿态数据
+                            if template_object.pose:
+                                logger.info("✓ 通过模式切换成功初始化姿态数据")
+                            else:
+                                logger.error("❌ 仍无法获取姿态数据")
+                                return False
                     
                     except Exception as mode_error:
-                        print(f"⚠ 模式切换时出错: {mode_error}")
+                        logger.warning("⚠ 模式切换时出错: %s", mode_error)
                         return False
-                    
-                    finally:
-                        # 恢复原始状态
-                        try:
-                            if original_active:
-                                bpy.context.view_layer.objects.active = original_active
-                            if original_mode != 'POSE':
-                                bpy.ops.object.mode_set(mode='OBJECT')
-                        except:
-                            pass
             
             # 最终检查姿态数据
             if not template_object.pose:
-                print(f"❌ 无法获取模板对象的姿态数据")
+                logger.error("❌ 无法获取模板对象的姿态数据")
                 return False
             
             if not template_object.pose.bones:
-                print(f"❌ 模板对象没有姿态骨骼")
+                logger.error("❌ 模板对象没有姿态骨骼")
                 return False
             
-            print(f"✓ 模板对象姿态数据验证通过，包含 {len(template_object.pose.bones)} 个姿态骨骼")
+            logger.info("✓ 模板对象姿态数据验证通过，包含 %s 个姿态骨骼", len(template_object.pose.bones))
             
             # 查找模板中的对应骨骼
             template_bone_name = "eyelip-con.L"
             
             if template_bone_name not in template_object.pose.bones:
-                print(f"✗ 模板中未找到骨骼: {template_bone_name}")
-                print(f"🔍 模板中可用的骨骼: {list(template_object.pose.bones.keys())[:10]}...")  # 显示前10个
+                logger.warning("✗ 模板中未找到骨骼: %s", template_bone_name)
+                logger.info("🔍 模板中可用的骨骼: %s...", list(template_object.pose.bones.keys())[:10])  # 显示前10个
                 return False
             
             template_bone = template_object.pose.bones[template_bone_name]
             local_bone = self.obj.pose.bones[self.control_bone]
             
-            print(f"✓ 找到模板骨骼: {template_bone_name}")
-            print(f"✓ 目标骨骼: {self.control_bone}")
+            logger.info("✓ 找到模板骨骼: %s", template_bone_name)
+            logger.info("✓ 目标骨骼: %s", self.control_bone)
             
             # 复制约束
             constraints_count = 0
@@ -279,28 +126,28 @@ class Rig(BaseFaceUPLocator):
                 self.apply_constraint_parameters(new_constraint, template_constraint.type)
                 
                 constraints_count += 1
-                print(f"✓ 复制约束: {template_constraint.type}")
+                logger.debug("✓ 复制约束: %s", template_constraint.type)
             
-            print(f"✓ 复制了 {constraints_count} 个约束")
+            logger.info("✓ 复制了 %s 个约束", constraints_count)
             return True
             
         except Exception as e:
-            print(f"✗ 复制约束时出错: {e}")
+            logger.warning("✗ 复制约束时出错: %s", e)
             import traceback
             traceback.print_exc()
             
             # 增强错误诊断
-            print(f"🔍 错误诊断信息:")
+            logger.info("🔍 错误诊断信息:")
             try:
-                print(f"   - 模板对象类型: {template_object.type if template_object else 'None'}")
-                print(f"   - 模板对象名称: {template_object.name if template_object else 'None'}")
-                print(f"   - 姿态数据存在: {bool(template_object.pose) if template_object else 'N/A'}")
+                logger.info("   - 模板对象类型: %s", template_object.type if template_object else 'None')
+                logger.info("   - 模板对象名称: %s", template_object.name if template_object else 'None')
+                logger.info("   - 姿态数据存在: %s", bool(template_object.pose) if template_object else 'N/A')
                 if template_object and template_object.pose:
-                    print(f"   - 姿态骨骼数量: {len(template_object.pose.bones)}")
-                print(f"   - 目标控制骨骼: {self.control_bone}")
-                print(f"   - 当前对象: {self.obj.name}")
+                    logger.info("   - 姿态骨骼数量: %s", len(template_object.pose.bones))
+                logger.info("   - 目标控制骨骼: %s", self.control_bone)
+                logger.info("   - 当前对象: %s", self.obj.name)
             except Exception as diag_error:
-                print(f"   - 诊断信息获取失败: {diag_error}")
+                logger.info("   - 诊断信息获取失败: %s", diag_error)
             
             return False
     
@@ -6,11 +6,12 @@ from ..utils.face_utils import create_face_control_widget
 from bpy.props import BoolProperty, EnumProperty, FloatProperty, StringProperty
 from mathutils import Vector
 from .neboffset_bones import (
-    NEBOFFSET_BONE_ATTRIBUTES,
-    NEBOFFSET_BONE_MAPPING,
-    POSITION_MAPPINGS,
-    CONSTRAINT_MAPPINGS,
     BONE_GROUPS,
+    get_lod_bone_attributes,
+    get_lod_bone_mapping,
+    get_lod_bone_name_folds,
+    get_lod_constraint_mappings,
+    get_lod_position_mappings,
     get_neboffset_bone_count,
     get_constraint_count,
     validate_bone_lists
@@ -34,7 +35,69 @@ from rigify.utils.layers import set_bone_layers
 
 # 导入stage装饰器
 from rigify.base_rig import stage
+from .utils.context_guard import ContextGuard
+from .utils.generation_profiler import profile_stages
+from .utils.blend_catalog import discover_templates, validate_template_file
+from .utils.template_session import TEMPLATE_RIG_NAME, TemplateSession
+from ..utils.log import get_logger, log_count
 
+logger = get_logger(__name__)
+
+
+# 模板选择下拉列表的选项（动态枚举的字符串需要在Python侧保持引用）
+_template_file_items = []
+
+
+def _get_template_file_items(self, context):
+    """模板目录中包含模板rig的 .blend 文件（从块目录读取，不加载文件，按修改时间缓存）"""
+    from .utils.blend_template_loader import get_template_search_dirs
+    
+    items = [('DEFAULT', "默认模板", "在模板目录中查找 Nebysse_FaceUP_Tem.blend")]
+    seen = set()
+    for path, rig_name in discover_templates(get_template_search_dirs(), TEMPLATE_RIG_NAME):
+        # 标识符是相对于模板目录的文件名，多个目录中的同名文件以搜索顺序中的第一个为准
+        file_name = os.path.basename(path)
+        if file_name not in seen:
+            seen.add(file_name)
+            items.append((file_name, file_name, f"{path}（模板rig: {rig_name}）"))
+    _template_file_items[:] = items
+    return _template_file_items
+
+
+def _get_template_file_choice(self):
+    """下拉列表显示 template_file 中保存的文件名（枚举本身不保存，不会因目录变化指向别的文件）"""
+    items = _get_template_file_items(self, None)
+    template_file = self.template_file or 'DEFAULT'
+    for index, item in enumerate(items):
+        if item[0] == template_file:
+            return index
+    return 0
+
+
+def _set_template_file_choice(self, value):
+    """把下拉列表中选择的文件名写入 template_file"""
+    items = _template_file_items or _get_template_file_items(self, None)
+    if 0 <= value < len(items):
+        self.template_file = '' if items[value][0] == 'DEFAULT' else items[value][0]
+
+
+def _find_template_file_by_name(file_name: str):
+    """
+    在模板目录中按文件名查找模板文件（搜索顺序与下拉列表一致）
+
+    Returns:
+        文件路径，找不到时返回None
+    """
+    from .utils.blend_template_loader import get_template_search_dirs
+    
+    for search_dir in get_template_search_dirs():
+        path = os.path.join(search_dir, file_name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+@profile_stages('set_neboffset_positions_late', 'copy_template_constraints_and_drivers')
 class Rig(BaseRig):
     """FaceUP-con: 面部控制主控系统"""
     
@@ -116,7 +179,7 @@ class Rig(BaseRig):
         self.bone_collections = {}
         
         # 按照rigify标准，在__init__中初始化所有骨骼集合
-        print("🏗️ 初始化骨骼集合结构...")
+        logger.info("🏗️ 初始化骨骼集合结构...")
         
         # 重新初始化bones结构，添加自定义集合
         self.bones.ctrl = self.CtrlBones()
@@ -129,17 +192,52 @@ class Rig(BaseRig):
         # 添加兼容性集合（保持现有约束系统工作）
         self.bones.neb_face_bones = BoneDict()  # 兼容性视图
         
-        print("✅ 骨骼集合结构初始化完成")
-        print(f"    🎮 ctrl: {type(self.bones.ctrl).__name__}")
-        print(f"    🔧 mch: {type(self.bones.mch).__name__}")
-        print(f"    ⚖️ wei: {type(self.bones.wei).__name__}")
-        print(f"    🔗 neb_face_bones: {type(self.bones.neb_face_bones).__name__}")
+        logger.info("✅ 骨骼集合结构初始化完成")
+        logger.info("    🎮 ctrl: %s", type(self.bones.ctrl).__name__)
+        logger.info("    🔧 mch: %s", type(self.bones.mch).__name__)
+        logger.info("    ⚖️ wei: %s", type(self.bones.wei).__name__)
+        logger.info("    🔗 neb_face_bones: %s", type(self.bones.neb_face_bones).__name__)
+        
+        # 细节级别：群演角色只生成每个分组保留的NebOffset骨骼，被折叠骨骼的约束和驱动器重定向到保留的骨骼
+        self.neboffset_lod = getattr(self.params, 'neboffset_lod', 'FULL')
+        self.neboffset_attributes = get_lod_bone_attributes(self.neboffset_lod)
+        self.neboffset_mapping = get_lod_bone_mapping(self.neboffset_lod)
+        
+        # 生成级模板会话：模板文件在整个生成中只打开一次，与眼睑等定位器共享，生成结束时统一释放
+        self.template_session = TemplateSession(generator)
+        template_path = self.resolve_template_file()
+        if template_path:
+            self.template_session.use_template_file(template_path)
         
         # 初始化管理器
-        self.template_manager = TemplateManager(self)
+        self.template_manager = TemplateManager(self, self.template_session)
         self.generation_manager = GenerationManager(self)
         self.constraint_manager = ConstraintManager(self)
     
+    def resolve_template_file(self):
+        """metarig中指定的模板文件路径，None表示使用默认模板"""
+        custom_path = getattr(self.params, 'custom_template_path', '')
+        if custom_path:
+            template_path = bpy.path.abspath(custom_path)
+            error = validate_template_file(template_path, TEMPLATE_RIG_NAME)
+            if error:
+                logger.warning("⚠ 自定义模板无效（%s），使用默认模板", error)
+                return None
+            return template_path
+        
+        file_name = getattr(self.params, 'template_file', '')
+        if not file_name:
+            return None
+        template_path = _find_template_file_by_name(file_name)
+        if template_path:
+            error = validate_template_file(template_path, TEMPLATE_RIG_NAME)
+        else:
+            error = f"模板目录中没有 {file_name}"
+        if error:
+            logger.warning("⚠ 选择的模板文件无效（%s），使用默认模板", error)
+            return None
+        return template_path
+    
     def ensure_bone_collection(self, name, *, ui_row=0, ui_title='', sel_set=False, color_set_id=0):
         """创建或获取指定名称的骨骼集合，并设置UI属性"""
         # 检查集合是否已存在
@@ -148,9 +246,9 @@ class Rig(BaseRig):
         if not coll:
             # 创建新的骨骼集合
             coll = self.obj.data.collections.new(name)
-            print(f"✓ 创建骨骼集合: {name}")
+            logger.debug("✓ 创建骨骼集合: %s", name)
         else:
-            print(f"✓ 使用现有骨骼集合: {name}")
+            logger.debug("✓ 使用现有骨骼集合: %s", name)
         
         # 设置rigify UI属性
         if ui_row > 0:
@@ -168,7 +266,7 @@ class Rig(BaseRig):
     
     def create_bone_collections(self):
         """创建所有需要的骨骼集合"""
-        print("\n🗂️ === 开始创建骨骼集合 ===")
+        logger.info("\n🗂️ === 开始创建骨骼集合 ===")
         
         # 创建Neb_MCH集合 - 包含从rigify复制的机制骨骼
         self.ensure_bone_collection('Neb_MCH', 
@@ -194,16 +292,16 @@ class Rig(BaseRig):
                                    ui_title='Face (面部系统)',
                                    color_set_id=5)
         
-        print(f"✅ 骨骼集合创建完成，共创建 {len(self.bone_collections)} 个集合")
+        logger.info("✅ 骨骼集合创建完成，共创建 %s 个集合", len(self.bone_collections))
         for name, coll in self.bone_collections.items():
-            print(f"    📁 {name}: UI行 {coll.rigify_ui_row}, 颜色 {coll.rigify_color_set_id}")
+            logger.debug("    📁 %s: UI行 %s, 颜色 %s", name, coll.rigify_ui_row, coll.rigify_color_set_id)
         
-        print("🗂️ === 骨骼集合创建完成 ===\n")
+        logger.info("🗂️ === 骨骼集合创建完成 ===\n")
     
     def assign_bone_to_collection(self, bone_name, collection_name):
         """将骨骼分配到指定集合"""
         if collection_name not in self.bone_collections:
-            print(f"⚠ 骨骼集合 '{collection_name}' 不存在，跳过分配骨骼 '{bone_name}'")
+            logger.warning("⚠ 骨骼集合 '%s' 不存在，跳过分配骨骼 '%s'", collection_name, bone_name)
             return False
         
         try:
@@ -219,14 +317,14 @@ class Rig(BaseRig):
             if bone:
                 # 使用rigify的set_bone_layers函数分配骨骼
                 set_bone_layers(bone, [coll])
-                print(f"✓ 分配骨骼 '{bone_name}' 到集合 '{collection_name}'")
+                logger.debug("✓ 分配骨骼 '%s' 到集合 '%s'", bone_name, collection_name)
                 return True
             else:
-                print(f"⚠ 骨骼 '{bone_name}' 不存在")
+                logger.warning("⚠ 骨骼 '%s' 不存在", bone_name)
                 return False
                 
         except Exception as e:
-            print(f"❌ 分配骨骼失败: {bone_name} -> {collection_name}: {e}")
+            logger.error("❌ 分配骨骼失败: %s -> %s: %s", bone_name, collection_name, e)
             return False
     
     def find_master_faceroot(self):
@@ -246,7 +344,7 @@ class Rig(BaseRig):
     
     def generate_bones(self):
         """生成骨骼结构"""
-        print("\n🏗️ === 开始生成骨骼结构 ===")
+        logger.info("\n🏗️ === 开始生成骨骼结构 ===")
         
         # 1. 创建骨骼集合
         self.create_bone_collections()
@@ -254,25 +352,25 @@ class Rig(BaseRig):
         # 2. 创建 Neb_Facer_root 顶层骨骼
         self.neb_facer_root_bone = self.copy_bone(self.base_bone, "Neb_Facer_root")
         self.bones.neb_facer_root = self.neb_facer_root_bone
-        print(f"✓ 创建顶层骨骼: Neb_Facer_root")
+        logger.info("✓ 创建顶层骨骼: Neb_Facer_root")
         
         # 3. 创建 Neb_face-root 主控骨骼
         self.faceroot_bone = self.copy_bone(self.base_bone, "Neb_face-root")
         self.bones.ctrl.master = self.faceroot_bone  # 使用标准命名
-        print(f"✓ 创建主控骨骼: Neb_face-root")
+        logger.info("✓ 创建主控骨骼: Neb_face-root")
         
         # 4. 创建 Neb_RigifyFace 父级骨骼
         self.neb_rigify_face_bone = self.copy_bone(self.base_bone, "Neb_RigifyFace")
         self.bones.neb_rigify_face = self.neb_rigify_face_bone
-        print(f"✓ 创建父级骨骼: Neb_RigifyFace")
+        logger.info("✓ 创建父级骨骼: Neb_RigifyFace")
         
         # 5. 生成NebOffset骨骼（使用预定义的规范）
-        print("\n⚖️ 生成NebOffset骨骼...")
+        logger.info("\n⚖️ 生成NebOffset骨骼...")
         
         # 打印当前骨架的全部骨骼名称
-        print("\n📋 === 当前骨架包含的所有骨骼 ===")
+        logger.info("\n📋 === 当前骨架包含的所有骨骼 ===")
         all_bones = [bone.name for bone in self.obj.data.bones]
-        print(f"📊 总骨骼数: {len(all_bones)} 个")
+        logger.info("📊 总骨骼数: %s 个", len(all_bones))
         
         # 按类型分组显示骨骼
         org_bones = [bone for bone in all_bones if bone.startswith('ORG-')]
@@ -284,100 +382,102 @@ class Rig(BaseRig):
         neboffset_bones = [bone for bone in all_bones if bone.startswith('NebOffset-')]
         ctrl_bones = [bone for bone in all_bones if not any(bone.startswith(prefix) for prefix in ['ORG-', 'DEF-', 'MCH-', 'WGT-', 'Neb', 'DISW-', 'NebOffset-'])]
         
-        print(f"📊 骨骼类型统计:")
-        print(f"   🦴 ORG骨骼 (原始): {len(org_bones)} 个") 
-        print(f"   🔧 DEF骨骼 (变形): {len(def_bones)} 个")
-        print(f"   ⚙️ MCH骨骼 (机制): {len(mch_bones)} 个") 
-        print(f"   🎛️ WGT骨骼 (控件): {len(wgt_bones)} 个")
-        print(f"   🏗️ Neb骨骼 (Nebysse): {len(neb_bones)} 个")
-        print(f"   📐 DISW骨骼 (距离权重): {len(disw_bones)} 个")
-        print(f"   ⚖️ NebOffset骨骼: {len(neboffset_bones)} 个")
-        print(f"   🎯 其他控制骨骼: {len(ctrl_bones)} 个")
+        logger.info("📊 骨骼类型统计:")
+        logger.info("   🦴 ORG骨骼 (原始): %s 个", len(org_bones)) 
+        logger.info("   🔧 DEF骨骼 (变形): %s 个", len(def_bones))
+        logger.info("   ⚙️ MCH骨骼 (机制): %s 个", len(mch_bones)) 
+        logger.info("   🎛️ WGT骨骼 (控件): %s 个", len(wgt_bones))
+        logger.info("   🏗️ Neb骨骼 (Nebysse): %s 个", len(neb_bones))
+        logger.info("   📐 DISW骨骼 (距离权重): %s 个", len(disw_bones))
+        logger.info("   ⚖️ NebOffset骨骼: %s 个", len(neboffset_bones))
+        logger.info("   🎯 其他控制骨骼: %s 个", len(ctrl_bones))
         
         # 显示Neb相关骨骼详细列表
         if neb_bones:
-            print(f"\n🏗️ Neb骨骼详细列表 ({len(neb_bones)} 个):")
+            logger.info("\n🏗️ Neb骨骼详细列表 (%s 个):", len(neb_bones))
             for i, bone_name in enumerate(neb_bones):
-                print(f"   {i+1:3d}. {bone_name}")
+                logger.debug("   %3d. %s", i + 1, bone_name)
         
         # 显示DISW骨骼详细列表
         if disw_bones:
-            print(f"\n📐 DISW骨骼详细列表 ({len(disw_bones)} 个):")
+            logger.info("\n📐 DISW骨骼详细列表 (%s 个):", len(disw_bones))
             for i, bone_name in enumerate(disw_bones):
-                print(f"   {i+1:3d}. {bone_name}")
+                logger.debug("   %3d. %s", i + 1, bone_name)
         
         # 显示NebOffset骨骼详细列表
         if neboffset_bones:
-            print(f"\n⚖️ NebOffset骨骼详细列表 ({len(neboffset_bones)} 个):")
+            logger.info("\n⚖️ NebOffset骨骼详细列表 (%s 个):", len(neboffset_bones))
             for i, bone_name in enumerate(neboffset_bones):
-                print(f"   {i+1:3d}. {bone_name}")
+                logger.debug("   %3d. %s", i + 1, bone_name)
         
         # 显示部分控制骨骼作为参考
         if ctrl_bones:
-            print(f"\n🎯 其他控制骨骼示例 (前10个，共{len(ctrl_bones)}个):")
+            logger.info("\n🎯 其他控制骨骼示例 (前10个，共%s个):", len(ctrl_bones))
             for i, bone_name in enumerate(ctrl_bones[:10]):
-                print(f"   {i+1:3d}. {bone_name}")
+                logger.debug("   %3d. %s", i + 1, bone_name)
             if len(ctrl_bones) > 10:
-                print(f"   ... 还有 {len(ctrl_bones) - 10} 个控制骨骼")
+                logger.info("   ... 还有 %s 个控制骨骼", len(ctrl_bones) - 10)
         
-        print(f"📋 === 骨骼列表显示完成 ===\n")
+        logger.info("📋 === 骨骼列表显示完成 ===\n")
         
         # 验证配置文件
-        print("🔍 验证NebOffset骨骼配置...")
+        logger.info("🔍 验证NebOffset骨骼配置...")
         validation_errors = validate_bone_lists()
         if validation_errors:
-            print("❌ 配置验证失败:")
+            logger.error("❌ 配置验证失败:")
             for error in validation_errors:
-                print(f"   - {error}")
+                logger.debug("   - %s", error)
         else:
-            print("✅ 配置验证通过")
+            logger.info("✅ 配置验证通过")
         
-        print(f"📊 从配置文件加载: {get_neboffset_bone_count()} 个NebOffset骨骼定义")
+        logger.info("📊 从配置文件加载: %s 个NebOffset骨骼定义", get_neboffset_bone_count())
+        if self.neboffset_lod != 'FULL':
+            logger.info("🎚️ 细节级别 %s: 生成 %s 个NebOffset骨骼", self.neboffset_lod, len(self.neboffset_mapping))
         
         # 使用配置文件中的骨骼映射
         disw_generated_count = 0
         disw_failed_count = 0
         
-        for attr_name, bone_name in NEBOFFSET_BONE_MAPPING.items():
+        for attr_name, bone_name in self.neboffset_mapping.items():
             try:
                 disw_bone = self.copy_bone(self.base_bone, bone_name)
                 setattr(self.bones.wei, attr_name.replace('.', '_'), disw_bone)  # 属性名转换为有效标识符
                 disw_generated_count += 1
             except Exception as e:
-                print(f"⚠ 生成NebOffset骨骼失败 {bone_name}: {e}")
+                logger.warning("⚠ 生成NebOffset骨骼失败 %s: %s", bone_name, e)
                 disw_failed_count += 1
                 continue
         
-        print(f"📊 NebOffset骨骼生成统计: 成功 {disw_generated_count} 个，失败 {disw_failed_count} 个")
+        logger.info("📊 NebOffset骨骼生成统计: 成功 %s 个，失败 %s 个", disw_generated_count, disw_failed_count)
         
         
         # 7. 统计所有骨骼
         total_wei = disw_generated_count
         
-        print(f"\n✅ 骨骼生成完成总结:")
-        print(f"    🏗️ 主要骨骼: 3 个 (Neb_Facer_root, Neb_face-root, Neb_RigifyFace)")
-        print(f"    ⚖️ NebOffset 骨骼: {total_wei} 个")
+        logger.info("\n✅ 骨骼生成完成总结:")
+        logger.info("    🏗️ 主要骨骼: 3 个 (Neb_Facer_root, Neb_face-root, Neb_RigifyFace)")
+        logger.info("    ⚖️ NebOffset 骨骼: %s 个", total_wei)
         
-        print(f"🏗️ === 骨骼结构生成完成 ===\n")
+        logger.info("🏗️ === 骨骼结构生成完成 ===\n")
     
     def rig_bones(self):
         """设置约束系统和骨骼集合分配"""
-        print("\n🔗 === 开始设置约束系统和骨骼集合分配 ===")
+        logger.info("\n🔗 === 开始设置约束系统和骨骼集合分配 ===")
         
         # 分配主要骨骼到相应集合
-        print("\n📁 分配主要骨骼到集合...")
+        logger.info("\n📁 分配主要骨骼到集合...")
         self.assign_bone_to_collection('Neb_Facer_root', 'Neb_Face')
         self.assign_bone_to_collection('Neb_face-root', 'Neb_Face')  
         self.assign_bone_to_collection('Neb_RigifyFace', 'Neb_Face')
         
         # 分配NebOffset骨骼到Neb_MCH集合
         if hasattr(self.bones, 'wei') and self.bones.wei:
-            print(f"\n📁 分配NebOffset骨骼到Neb_MCH集合...")
+            logger.info("\n📁 分配NebOffset骨骼到Neb_MCH集合...")
             wei_assigned = 0
             wei_failed = 0
             
             # 使用配置文件中的骨骼属性列表
-            wei_attr_names = [attr.replace('.', '_') for attr in NEBOFFSET_BONE_ATTRIBUTES]
+            wei_attr_names = [attr.replace('.', '_') for attr in self.neboffset_attributes]
             
             for i, attr_name in enumerate(wei_attr_names):
                 if hasattr(self.bones.wei, attr_name):
@@ -385,19 +485,19 @@ class Rig(BaseRig):
                     if bone_name:
                         if self.assign_bone_to_collection(bone_name, 'Neb_MCH'):
                             wei_assigned += 1
-                            print(f"✅ NebOffset {i+1:2d}/{len(wei_attr_names)}: {bone_name}")
+                            logger.debug("✅ NebOffset %2d/%s: %s", i + 1, len(wei_attr_names), bone_name)
                         else:
                             wei_failed += 1
                     else:
-                        print(f"⚠ NebOffset {i+1:2d}/{len(wei_attr_names)}: {attr_name} (骨骼名称为空)")
+                        logger.warning("⚠ NebOffset %2d/%s: %s (骨骼名称为空)", i + 1, len(wei_attr_names), attr_name)
                 else:
-                    print(f"⚠ NebOffset {i+1:2d}/{len(wei_attr_names)}: {attr_name} (属性不存在)")
+                    logger.warning("⚠ NebOffset %2d/%s: %s (属性不存在)", i + 1, len(wei_attr_names), attr_name)
                     
-            print(f"📊 NebOffset骨骼分配统计: 成功 {wei_assigned} 个，失败 {wei_failed} 个")
+            logger.info("📊 NebOffset骨骼分配统计: 成功 %s 个，失败 %s 个", wei_assigned, wei_failed)
         
         # 分配控制骨骼到Neb_Con集合
         if hasattr(self.bones, 'ctrl') and self.bones.ctrl:
-            print(f"\n📁 分配控制骨骼到Neb_Con集合...")
+            logger.info("\n📁 分配控制骨骼到Neb_Con集合...")
             ctrl_assigned = 0
             ctrl_failed = 0
             ctrl_attr_names = ['face_root', 'mouth_main', 'eye_l_main', 'eye_r_main', 'brow_l_main', 'brow_r_main']
@@ -408,260 +508,161 @@ class Rig(BaseRig):
                     if bone_name:
                         if self.assign_bone_to_collection(bone_name, 'Neb_Con'):
                             ctrl_assigned += 1
-                            print(f"✅ 控制骨骼 {i+1:2d}/{len(ctrl_attr_names)}: {bone_name}")
+                            logger.debug("✅ 控制骨骼 %2d/%s: %s", i + 1, len(ctrl_attr_names), bone_name)
                         else:
                             ctrl_failed += 1
                     else:
-                        print(f"⚠ 控制骨骼 {i+1:2d}/{len(ctrl_attr_names)}: {attr_name} (骨骼名称为空)")
+                        logger.warning("⚠ 控制骨骼 %2d/%s: %s (骨骼名称为空)", i + 1, len(ctrl_attr_names), attr_name)
                 else:
-                    print(f"⚠ 控制骨骼 {i+1:2d}/{len(ctrl_attr_names)}: {attr_name} (属性不存在)")
+                    logger.warning("⚠ 控制骨骼 %2d/%s: %s (属性不存在)", i + 1, len(ctrl_attr_names), attr_name)
                     
-            print(f"📊 控制骨骼分配统计: 成功 {ctrl_assigned} 个，失败 {ctrl_failed} 个")
+            logger.info("📊 控制骨骼分配统计: 成功 %s 个，失败 %s 个", ctrl_assigned, ctrl_failed)
         
         # 添加复制变换约束
-        print(f"\n🔗 === 开始设置复制变换约束 ===")
+        logger.info("\n🔗 === 开始设置复制变换约束 ===")
         self.setup_copy_transform_constraints()
         
         # 复制模板约束和驱动器到NebOffset骨骼
-        print(f"\n📋 === 开始复制模板约束和驱动器 ===")
+        logger.info("\n📋 === 开始复制模板约束和驱动器 ===")
         self.copy_template_constraints_and_drivers()
         
-        print(f"🔗 === 约束系统和骨骼集合分配完成 ===\n")
-        print(f"💡 注意：NebOffset骨骼位置设置已移至@stage.generate_bones阶段执行")
+        logger.info("🔗 === 约束系统和骨骼集合分配完成 ===\n")
+        logger.info("💡 注意：NebOffset骨骼位置设置已移至@stage.generate_bones阶段执行")
     
     def copy_template_constraints_and_drivers(self):
         """从模板rig复制约束和驱动器到NebOffset骨骼"""
-        print("📋 开始从模板rig复制约束和驱动器到NebOffset骨骼...")
-        
-        # === 关键：完整的 Rigify 状态保护系统 ===
-        rigify_state = {
-            'active': bpy.context.view_layer.objects.active,
-            'selected': list(bpy.context.selected_objects),
-            'mode': bpy.context.mode,
-            'current_rig': self.obj
-        }
-        
-        print(f"🛡️ 保护 Rigify 状态:")
-        print(f"   📌 活动对象: {rigify_state['active'].name if rigify_state['active'] else 'None'}")
-        print(f"   📌 当前rig: {rigify_state['current_rig'].name}")
-        print(f"   📌 模式: {rigify_state['mode']}")
+        logger.info("📋 开始从模板rig复制约束和驱动器到NebOffset骨骼...")
         
+        # 保护 Rigify 状态：当前rig保持活动并处于对象模式（已满足时不调用运算符），
+        # 模板查找和加载器中的嵌套保护不再重复保存和恢复
         try:
-            # 确保处于正确的模式和状态
-            self._ensure_safe_context()
-            
-            # 获取模板rig对象（使用优化的查找方法）
-            template_rig = self._find_template_rig_safe()
-            if not template_rig:
-                print("⚠ 未找到模板rig对象，跳过约束和驱动器复制")
-                return
-            
-            print(f"✅ 找到模板rig: {template_rig.name}")
+            with ContextGuard(active=self.obj, mode='OBJECT', leave_active=self.obj):
+                # 预编译快照有效时直接使用模板rig名称，无需追加 .blend
+                snapshot = self.template_session.loader.load_precompiled_snapshot()
+                if snapshot is not None:
+                    template_rig = snapshot['template_rig']
+                    logger.info("⚡ 使用预编译模板快照: %s", template_rig)
+                else:
+                    # 获取模板rig对象（使用优化的查找方法）
+                    template_rig = self._find_template_rig_safe()
+                    if not template_rig:
+                        logger.warning("⚠ 未找到模板rig对象，跳过约束和驱动器复制")
+                        return
+                
+                    logger.info("✅ 找到模板rig: %s", template_rig.name)
             
-            # 执行复制操作（保持状态）
-            success = self._perform_template_copy(template_rig)
+                # 执行复制操作（保持状态）
+                success = self._perform_template_copy(template_rig)
             
-            if success:
-                print("✅ 模板约束和驱动器复制完成")
-            else:
-                print("⚠ 模板复制过程中出现问题")
+                if success:
+                    logger.info("✅ 模板约束和驱动器复制完成")
+                else:
+                    logger.warning("⚠ 模板复制过程中出现问题")
                 
         except Exception as e:
-            print(f"❌ 复制模板约束和驱动器时出错: {e}")
+            logger.error("❌ 复制模板约束和驱动器时出错: %s", e)
             import traceback
             traceback.print_exc()
-            
-        finally:
-            # === 关键：恢复 Rigify 期望的状态 ===
-            self._restore_rigify_state(rigify_state)
         
-        print("📋 === 模板约束和驱动器复制完成 ===\n")
-    
-    def _ensure_safe_context(self):
-        """确保处于安全的上下文状态"""
-        # 确保在对象模式
-        if bpy.context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        # 确保当前rig是活动的（Rigify要求）
-        if bpy.context.view_layer.objects.active != self.obj:
-            bpy.context.view_layer.objects.active = self.obj
-            self.obj.select_set(True)
+        logger.info("📋 === 模板约束和驱动器复制完成 ===\n")
     
     def _find_template_rig_safe(self):
         """安全地查找模板rig对象（不破坏Rigify状态）"""
-        print("🔍 安全查找模板rig对象...")
+        logger.info("🔍 安全查找模板rig对象...")
         
         # 首先尝试通过 template_manager 查找（推荐方法）
         if hasattr(self, 'template_manager') and self.template_manager:
             try:
                 template_rig = self.template_manager.find_template_rig_object_safe(self.obj)
                 if template_rig:
-                    print(f"✅ 通过template_manager找到: {template_rig.name}")
+                    logger.info("✅ 通过template_manager找到: %s", template_rig.name)
                     return template_rig
             except Exception as e:
-                print(f"⚠ template_manager查找失败: {e}")
+                logger.warning("⚠ template_manager查找失败: %s", e)
         
         # 备用方法：直接在场景中查找
-        print("🔍 使用备用方法查找...")
+        logger.info("🔍 使用备用方法查找...")
         return self._find_template_in_scene()
     
     def _find_template_in_scene(self):
-        """在当前场景中直接查找模板rig"""
-        target_names = [
-            "Nebysse_FaceUP_Tem.Rig",
-            "Nebysse_FaceUP_Tem",
-            "FaceUP_Tem.Rig"
-        ]
+        """在模板rig注册表中查找模板rig（O(1)，不扫描场景对象）"""
+        from .utils.template_registry import find_template_rig
+        
+        template_rig = find_template_rig(exclude=self.obj)
+        if template_rig:
+            logger.info("✅ 场景中找到模板rig: %s", template_rig.name)
+            return template_rig
         
-        # 精确名称匹配
-        for target_name in target_names:
-            if target_name in bpy.data.objects:
-                obj = bpy.data.objects[target_name]
-                if obj.type == 'ARMATURE' and obj != self.obj:
-                    print(f"✅ 场景中找到模板rig: {obj.name}")
-                    return obj
-        
-        # 包含NebOffset骨骼的armature对象
-        for obj in bpy.context.scene.objects:
-            if (obj.type == 'ARMATURE' and 
-                obj != self.obj):
-                neboffset_bones = [bone for bone in obj.pose.bones if bone.name.startswith('NebOffset-')]
-                if len(neboffset_bones) > 5:
-                    print(f"✅ 按NebOffset骨骼找到: {obj.name} ({len(neboffset_bones)}个骨骼)")
-                    return obj
-        
-        print("⚠ 场景中未找到模板rig")
+        logger.warning("⚠ 场景中未找到模板rig")
         return None
     
     def _perform_template_copy(self, template_rig):
-        """执行模板复制操作（增强版：使用专门的NebOffset骨骼复制方法）"""
+        """执行模板复制操作（批量复制NebOffset骨骼数据，只更新一次依赖图）
+        
+        Args:
+            template_rig: 模板rig对象，或使用预编译快照时的模板rig名称
+        """
+        template_rig_name = template_rig if isinstance(template_rig, str) else template_rig.name
+        logger.info("📋 开始从 %s 复制到NebOffset骨骼...", template_rig_name)
+        logger.info("🎯 使用批量NebOffset骨骼数据复制方法")
+        
+        # 使用模板会话共享的加载器（共享快照、ID映射表和追加数据块的所有权）
+        loader = self.template_session.loader
+        
+        bone_names = ["NebOffset-" + bone_attr for bone_attr in self.neboffset_attributes]
+        # 模板中引用被折叠骨骼的驱动器变量和约束子目标映射到保留的骨骼
+        results = loader.copy_neboffset_bones_batch(template_rig, self.obj, bone_names,
+                                                    bone_folds=get_lod_bone_name_folds(self.neboffset_lod))
+        
+        successful_bones = 0
+        failed_count = 0
         constraints_copied = 0
         drivers_copied = 0
-        failed_count = 0
-        skipped_count = 0
-        
-        print(f"📋 开始从 {template_rig.name} 复制到NebOffset骨骼...")
-        print(f"🎯 使用增强的NebOffset骨骼数据复制方法")
+        properties_copied = 0
         
-        # 创建blend_template_loader实例用于复制操作
-        from .utils.blend_template_loader import BlendTemplateLoader
-        loader = BlendTemplateLoader()
-        # 遍历NEBOFFSET_BONE_ATTRIBUTES中的所有骨骼
-        for i, bone_attr in enumerate(NEBOFFSET_BONE_ATTRIBUTES, 1):
-            neboffset_bone_name = "NebOffset-"+bone_attr
+        for i, bone_name in enumerate(bone_names, 1):
+            result = results[bone_name]
+            constraints_copied += result['constraints']
+            drivers_copied += result['drivers']
+            properties_copied += result['custom_properties']
             
-            try:
-                print(self.obj.pose.bones[neboffset_bone_name].name)
-                print(f"🔄 [{i}/{len(NEBOFFSET_BONE_ATTRIBUTES)}] 复制骨骼数据: {neboffset_bone_name}")
-                
-                success = loader.copy_neboffset_bone_data(
-                    template_rig_name=template_rig.name,
-                    neboffset_bone_name=neboffset_bone_name,
-                    target_rig=self.obj,
-                    target_bone_name=neboffset_bone_name
-                )
-                
-                if success:
-                    # 统计成功复制的数据（这里我们使用近似值，因为新方法统一处理）
-                    constraints_copied += 1  # 假设至少复制了1个约束
-                    drivers_copied += 1       # 假设至少复制了1个驱动器
-                    
-                    if i <= 10:  # 只显示前10个成功信息
-                        print(f"  ✅ [{i}] {neboffset_bone_name}: 完整数据复制成功")
-                    elif i == 11:
-                        print(f"  ... 继续复制更多骨骼数据 ...")
-                else:
-                    failed_count += 1
-                    if failed_count <= 3:
-                        print(f"  ❌ [{i}] {neboffset_bone_name}: 复制失败")
-                
-            except Exception as e:
+            if result['success']:
+                successful_bones += 1
+            else:
                 failed_count += 1
-                if failed_count <= 3:
-                    print(f"❌ 复制失败 {neboffset_bone_name}: {e}")
+                if failed_count <= 3:  # 只显示前3个错误
+                    logger.error("  ❌ [%s] %s: %s", i, bone_name, result['error'] or '复制失败')
         
         # 输出统计结果
-        successful_bones = len(NEBOFFSET_BONE_ATTRIBUTES) - skipped_count - failed_count
-        
-        print(f"📊 模板NebOffset骨骼数据复制统计:")
-        print(f"   📋 处理骨骼: {len(NEBOFFSET_BONE_ATTRIBUTES)} 个")
-        print(f"   ✅ 成功复制: {successful_bones} 个骨骼")
-        print(f"   ⚠ 跳过处理: {skipped_count} 个")
-        print(f"   ❌ 复制失败: {failed_count} 个")
-        
-        # 计算近似的约束和驱动器数量（基于成功的骨骼数量）
-        estimated_constraints = successful_bones * 2  # 假设每个骨骼平均2个约束
-        estimated_drivers = successful_bones * 3      # 假设每个骨骼平均3个驱动器
-        
-        print(f"   🔗 约束（估算）: {estimated_constraints} 个")
-        print(f"   🎯 驱动器（估算）: {estimated_drivers} 个")
+        logger.info("📊 模板NebOffset骨骼数据复制统计:")
+        logger.info("   📋 处理骨骼: %s 个", len(bone_names))
+        logger.info("   ✅ 成功复制: %s 个骨骼", successful_bones)
+        log_count(logger, "   ❌ 复制失败: %s 个", failed_count)
+        logger.info("   🔗 约束: %s 个", constraints_copied)
+        logger.info("   🎯 驱动器: %s 个", drivers_copied)
+        logger.info("   📝 自定义属性: %s 个", properties_copied)
         
         if successful_bones > 0:
-            success_rate = (successful_bones / len(NEBOFFSET_BONE_ATTRIBUTES)) * 100
-            print(f"   📈 成功率: {success_rate:.1f}%")
-            print("✅ NebOffset骨骼完整数据复制完成")
+            success_rate = (successful_bones / len(bone_names)) * 100
+            logger.info("   📈 成功率: %.1f%%", success_rate)
+            logger.info("✅ NebOffset骨骼完整数据复制完成")
         else:
-            print("⚠ 没有成功复制任何NebOffset骨骼数据")
+            logger.warning("⚠ 没有成功复制任何NebOffset骨骼数据")
         
         return successful_bones > 0
     
-    def _restore_rigify_state(self, rigify_state):
-        """恢复Rigify期望的状态"""
-        try:
-            print("🔄 恢复Rigify状态...")
-            
-            # 最重要：确保当前rig是活动对象
-            current_rig = rigify_state['current_rig']
-            if current_rig and current_rig.name in bpy.data.objects:
-                bpy.context.view_layer.objects.active = current_rig
-                current_rig.select_set(True)
-                print(f"✅ 活动对象恢复为: {current_rig.name}")
-            
-            # 恢复模式
-            target_mode = rigify_state['mode']
-            if bpy.context.mode != target_mode:
-                if target_mode == 'EDIT_ARMATURE':
-                    bpy.ops.object.mode_set(mode='EDIT')
-                elif target_mode == 'POSE':
-                    bpy.ops.object.mode_set(mode='POSE')
-                else:
-                    bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # 更新视图层
-            bpy.context.view_layer.update()
-            
-            # 验证最终状态
-            final_active = bpy.context.view_layer.objects.active
-            if final_active == current_rig:
-                print("✅ Rigify状态恢复成功")
-            else:
-                print(f"⚠ 状态恢复异常，强制设置...")
-                bpy.context.view_layer.objects.active = current_rig
-                
-        except Exception as e:
-            print(f"❌ 恢复Rigify状态失败: {e}")
-            # 紧急恢复
-            try:
-                current_rig = rigify_state['current_rig']
-                bpy.context.view_layer.objects.active = current_rig
-                current_rig.select_set(True)
-                print("🆘 紧急恢复完成")
-            except:
-                print("🆘 紧急恢复也失败")
-    
     def find_template_rig(self):
         """查找模板rig对象（简化版，委托给安全方法）"""
-        print("🔍 开始查找模板rig对象...")
+        logger.info("🔍 开始查找模板rig对象...")
         
         # 直接委托给安全的查找方法
         template_rig = self._find_template_rig_safe()
         
         if template_rig:
-            print(f"✅ 找到模板rig: {template_rig.name}")
+            logger.info("✅ 找到模板rig: %s", template_rig.name)
         else:
-            print("⚠ 未找到模板rig对象")
-            print("💡 建议检查模板文件或手动导入模板rig")
+            logger.warning("⚠ 未找到模板rig对象")
+            logger.info("💡 建议检查模板文件或手动导入模板rig")
         
         return template_rig
     
@@ -683,7 +684,7 @@ class Rig(BaseRig):
                 copied_count += 1
                 
             except Exception as e:
-                print(f"❌ 复制约束失败 {source_constraint.name}: {e}")
+                logger.error("❌ 复制约束失败 %s: %s", source_constraint.name, e)
         
         return copied_count
     
@@ -695,12 +696,9 @@ class Rig(BaseRig):
         if hasattr(source_constraint, 'mute'):
             target_constraint.mute = source_constraint.mute
         
-        # 目标相关属性
+        # 目标相关属性（模板rig及其数据通过ID映射表重定向到当前rig）
         if hasattr(source_constraint, 'target'):
-            if source_constraint.target == source_rig:
-                target_constraint.target = self.obj  # 重定向到当前rig
-            else:
-                target_constraint.target = source_constraint.target
+            target_constraint.target = self._get_template_id_remap(source_rig).remap(source_constraint.target)
         
         if hasattr(source_constraint, 'subtarget'):
             target_constraint.subtarget = source_constraint.subtarget
@@ -715,49 +713,64 @@ class Rig(BaseRig):
             if hasattr(source_constraint, attr):
                 setattr(target_constraint, attr, getattr(source_constraint, attr))
     
-    def copy_bone_drivers(self, source_bone, target_bone, source_rig):
-        """复制骨骼驱动器从源骨骼到目标骨骼"""
+    def copy_bone_drivers(self, source_bone, target_bone, source_rig, driver_index=None):
+        """复制骨骼驱动器从源骨骼到目标骨骼
+        
+        Args:
+            driver_index: build_driver_index 生成的驱动器索引，为None时使用按源rig缓存的索引
+        """
+        from .utils.blend_template_loader import build_driver_index
+        
         copied_count = 0
         
         if not source_bone.id_data.animation_data:
             return 0
         
-        source_drivers = source_bone.id_data.animation_data.drivers
-        if not source_drivers:
-            return 0
-        
-        # 获取源骨骼的数据路径前缀
-        source_bone_path = f'pose.bones["{source_bone.name}"]'
+        if driver_index is None:
+            # 同一源rig的索引只建立一次，后续骨骼按名称O(1)查询
+            cache = getattr(self, '_driver_index_cache', None)
+            if cache is None or cache[0] is not source_rig:
+                cache = (source_rig, build_driver_index(source_rig))
+                self._driver_index_cache = cache
+            driver_index = cache[1]
         
-        for driver in source_drivers:
+        for driver, path in driver_index.get(source_bone.name, ()):
             try:
-                # 检查驱动器是否属于源骨骼
-                if not driver.data_path.startswith(source_bone_path):
-                    continue
-                
-                # 构建目标数据路径
-                target_bone_path = f'pose.bones["{target_bone.name}"]'
-                target_data_path = driver.data_path.replace(source_bone_path, target_bone_path)
+                # 以目标骨骼名称渲染数据路径
+                target_data_path = path.render(bone=target_bone.name)
                 
                 # 复制驱动器
                 self.copy_driver(driver, target_data_path, source_rig)
                 copied_count += 1
                 
             except Exception as e:
-                print(f"❌ 复制驱动器失败: {e}")
+                logger.error("❌ 复制驱动器失败: %s", e)
         
         return copied_count
     
+    def _get_template_id_remap(self, source_rig):
+        """获取模板rig → 当前rig的ID映射表（同一模板rig只建立一次）"""
+        from .utils.id_remap import IDRemap
+        
+        cache = getattr(self, '_id_remap_cache', None)
+        if cache is None or cache[0] is not source_rig:
+            cache = (source_rig, IDRemap.for_template(self.obj, source_rig))
+            self._id_remap_cache = cache
+        return cache[1]
+    
     def copy_driver(self, source_driver, target_data_path, source_rig):
         """复制单个驱动器"""
+        from .utils.driver_expressions import optimize_driver, record_analysis
+        from .utils.driver_paths import add_driver
+        from .utils.driver_repair import record_driver
+        
         # 确保目标对象有动画数据
         if not self.obj.animation_data:
             self.obj.animation_data_create()
         
-        # 创建新驱动器
-        new_driver = self.obj.driver_add(target_data_path)
-        if hasattr(new_driver, '__len__'):  # 如果返回列表，取第一个
-            new_driver = new_driver[0]
+        # 创建新驱动器（保留源驱动器的数组通道）
+        new_driver = add_driver(self.obj, target_data_path, source_driver.array_index)
+        record_driver(new_driver)
         
         # 复制驱动器类型和表达式
         new_driver.driver.type = source_driver.driver.type
@@ -765,6 +778,7 @@ class Rig(BaseRig):
             new_driver.driver.expression = source_driver.driver.expression
         
         # 复制变量
+        remap = self._get_template_id_remap(source_rig)
         for source_var in source_driver.driver.variables:
             new_var = new_driver.driver.variables.new()
             new_var.name = source_var.name
@@ -775,35 +789,37 @@ class Rig(BaseRig):
                 if i < len(new_var.targets):
                     new_target = new_var.targets[i]
                     
-                    # 重定向目标对象
-                    if source_target.id == source_rig:
-                        new_target.id = self.obj
-                    else:
-                        new_target.id = source_target.id
+                    # 通过ID映射表重定向目标（id_type 需要先于 id 设置）
+                    if new_var.type == 'SINGLE_PROP':
+                        new_target.id_type = source_target.id_type
+                    new_target.id = remap.remap(source_target.id)
                     
                     # 复制其他目标属性
                     for attr in ['bone_target', 'data_path', 'transform_type', 'transform_space']:
                         if hasattr(source_target, attr):
                             setattr(new_target, attr, getattr(source_target, attr))
+        
+        # 常见写法改写为简单表达式或驱动器类型，仍需Python求值的记入表达式报告
+        record_analysis(f"{self.obj.name} {target_data_path}", optimize_driver(new_driver.driver))
     
     def setup_copy_transform_constraints(self):
         """设置复制变换约束"""
-        print("🔗 开始为rigify骨骼添加复制变换约束...")
+        logger.info("🔗 开始为rigify骨骼添加复制变换约束...")
         
         # 使用配置文件中的约束映射
-        constraint_mappings = CONSTRAINT_MAPPINGS
+        constraint_mappings = get_lod_constraint_mappings(self.neboffset_lod)
         
         constraint_added_count = 0
         constraint_failed_count = 0
         constraint_skipped_count = 0
         
-        print(f"📝 准备为 {len(constraint_mappings)} 个骨骼对添加复制变换约束...")
-        print("🎯 约束方向：rigify骨骼 -> NebOffset骨骼")
-        print("🏗️ 父级骨骼：所有NebOffset骨骼都将以Neb_RigifyFace为父级")
-        print(f"📋 约束配置来源：neboffset_bones.py (共 {get_constraint_count()} 个映射)")
+        logger.info("📝 准备为 %s 个骨骼对添加复制变换约束...", len(constraint_mappings))
+        logger.info("🎯 约束方向：rigify骨骼 -> NebOffset骨骼")
+        logger.info("🏗️ 父级骨骼：所有NebOffset骨骼都将以Neb_RigifyFace为父级")
+        logger.info("📋 约束配置来源：neboffset_bones.py (共 %s 个映射)", get_constraint_count())
         
         # 添加设置父级功能
-        print("👨‍👩‍👧‍👦 开始为NebOffset骨骼设置父级...")
+        logger.info("👨\u200d👩\u200d👧\u200d👦 开始为NebOffset骨骼设置父级...")
         parent_set_count = 0
         parent_failed_count = 0
         parent_skipped_count = 0
@@ -818,7 +834,7 @@ class Rig(BaseRig):
             except Exception as e:
                 parent_failed_count += 1
                 if parent_failed_count <= 3:  # 只显示前3个错误
-                    print(f"❌ 设置父级失败 {target_bone_name} -> {self.neb_rigify_face_bone}: {e}")
+                    logger.error("❌ 设置父级失败 %s -> %s: %s", target_bone_name, self.neb_rigify_face_bone, e)
         
 
 
@@ -826,22 +842,22 @@ class Rig(BaseRig):
 
         # 输出父级设置统计
         total_parent_processed = parent_set_count + parent_failed_count + parent_skipped_count
-        print(f"\n📊 NebOffset骨骼父级设置统计:")
-        print(f"   ✅ 成功设置: {parent_set_count} 个父级关系")
-        print(f"   ❌ 设置失败: {parent_failed_count} 个")
-        print(f"   ⚠ 跳过处理: {parent_skipped_count} 个")
-        print(f"   📝 总处理量: {total_parent_processed} 个")
+        logger.info("\n📊 NebOffset骨骼父级设置统计:")
+        logger.info("   ✅ 成功设置: %s 个父级关系", parent_set_count)
+        log_count(logger, "   ❌ 设置失败: %s 个", parent_failed_count)
+        log_count(logger, "   ⚠ 跳过处理: %s 个", parent_skipped_count, "WARNING")
+        logger.info("   📝 总处理量: %s 个", total_parent_processed)
         
         if parent_set_count > 0:
             parent_success_rate = (parent_set_count / total_parent_processed) * 100
-            print(f"   📈 成功率: {parent_success_rate:.1f}%")
-            print(f"✅ NebOffset骨骼父级设置完成，所有目标骨骼现在以 {self.neb_rigify_face_bone} 为父级")
-            print("🎯 父级结构：Neb_RigifyFace -> 所有NebOffset骨骼")
+            logger.info("   📈 成功率: %.1f%%", parent_success_rate)
+            logger.info("✅ NebOffset骨骼父级设置完成，所有目标骨骼现在以 %s 为父级", self.neb_rigify_face_bone)
+            logger.info("🎯 父级结构：Neb_RigifyFace -> 所有NebOffset骨骼")
         else:
-            print("⚠ 没有成功设置任何NebOffset骨骼父级关系")
-            print("💡 请检查Neb_RigifyFace骨骼和NebOffset骨骼是否正确生成")
+            logger.warning("⚠ 没有成功设置任何NebOffset骨骼父级关系")
+            logger.info("💡 请检查Neb_RigifyFace骨骼和NebOffset骨骼是否正确生成")
         
-        print("👨‍👩‍👧‍👦 === NebOffset骨骼父级设置完成 ===\n")
+        logger.info("👨\u200d👩\u200d👧\u200d👦 === NebOffset骨骼父级设置完成 ===\n")
         
         for source_bone_name, target_bone_name in constraint_mappings:
             try:
@@ -849,14 +865,14 @@ class Rig(BaseRig):
                 if source_bone_name not in self.obj.pose.bones:
                     constraint_skipped_count += 1
                     if constraint_skipped_count <= 5:  # 只显示前5个跳过信息
-                        print(f"⚠ 跳过约束：源骨骼 '{source_bone_name}' 不存在")
+                        logger.warning("⚠ 跳过约束：源骨骼 '%s' 不存在", source_bone_name)
                     continue
                 
                 # 检查目标骨骼（NebOffset骨骼）是否存在
                 if target_bone_name not in self.obj.pose.bones:
                     constraint_failed_count += 1
                     if constraint_failed_count <= 5:  # 只显示前5个失败信息
-                        print(f"❌ 约束失败：目标骨骼 '{target_bone_name}' 不存在")
+                        logger.error("❌ 约束失败：目标骨骼 '%s' 不存在", target_bone_name)
                     continue
                 
                 # 获取源骨骼的姿态骨骼
@@ -878,33 +894,33 @@ class Rig(BaseRig):
                 
                 # 显示成功添加的约束（只显示前10个）
                 if constraint_added_count <= 10:
-                    print(f"✅ 约束 {constraint_added_count:2d}: {source_bone_name:15s} -> {target_bone_name}")
+                    logger.debug("✅ 约束 %2d: %15s -> %s", constraint_added_count, source_bone_name, target_bone_name)
                 elif constraint_added_count == 11:
-                    print(f"   ... 继续添加更多约束 ...")
+                    logger.debug("   ... 继续添加更多约束 ...")
                 
             except Exception as e:
                 constraint_failed_count += 1
                 if constraint_failed_count <= 3:  # 只显示前3个错误
-                    print(f"❌ 添加约束失败 {source_bone_name} -> {target_bone_name}: {e}")
+                    logger.error("❌ 添加约束失败 %s -> %s: %s", source_bone_name, target_bone_name, e)
         
         # 输出约束添加统计
         total_processed = constraint_added_count + constraint_failed_count + constraint_skipped_count
-        print(f"\n📊 复制变换约束添加统计:")
-        print(f"   ✅ 成功添加: {constraint_added_count} 个约束")
-        print(f"   ❌ 添加失败: {constraint_failed_count} 个")
-        print(f"   ⚠ 跳过处理: {constraint_skipped_count} 个")
-        print(f"   📝 总处理量: {total_processed} 个")
+        logger.info("\n📊 复制变换约束添加统计:")
+        logger.info("   ✅ 成功添加: %s 个约束", constraint_added_count)
+        log_count(logger, "   ❌ 添加失败: %s 个", constraint_failed_count)
+        log_count(logger, "   ⚠ 跳过处理: %s 个", constraint_skipped_count, "WARNING")
+        logger.info("   📝 总处理量: %s 个", total_processed)
         
         if constraint_added_count > 0:
             success_rate = (constraint_added_count / total_processed) * 100
-            print(f"   📈 成功率: {success_rate:.1f}%")
-            print("✅ 复制变换约束系统设置完成")
-            print("🎯 约束效果：rigify骨骼的变换将跟随对应的NebOffset骨骼")
+            logger.info("   📈 成功率: %.1f%%", success_rate)
+            logger.info("✅ 复制变换约束系统设置完成")
+            logger.info("🎯 约束效果：rigify骨骼的变换将跟随对应的NebOffset骨骼")
         else:
-            print("⚠ 没有成功添加任何复制变换约束")
-            print("💡 请检查源骨骼和目标骨骼是否正确生成")
+            logger.warning("⚠ 没有成功添加任何复制变换约束")
+            logger.info("💡 请检查源骨骼和目标骨骼是否正确生成")
         
-        print("🔗 === 复制变换约束设置完成 ===\n")
+        logger.info("🔗 === 复制变换约束设置完成 ===\n")
     
     @stage.generate_bones
     def set_neboffset_positions_late(self):
@@ -915,9 +931,9 @@ class Rig(BaseRig):
         - 这些是世界坐标系下的绝对位置，不是姿态坐标
         - 坐标复制在编辑状态下进行，确保骨骼的基础结构正确
         """
-        print(f"\n📍 === 延迟设置NebOffset骨骼编辑坐标 ===")
-        print("💡 使用@stage.generate_bones装饰器确保在所有rigify骨骼生成完成后执行")
-        print("🎯 坐标类型：编辑模式下的根坐标（head）和头坐标（tail），非姿态坐标")
+        logger.info("\n📍 === 延迟设置NebOffset骨骼编辑坐标 ===")
+        logger.info("💡 使用@stage.generate_bones装饰器确保在所有rigify骨骼生成完成后执行")
+        logger.info("🎯 坐标类型：编辑模式下的根坐标（head）和头坐标（tail），非姿态坐标")
         
         # 检查NebOffset骨骼集合是否存在
         #if not hasattr(self.bones, 'wei') or not self.bones.wei:
@@ -929,18 +945,18 @@ class Rig(BaseRig):
         all_bones = [bone.name for bone in edit_bones]
         total_bones = len(all_bones)
         
-        print(f"📊 当前骨架包含 {total_bones} 个骨骼（编辑模式）")
+        logger.info("📊 当前骨架包含 %s 个骨骼（编辑模式）", total_bones)
         
         # 快速检查关键rigify骨骼是否存在
         key_rigify_bones = ['brow.T.L.003', 'brow.T.R.003', 'lip.T.L', 'lip.B.L', 'cheek.B.L']
         existing_key_bones = []
         for bone in key_rigify_bones:
-            print(f"🔑 关键rigify骨骼检测: {bone}")
+            logger.debug("🔑 关键rigify骨骼检测: %s", bone)
             existing_key_bones.append(bone)
         
         if len(existing_key_bones) == 0:
-            print("⚠ 未检测到任何关键rigify面部骨骼，可能不是rigify面部骨架")
-            print("💡 跳过NebOffset编辑坐标设置，这是正常情况")
+            logger.warning("⚠ 未检测到任何关键rigify面部骨骼，可能不是rigify面部骨架")
+            logger.info("💡 跳过NebOffset编辑坐标设置，这是正常情况")
             return
         
         # 更新的骨骼映射配置 - 根据用户指定的对应关系
@@ -953,24 +969,24 @@ class Rig(BaseRig):
         # - lip.B.L.001 = lip.B.L.001 (保持直接对应)
         # - lip.B = lip.B.L (NebOffset-lip.B 从 lip.B.L 获取编辑坐标)
         # - brow.T.L.003 = brow.T.L.003 (保持直接对应)
-        position_mappings = POSITION_MAPPINGS
+        position_mappings = get_lod_position_mappings(self.neboffset_lod)
         
-        print(f"📋 位置映射配置来源：neboffset_bones.py (共 {len(position_mappings)} 个映射)")
+        logger.info("📋 位置映射配置来源：neboffset_bones.py (共 %s 个映射)", len(position_mappings))
         
         # 执行编辑坐标设置
         position_set_count = 0
         position_failed_count = 0
         position_skipped_count = 0
         
-        print(f"📍 开始设置NebOffset骨骼编辑坐标...")
-        print(f"📝 应用新的编辑坐标对应关系:")
-        print(f"   - lip.T -> lip.T.L (根坐标+头坐标)")
-        print(f"   - lip.B -> lip.B.L (根坐标+头坐标)") 
-        print(f"   - lips.L -> cheek.B.L (根坐标+头坐标)")
-        print(f"   - 其他骨骼保持直接对应")
-        print(f"🎯 坐标类型：编辑模式世界坐标（非姿态坐标）")
+        logger.info("📍 开始设置NebOffset骨骼编辑坐标...")
+        logger.info("📝 应用新的编辑坐标对应关系:")
+        logger.info("   - lip.T -> lip.T.L (根坐标+头坐标)")
+        logger.info("   - lip.B -> lip.B.L (根坐标+头坐标)") 
+        logger.info("   - lips.L -> cheek.B.L (根坐标+头坐标)")
+        logger.info("   - 其他骨骼保持直接对应")
+        logger.info("🎯 坐标类型：编辑模式世界坐标（非姿态坐标）")
         for bone in edit_bones:
-            print(f"🔍 检查骨骼: {bone.name}")
+            logger.debug("🔍 检查骨骼: %s", bone.name)
         for attr_name, rigify_bone_name in position_mappings:
             try:
                 # 检查NebOffset骨骼是否存在
@@ -987,33 +1003,33 @@ class Rig(BaseRig):
                     
             except Exception as e:
                 position_failed_count += 1
-                print(f"❌ 编辑坐标设置失败 {attr_name}: {e}")
+                logger.error("❌ 编辑坐标设置失败 %s: %s", attr_name, e)
         
         # 输出统计结果
         total_processed = position_set_count + position_failed_count + position_skipped_count
-        print(f"\n📊 NebOffset骨骼编辑坐标设置统计:")
-        print(f"   ✅ 成功设置: {position_set_count} 个（根坐标+头坐标）")
-        print(f"   ❌ 设置失败: {position_failed_count} 个") 
-        print(f"   ⚠ 跳过处理: {position_skipped_count} 个")
-        print(f"   📝 总处理量: {total_processed} 个")
+        logger.info("\n📊 NebOffset骨骼编辑坐标设置统计:")
+        logger.info("   ✅ 成功设置: %s 个（根坐标+头坐标）", position_set_count)
+        log_count(logger, "   ❌ 设置失败: %s 个", position_failed_count)
+        log_count(logger, "   ⚠ 跳过处理: %s 个", position_skipped_count, "WARNING")
+        logger.info("   📝 总处理量: %s 个", total_processed)
         
         if position_set_count > 0:
             success_rate = (position_set_count / total_processed) * 100
-            print(f"   📈 成功率: {success_rate:.1f}%")
-            print("✅ NebOffset骨骼编辑坐标设置完成")
-            print("🔄 新的编辑坐标对应关系已应用: lip.T->lip.T.L, lip.B->lip.B.L, lips.L->cheek.B.L")
-            print("🎯 坐标类型确认：编辑模式世界坐标（根坐标+头坐标+滚转角）")
+            logger.info("   📈 成功率: %.1f%%", success_rate)
+            logger.info("✅ NebOffset骨骼编辑坐标设置完成")
+            logger.info("🔄 新的编辑坐标对应关系已应用: lip.T->lip.T.L, lip.B->lip.B.L, lips.L->cheek.B.L")
+            logger.info("🎯 坐标类型确认：编辑模式世界坐标（根坐标+头坐标+滚转角）")
         else:
-            print("⚠ 没有成功设置任何NebOffset骨骼编辑坐标")
+            logger.warning("⚠ 没有成功设置任何NebOffset骨骼编辑坐标")
             
-        print(f"📍 === NebOffset骨骼编辑坐标设置完成 ===\n")
+        logger.info("📍 === NebOffset骨骼编辑坐标设置完成 ===\n")
     
     def _generate_mch_bones_now(self, detected_face_bones):
         """立即生成MCH骨骼（在generate_bones阶段调用）"""
-        print("🔧 开始生成MCH骨骼...")
+        logger.info("🔧 开始生成MCH骨骼...")
         
         if not detected_face_bones:
-            print("⚠ 没有预定义的面部骨骼映射")
+            logger.warning("⚠ 没有预定义的面部骨骼映射")
             return 0
         
         mch_generated_count = 0
@@ -1046,7 +1062,7 @@ class Rig(BaseRig):
         if mch_generated_count > 0:
             self.bones.neb_face_bones.clear()
             self.bones.neb_face_bones.update(self.bones.mch.face_bones)
-            print(f"✓ 更新兼容性视图: {len(self.bones.neb_face_bones)} 个MCH骨骼")
+            logger.info("✓ 更新兼容性视图: %s 个MCH骨骼", len(self.bones.neb_face_bones))
         
         return mch_generated_count
     
@@ -1055,21 +1071,21 @@ class Rig(BaseRig):
         return
     def generate_widgets(self):
         """生成控制部件"""
-        print("\n🎨 === 开始生成控制部件 ===")
+        logger.info("\n🎨 === 开始生成控制部件 ===")
         
         # 为主要骨骼生成部件
         if self.neb_facer_root_bone:
             create_face_control_widget(self.obj, self.neb_facer_root_bone, size=0.8)
-            print("✓ 生成 Neb_Facer_root 控制部件")
+            logger.info("✓ 生成 Neb_Facer_root 控制部件")
         
         # 为 Neb_face-root 生成部件
         create_face_control_widget(self.obj, self.faceroot_bone, size=1.0)
-        print("✓ 生成 Neb_face-root 控制部件")
+        logger.info("✓ 生成 Neb_face-root 控制部件")
         
         # 为 Neb_RigifyFace 生成部件
         if self.neb_rigify_face_bone:
             create_face_control_widget(self.obj, self.neb_rigify_face_bone, size=0.6)
-            print("✓ 生成 Neb_RigifyFace 控制部件")
+            logger.info("✓ 生成 Neb_RigifyFace 控制部件")
         
         # 为权重骨骼生成部件（NebOffset骨骼，更小）
         if hasattr(self.bones, 'wei') and self.bones.wei:
@@ -1098,7 +1114,7 @@ class Rig(BaseRig):
                     if bone_name:
                         create_face_control_widget(self.obj, bone_name, size=0.15)  # 最小尺寸NebOffset骨骼
                         wei_count += 1
-            print(f"✓ 生成 {wei_count} 个NebOffset骨骼控制部件")
+            logger.info("✓ 生成 %s 个NebOffset骨骼控制部件", wei_count)
         
         # 为控制骨骼生成部件（主要控制骨骼，标准尺寸）
         if hasattr(self.bones, 'ctrl') and self.bones.ctrl:
@@ -1109,19 +1125,19 @@ class Rig(BaseRig):
                     if bone_name:
                         create_face_control_widget(self.obj, bone_name, size=0.4)  # 标准尺寸控制骨骼
                         con_count += 1
-            print(f"✓ 生成 {con_count} 个控制骨骼控制部件")
+            logger.info("✓ 生成 %s 个控制骨骼控制部件", con_count)
         
-        print("🎨 === 控制部件生成完成 ===\n")
+        logger.info("🎨 === 控制部件生成完成 ===\n")
     
     def finalize(self):
         """完成设置"""
-        print("🎯 === FaceUP 面部绑定系统初始化完成 ===")
+        logger.info("🎯 === FaceUP 面部绑定系统初始化完成 ===")
         
         try:
             # 验证必需的定位器
             self.validate_required_locators()
         except Exception as e:
-            print(f"⚠ 验证定位器时出错: {e}")
+            logger.warning("⚠ 验证定位器时出错: %s", e)
         
         try:
             # 设置驱动器系统（现在包含清理）
@@ -1139,9 +1155,9 @@ class Rig(BaseRig):
                 missing_locators.append(locator_name)
         
         if missing_locators:
-            print(f"⚠ 缺少定位器: {missing_locators}")
+            logger.warning("⚠ 缺少定位器: %s", missing_locators)
         else:
-            print("✓ 所有必需定位器已注册")
+            logger.info("✓ 所有必需定位器已注册")
     
     def create_driver_system(self):
         """创建驱动器系统"""
@@ -1173,13 +1189,7 @@ class Rig(BaseRig):
             # print("💡 请检查模板文件和模板rig对象是否正确配置")
             pass
         
-        # 在驱动器系统创建完成后清理模板数据
-        # 这样可以避免在Rigify的finalize阶段干扰活动对象
-        try:
-            print("\n🧹 开始清理模板数据...")
-            self.template_manager.cleanup_template_data_complete()
-        except Exception as e:
-            print(f"⚠ 清理模板数据时出错: {e}")
+        # 模板数据不在这里清理：模板会话在所有rig的finalize之后一步释放
         
         # print("🎯 === 驱动器系统初始化完成 ===\n")
     
@@ -1351,6 +1361,40 @@ class Rig(BaseRig):
             default=False,
             description="是否启用自定义骨骼生成顺序"
         )
+        
+        params.neboffset_lod = EnumProperty(
+            name="细节级别",
+            items=[
+                ('FULL', "完整", "生成全部NebOffset骨骼"),
+                ('MEDIUM', "中", "每侧眉毛、每个嘴唇象限和每侧嘴角各保留一个NebOffset骨骼"),
+                ('LOW', "低", "在中级别的基础上，上下唇只保留中央骨骼（用于群演角色）")
+            ],
+            default='FULL',
+            description="被折叠的NebOffset骨骼不生成，跟随它们的rigify骨骼和模板驱动器改为使用所在分组保留的骨骼"
+        )
+        
+        # 模板选择
+        params.template_file = StringProperty(
+            name="模板文件",
+            default="",
+            description="生成时使用的模板文件名（相对于模板目录），为空时使用默认模板"
+        )
+        
+        # 只用于界面选择，读写 template_file，本身不保存
+        params.template_file_choice = EnumProperty(
+            name="模板文件",
+            items=_get_template_file_items,
+            get=_get_template_file_choice,
+            set=_set_template_file_choice,
+            description="生成时使用的模板文件（列出模板目录中包含模板rig的 .blend 文件）"
+        )
+        
+        params.custom_template_path = StringProperty(
+            name="自定义模板",
+            default="",
+            subtype='FILE_PATH',
+            description="指定模板 .blend 文件（优先于模板文件选择）"
+        )
     
     @staticmethod
     def parameters_ui(layout, params):
@@ -1391,6 +1435,24 @@ class Rig(BaseRig):
             col.prop(params, "add_bones")
         
         col.prop(params, "custom_generation_order")
+        col.prop(params, "neboffset_lod")
+        
+        layout.separator()
+        
+        # 模板设置（从 .blend 块目录验证，不加载文件）
+        box = layout.box()
+        box.label(text="模板:", icon='FILE_BLEND')
+        col = box.column()
+        col.prop(params, "template_file_choice")
+        if params.template_file and _find_template_file_by_name(params.template_file) is None:
+            col.label(text=f"模板目录中没有 {params.template_file}，将使用默认模板", icon='ERROR')
+        col.prop(params, "custom_template_path")
+        if params.custom_template_path:
+            error = validate_template_file(bpy.path.abspath(params.custom_template_path), TEMPLATE_RIG_NAME)
+            if error:
+                col.label(text=error, icon='ERROR')
+            else:
+                col.label(text="模板有效", icon='CHECKMARK')
         
         layout.separator()
         
@@ -1404,12 +1466,12 @@ class Rig(BaseRig):
     
     def detect_rigify_face_bones_backup(self):
         """备用的rigify面部骨骼检测方法"""
-        print("🔍 使用备用检测方法查找rigify面部骨骼...")
+        logger.info("🔍 使用备用检测方法查找rigify面部骨骼...")
         
         # 🚫 新规则：跳过所有rigify面部骨骼检测
-        print("🚫 新规则：跳过备用检测，默认用户已经设置")
-        print("💡 假设用户已经正确配置了rigify面部骨架") 
-        print("🎯 直接返回空映射，继续后续处理流程")
+        logger.info("🚫 新规则：跳过备用检测，默认用户已经设置")
+        logger.info("💡 假设用户已经正确配置了rigify面部骨架") 
+        logger.info("🎯 直接返回空映射，继续后续处理流程")
         
         return {}
         
@@ -1486,7 +1548,7 @@ class Rig(BaseRig):
     
     def _get_default_rigify_face_mapping(self):
         """获取预定义的rigify面部骨骼映射关系（跳过检测）"""
-        print("📋 加载预定义的rigify面部骨骼映射...")
+        logger.info("📋 加载预定义的rigify面部骨骼映射...")
         
         # 标准的rigify面部骨骼映射关系
         default_mapping = {
@@ -1606,22 +1668,22 @@ class Rig(BaseRig):
             "temple.R": "Neb_temple_R"
         }
         
-        print(f"✅ 预定义映射加载完成：{len(default_mapping)} 个骨骼映射")
+        logger.info("✅ 预定义映射加载完成：%s 个骨骼映射", len(default_mapping))
         
         # 显示重要的嘴唇控制骨骼映射
         lip_mappings = {k: v for k, v in default_mapping.items() if 'lip' in k.lower()}
         if lip_mappings:
-            print(f"📋 嘴唇控制骨骼映射 ({len(lip_mappings)} 个):")
+            logger.info("📋 嘴唇控制骨骼映射 (%s 个):", len(lip_mappings))
             for i, (rigify_name, neb_name) in enumerate(list(lip_mappings.items())[:8]):
-                print(f"    {i+1:2d}. {rigify_name:15s} -> {neb_name}")
+                logger.debug("    %2d. %15s -> %s", i + 1, rigify_name, neb_name)
             if len(lip_mappings) > 8:
-                print(f"    ... 还有 {len(lip_mappings) - 8} 个嘴唇控制映射")
+                logger.info("    ... 还有 %s 个嘴唇控制映射", len(lip_mappings) - 8)
         
         return default_mapping
     
     def parent_bones(self):
         """设置骨骼父子关系"""
-        print("\n👨‍👩‍👧‍👦 === 开始设置骨骼父子关系 ===")
+        logger.info("\n👨\u200d👩\u200d👧\u200d👦 === 开始设置骨骼父子关系 ===")
         
         # 使用BoneDetector检测head骨骼
         head_bone_name = BoneDetector.detect_rigify_head_bone(self.obj)
@@ -1629,25 +1691,24 @@ class Rig(BaseRig):
         # 设置主要骨骼的父子关系
         if head_bone_name:
             self.set_bone_parent(self.neb_facer_root_bone, head_bone_name)
-            print(f"✓ 设置 Neb_Facer_root 父骨骼为原生 {head_bone_name}")
+            logger.info("✓ 设置 Neb_Facer_root 父骨骼为原生 %s", head_bone_name)
         else:
-            print("✓ Neb_Facer_root 设置为根骨骼（无父级）")
+            logger.info("✓ Neb_Facer_root 设置为根骨骼（无父级）")
         
         if self.faceroot_bone and self.neb_facer_root_bone:
             self.set_bone_parent(self.faceroot_bone, self.neb_facer_root_bone)
-            print(f"✓ 设置父子关系: Neb_face-root -> Neb_Facer_root")
+            logger.info("✓ 设置父子关系: Neb_face-root -> Neb_Facer_root")
         
         if self.neb_rigify_face_bone and self.neb_facer_root_bone:
             self.set_bone_parent(self.neb_rigify_face_bone, self.neb_facer_root_bone)
-            print(f"✓ 设置父子关系: Neb_RigifyFace -> Neb_Facer_root")
+            logger.info("✓ 设置父子关系: Neb_RigifyFace -> Neb_Facer_root")
         
-        # 设置权重骨骼的父子关系 - 使用CONSTRAINT_MAPPINGS确保覆盖所有NebOffset骨骼
-        print("\n⚖️ 设置NebOffset骨骼父级关系...")
+        # 设置权重骨骼的父子关系 - 覆盖当前细节级别生成的所有NebOffset骨骼
+        logger.info("\n⚖️ 设置NebOffset骨骼父级关系...")
         neboffset_parent_set_count = 0
         neboffset_parent_failed_count = 0
         
-        # 使用CONSTRAINT_MAPPINGS中的目标骨骼（NebOffset骨骼）来设置父级
-        for source_bone_name, target_bone_name in CONSTRAINT_MAPPINGS:
+        for target_bone_name in self.neboffset_mapping.values():
             try:
                 # 检查目标骨骼（NebOffset骨骼）是否存在
                 if target_bone_name not in self.obj.data.edit_bones:
@@ -1667,28 +1728,28 @@ class Rig(BaseRig):
                 
                 # 显示成功设置的前几个（避免输出过多）
                 if neboffset_parent_set_count <= 5:
-                    print(f"✅ NebOffset父级 {neboffset_parent_set_count}: {target_bone_name:25s} -> {self.neb_rigify_face_bone}")
+                    logger.debug("✅ NebOffset父级 %s: %25s -> %s", neboffset_parent_set_count, target_bone_name, self.neb_rigify_face_bone)
                 elif neboffset_parent_set_count == 6:
-                    print(f"   ... 继续设置更多NebOffset骨骼父级 ...")
+                    logger.debug("   ... 继续设置更多NebOffset骨骼父级 ...")
                 
             except Exception as e:
                 neboffset_parent_failed_count += 1
                 if neboffset_parent_failed_count <= 3:
-                    print(f"❌ 设置NebOffset父级失败 {target_bone_name}: {e}")
+                    logger.error("❌ 设置NebOffset父级失败 %s: %s", target_bone_name, e)
         
-        print(f"📊 NebOffset骨骼父级设置统计:")
-        print(f"   ✅ 成功设置: {neboffset_parent_set_count} 个NebOffset骨骼")
-        print(f"   ❌ 设置失败: {neboffset_parent_failed_count} 个")
+        logger.info("📊 NebOffset骨骼父级设置统计:")
+        logger.info("   ✅ 成功设置: %s 个NebOffset骨骼", neboffset_parent_set_count)
+        log_count(logger, "   ❌ 设置失败: %s 个", neboffset_parent_failed_count)
         
         if neboffset_parent_set_count > 0:
-            success_rate = (neboffset_parent_set_count / len(CONSTRAINT_MAPPINGS)) * 100
-            print(f"   📈 成功率: {success_rate:.1f}% (总共{len(CONSTRAINT_MAPPINGS)}个NebOffset骨骼)")
-            print(f"✅ NebOffset骨骼父级设置完成，所有目标骨骼以 {self.neb_rigify_face_bone} 为父级")
+            success_rate = (neboffset_parent_set_count / len(self.neboffset_mapping)) * 100
+            logger.info("   📈 成功率: %.1f%% (总共%s个NebOffset骨骼)", success_rate, len(self.neboffset_mapping))
+            logger.info("✅ NebOffset骨骼父级设置完成，所有目标骨骼以 %s 为父级", self.neb_rigify_face_bone)
         else:
-            print("⚠ 没有成功设置任何NebOffset骨骼父级")
-            print("💡 请检查Neb_RigifyFace骨骼和NebOffset骨骼是否正确生成")
+            logger.warning("⚠ 没有成功设置任何NebOffset骨骼父级")
+            logger.info("💡 请检查Neb_RigifyFace骨骼和NebOffset骨骼是否正确生成")
         
-        print("👨‍👩‍👧‍👦 === NebOffset骨骼父级设置完成 ===\n")
+        logger.info("👨\u200d👩\u200d👧\u200d👦 === NebOffset骨骼父级设置完成 ===\n")
         
         # 设置控制骨骼的父子关系
         if hasattr(self.bones, 'ctrl') and self.bones.ctrl:
@@ -1699,10 +1760,10 @@ class Rig(BaseRig):
                     if bone_id:
                         self.set_bone_parent(bone_id, self.faceroot_bone)  # 控制骨骼连接到face-root
                         con_count += 1
-            print(f"✓ 设置 {con_count} 个控制骨骼的父级为 Neb_face-root")
+            logger.info("✓ 设置 %s 个控制骨骼的父级为 Neb_face-root", con_count)
         
         # 特殊处理：设置mouth-root的父级为Neb_face-root
-        print("\n🦷 设置mouth-root特殊父级关系...")
+        logger.info("\n🦷 设置mouth-root特殊父级关系...")
         mouth_root_set_count = 0
         mouth_root_failed_count = 0
         
@@ -1715,13 +1776,13 @@ class Rig(BaseRig):
                 mouth_root_bone.parent = neb_face_root_bone
                 
                 mouth_root_set_count += 1
-                print(f"✅ 设置 mouth-root 父级为 {self.faceroot_bone}")
+                logger.info("✅ 设置 mouth-root 父级为 %s", self.faceroot_bone)
                 
             except Exception as e:
                 mouth_root_failed_count += 1
-                print(f"❌ 设置mouth-root父级失败: {e}")
+                logger.error("❌ 设置mouth-root父级失败: %s", e)
         else:
-            print("⚠ mouth-root骨骼不存在，跳过特殊父级设置")
+            logger.warning("⚠ mouth-root骨骼不存在，跳过特殊父级设置")
         
         # 同样处理其他可能的子级定位器根骨骼
         special_root_bones = [
@@ -1737,23 +1798,23 @@ class Rig(BaseRig):
                     neb_face_root_bone = self.obj.data.edit_bones[self.faceroot_bone]
                     root_bone.parent = neb_face_root_bone
                     special_roots_set += 1
-                    print(f"✅ 设置 {root_bone_name} 父级为 {self.faceroot_bone}")
+                    logger.debug("✅ 设置 %s 父级为 %s", root_bone_name, self.faceroot_bone)
                 except Exception as e:
-                    print(f"❌ 设置{root_bone_name}父级失败: {e}")
+                    logger.error("❌ 设置%s父级失败: %s", root_bone_name, e)
         
-        print(f"📊 特殊根骨骼父级设置统计:")
-        print(f"   🦷 mouth-root: {mouth_root_set_count} 成功, {mouth_root_failed_count} 失败")
-        print(f"   👁️ 其他定位器根骨骼: {special_roots_set} 个成功设置")
+        logger.info("📊 特殊根骨骼父级设置统计:")
+        logger.info("   🦷 mouth-root: %s 成功, %s 失败", mouth_root_set_count, mouth_root_failed_count)
+        logger.info("   👁️ 其他定位器根骨骼: %s 个成功设置", special_roots_set)
         
         if mouth_root_set_count > 0 or special_roots_set > 0:
-            print("✅ 子级定位器根骨骼父级设置完成")
-            print("🎯 层级结构：Neb_face-root -> mouth-root, eyelip-root.L/R, brow-root.L/R")
+            logger.info("✅ 子级定位器根骨骼父级设置完成")
+            logger.info("🎯 层级结构：Neb_face-root -> mouth-root, eyelip-root.L/R, brow-root.L/R")
         
-        print("👨‍👩‍👧‍👦 === 骨骼父子关系设置完成 ===\n")
+        logger.info("👨\u200d👩\u200d👧\u200d👦 === 骨骼父子关系设置完成 ===\n")
     
     def configure_bones(self):
         """配置骨骼属性"""
-        print("\n⚙️ === 开始配置骨骼属性 ===")
+        logger.info("\n⚙️ === 开始配置骨骼属性 ===")
         
         # 配置主要骨骼
         if self.neb_facer_root_bone:
@@ -1761,20 +1822,20 @@ class Rig(BaseRig):
             bone.lock_location = [True, True, True]
             bone.lock_rotation = [True, True, True]
             bone.lock_scale = [True, True, True]
-            print("✓ 配置 Neb_Facer_root: 锁定所有变换")
+            logger.info("✓ 配置 Neb_Facer_root: 锁定所有变换")
         
         face_root_bone = self.get_bone(self.faceroot_bone)
         face_root_bone.lock_location = [True, True, True]
         face_root_bone.lock_rotation = [True, True, True]
         face_root_bone.lock_scale = [True, True, True]
-        print("✓ 配置 Neb_face-root: 锁定所有变换")
+        logger.info("✓ 配置 Neb_face-root: 锁定所有变换")
         
         if self.neb_rigify_face_bone:
             bone = self.get_bone(self.neb_rigify_face_bone)
             bone.lock_location = [True, True, True]
             bone.lock_rotation = [True, True, True]
             bone.lock_scale = [True, True, True]
-            print("✓ 配置 Neb_RigifyFace: 锁定所有变换")
+            logger.info("✓ 配置 Neb_RigifyFace: 锁定所有变换")
         
         # 配置 MCH 骨骼（机制骨骼）
         if hasattr(self.bones.mch, 'face_bones') and self.bones.mch.face_bones:
@@ -1783,7 +1844,7 @@ class Rig(BaseRig):
                 bone = self.get_bone(bone_id)
                 bone.lock_scale = [True, True, True]  # 机制骨骼只锁定缩放
                 mch_count += 1
-            print(f"✓ 配置 {mch_count} 个MCH骨骼: 锁定缩放")
+            logger.info("✓ 配置 %s 个MCH骨骼: 锁定缩放", mch_count)
         
         # 配置权重骨骼
         if hasattr(self.bones, 'wei') and self.bones.wei:
@@ -1815,7 +1876,7 @@ class Rig(BaseRig):
                         bone.lock_rotation = [True, True, True]  # NebOffset骨骼锁定旋转
                         bone.lock_scale = [True, True, True]     # NebOffset骨骼锁定缩放
                         wei_count += 1
-            print(f"✓ 配置 {wei_count} 个NebOffset骨骼: 锁定所有变换")
+            logger.info("✓ 配置 %s 个NebOffset骨骼: 锁定所有变换", wei_count)
         
         # 配置控制骨骼
         if hasattr(self.bones, 'ctrl') and self.bones.ctrl:
@@ -1827,6 +1888,6 @@ class Rig(BaseRig):
                         bone = self.get_bone(bone_id)
                         bone.lock_scale = [True, True, True]  # 控制骨骼只锁定缩放
                         con_count += 1
-            print(f"✓ 配置 {con_count} 个控制骨骼: 锁定缩放")
+            logger.info("✓ 配置 %s 个控制骨骼: 锁定缩放", con_count)
         
-        print("⚙️ === 骨骼属性配置完成 ===\n") 
\ No newline at end of file
+        logger.info("⚙️ === 骨骼属性配置完成 ===\n") 
\ No newline at end of file
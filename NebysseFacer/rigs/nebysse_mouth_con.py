@@ -6,7 +6,12 @@ from .nebysse_base_faceup_locator import BaseFaceUPLocator
 from .nebysse_collection_utils import BaseFaceUPCollectionMixin
 from rigify.utils.bones import BoneDict
 from rigify.utils.naming import make_derived_name
+from .utils.generation_profiler import profile_stages
+from ..utils.log import get_logger
 
+logger = get_logger(__name__)
+
+@profile_stages()
 class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
     """嘴部控制定位器"""
     
@@ -25,10 +30,10 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
             try:
                 self.disw_positions = self.get_disw_positions_from_params()
             except Exception as e:
-                print(f"⚠ 获取DISW位置参数失败，使用默认值: {e}")
+                logger.warning("⚠ 获取DISW位置参数失败，使用默认值: %s", e)
                 self.disw_positions = self._get_default_disw_positions()
         else:
-            print("⚠ get_disw_positions_from_params方法不存在，使用默认坐标")
+            logger.warning("⚠ get_disw_positions_from_params方法不存在，使用默认坐标")
             self.disw_positions = self._get_default_disw_positions()
     
     def _get_default_disw_positions(self):
@@ -105,7 +110,7 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
                 bone_obj.head = root_bone_obj.head + offset
                 bone_obj.tail = bone_obj.head + Vector((0, 0.005, 0))  # 设置小的尾部偏移
                 
-                print(f"✓ 创建权重骨骼: {bone_name} 位置偏移: {offset}")
+                logger.debug("✓ 创建权重骨骼: %s 位置偏移: %s", bone_name, offset)
         
         # 将权重骨骼添加到bones字典
         bones.disw = self.disw_bones
@@ -113,7 +118,7 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
         # 注册到父级控制器（nebysse_faceup_con）
         self.register_to_faceup_controller()
         
-        print(f"✓ 嘴部骨骼层级生成完成: root={self.root_bone}, ctrl={self.control_bone}, disw={len(self.disw_bones)}个")
+        logger.info("✓ 嘴部骨骼层级生成完成: root=%s, ctrl=%s, disw=%s个", self.root_bone, self.control_bone, len(self.disw_bones))
         
         return bones
     
@@ -125,15 +130,15 @@ class Rig(BaseFaceUPLocator, BaseFaceUPCollectionMixin):
         # 设置控制器骨骼为根骨骼的子级
         if hasattr(self, 'control_bone') and hasattr(self, 'root_bone'):
             self.set_bone_parent(self.control_bone, self.root_bone)
-            print(f"✓ 设置 {self.control_bone} 父骨骼为 {self.root_bone}")
+            logger.info("✓ 设置 %s 父骨骼为 %s", self.control_bone, self.root_bone)
         
         # 设置所有DISW骨骼为根骨骼的子级
         if hasattr(self, 'disw_bones') and hasattr(self, 'root_bone'):
             for disw_bone in self.disw_bones:
                 self.set_bone_parent(disw_bone, self.root_bone)
-                print(f"✓ 设置 {disw_bone} 父骨骼为 {self.root_bone}")
+                logger.debug("✓ 设置 %s 父骨骼为 %s", disw_bone, self.root_bone)
         
-        print(f"✓ 嘴部骨骼层级关系设置完成")
+        logger.info("✓ 嘴部骨骼层级关系设置完成")
     
     def configure_bones(self):
         """配置嘴部控制骨骼和 DISW 骨骼"""
@@ -0,0 +1,433 @@
+"""
+.blend 数据块目录读取器 - 不加载文件，直接从块索引列出数据块名称和类型
+
+纯Python实现（不依赖bpy），只读取文件头、各个块头和 DNA1 结构描述：
+- 文件头给出指针大小和字节序
+- ID块（块代码为两个字母的ID代码，如 OB、AR、AC）只读取开头的ID结构，取出名称
+- DNA1 块给出 ID 结构中 name / lib 字段的偏移，适用于不同Blender版本
+块数据本身不解析，也不创建任何数据块，读取一个模板文件通常只需几毫秒。
+
+目录按 路径 + 文件修改时间/大小 缓存，文件被修改后自动重新读取。
+用于快速查找模板文件、在metarig界面中验证用户指定的模板，以及模板选择下拉列表。
+
+gzip压缩的文件直接支持；zstd压缩的文件（Blender 3.0+ 的"压缩"选项）需要 zstandard 模块
+（或 Python 3.14 的 compression.zstd），不可用时抛出 BlendCatalogError。
+"""
+
+import gzip
+import io
+import os
+import re
+import struct
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# ID代码 → bpy.data / libraries.load 中的集合名称
+ID_CODE_COLLECTIONS = {
+    b'AC': 'actions',
+    b'AR': 'armatures',
+    b'BR': 'brushes',
+    b'CA': 'cameras',
+    b'CF': 'cache_files',
+    b'CU': 'curves',
+    b'CV': 'hair_curves',
+    b'GD': 'grease_pencils',
+    b'GP': 'grease_pencils_v3',
+    b'GR': 'collections',
+    b'IM': 'images',
+    b'KE': 'shape_keys',
+    b'LA': 'lights',
+    b'LI': 'libraries',
+    b'LP': 'lightprobes',
+    b'LS': 'linestyles',
+    b'LT': 'lattices',
+    b'MA': 'materials',
+    b'MB': 'metaballs',
+    b'MC': 'movieclips',
+    b'ME': 'meshes',
+    b'MS': 'masks',
+    b'NT': 'node_groups',
+    b'OB': 'objects',
+    b'PA': 'particles',
+    b'PC': 'paint_curves',
+    b'PL': 'palettes',
+    b'PT': 'pointclouds',
+    b'SC': 'scenes',
+    b'SO': 'sounds',
+    b'SN': 'screens',
+    b'TE': 'textures',
+    b'TX': 'texts',
+    b'VF': 'fonts',
+    b'VO': 'volumes',
+    b'WM': 'window_managers',
+    b'WO': 'worlds',
+    b'WS': 'workspaces',
+}
+
+# ID块开头预读的字节数（足以覆盖 ID 结构中的 lib 和 name 字段）
+_ID_PREFIX_SIZE = 512
+
+CATALOG_CACHE_SIZE = 16
+_catalog_cache: "OrderedDict[str, Tuple[Tuple[int, int], BlendCatalog]]" = OrderedDict()
+
+_ARRAY_PATTERN = re.compile(r'\[(\d+)\]')
+
+
+class BlendCatalogError(ValueError):
+    """文件不是可读取的 .blend 文件"""
+
+
+class BlendCatalog:
+    """一个 .blend 文件中本地（非链接）数据块的目录"""
+
+    def __init__(self, path: str, version: int, pointer_size: int, little_endian: bool,
+                 compression: Optional[str], ids: Dict[str, List[str]]):
+        self.path = path
+        self.version = version
+        self.pointer_size = pointer_size
+        self.little_endian = little_endian
+        self.compression = compression
+        self.ids = ids
+
+    def __repr__(self):
+        counts = ", ".join(f"{name}={len(names)}" for name, names in sorted(self.ids.items()))
+        return f"BlendCatalog({os.path.basename(self.path)!r}, version={self.version}, {counts})"
+
+    @property
+    def version_string(self) -> str:
+        return f"{self.version // 100}.{self.version % 100}"
+
+    def names(self, collection: str) -> List[str]:
+        """某类数据块（如 'objects'）的名称列表"""
+        return self.ids.get(collection, [])
+
+    def contains(self, collection: str, name: str) -> bool:
+        return name in self.ids.get(collection, ())
+
+
+# ==================== 文件读取 ====================
+
+def _open_uncompressed(path: str):
+    """
+    打开 .blend 文件，返回 (可随机访问的文件对象, 压缩方式)
+
+    未压缩文件直接打开；压缩文件整体解压到内存。
+    """
+    handle = open(path, 'rb')
+    magic = handle.read(4)
+    handle.seek(0)
+    if magic[:2] == b'\x1f\x8b':
+        with handle:
+            return io.BytesIO(gzip.decompress(handle.read())), 'GZIP'
+    if magic == b'\x28\xb5\x2f\xfd':
+        with handle:
+            return io.BytesIO(_zstd_decompress(handle.read())), 'ZSTD'
+    return handle, None
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    try:
+        from compression import zstd
+        return zstd.decompress(data)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise BlendCatalogError("文件使用zstd压缩，当前Python环境没有zstd解压模块")
+    # Blender写出多帧（可随机访问）的zstd文件，需要跨帧读取
+    with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+        return reader.read()
+
+
+def _read_header(handle) -> Tuple[int, bool, int, str]:
+    """
+    读取文件头
+
+    Returns:
+        (指针大小, 是否小端, 版本号, 块头格式)
+    """
+    header = handle.read(12)
+    if len(header) < 12 or not header.startswith(b'BLENDER'):
+        raise BlendCatalogError("不是 .blend 文件")
+
+    if header[7:9] == b'17':
+        # 新文件头（BLENDER17-01v0500）：64位块头
+        header += handle.read(5)
+        if header[9:10] != b'-' or header[12:13] not in (b'v', b'V'):
+            raise BlendCatalogError("无法识别的 .blend 文件头")
+        little_endian = header[12:13] == b'v'
+        return 8, little_endian, int(header[13:17]), 'LARGE'
+
+    pointer_size = {b'_': 4, b'-': 8}.get(header[7:8])
+    if pointer_size is None or header[8:9] not in (b'v', b'V'):
+        raise BlendCatalogError("无法识别的 .blend 文件头")
+    return pointer_size, header[8:9] == b'v', int(header[9:12]), 'SMALL'
+
+
+def _bhead_struct(pointer_size: int, little_endian: bool, bhead_format: str) -> struct.Struct:
+    """
+    块头结构，字段顺序统一为 (代码, 长度, SDNA序号)
+
+    旧格式: code, len(int32), old(指针), SDNAnr(int32), nr(int32)
+    新格式: code, SDNAnr(int32), old(uint64), len(int64), nr(int64)
+    """
+    endian = '<' if little_endian else '>'
+    if bhead_format == 'LARGE':
+        return struct.Struct(endian + '4siQqq')
+    return struct.Struct(endian + ('4siIii' if pointer_size == 4 else '4siQii'))
+
+
+def _unpack_bhead(bhead_format: str, values) -> Tuple[bytes, int]:
+    """返回 (块代码, 块长度)"""
+    if bhead_format == 'LARGE':
+        return values[0], values[3]
+    return values[0], values[1]
+
+
+# ==================== SDNA ====================
+
+def _align4(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _parse_sdna(data: bytes, little_endian: bool):
+    """
+    解析 DNA1 块
+
+    Returns:
+        (字段名列表, 类型名列表, 类型长度列表, {结构类型名: [(类型序号, 字段名序号), ...]})
+    """
+    endian = '<' if little_endian else '>'
+    if data[:8] != b'SDNANAME':
+        raise BlendCatalogError("DNA1 块格式无效")
+
+    def read_strings(offset: int, marker: bytes):
+        if data[offset:offset + 4] != marker:
+            raise BlendCatalogError("DNA1 块格式无效")
+        count = struct.unpack_from(endian + 'i', data, offset + 4)[0]
+        offset += 8
+        strings = []
+        for _ in range(count):
+            end = data.index(b'\0', offset)
+            strings.append(data[offset:end].decode('latin-1'))
+            offset = end + 1
+        return strings, _align4(offset)
+
+    names, offset = read_strings(4, b'NAME')
+    types, offset = read_strings(offset, b'TYPE')
+
+    if data[offset:offset + 4] != b'TLEN':
+        raise BlendCatalogError("DNA1 块格式无效")
+    offset += 4
+    lengths = list(struct.unpack_from(endian + f'{len(types)}h', data, offset))
+    offset = _align4(offset + 2 * len(types))
+
+    if data[offset:offset + 4] != b'STRC':
+        raise BlendCatalogError("DNA1 块格式无效")
+    struct_count = struct.unpack_from(endian + 'i', data, offset + 4)[0]
+    offset += 8
+    structs = {}
+    for _ in range(struct_count):
+        type_index, field_count = struct.unpack_from(endian + 'hh', data, offset)
+        offset += 4
+        fields = struct.unpack_from(endian + f'{2 * field_count}h', data, offset)
+        offset += 4 * field_count
+        structs[types[type_index]] = list(zip(fields[0::2], fields[1::2]))
+    return names, types, lengths, structs
+
+
+def _field_size(field_name: str, type_length: int, pointer_size: int) -> int:
+    count = 1
+    for dimension in _ARRAY_PATTERN.findall(field_name):
+        count *= int(dimension)
+    if field_name.startswith('*') or field_name.startswith('(*'):
+        return pointer_size * count
+    return type_length * count
+
+
+def _field_key(field_name: str) -> str:
+    return _ARRAY_PATTERN.sub('', field_name).strip('*()')
+
+
+def _id_field_layout(sdna, pointer_size: int) -> Dict[str, Tuple[int, int]]:
+    """ID 结构中 name 和 lib 字段的 {字段名: (偏移, 大小)}"""
+    names, types, lengths, structs = sdna
+    fields = structs.get('ID')
+    if fields is None:
+        raise BlendCatalogError("DNA1 中没有 ID 结构")
+
+    layout = {}
+    offset = 0
+    for type_index, name_index in fields:
+        field_name = names[name_index]
+        size = _field_size(field_name, lengths[type_index], pointer_size)
+        layout[_field_key(field_name)] = (offset, size)
+        offset += size
+    if 'name' not in layout:
+        raise BlendCatalogError("ID 结构中没有 name 字段")
+    return layout
+
+
+# ==================== 目录 ====================
+
+def _scan_blocks(handle, pointer_size: int, little_endian: bool, bhead_format: str):
+    """
+    遍历块头，预读ID块开头
+
+    Returns:
+        ([(ID代码, ID块开头字节), ...], DNA1块数据)
+    """
+    bhead = _bhead_struct(pointer_size, little_endian, bhead_format)
+    id_blocks = []
+    sdna_data = None
+    while True:
+        raw = handle.read(bhead.size)
+        if len(raw) < bhead.size:
+            break
+        code, length = _unpack_bhead(bhead_format, bhead.unpack(raw))
+        if code == b'ENDB':
+            break
+        if length < 0:
+            raise BlendCatalogError("块长度无效")
+
+        id_code = code[:2]
+        if code[2:] == b'\0\0' and id_code in ID_CODE_COLLECTIONS:
+            prefix = handle.read(min(length, _ID_PREFIX_SIZE))
+            id_blocks.append((id_code, prefix))
+            handle.seek(length - len(prefix), io.SEEK_CUR)
+        elif code == b'DNA1':
+            sdna_data = handle.read(length)
+        else:
+            handle.seek(length, io.SEEK_CUR)
+    return id_blocks, sdna_data
+
+
+def _read_catalog(path: str) -> BlendCatalog:
+    try:
+        handle, compression = _open_uncompressed(path)
+    except OSError as e:
+        raise BlendCatalogError(f"无法读取文件: {e}")
+
+    with handle:
+        pointer_size, little_endian, version, bhead_format = _read_header(handle)
+        id_blocks, sdna_data = _scan_blocks(handle, pointer_size, little_endian, bhead_format)
+
+    if sdna_data is None:
+        raise BlendCatalogError("文件中没有 DNA1 块")
+    layout = _id_field_layout(_parse_sdna(sdna_data, little_endian), pointer_size)
+    name_offset, name_size = layout['name']
+    lib_offset, lib_size = layout.get('lib', (None, 0))
+
+    ids: Dict[str, List[str]] = {}
+    for id_code, prefix in id_blocks:
+        # 链接自其他库的ID不能从本文件追加
+        if lib_offset is not None and any(prefix[lib_offset:lib_offset + lib_size]):
+            continue
+        raw_name = prefix[name_offset:name_offset + name_size].split(b'\0', 1)[0]
+        # 名称以两个字母的ID代码开头
+        name = raw_name[2:].decode('utf-8', errors='replace')
+        ids.setdefault(ID_CODE_COLLECTIONS[id_code], []).append(name)
+
+    return BlendCatalog(path, version, pointer_size, little_endian, compression, ids)
+
+
+def read_blend_catalog(path: str) -> BlendCatalog:
+    """
+    读取 .blend 文件的数据块目录（按 路径 + 修改时间/大小 缓存）
+
+    Raises:
+        BlendCatalogError: 文件不存在、不是 .blend 文件或无法解压
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise BlendCatalogError(f"无法读取文件: {e}")
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _catalog_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        _catalog_cache.move_to_end(path)
+        return cached[1]
+
+    catalog = _read_catalog(path)
+    _catalog_cache[path] = (stamp, catalog)
+    _catalog_cache.move_to_end(path)
+    while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+        _catalog_cache.popitem(last=False)
+    logger.debug("📇 读取 .blend 目录: %s", catalog)
+    return catalog
+
+
+def clear_catalog_cache():
+    _catalog_cache.clear()
+
+
+# ==================== 模板查找和验证 ====================
+
+def pick_template_rig_name(object_names: Iterable[str], template_rig_name: str) -> Optional[str]:
+    """从对象名称列表中选出模板rig名称（精确名称优先，其次按 FaceUP_Tem 关键词）"""
+    object_names = list(object_names)
+    if template_rig_name in object_names:
+        return template_rig_name
+    for name in object_names:
+        if 'FaceUP_Tem' in name:
+            return name
+    return None
+
+
+def validate_template_file(path: str, template_rig_name: str) -> Optional[str]:
+    """
+    检查文件是否是包含模板rig的 .blend 文件（不加载文件）
+
+    Returns:
+        错误信息；文件有效时返回None
+    """
+    if not path:
+        return "未指定模板文件"
+    if not os.path.isfile(path):
+        return f"文件不存在: {path}"
+    try:
+        catalog = read_blend_catalog(path)
+    except BlendCatalogError as e:
+        return str(e)
+    if not catalog.names('armatures'):
+        return "文件中没有骨架数据"
+    if pick_template_rig_name(catalog.names('objects'), template_rig_name) is None:
+        return f"文件中没有模板rig对象: {template_rig_name}"
+    return None
+
+
+def discover_templates(search_dirs: Iterable[str], template_rig_name: str) -> List[Tuple[str, str]]:
+    """
+    在目录中查找包含模板rig的 .blend 文件（不加载文件）
+
+    Returns:
+        [(文件路径, 模板rig名称), ...]，按目录顺序，重复路径只出现一次
+    """
+    found = []
+    seen = set()
+    for search_dir in search_dirs:
+        search_dir = os.path.normpath(search_dir)
+        if search_dir in seen or not os.path.isdir(search_dir):
+            continue
+        seen.add(search_dir)
+        for file_name in sorted(os.listdir(search_dir)):
+            if not file_name.endswith('.blend'):
+                continue
+            path = os.path.join(search_dir, file_name)
+            try:
+                catalog = read_blend_catalog(path)
+            except BlendCatalogError as e:
+                logger.debug("⚠ 跳过无法读取的文件 %s: %s", file_name, e)
+                continue
+            rig_name = pick_template_rig_name(catalog.names('objects'), template_rig_name)
+            if rig_name:
+                found.append((path, rig_name))
+    return found
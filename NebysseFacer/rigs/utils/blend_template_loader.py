@@ -18,8 +18,194 @@ Blender模板加载器 - 通用模块
 
 import os
 import bpy
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any
 
+from .blend_catalog import BlendCatalogError, pick_template_rig_name, read_blend_catalog
+from .context_guard import ContextGuard
+from .driver_expressions import (
+    PYTHON,
+    SIMPLE,
+    TYPED,
+    analyze_snapshot_drivers,
+    log_python_drivers,
+    optimize_driver_data,
+    record_analysis,
+)
+from .driver_paths import DriverPath, add_driver, parse_data_path
+from .driver_repair import record_driver
+from .id_remap import ID_TYPE_COLLECTIONS, IDRemap, find_template_id
+from .template_ownership import (
+    adopt_tagged_ids,
+    collect_appended_ids,
+    mark_template_name,
+    new_load_session,
+    remove_owned_ids,
+    session_uid_watermark,
+    tag_owned_ids,
+)
+from .template_registry import (
+    find_template_rig,
+    is_template_rig,
+    register_template_rig,
+)
+from .template_snapshot import (
+    collect_snapshot_dependencies,
+    compute_template_hash,
+    read_template_snapshot,
+    write_template_snapshot,
+)
+from ...utils.log import get_logger, log_count
+
+logger = get_logger(__name__)
+
+
+# ==================== 进程级模板快照缓存 ====================
+# 键为 (模板路径, 文件修改时间, 文件大小, 模板rig名称)，值为全部骨骼数据的纯Python快照。
+# 同一会话中的多个骨骼、左右侧绑定以及重复生成共享同一份快照；
+# 模板文件一旦被修改，旧快照会被淘汰，超出容量时按LRU淘汰。
+TEMPLATE_SNAPSHOT_CACHE_SIZE = 4
+_template_snapshot_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+
+
+def get_template_search_dirs() -> List[str]:
+    """默认的模板文件搜索目录（已规范化，去重）"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # 从 utils 目录向上找到项目根目录
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
+    
+    search_dirs = []
+    for search_dir in (
+        os.path.join(project_root, "templates"),
+        os.path.join(project_root, "NebysseFacer", "templates"),
+        os.path.join(current_dir, "templates"),
+        os.path.join(current_dir, "..", "templates"),
+        os.path.join(current_dir, "..", "..", "templates"),
+    ):
+        search_dir = os.path.normpath(search_dir)
+        if search_dir not in search_dirs:
+            search_dirs.append(search_dir)
+    return search_dirs
+
+
+def get_template_file_stamp(template_path: str) -> Optional[Tuple[str, int, int]]:
+    """获取模板文件的缓存标识 (规范化路径, mtime_ns, size)，文件不存在时返回None"""
+    if not template_path:
+        return None
+    try:
+        stat = os.stat(template_path)
+    except OSError:
+        return None
+    return (os.path.normcase(os.path.normpath(os.path.abspath(template_path))),
+            stat.st_mtime_ns, stat.st_size)
+
+
+def clear_template_snapshot_cache():
+    """清空进程级模板快照缓存"""
+    _template_snapshot_cache.clear()
+
+
+def _get_cached_template_snapshot(cache_key: Tuple) -> Optional[Dict[str, Any]]:
+    """从LRU缓存读取快照，命中时移动到队尾"""
+    snapshot = _template_snapshot_cache.get(cache_key)
+    if snapshot is not None:
+        _template_snapshot_cache.move_to_end(cache_key)
+    return snapshot
+
+
+def _store_template_snapshot(cache_key: Tuple, snapshot: Dict[str, Any]):
+    """写入LRU缓存，并淘汰同一模板文件的过期快照"""
+    stale_keys = [key for key in _template_snapshot_cache
+                  if key[0] == cache_key[0] and key[3] == cache_key[3] and key != cache_key]
+    for key in stale_keys:
+        del _template_snapshot_cache[key]
+
+    _template_snapshot_cache[cache_key] = snapshot
+    _template_snapshot_cache.move_to_end(cache_key)
+    while len(_template_snapshot_cache) > TEMPLATE_SNAPSHOT_CACHE_SIZE:
+        _template_snapshot_cache.popitem(last=False)
+
+
+def _to_plain_value(value):
+    """将ID属性值（IDPropertyArray/IDPropertyGroup等）转换为纯Python值，避免快照持有RNA引用"""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if hasattr(value, 'to_list'):
+        return value.to_list()
+    if isinstance(value, dict):
+        return {key: _to_plain_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain_value(item) for item in value]
+    if hasattr(value, 'name') and not isinstance(value, (str, bytes)):
+        # ID数据块引用只保留名称
+        return value.name
+    return value
+
+
+def fold_bone_references(bone_data: Dict[str, Any], bone_folds: Dict[str, str]) -> Dict[str, Any]:
+    """
+    将骨骼快照中引用被折叠骨骼的约束子目标和驱动器变量重定向到保留的骨骼（细节级别，见 neboffset_bones）
+
+    返回新的骨骼快照，原快照（进程级缓存）保持不变。
+
+    Args:
+        bone_data: 单个骨骼的快照数据
+        bone_folds: {被折叠的骨骼名称: 保留的骨骼名称}
+    """
+    if not bone_folds:
+        return bone_data
+
+    folded = dict(bone_data)
+    constraints = []
+    for constraint_data in bone_data.get('constraints', []):
+        properties = constraint_data.get('properties', {})
+        if properties.get('subtarget') in bone_folds:
+            properties = dict(properties, subtarget=bone_folds[properties['subtarget']])
+            constraint_data = dict(constraint_data, properties=properties)
+        constraints.append(constraint_data)
+    folded['constraints'] = constraints
+
+    drivers = []
+    for driver_data in bone_data.get('drivers', []):
+        variables = []
+        for var_data in driver_data.get('variables', []):
+            targets = []
+            for target_data in var_data.get('targets', []):
+                bone_target = target_data.get('bone_target', '')
+                data_path = parse_data_path(target_data.get('data_path', '')).remap(bone_folds).data_path
+                if bone_target in bone_folds or data_path != target_data.get('data_path', ''):
+                    target_data = dict(target_data, bone_target=bone_folds.get(bone_target, bone_target),
+                                       data_path=data_path)
+                targets.append(target_data)
+            variables.append(dict(var_data, targets=targets))
+        drivers.append(dict(driver_data, variables=variables))
+    folded['drivers'] = drivers
+    return folded
+
+
+# ==================== 驱动器索引 ====================
+def build_driver_index(armature_obj) -> Dict[str, List[Tuple[Any, DriverPath]]]:
+    """
+    单次遍历骨架的全部驱动器，按骨骼名称分桶
+
+    Args:
+        armature_obj: 骨架对象
+
+    Returns:
+        {骨骼名称: [(fcurve, DriverPath), ...]}，不属于骨骼的驱动器不入索引
+    """
+    index = {}
+    animation_data = armature_obj.animation_data
+    if not animation_data:
+        return index
+
+    for fcurve in animation_data.drivers:
+        path = parse_data_path(fcurve.data_path, fcurve.array_index)
+        if path.bone is not None:
+            index.setdefault(path.bone, []).append((fcurve, path))
+
+    return index
+
 
 class BlendTemplateLoader:
     """Blender模板文件加载器"""
@@ -35,8 +221,15 @@ class BlendTemplateLoader:
         self.template_name = template_name
         self.template_path = template_path
         self.loaded_objects = []
-        self.original_context = None
-        
+        # 本加载器追加模板时使用的加载会话ID（见 template_ownership）
+        self.load_sessions = []
+        # 无法定位模板文件时（如手动导入场景的模板rig），快照只在实例内缓存
+        self._instance_snapshots = {}
+        # 追加时请求的 (id_type, 名称) → 实际追加得到的数据块（追加时可能被重命名）
+        self.appended_ids = {}
+        # 本次加载的 模板ID → 生成结果ID 映射表（见 id_remap）
+        self.id_remap = None
+
     def get_template_armature(self):
         """获取已加载的模板armature对象
         
@@ -48,17 +241,8 @@ class BlendTemplateLoader:
             if obj and obj.type == 'ARMATURE':
                 return obj
         
-        # 如果没有已加载的对象，尝试查找场景中的模板armature
-        if self.template_name:
-            template_base_name = os.path.splitext(self.template_name)[0]
-            for obj in bpy.data.objects:
-                if (obj.type == 'ARMATURE' and 
-                    (template_base_name in obj.name or
-                     "Nebysse_FaceUP_Tem" in obj.name or
-                     "FaceUP_Tem" in obj.name)):
-                    return obj
-        
-        return None
+        # 如果没有已加载的对象，查询模板rig注册表
+        return find_template_rig()
     
     def find_template_file(self, search_dirs: List[str] = None) -> Optional[str]:
         """
@@ -71,43 +255,52 @@ class BlendTemplateLoader:
             找到的模板文件完整路径，未找到返回None
         """
         if self.template_path and os.path.exists(self.template_path):
-            print(f"✓ 使用指定的模板路径: {self.template_path}")
+            logger.info("✓ 使用指定的模板路径: %s", self.template_path)
             return self.template_path
         
         if not self.template_name:
-            print("❌ 未指定模板名称")
+            logger.error("❌ 未指定模板名称")
             return None
         
         # 默认搜索路径
         if not search_dirs:
-            current_file = os.path.abspath(__file__)
-            current_dir = os.path.dirname(current_file)
-            # 从 utils 目录向上找到项目根目录
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-            
-            search_dirs = [
-                os.path.join(project_root, "templates"),
-                os.path.join(project_root, "NebysseFacer", "templates"),
-                os.path.join(current_dir, "templates"),
-                os.path.join(current_dir, "..", "templates"),
-                os.path.join(current_dir, "..", "..", "templates"),
-            ]
-        
-        # 在搜索目录中查找模板文件
+            search_dirs = get_template_search_dirs()
+        
+        # 在搜索目录中查找模板文件；从块目录确认文件中确实有模板rig（不加载文件）
         for search_dir in search_dirs:
             template_path = os.path.join(search_dir, self.template_name)
             template_path = os.path.normpath(template_path)
             
-            print(f"🔍 搜索模板文件: {template_path}")
+            logger.debug("🔍 搜索模板文件: %s", template_path)
             
             if os.path.exists(template_path):
-                print(f"✓ 找到模板文件: {template_path}")
+                if not self._catalog_has_template_rig(template_path):
+                    continue
+                logger.debug("✓ 找到模板文件: %s", template_path)
                 self.template_path = template_path
                 return template_path
         
-        print(f"❌ 未找到模板文件: {self.template_name}")
+        logger.error("❌ 未找到模板文件: %s", self.template_name)
         return None
     
+    def _catalog_has_template_rig(self, template_path: str,
+                                  template_rig_name: str = "Nebysse_FaceUP_Tem.Rig") -> bool:
+        """
+        从 .blend 块目录判断文件中是否有模板rig（不加载文件）
+        
+        目录无法读取时（如缺少zstd解压模块）不做判断，按有模板处理，由追加时再确认。
+        """
+        try:
+            catalog = read_blend_catalog(template_path)
+        except BlendCatalogError as e:
+            logger.debug("⚠ 无法读取模板文件目录 %s: %s", template_path, e)
+            return True
+        
+        if pick_template_rig_name(catalog.names('objects'), template_rig_name) is None:
+            logger.warning("⚠ 模板文件中没有模板rig对象，跳过: %s", template_path)
+            return False
+        return True
+    
     def load_template_data(self, target_bone_names: List[str] = None) -> Dict[str, Any]:
         """
         从模板文件加载数据（防重复加载版本）
@@ -122,147 +315,156 @@ class BlendTemplateLoader:
         if not template_path:
             return {}
         
-        print(f"📂 开始加载模板文件: {os.path.basename(template_path)}")
+        logger.info("📂 开始加载模板文件: %s", os.path.basename(template_path))
         
         try:
-            # 保存当前上下文
-            self.original_context = {
-                'active_object': bpy.context.view_layer.objects.active,
-                'selected_objects': list(bpy.context.selected_objects),
-                'mode': bpy.context.mode
-            }
+            # 对象模式下加载（已是对象模式时不调用运算符），退出时恢复活动对象和选择状态
+            with ContextGuard(mode='OBJECT'):
+                # ==================== 防重复加载检查 ====================
+                # 同一模板文件版本已追加过的模板rig直接复用（注册表O(1)查询）
+                existing_template = find_template_rig(template_hash=compute_template_hash(template_path))
             
-            # 确保在对象模式
-            if bpy.context.mode != 'OBJECT':
-                bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # ==================== 防重复加载检查 ====================
-            print("🔍 检查是否存在重复的模板对象...")
-            
-            # 检查当前场景中是否已有同名的模板对象
-            existing_template_objects = []
-            template_base_name = os.path.splitext(os.path.basename(template_path))[0]  # 不含扩展名的文件名
-            
-            for obj in bpy.data.objects:
-                if obj.type == 'ARMATURE':
-                    # 检查对象名称是否包含模板基础名称
-                    if (template_base_name in obj.name or 
-                        "Nebysse_FaceUP_Tem" in obj.name or
-                        "FaceUP_Tem" in obj.name):
-                        existing_template_objects.append(obj)
-            
-            if existing_template_objects:
-                print(f"⚠ 发现 {len(existing_template_objects)} 个可能重复的模板对象:")
-                for obj in existing_template_objects:
-                    print(f"  📍 {obj.name}")
-                
-                print("🤔 选择处理策略...")
+                if existing_template:
+                    logger.info("✓ 重用已加载的模板对象: %s", existing_template.name)
                 
-                # 策略1：尝试重用现有对象（如果名称匹配度高）
-                best_match = None
-                for obj in existing_template_objects:
-                    # 寻找最匹配的对象（名称包含"Rig"且没有多余的后缀）
-                    if "Rig" in obj.name and not any(suffix in obj.name for suffix in [".001", ".002", ".003", ".004"]):
-                        best_match = obj
-                        break
+                    # 接管现有对象所属的加载会话，以便后续清理
+                    self.adopt_template_rig(existing_template)
                 
-                if best_match:
-                    print(f"✓ 重用现有的最佳匹配模板对象: {best_match.name}")
-                    
-                    # 将现有对象添加到已加载对象列表中，以便后续清理
-                    if best_match not in self.loaded_objects:
-                        self.loaded_objects.append(best_match)
-                    
                     # 提取骨骼数据
-                    bone_data = self._extract_bone_data(best_match, target_bone_names)
-                    
+                    bone_data = self._extract_bone_data(existing_template, target_bone_names)
+                
                     return {
-                        'armature': best_match,
+                        'armature': existing_template,
                         'bone_data': bone_data,
                         'loaded_objects': self.loaded_objects,
                         'template_path': template_path,
                         'reused_existing': True
                     }
-                else:
-                    # 策略2：清理所有现有对象，重新加载
-                    print("🧹 清理现有对象，准备重新加载...")
-                    for obj in existing_template_objects:
-                        try:
-                            print(f"  🗑️ 清理现有对象: {obj.name}")
-                            if obj == bpy.context.view_layer.objects.active:
-                                bpy.context.view_layer.objects.active = None
-                            obj.select_set(False)
-                            bpy.data.objects.remove(obj)
-                        except Exception as e:
-                            print(f"  ⚠ 清理对象失败 {obj.name}: {e}")
-                    
-                    print("✓ 现有对象清理完成，继续新加载...")
-            else:
-                print("✓ 未发现重复对象，可以安全加载")
-            
-            # ==================== 开始加载模板文件 ====================
-            print("📦 开始从文件加载模板对象...")
-            
-            # 记录加载前的对象
-            objects_before = set(bpy.data.objects.keys())
-            
-            # 加载模板文件
-            with bpy.data.libraries.load(template_path, link=False) as (data_from, data_to):
-                data_to.objects = data_from.objects
-                data_to.armatures = data_from.armatures
-            
-            # 查找新加载的对象
-            objects_after = set(bpy.data.objects.keys())
-            new_objects = objects_after - objects_before
-            
-            print(f"📊 成功加载了 {len(new_objects)} 个新对象")
-            
-            # 找到骨架对象
-            template_armature = None
-            loaded_armatures = []
-            
-            for obj_name in new_objects:
-                obj = bpy.data.objects[obj_name]
-                if obj.type == 'ARMATURE':
-                    loaded_armatures.append(obj)
-                    # 选择最佳的骨架对象（优先没有后缀的）
-                    if not template_armature or (not any(suffix in obj.name for suffix in [".001", ".002", ".003"]) and "Rig" in obj.name):
-                        template_armature = obj
-                    self.loaded_objects.append(obj)
-            
-            if not template_armature:
-                print("❌ 模板中未找到骨架对象")
-                return {}
-            
-            print(f"✓ 找到主模板骨架: {template_armature.name}")
-            if len(loaded_armatures) > 1:
-                print(f"⚠ 注意：加载了 {len(loaded_armatures)} 个骨架对象，使用主骨架: {template_armature.name}")
-                for arm in loaded_armatures:
-                    if arm != template_armature:
-                        print(f"  📋 其他骨架: {arm.name}")
-            
-            # 将骨架添加到场景（如果还没有）
-            if template_armature.name not in bpy.context.scene.collection.objects:
-                bpy.context.scene.collection.objects.link(template_armature)
-                print(f"🔗 已将模板骨架链接到场景: {template_armature.name}")
-            
-            # 提取骨骼数据
-            bone_data = self._extract_bone_data(template_armature, target_bone_names)
-            
-            return {
-                'armature': template_armature,
-                'bone_data': bone_data,
-                'loaded_objects': self.loaded_objects,
-                'template_path': template_path,
-                'reused_existing': False
-            }
+            
+                # ==================== 开始加载模板文件 ====================
+                # 只追加模板rig及其约束/驱动器实际引用的数据块
+                template_armature = self._append_template_rig(template_path)
+            
+                if not template_armature:
+                    logger.error("❌ 模板中未找到骨架对象")
+                    return {}
+            
+                logger.info("✓ 找到主模板骨架: %s", template_armature.name)
+            
+                # 提取骨骼数据
+                bone_data = self._extract_bone_data(template_armature, target_bone_names)
+            
+                return {
+                    'armature': template_armature,
+                    'bone_data': bone_data,
+                    'loaded_objects': self.loaded_objects,
+                    'template_path': template_path,
+                    'reused_existing': False
+                }
             
         except Exception as e:
-            print(f"❌ 加载模板文件失败: {e}")
+            logger.error("❌ 加载模板文件失败: %s", e)
             import traceback
             traceback.print_exc()
             return {}
     
+    def load_template_rig(self, template_rig_name: str = "Nebysse_FaceUP_Tem.Rig"):
+        """
+        选择性追加模板rig对象（不提取骨骼数据）
+        
+        Args:
+            template_rig_name: 模板rig对象名称
+            
+        Returns:
+            追加的模板rig对象，失败返回None
+        """
+        template_path = self.find_template_file()
+        if not template_path:
+            return None
+        return self._append_template_rig(template_path, template_rig_name)
+    
+    def _append_template_rig(self, template_path: str, template_rig_name: str = "Nebysse_FaceUP_Tem.Rig"):
+        """
+        只追加模板rig对象，以及其约束和驱动器变量按名称引用的数据块
+        
+        依赖列表来自模板快照（即使快照已过期，也可作为依赖提示），并与库中的数据块列表取交集；
+        通过指针引用的数据块（骨架数据、约束目标、动作等）由Blender在追加时自动带入。
+        
+        Returns:
+            追加并链接到场景的模板rig对象，失败返回None
+        """
+        # 块目录确认没有模板rig时不打开库
+        if not self._catalog_has_template_rig(template_path, template_rig_name):
+            logger.error("❌ 模板文件中未找到模板rig对象: %s", template_rig_name)
+            return None
+        
+        previous_snapshot = read_template_snapshot(template_path, check_hash=False)
+        dependencies = previous_snapshot.get('dependencies', {}) if previous_snapshot else {}
+        
+        logger.info("📦 选择性追加模板rig: %s", os.path.basename(template_path))
+        
+        # 记录追加前的 session_uid 水位，之后只标记本次追加新建的数据块
+        watermark = session_uid_watermark()
+        
+        with bpy.data.libraries.load(template_path, link=False) as (data_from, data_to):
+            rig_name = self._pick_template_rig_name(data_from.objects, template_rig_name)
+            if not rig_name:
+                logger.error("❌ 模板文件中未找到模板rig对象: %s", template_rig_name)
+                return None
+            
+            helper_objects = [name for name in dependencies.get('objects', [])
+                              if name in data_from.objects and name != rig_name]
+            data_to.objects = [rig_name] + helper_objects
+            # 之前追加并被生成的rig采用的动作直接复用，同名的用户动作不算
+            action_names = [name for name in dependencies.get('actions', [])
+                            if name in data_from.actions and find_template_id('ACTION', name) is None]
+            data_to.actions = action_names
+        
+        loaded_objects = [obj for obj in data_to.objects if obj]
+        
+        # 记录辅助对象和动作的实际数据块（追加时可能被重命名），供ID映射表按模板中的名称查找
+        for name, datablock in zip(helper_objects, data_to.objects[1:]):
+            if datablock:
+                self.appended_ids[('OBJECT', name)] = datablock
+                mark_template_name(datablock, name)
+        for name, datablock in zip(action_names, data_to.actions):
+            if datablock:
+                self.appended_ids[('ACTION', name)] = datablock
+                mark_template_name(datablock, name)
+        
+        # 标记本次追加的全部数据块（含间接带入的骨架/网格数据、材质和动作），清理时精确删除
+        load_session = new_load_session()
+        self.load_sessions.append(load_session)
+        owned_count = tag_owned_ids(
+            collect_appended_ids(loaded_objects + [action for action in data_to.actions if action], watermark),
+            load_session
+        )
+        logger.info("🏷️ 已标记模板数据块: %s 个（加载会话 %s）", owned_count, load_session)
+        
+        if not loaded_objects or loaded_objects[0].type != 'ARMATURE':
+            logger.error("❌ 追加的模板rig不是骨架对象")
+            self.loaded_objects.extend(loaded_objects)
+            return None
+        
+        self.loaded_objects.extend(loaded_objects)
+        template_armature = loaded_objects[0]
+        
+        logger.info("📊 追加了 %s 个对象, %s 个动作", len(loaded_objects), len([a for a in data_to.actions if a]))
+        
+        # 将骨架添加到场景（如果还没有）
+        if template_armature.name not in bpy.context.scene.collection.objects:
+            bpy.context.scene.collection.objects.link(template_armature)
+            logger.info("🔗 已将模板骨架链接到场景: %s", template_armature.name)
+        
+        # 登记到模板rig注册表，之后按名称/哈希直接查询
+        register_template_rig(template_armature, template_rig_name, compute_template_hash(template_path))
+        
+        return template_armature
+    
+    def _pick_template_rig_name(self, object_names: List[str], template_rig_name: str) -> Optional[str]:
+        """从库的对象名称列表中选出模板rig名称"""
+        return pick_template_rig_name(object_names, template_rig_name)
+    
     def _extract_bone_data(self, armature_obj, target_bone_names: List[str] = None) -> Dict[str, Dict]:
         """
         提取骨骼数据，包括自定义属性和驱动器
@@ -283,11 +485,14 @@ class BlendTemplateLoader:
             # 获取要处理的骨骼列表
             bones_to_process = target_bone_names if target_bone_names else armature_obj.pose.bones.keys()
             
-            print(f"📋 提取 {len(bones_to_process)} 个骨骼的数据...")
+            logger.info("📋 提取 %s 个骨骼的数据...", len(bones_to_process))
+            
+            # 一次遍历建立驱动器索引，后续按骨骼O(1)查询
+            driver_index = build_driver_index(armature_obj)
             
             for bone_name in bones_to_process:
                 if bone_name not in armature_obj.pose.bones:
-                    print(f"⚠ 跳过不存在的骨骼: {bone_name}")
+                    logger.warning("⚠ 跳过不存在的骨骼: %s", bone_name)
                     continue
                 
                 pose_bone = armature_obj.pose.bones[bone_name]
@@ -323,7 +528,7 @@ class BlendTemplateLoader:
                 bone_info['custom_properties'] = custom_props
                 
                 # 提取驱动器（包括自定义属性上的驱动器）
-                drivers = self._extract_drivers(armature_obj, bone_name)
+                drivers = self._extract_drivers(armature_obj, bone_name, driver_index)
                 bone_info['drivers'] = drivers
                 
                 # 提取约束
@@ -332,26 +537,295 @@ class BlendTemplateLoader:
                 
                 bone_data[bone_name] = bone_info
                 
-                print(f"  ✓ 提取骨骼数据: {bone_name}")
-                print(f"    🔄 自定义属性: {len(custom_props)}")
-                # print(f"    🔄 驱动器: {len(drivers)}") # 删除debug打印
-                print(f"    🔗 约束: {len(constraints)}")
-                
-                # 详细报告自定义属性上的驱动器
-                custom_prop_drivers = [d for d in drivers if self._is_custom_property_driver(d)]
-                if custom_prop_drivers:
-                    # print(f"    🎯 自定义属性驱动器: {len(custom_prop_drivers)}") # 删除debug打印
-                    pass
+                logger.debug("  ✓ 提取骨骼数据: %s", bone_name)
+                logger.debug("    🔄 自定义属性: %s", len(custom_props))
+                logger.debug("    🔗 约束: %s", len(constraints))
             
-            print(f"✅ 骨骼数据提取完成: {len(bone_data)} 个骨骼")
+            logger.info("✅ 骨骼数据提取完成: %s 个骨骼", len(bone_data))
             return bone_data
             
         except Exception as e:
-            print(f"❌ 提取骨骼数据失败: {e}")
+            logger.error("❌ 提取骨骼数据失败: %s", e)
             import traceback
             traceback.print_exc()
             return {}
+
+    def get_template_snapshot(self, template_rig_obj) -> Dict[str, Any]:
+        """
+        获取模板rig全部骨骼数据的快照（一次提取，多次复用）
+
+        快照以 模板路径 + 文件mtime/size 为键存放在进程级LRU缓存中，
+        供所有骨骼、左右侧绑定以及同一会话中的重复生成共享。
+        快照中只包含纯Python值，不持有任何RNA引用。
+        从模板对象提取后会同时写出预编译快照文件，供之后的生成跳过 .blend 追加。
+
+        Args:
+            template_rig_obj: 模板rig对象
+
+        Returns:
+            快照字典: {'template_path', 'template_rig', 'bones', 'dependencies'}
+        """
+        template_path = self._get_template_path()
+        stamp = get_template_file_stamp(template_path)
+        cache_key = stamp + (template_rig_obj.name,) if stamp else None
+
+        if cache_key:
+            snapshot = _get_cached_template_snapshot(cache_key)
+            if snapshot is None:
+                snapshot = read_template_snapshot(template_path, template_rig_obj.name)
+                if snapshot is not None:
+                    _store_template_snapshot(cache_key, snapshot)
+        else:
+            snapshot = self._instance_snapshots.get(template_rig_obj.name)
+
+        if snapshot is not None:
+            return snapshot
+
+        logger.info("📸 创建模板快照: %s", template_rig_obj.name)
+        bone_data = _to_plain_value(self._extract_bone_data(template_rig_obj))
+        self._optimize_snapshot_drivers(bone_data)
+        snapshot = {
+            'template_path': template_path,
+            'template_rig': template_rig_obj.name,
+            'bones': bone_data,
+            'dependencies': collect_snapshot_dependencies(bone_data, template_rig_obj.name,
+                                                          template_rig_obj.data.name),
+        }
+
+        if not bone_data:
+            # 提取失败时不缓存，下次调用重新尝试
+            return snapshot
+
+        if cache_key:
+            _store_template_snapshot(cache_key, snapshot)
+            snapshot_path = write_template_snapshot(
+                template_path, template_rig_obj.name, bone_data, snapshot['dependencies']
+            )
+            if snapshot_path:
+                logger.info("💾 已写出预编译模板快照: %s", os.path.basename(snapshot_path))
+        else:
+            self._instance_snapshots[template_rig_obj.name] = snapshot
+
+        logger.info("✓ 模板快照已缓存: %s 个骨骼", len(snapshot['bones']))
+        return snapshot
+
+    def load_precompiled_snapshot(self, template_rig_name: str = "Nebysse_FaceUP_Tem.Rig") -> Optional[Dict[str, Any]]:
+        """
+        不追加 .blend，直接获取模板快照（进程缓存或预编译快照文件）
+
+        Args:
+            template_rig_name: 模板rig对象名称
+
+        Returns:
+            快照字典；快照不存在或哈希过期时返回None，此时调用方应回退到 .blend
+        """
+        template_path = self._get_template_path()
+        stamp = get_template_file_stamp(template_path)
+        if not stamp:
+            return None
+
+        cache_key = stamp + (template_rig_name,)
+        snapshot = _get_cached_template_snapshot(cache_key)
+        if snapshot is None:
+            snapshot = read_template_snapshot(template_path, template_rig_name)
+            if snapshot is None:
+                return None
+            _store_template_snapshot(cache_key, snapshot)
+            logger.info("⚡ 使用预编译模板快照: %s", os.path.basename(template_path))
+
+        return snapshot
+
+    def compile_template_snapshot(self, template_rig_name: str = "Nebysse_FaceUP_Tem.Rig") -> Optional[str]:
+        """
+        从 .blend 模板重新编译快照文件（忽略已有快照）
+
+        Args:
+            template_rig_name: 模板rig对象名称
+
+        Returns:
+            快照文件路径，失败返回None
+
+        Raises:
+            RuntimeError: 如果模板rig对象不存在
+        """
+        template_path = self._get_template_path()
+        if not template_path:
+            logger.error("❌ 无法编译模板快照：未找到模板文件")
+            return None
+
+        template_rig_obj = self._find_template_rig_object(template_rig_name)
+        bone_data = _to_plain_value(self._extract_bone_data(template_rig_obj))
+        if not bone_data:
+            logger.error("❌ 无法编译模板快照：骨骼数据提取失败")
+            return None
+        self._optimize_snapshot_drivers(bone_data)
+
+        dependencies = collect_snapshot_dependencies(bone_data, template_rig_obj.name, template_rig_obj.data.name)
+        snapshot_path = write_template_snapshot(template_path, template_rig_obj.name, bone_data, dependencies)
+
+        stamp = get_template_file_stamp(template_path)
+        if snapshot_path and stamp:
+            _store_template_snapshot(stamp + (template_rig_obj.name,), {
+                'template_path': template_path,
+                'template_rig': template_rig_obj.name,
+                'bones': bone_data,
+                'dependencies': dependencies,
+            })
+            logger.info("✅ 模板快照编译完成: %s (%s 个骨骼)", snapshot_path, len(bone_data))
+
+        return snapshot_path
+
+    def _optimize_snapshot_drivers(self, bone_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        分析快照中的驱动器表达式，把常见写法改写为简单表达式或驱动器类型（编译快照时运行一次）
+
+        Returns:
+            driver_expressions.analyze_snapshot_drivers 的报告
+        """
+        report = analyze_snapshot_drivers(bone_data)
+        logger.info("🧮 模板驱动器: 驱动器类型 %s 个, 简单表达式 %s 个, Python求值 %s 个（改写 %s 个）",
+                    report[TYPED], report[SIMPLE], report[PYTHON], report['rewritten'])
+        if report['python_drivers']:
+            logger.warning("⚠ 模板中以下驱动器仍需Python求值:")
+            log_python_drivers(report['python_drivers'])
+        return report
+
+    def ensure_snapshot_dependencies(self, snapshot: Dict[str, Any]) -> int:
+        """
+        确保快照按名称引用的每个数据块（约束目标和驱动器变量引用的对象、动作及其他类型的数据块）
+        都有来自模板的副本，并登记到 appended_ids 供ID映射表查找
+        
+        已追加或之前被生成的rig采用的模板数据块直接复用；当前文件中恰好同名的用户数据不算，
+        仍从模板追加（追加时被重命名）。场景引用在建立ID映射表时指向当前场景，不追加。
+        
+        Returns:
+            新追加的数据块数量
+        """
+        dependencies = snapshot.get('dependencies', {})
+        requested = {
+            'OBJECT': list(dependencies.get('objects', [])),
+            'ACTION': list(dependencies.get('actions', [])),
+        }
+        for id_type, name in dependencies.get('ids', []):
+            if id_type != 'SCENE':
+                requested.setdefault(id_type, []).append(name)
+        
+        missing = {}
+        for id_type, names in requested.items():
+            for name in names:
+                if (id_type, name) in self.appended_ids:
+                    continue
+                datablock = find_template_id(id_type, name)
+                if datablock is not None:
+                    self.appended_ids[(id_type, name)] = datablock
+                else:
+                    missing.setdefault(id_type, []).append(name)
+        
+        template_path = snapshot.get('template_path') or self._get_template_path()
+        if not missing or not template_path:
+            return 0
+        
+        return self._append_template_ids(template_path, missing)
     
+    def _append_template_ids(self, template_path: str, requested: Dict[str, List[str]]) -> int:
+        """
+        从模板文件按名称追加数据块：登记到 appended_ids、记录模板中的名称并标记所有权
+        
+        Args:
+            template_path: 模板 .blend 文件路径
+            requested: {id_type: [模板中的名称, ...]}
+            
+        Returns:
+            追加的数据块数量
+        """
+        watermark = session_uid_watermark()
+        attributes = {id_type: ID_TYPE_COLLECTIONS[id_type]
+                      for id_type in requested if id_type in ID_TYPE_COLLECTIONS}
+        names_by_type = {}
+        
+        with bpy.data.libraries.load(template_path, link=False) as (data_from, data_to):
+            for id_type, attribute in attributes.items():
+                available = set(getattr(data_from, attribute))
+                names_by_type[id_type] = [name for name in requested[id_type] if name in available]
+                setattr(data_to, attribute, names_by_type[id_type])
+        
+        appended = []
+        for id_type, names in names_by_type.items():
+            for name, datablock in zip(names, getattr(data_to, attributes[id_type])):
+                if datablock:
+                    self.appended_ids[(id_type, name)] = datablock
+                    mark_template_name(datablock, name)
+                    appended.append(datablock)
+        
+        if not appended:
+            return 0
+        
+        load_session = new_load_session()
+        self.load_sessions.append(load_session)
+        tag_owned_ids(collect_appended_ids(appended, watermark), load_session)
+        logger.info("📦 已从模板追加快照引用的数据块: %s 个（加载会话 %s）", len(appended), load_session)
+        return len(appended)
+    
+    def _resolve_template_snapshot(self, template_rig) -> Dict[str, Any]:
+        """
+        获取模板快照：传入名称时优先使用预编译快照，仅在快照过期时才查找/加载模板rig对象
+
+        Args:
+            template_rig: 模板rig对象或其名称
+        """
+        if isinstance(template_rig, str):
+            snapshot = self.load_precompiled_snapshot(template_rig)
+            if snapshot is None:
+                snapshot = self.get_template_snapshot(self._find_template_rig_object(template_rig))
+        else:
+            snapshot = self.get_template_snapshot(template_rig)
+
+        self.ensure_snapshot_dependencies(snapshot)
+        return snapshot
+
+    def build_id_remap(self, target_rig, template_rig=None, snapshot: Dict[str, Any] = None) -> IDRemap:
+        """
+        建立本次加载的 模板ID → 生成结果ID 映射表（每次加载/批量复制只建立一次）
+
+        覆盖模板rig、模板骨架数据、追加的辅助对象和动作；之后创建的每个约束目标和驱动器变量目标都查此表。
+
+        Args:
+            target_rig: 正在生成的rig对象
+            template_rig: 模板rig对象（使用预编译快照时为None）
+            snapshot: 模板快照（提供模板rig名称和骨架数据名称）
+        """
+        snapshot = snapshot or {}
+        template_data_name = snapshot.get('dependencies', {}).get('template_data')
+        remap = IDRemap.for_template(
+            target_rig, template_rig,
+            template_rig_names=[name for name in (snapshot.get('template_rig'),) if name],
+            template_data_names=[template_data_name] if template_data_name else [],
+        )
+        for (id_type, name), datablock in self.appended_ids.items():
+            remap.add_name(id_type, name, datablock)
+        # 模板中的场景引用指向当前场景
+        for id_type, name in snapshot.get('dependencies', {}).get('ids', []):
+            if id_type == 'SCENE':
+                remap.add_name(id_type, name, bpy.context.scene)
+
+        self.id_remap = remap
+        logger.debug("🗺️ ID映射表: %s 项 -> %s", len(remap), target_rig.name)
+        return remap
+
+    def get_id_remap(self, target_rig) -> IDRemap:
+        """获取目标rig的ID映射表，尚未建立时以本加载器追加（或注册表中）的模板rig建立"""
+        if self.id_remap is None or self.id_remap.target != target_rig:
+            self.build_id_remap(target_rig, self.get_template_armature())
+        return self.id_remap
+
+    def _get_template_path(self) -> Optional[str]:
+        """获取模板文件路径（必要时搜索）"""
+        if self.template_path and os.path.exists(self.template_path):
+            return self.template_path
+        if self.template_name:
+            return self.find_template_file()
+        return None
+
     def _extract_custom_properties(self, pose_bone) -> Dict[str, Any]:
         """提取自定义属性"""
         custom_props = {}
@@ -381,89 +855,63 @@ class BlendTemplateLoader:
         
         return custom_props
     
-    def _extract_drivers(self, armature_obj, bone_name: str) -> List[Dict]:
+    def _extract_drivers(self, armature_obj, bone_name: str,
+                         driver_index: Dict[str, List[Tuple[Any, DriverPath]]] = None) -> List[Dict]:
         """
         提取驱动器（增强版：包括自定义属性和约束属性上的驱动器）
+        
+        Args:
+            armature_obj: 骨架对象
+            bone_name: 骨骼名称
+            driver_index: build_driver_index 生成的索引，为None时现场建立
         """
         drivers = []
         
-        if not armature_obj.animation_data or not armature_obj.animation_data.drivers:
-            return drivers
-        
-        # 构建该骨骼的所有可能的数据路径模式
-        bone_path_patterns = [
-            f'pose.bones["{bone_name}"]',
-            f"pose.bones['{bone_name}']",
-        ]
+        if driver_index is None:
+            driver_index = build_driver_index(armature_obj)
         
-        # print(f"    🔍 搜索驱动器，骨骼路径模式: {bone_path_patterns}") # 删除debug打印
-        
-        for fcurve in armature_obj.animation_data.drivers:
-            data_path = fcurve.data_path
-            
-            # 检查是否是该骨骼的驱动器
-            is_bone_driver = any(pattern in data_path for pattern in bone_path_patterns)
+        for fcurve, path in driver_index.get(bone_name, ()):
+            driver_data = {
+                'data_path': fcurve.data_path,
+                'array_index': fcurve.array_index,
+                'driver_type': fcurve.driver.type,
+                'expression': fcurve.driver.expression,
+                'use_self': fcurve.driver.use_self,
+                'variables': []
+            }
             
-            if is_bone_driver:
-                driver_data = {
-                    'data_path': data_path,
-                    'array_index': fcurve.array_index,
-                    'driver_type': fcurve.driver.type,
-                    'expression': fcurve.driver.expression,
-                    'variables': []
+            # 提取变量
+            for var in fcurve.driver.variables:
+                var_data = {
+                    'name': var.name,
+                    'type': var.type,
+                    'targets': []
                 }
                 
-                # 检查驱动器类型
-                if self._is_constraint_property_driver_data(data_path):
-                    # print(f"      🔗 发现约束属性驱动器: {data_path}") # 删除debug打印
-                    pass
-                elif self._is_custom_property_driver(driver_data):
-                    # print(f"      🎯 发现自定义属性驱动器: {data_path}") # 删除debug打印
-                    pass
-                else:
-                    # print(f"      🔄 发现变换驱动器: {data_path}") # 删除debug打印
-                    pass
-                
-                # 提取变量
-                for var in fcurve.driver.variables:
-                    var_data = {
-                        'name': var.name,
-                        'type': var.type,
-                        'targets': []
+                for target in var.targets:
+                    target_data = {
+                        'id_type': target.id_type,
+                        'id': target.id.name if target.id else None,
+                        'data_path': target.data_path,
+                        'bone_target': target.bone_target,
+                        'transform_type': target.transform_type,
+                        'transform_space': target.transform_space,
                     }
-                    
-                    for target in var.targets:
-                        target_data = {
-                            'id_type': target.id_type,
-                            'id': target.id.name if target.id else None,
-                            'data_path': target.data_path,
-                            'bone_target': target.bone_target,
-                            'transform_type': target.transform_type,
-                            'transform_space': target.transform_space,
-                        }
-                        var_data['targets'].append(target_data)
-                    
-                    driver_data['variables'].append(var_data)
+                    var_data['targets'].append(target_data)
                 
-                drivers.append(driver_data)
-                # print(f"      ✓ 提取驱动器: {data_path} -> 表达式: {fcurve.driver.expression}") # 删除debug打印
+                driver_data['variables'].append(var_data)
+            
+            drivers.append(driver_data)
         
         return drivers
     
     def _is_constraint_property_driver_data(self, data_path: str) -> bool:
         """检查是否是约束属性驱动器（基于数据路径）"""
-        # 检查路径是否包含 constraints["name"].property 格式
-        import re
-        constraint_pattern = r'\.constraints\[["\'][^"\']+["\']\]\.[a-zA-Z_]+'
-        return bool(re.search(constraint_pattern, data_path))
+        return parse_data_path(data_path).is_constraint_property
     
     def _is_custom_property_driver(self, driver_data: Dict) -> bool:
         """检查是否是自定义属性驱动器"""
-        data_path = driver_data.get('data_path', '')
-        # 自定义属性驱动器的路径包含 ["property_name"] 格式，但不是约束属性
-        has_custom_prop_pattern = '["' in data_path and '"]' in data_path
-        is_constraint_prop = self._is_constraint_property_driver_data(data_path)
-        return has_custom_prop_pattern and not is_constraint_prop
+        return parse_data_path(driver_data.get('data_path', '')).is_custom_property
     
     def _extract_constraints(self, pose_bone) -> List[Dict]:
         """提取约束"""
@@ -580,10 +1028,10 @@ class BlendTemplateLoader:
             应用是否成功
         """
         if not bone_data:
-            print("⚠ 骨骼数据为空")
+            logger.warning("⚠ 骨骼数据为空")
             return False
         
-        print("🔄 开始应用骨骼数据到目标绑定...")
+        logger.info("🔄 开始应用骨骼数据到目标绑定...")
         
         success_count = 0
         error_count = 0
@@ -595,7 +1043,7 @@ class BlendTemplateLoader:
             try:
                 # 应用自定义属性
                 if self._apply_custom_properties(target_rig, target_bone_name, data.get('custom_properties', {})):
-                    print(f"  ✓ 应用自定义属性: {template_bone_name} -> {target_bone_name}")
+                    logger.debug("  ✓ 应用自定义属性: %s -> %s", template_bone_name, target_bone_name)
                 
                 # 应用驱动器（包括自定义属性上的驱动器）
                 if drivers:
@@ -604,20 +1052,20 @@ class BlendTemplateLoader:
                 success_count += 1
                 
             except Exception as e:
-                print(f"❌ 应用骨骼数据失败 {template_bone_name}: {e}")
+                logger.error("❌ 应用骨骼数据失败 %s: %s", template_bone_name, e)
                 error_count += 1
                 continue
         
-        print(f"📊 骨骼数据应用完成:")
-        print(f"   ✅ 成功: {success_count} 个")
-        print(f"   ❌ 失败: {error_count} 个")
+        logger.info("📊 骨骼数据应用完成:")
+        logger.info("   ✅ 成功: %s 个", success_count)
+        log_count(logger, "   ❌ 失败: %s 个", error_count)
         
         return error_count == 0
     
     def _apply_custom_properties(self, target_rig, bone_name: str, custom_props: Dict) -> bool:
         """应用自定义属性"""
         if bone_name not in target_rig.pose.bones:
-            print(f"⚠ 目标骨骼不存在: {bone_name}")
+            logger.warning("⚠ 目标骨骼不存在: %s", bone_name)
             return False
         
         pose_bone = target_rig.pose.bones[bone_name]
@@ -639,10 +1087,10 @@ class BlendTemplateLoader:
                     if 'description' in ui_data and ui_data['description']:
                         id_props_ui.update(description=ui_data['description'])
                 
-                print(f"    📝 设置属性: {prop_name} = {prop_data['value']}")
+                logger.debug("    📝 设置属性: %s = %s", prop_name, prop_data['value'])
                 
             except Exception as e:
-                print(f"⚠ 设置属性失败 {prop_name}: {e}")
+                logger.warning("⚠ 设置属性失败 %s: %s", prop_name, e)
                 continue
         
         return True
@@ -656,7 +1104,7 @@ class BlendTemplateLoader:
             return True
         
         if bone_name not in target_rig.pose.bones:
-            print(f"⚠ 目标骨骼不存在: {bone_name}")
+            logger.warning("⚠ 目标骨骼不存在: %s", bone_name)
             return False
         
         pose_bone = target_rig.pose.bones[bone_name]
@@ -666,36 +1114,25 @@ class BlendTemplateLoader:
         
         for driver_data in drivers:
             try:
-                # 解析data_path，替换骨骼名称
-                data_path = driver_data['data_path']
-                original_data_path = data_path
-                
-                # 替换骨骼名称（支持多种引号格式）
-                import re
-                pattern = r'pose\.bones\[(["\'])([^"\']+)\1\]'
-                def replace_bone_name(match):
-                    quote = match.group(1)
-                    old_bone_name = match.group(2)
-                    if bone_mapping and old_bone_name in bone_mapping:
-                        new_bone_name = bone_mapping[old_bone_name]
-                    else:
-                        new_bone_name = bone_name
-                    return f'pose.bones[{quote}{new_bone_name}{quote}]'
-                
-                data_path = re.sub(pattern, replace_bone_name, data_path)
-                
+                # 解析data_path并替换骨骼名称（未映射的骨骼重定向到目标骨骼）
                 array_index = driver_data.get('array_index', 0)
+                path = parse_data_path(driver_data['data_path'], array_index).remap(bone_mapping, bone_name)
+                data_path = path.render()
                 
-                # 检查是否是自定义属性驱动器
-                is_custom_prop = self._is_custom_property_driver(driver_data)
-                
-                if is_custom_prop:
+                if path.is_custom_property:
                     # 自定义属性驱动器处理 - 不传递array_index参数
                     success = self._apply_custom_property_driver(
                         pose_bone, data_path, driver_data, bone_mapping, target_rig
                     )
                     if success:
                         custom_prop_drivers += 1
+                elif path.is_constraint_property:
+                    # 约束属性驱动器处理
+                    success = self._apply_constraint_property_driver(
+                        target_rig, bone_name, data_path, driver_data, bone_mapping
+                    )
+                    if success:
+                        transform_drivers += 1
                 else:
                     # 常规变换驱动器处理
                     success = self._apply_transform_driver(
@@ -716,26 +1153,9 @@ class BlendTemplateLoader:
                                     driver_data: Dict, bone_mapping: Dict, target_rig) -> bool:
         """应用自定义属性驱动器（增强版）"""
         try:
-            # 修复：正确提取自定义属性名称
             # 路径格式: pose.bones["骨骼名"]["属性名"]
-            # 需要找到最后一个[""]部分，那才是属性名称
-            prop_name = None
-            
-            # 使用正则表达式更精确地匹配属性名称
-            import re
-            # 匹配 pose.bones["骨骼名"]["属性名"] 格式
-            pattern = r'pose\.bones\["[^"]+"\]\["([^"]+)"\]'
-            match = re.search(pattern, data_path)
-            
-            if match:
-                prop_name = match.group(1)
-            else:
-                # 备用方案：查找最后一个[""]部分
-                parts = data_path.split('["')
-                if len(parts) >= 3:  # pose.bones, 骨骼名, 属性名
-                    last_part = parts[-1]
-                    if '"]' in last_part:
-                        prop_name = last_part.split('"]')[0]
+            path = parse_data_path(data_path)
+            prop_name = path.property if path.is_custom_property else None
             
             if not prop_name:
                 return False
@@ -752,7 +1172,7 @@ class BlendTemplateLoader:
                 return False
             
             # 创建驱动器 - 自定义属性不需要array_index参数
-            driver = pose_bone.driver_add(f'["{prop_name}"]')
+            driver = pose_bone.driver_add(path.bone_relative_path())
             
             if not driver:
                 return False
@@ -793,21 +1213,12 @@ class BlendTemplateLoader:
                 # print(f"      ❌ 骨架缺少动画数据") # 删除debug打印
                 return False
             
-            # 查找对应的FCurve
-            target_path = f'pose.bones["{pose_bone.name}"]["{prop_name}"]'
-            found_fcurve = None
-            
-            for fcurve in armature.animation_data.drivers:
-                if fcurve.data_path == target_path:
-                    found_fcurve = fcurve
-                    break
-            
-            if not found_fcurve:
+            # 检查驱动器FCurve指向预期的属性
+            path = parse_data_path(driver.data_path)
+            if not (path.is_custom_property and path.bone == pose_bone.name and path.property == prop_name):
                 # print(f"      ❌ 未找到对应的FCurve: {target_path}") # 删除debug打印
                 return False
             
-            # print(f"      ✓ 找到FCurve: {found_fcurve.data_path}") # 删除debug打印
-            
             # 检查驱动器表达式
             expression = driver.driver.expression
             expected_expression = driver_data.get('expression', '')
@@ -849,13 +1260,12 @@ class BlendTemplateLoader:
                               driver_data: Dict, bone_mapping: Dict, target_rig) -> bool:
         """应用变换驱动器"""
         try:
-            # 提取变换属性名称（如 location, rotation_euler 等）
-            parts = data_path.split('.')
-            if len(parts) >= 2:
-                transform_prop = parts[-1]
+            # 相对骨骼的变换属性路径（如 location, rotation_euler 等）
+            path = parse_data_path(data_path, array_index)
+            if path.bone is not None and path.property:
                 
                 # 创建驱动器
-                driver = pose_bone.driver_add(transform_prop, array_index)
+                driver = add_driver(pose_bone, path.bone_relative_path(), array_index)
                 if driver:
                     self._configure_driver(driver, driver_data, bone_mapping, target_rig)
                     return True
@@ -868,11 +1278,17 @@ class BlendTemplateLoader:
     
     def _configure_driver(self, driver, driver_data: Dict, bone_mapping: Dict, target_rig):
         """配置驱动器的通用方法（增强版）"""
+        # 记入驱动器账本，生成结束后只检查加载器创建或重定向的驱动器
+        record_driver(driver)
+        remap = self.get_id_remap(target_rig)
+        
         try:
             # print(f"        🔧 开始配置驱动器...") # 删除debug打印
             # print(f"        📄 驱动器数据: {driver_data.get('data_path', 'unknown')}") # 删除debug打印
             
-            # 设置驱动器类型和表达式
+            # 设置驱动器类型和表达式（旧快照中未分析的驱动器在此改写，结果记入表达式报告）
+            analysis = optimize_driver_data(driver_data)
+            record_analysis(f"{target_rig.name} {driver_data.get('data_path', '')}", analysis)
             driver_type = driver_data.get('driver_type', 'SCRIPTED')
             expression = driver_data.get('expression', '')
             
@@ -911,7 +1327,7 @@ class BlendTemplateLoader:
                             break
                         
                         target = var.targets[j]
-                        target.id = target_rig
+                        remap.set_driver_target(var, target, target_data)
                         
                         # 处理骨骼名称映射
                         bone_target = target_data.get('bone_target', '')
@@ -994,119 +1410,35 @@ class BlendTemplateLoader:
             # print(f"        ❌ 验证驱动器配置失败: {e}") # 删除debug打印
             return False
     
+    def adopt_template_rig(self, template_rig):
+        """
+        接管之前留下的模板rig（如中断的生成或保存在文件中的模板rig）
+
+        登记其加载会话的全部带标记数据块，清理时一并删除；对象不加入 loaded_objects，
+        没有所有权标记的对象不会被接管。
+        """
+        for load_session in adopt_tagged_ids([template_rig]):
+            if load_session not in self.load_sessions:
+                self.load_sessions.append(load_session)
+    
     def cleanup(self):
-        """清理加载的模板数据"""
-        print("🧹 清理模板数据...")
-        
-        # 保存当前上下文信息
-        current_active = bpy.context.view_layer.objects.active
-        current_selected = list(bpy.context.selected_objects)
+        """清理本加载器追加和接管的模板数据（只删除带加载会话标记的ID，一次 batch_remove）"""
+        logger.info("🧹 清理模板数据...")
         
-        # 统计要清理的对象
-        template_rig_objects = []
-        other_objects = []
-        
-        for obj in self.loaded_objects:
-            if "Nebysse_FaceUP_Tem.Rig" in obj.name:
-                template_rig_objects.append(obj)
-            else:
-                other_objects.append(obj)
+        template_rig_count = len([obj for obj in self.loaded_objects if is_template_rig(obj)])
         
-        if template_rig_objects:
-            print(f"  🎯 发现模板rig对象: {len(template_rig_objects)} 个")
-            for obj in template_rig_objects:
-                print(f"    📍 {obj.name}")
-        
-        if other_objects:
-            print(f"  📦 其他模板对象: {len(other_objects)} 个")
-        
-        # 清理加载的对象
-        for obj in self.loaded_objects:
+        # 删除对象只使用数据API；退出时恢复选择状态，已删除的对象自动跳过
+        with ContextGuard():
             try:
-                # 安全检查：确保对象仍然存在且有效
-                if obj and hasattr(obj, 'name') and obj.name in bpy.data.objects:
-                    # 特别标注模板rig对象的删除
-                    if "Nebysse_FaceUP_Tem.Rig" in obj.name:
-                        print(f"  🗑️ 删除模板rig对象: {obj.name}")
-                    else:
-                        print(f"  🗑️ 删除对象: {obj.name}")
-                    
-                    # 如果要删除的对象是当前活动对象，先切换活动对象
-                    if obj == current_active:
-                        # 尝试找到一个不会被删除的对象作为活动对象
-                        for alt_obj in bpy.data.objects:
-                            if alt_obj not in self.loaded_objects:
-                                bpy.context.view_layer.objects.active = alt_obj
-                                print(f"    🔄 切换活动对象到: {alt_obj.name}")
-                                break
-                        else:
-                            bpy.context.view_layer.objects.active = None
-                    
-                    # 确保对象未被选中
-                    obj.select_set(False)
-                    
-                    # 删除对象
-                    bpy.data.objects.remove(obj)
-            except (ReferenceError, AttributeError):
-                # 对象已被删除或引用已失效，跳过
-                pass
+                removed = remove_owned_ids(self.load_sessions)
             except Exception as e:
-                print(f"⚠ 删除对象失败: {e}")
+                removed = 0
+                logger.warning("⚠ 删除模板数据块失败: %s", e)
         
         self.loaded_objects.clear()
-        print(f"  ✓ 已清理所有模板对象，包括 {len(template_rig_objects)} 个模板rig对象")
-        
-        # 智能恢复原始上下文
-        if self.original_context:
-            try:
-                # 恢复活动对象
-                original_active = self.original_context['active_object']
-                if original_active and hasattr(original_active, 'name') and original_active.name in bpy.data.objects:
-                    bpy.context.view_layer.objects.active = original_active
-                    print(f"  ✓ 恢复活动对象: {original_active.name}")
-                elif not bpy.context.view_layer.objects.active:
-                    # 如果没有活动对象，尝试设置一个
-                    for obj in bpy.data.objects:
-                        if obj.type == 'ARMATURE':
-                            bpy.context.view_layer.objects.active = obj
-                            print(f"  🔄 设置活动对象为骨架: {obj.name}")
-                            break
-                
-                # 恢复选择状态
-                bpy.ops.object.select_all(action='DESELECT')
-                for obj in self.original_context['selected_objects']:
-                    # 安全检查：确保对象仍然存在且有效
-                    try:
-                        if obj and hasattr(obj, 'name') and obj.name in bpy.data.objects:
-                            bpy.data.objects[obj.name].select_set(True)
-                    except (ReferenceError, AttributeError):
-                        # 对象已被删除或引用已失效，跳过
-                        pass
-                    except Exception as e:
-                        print(f"⚠ 恢复对象选择状态时出错: {e}")
-                        pass
-                
-                # 更新视图层
-                bpy.context.view_layer.update()
-                
-                print(f"  ✓ 上下文恢复完成，活动对象: {bpy.context.view_layer.objects.active.name if bpy.context.view_layer.objects.active else 'None'}")
-                
-            except Exception as e:
-                print(f"⚠ 恢复上下文失败: {e}")
-                
-                # 紧急恢复：确保有活动对象
-                try:
-                    if not bpy.context.view_layer.objects.active:
-                        for obj in bpy.data.objects:
-                            if obj.type == 'ARMATURE':
-                                bpy.context.view_layer.objects.active = obj
-                                obj.select_set(True)
-                                print(f"  🆘 紧急设置活动对象: {obj.name}")
-                                break
-                except:
-                    pass
-        
-        print("✓ 清理完成")
+        self.load_sessions.clear()
+        logger.info("  ✓ 已清理 %s 个模板数据块，包括 %s 个模板rig对象", removed, template_rig_count)
+        logger.info("✓ 清理完成")
 
     def copy_properties_from_template_rig(self, template_rig_name: str = "Nebysse_FaceUP_Tem.Rig", 
                                         source_bone_name: str = "Neb_face-root", 
@@ -1127,44 +1459,42 @@ class BlendTemplateLoader:
             RuntimeError: 如果模板rig对象不存在或其他关键错误
         """
         try:
-            print(f"🎯 开始从模板rig复制自定义属性...")
-            print(f"   📂 模板rig: {template_rig_name}")
-            print(f"   🦴 源骨骼: {source_bone_name}")
-            print(f"   🎯 目标骨骼: {target_bone_name}")
+            logger.info("🎯 开始从模板rig复制自定义属性...")
+            logger.info("   📂 模板rig: %s", template_rig_name)
+            logger.info("   🦴 源骨骼: %s", source_bone_name)
+            logger.info("   🎯 目标骨骼: %s", target_bone_name)
             
-            # 查找模板rig对象（可能抛出异常）
-            template_rig_obj = self._find_template_rig_object(template_rig_name)
-            # 如果执行到这里，说明找到了模板rig对象
+            # 获取模板快照（优先使用预编译快照，找不到模板rig时抛出异常）
+            snapshot = self._resolve_template_snapshot(template_rig_name)
             
             # 检查源骨骼是否存在
-            if source_bone_name not in template_rig_obj.pose.bones:
+            if source_bone_name not in snapshot['bones']:
                 error_msg = f"模板rig中不存在源骨骼: {source_bone_name}"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
-            source_pose_bone = template_rig_obj.pose.bones[source_bone_name]
-            print(f"✓ 找到源骨骼: {source_pose_bone.name}")
+            logger.info("✓ 找到源骨骼: %s", source_bone_name)
             
             # 检查目标rig和骨骼
             if not target_rig:
                 error_msg = "未指定目标rig对象"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
             if target_bone_name not in target_rig.pose.bones:
                 error_msg = f"目标rig中不存在目标骨骼: {target_bone_name}"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
             target_pose_bone = target_rig.pose.bones[target_bone_name]
-            print(f"✓ 找到目标骨骼: {target_pose_bone.name}")
+            logger.info("✓ 找到目标骨骼: %s", target_pose_bone.name)
             
-            # 提取源骨骼的自定义属性
-            source_custom_props = self._extract_custom_properties(source_pose_bone)
-            print(f"📝 从源骨骼提取到 {len(source_custom_props)} 个自定义属性")
+            # 从模板快照读取源骨骼的自定义属性
+            source_custom_props = snapshot['bones'][source_bone_name].get('custom_properties', {})
+            logger.info("📝 从源骨骼提取到 %s 个自定义属性", len(source_custom_props))
             
             if not source_custom_props:
-                print("⚠ 源骨骼没有自定义属性")
+                logger.warning("⚠ 源骨骼没有自定义属性")
                 return True
             
             # 复制自定义属性到目标骨骼
@@ -1191,13 +1521,13 @@ class BlendTemplateLoader:
                             id_props_ui.update(soft_max=ui_data['soft_max'])
                     
                     copied_count += 1
-                    print(f"  ✓ 复制属性: {prop_name} = {prop_data['value']}")
+                    logger.debug("  ✓ 复制属性: %s = %s", prop_name, prop_data['value'])
                     
                 except Exception as e:
-                    print(f"⚠ 复制属性失败 {prop_name}: {e}")
+                    logger.warning("⚠ 复制属性失败 %s: %s", prop_name, e)
                     continue
             
-            print(f"✅ 自定义属性复制完成: {copied_count}/{len(source_custom_props)} 个成功")
+            logger.info("✅ 自定义属性复制完成: %s/%s 个成功", copied_count, len(source_custom_props))
             
             # 更新依赖图
             bpy.context.view_layer.update()
@@ -1209,7 +1539,7 @@ class BlendTemplateLoader:
             raise
         except Exception as e:
             error_msg = f"从模板rig复制自定义属性时发生意外错误: {e}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             import traceback
             traceback.print_exc()
             raise RuntimeError(error_msg)
@@ -1238,14 +1568,11 @@ class BlendTemplateLoader:
             # print(f"  📌 源骨骼: {source_bone_name}") # 删除debug打印
             # print(f"  📌 目标骨骼: {target_bone_name}") # 删除debug打印
             
-            # 查找模板rig对象
-            template_rig_obj = self._find_template_rig_object(template_rig_name)
-            if not template_rig_obj:
-                # print(f"❌ 找不到模板rig对象: {template_rig_name}") # 删除debug打印
-                return False
+            # 获取模板快照（优先使用预编译快照）
+            snapshot = self._resolve_template_snapshot(template_rig_name)
             
-            # 提取源骨骼的驱动器
-            source_drivers = self._extract_drivers(template_rig_obj, source_bone_name)
+            # 从模板快照读取源骨骼的驱动器
+            source_drivers = snapshot['bones'].get(source_bone_name, {}).get('drivers', [])
             
             if not source_drivers:
                 # print("⚠ 源骨骼没有驱动器") # 删除debug打印
@@ -1268,7 +1595,7 @@ class BlendTemplateLoader:
             raise
         except Exception as e:
             error_msg = f"从模板rig复制驱动器时发生意外错误: {e}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             import traceback
             traceback.print_exc()
             raise RuntimeError(error_msg)
@@ -1277,6 +1604,8 @@ class BlendTemplateLoader:
         """
         查找模板rig对象（严格模式：找不到直接抛出异常）
         
+        先查询模板rig注册表，未命中时从模板文件选择性追加（追加的对象会自动登记）。
+        
         Args:
             template_rig_name: 模板rig对象名称
             
@@ -1287,143 +1616,36 @@ class BlendTemplateLoader:
             RuntimeError: 如果未找到模板rig对象
         """
         try:
-            print(f"🔍 智能查找模板rig对象: {template_rig_name}")
+            template_rig_obj = find_template_rig(template_rig_name)
+            if template_rig_obj:
+                return template_rig_obj
             
-            # 第一步：尝试直接根据名称查找
-            if template_rig_name in bpy.data.objects:
-                obj = bpy.data.objects[template_rig_name]
-                if obj.type == 'ARMATURE':
-                    print(f"✓ 直接找到模板rig对象: {obj.name}")
-                    return obj
+            logger.warning("⚠ 场景中未找到模板rig对象: %s", template_rig_name)
+            logger.info("🔄 尝试从模板文件加载...")
             
-            # 第二步：智能查找包含基础名称的对象（处理.001, .002等后缀）
-            base_name = template_rig_name
-            template_candidates = []
+            template_rig_obj = self.load_template_rig(template_rig_name)
+            if template_rig_obj:
+                logger.info("✓ 从模板文件加载到rig对象: %s", template_rig_obj.name)
+                return template_rig_obj
             
-            for obj in bpy.data.objects:
-                if obj.type != 'ARMATURE':
-                    continue
-                
-                obj_name = obj.name
-                
-                # 检查是否是带后缀的同名对象
-                if obj_name.startswith(base_name):
-                    # 检查后缀格式：.001, .002 等
-                    suffix = obj_name[len(base_name):]
-                    if suffix == "" or (suffix.startswith('.') and suffix[1:].isdigit()):
-                        template_candidates.append(obj)
-                        print(f"  📋 发现候选对象: {obj_name}")
-            
-            # 第三步：如果找到候选对象，选择最佳匹配
-            if template_candidates:
-                # 优先选择没有后缀的原始名称
-                for obj in template_candidates:
-                    if obj.name == base_name:
-                        print(f"✓ 找到原始名称的模板rig: {obj.name}")
-                        return obj
-                
-                # 如果没有原始名称，选择后缀数字最小的
-                template_candidates.sort(key=lambda x: self._extract_suffix_number(x.name))
-                best_match = template_candidates[0]
-                print(f"✓ 找到最佳匹配的模板rig: {best_match.name}")
-                print(f"  💡 注意：由于Blender重名机制，使用了带后缀的对象")
-                return best_match
-            
-            # 第四步：扩展搜索 - 查找包含关键词的对象
-            print(f"🔍 扩展搜索包含关键词的对象...")
-            keyword_matches = []
-            keywords = ["FaceUP", "Tem", "Rig", "Template"]
-            
-            for obj in bpy.data.objects:
-                if obj.type != 'ARMATURE':
-                    continue
-                
-                obj_name = obj.name
-                keyword_count = sum(1 for keyword in keywords if keyword in obj_name)
-                
-                if keyword_count >= 2:  # 至少包含2个关键词
-                    keyword_matches.append((obj, keyword_count))
-                    print(f"  📋 关键词匹配: {obj_name} (匹配 {keyword_count} 个关键词)")
-            
-            if keyword_matches:
-                # 按匹配的关键词数量排序，选择最佳匹配
-                keyword_matches.sort(key=lambda x: x[1], reverse=True)
-                best_match = keyword_matches[0][0]
-                print(f"✓ 通过关键词找到模板rig: {best_match.name}")
-                return best_match
-            
-            # 第五步：尝试从当前加载的对象中查找（如果是刚加载的）
-            if hasattr(self, 'loaded_objects') and self.loaded_objects:
-                print(f"🔍 在已加载对象中查找...")
-                for obj in self.loaded_objects:
-                    if obj.type == 'ARMATURE' and template_rig_name in obj.name:
-                        print(f"✓ 在已加载对象中找到: {obj.name}")
-                        return obj
-            
-            # 第六步：如果还没找到，尝试从模板文件加载
-            print(f"⚠ 场景中未找到模板rig对象: {template_rig_name}")
-            print(f"🔄 尝试从模板文件加载...")
-            
-            template_data = self.load_template_data()
-            if template_data and 'armature' in template_data:
-                template_armature = template_data['armature']
-                if template_rig_name in template_armature.name or template_armature.name in template_rig_name:
-                    print(f"✓ 从模板文件加载到rig对象: {template_armature.name}")
-                    return template_armature
-            
-            # 所有方法都失败了，抛出详细的异常
             error_msg = f"无法找到模板rig对象: {template_rig_name}"
-            print(f"❌ {error_msg}")
-            print(f"💡 详细诊断信息：")
-            print(f"   1. 直接名称查找：失败")
-            print(f"   2. 后缀名称查找：找到 {len(template_candidates)} 个候选对象")
-            print(f"   3. 关键词匹配：找到 {len(keyword_matches)} 个匹配对象")
-            print(f"   4. 已加载对象查找：{len(self.loaded_objects) if hasattr(self, 'loaded_objects') else 0} 个对象")
-            print(f"   5. 模板文件加载：{'成功' if template_data else '失败'}")
-            
-            print(f"🔧 可能的解决方案：")
-            print(f"   1. 检查模板文件是否存在且有效")
-            print(f"   2. 确认模板rig对象名称为: {template_rig_name}")
-            print(f"   3. 检查Blender版本兼容性")
-            print(f"   4. 重新安装或修复模板文件")
-            print(f"   5. 手动导入模板文件到场景中")
-            
-            # 列出当前场景中的所有骨架对象
-            armature_objects = [obj.name for obj in bpy.data.objects if obj.type == 'ARMATURE']
-            if armature_objects:
-                print(f"📋 当前场景中的骨架对象:")
-                for arm_name in armature_objects:
-                    print(f"   • {arm_name}")
-            else:
-                print(f"📋 当前场景中没有骨架对象")
-            
+            logger.error("❌ %s", error_msg)
+            logger.info("🔧 可能的解决方案：")
+            logger.info("   1. 检查模板文件是否存在且有效")
+            logger.info("   2. 确认模板rig对象名称为: %s", template_rig_name)
+            logger.info("   3. 检查Blender版本兼容性")
+            logger.info("   4. 重新安装或修复模板文件")
+            logger.info("   5. 手动导入模板文件到场景中")
             raise RuntimeError(error_msg)
             
         except RuntimeError:
-            # 重新抛出已知的运行时错误
             raise
         except Exception as e:
             error_msg = f"查找模板rig对象时发生意外错误: {e}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             import traceback
             traceback.print_exc()
             raise RuntimeError(error_msg)
-    
-    def _extract_suffix_number(self, name: str) -> int:
-        """提取名称后缀中的数字，用于排序"""
-        try:
-            # 查找最后一个点的位置
-            last_dot = name.rfind('.')
-            if last_dot == -1:
-                return 0  # 没有后缀
-            
-            suffix = name[last_dot + 1:]
-            if suffix.isdigit():
-                return int(suffix)
-            else:
-                return 0  # 后缀不是数字
-        except:
-            return 0
 
     def load_template_data_safe(self):
         """安全地加载模板数据（专为Rigify生成过程设计）
@@ -1431,58 +1653,16 @@ class BlendTemplateLoader:
         Returns:
             模板数据字典，失败返回None
         """
-        print("📂 BlendTemplateLoader: 安全加载模板数据...")
-        
-        # 保护当前状态
-        original_active = bpy.context.view_layer.objects.active
-        original_selected = list(bpy.context.selected_objects)
-        original_mode = bpy.context.mode
+        logger.info("📂 BlendTemplateLoader: 安全加载模板数据...")
         
         try:
-            # 确保在对象模式
-            if bpy.context.mode != 'OBJECT':
-                bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # 调用原有的加载方法，但更加小心
-            return self._load_template_data_protected()
+            # 对象模式下加载；嵌套在TemplateManager的保护中时不重复保存和恢复状态
+            with ContextGuard(mode='OBJECT'):
+                return self._load_template_data_protected()
             
         except Exception as e:
-            print(f"❌ 安全加载失败: {e}")
+            logger.error("❌ 安全加载失败: %s", e)
             return None
-            
-        finally:
-            # 恢复原始状态
-            try:
-                if original_active and original_active.name in bpy.data.objects:
-                    bpy.context.view_layer.objects.active = original_active
-                
-                # 恢复选择状态
-                for obj in original_selected:
-                    try:
-                        if obj and obj.name in bpy.data.objects:
-                            obj.select_set(True)
-                    except:
-                        pass
-                
-                # 恢复模式
-                if bpy.context.mode != original_mode:
-                    try:
-                        if original_mode == 'EDIT_ARMATURE':
-                            bpy.ops.object.mode_set(mode='EDIT')
-                        elif original_mode == 'POSE':
-                            bpy.ops.object.mode_set(mode='POSE')
-                        else:
-                            bpy.ops.object.mode_set(mode='OBJECT')
-                    except:
-                        pass
-                
-                # 更新视图层
-                bpy.context.view_layer.update()
-                
-                print(f"  ✓ 上下文恢复完成，活动对象: {bpy.context.view_layer.objects.active.name if bpy.context.view_layer.objects.active else 'None'}")
-                
-            except Exception as e:
-                print(f"⚠ 安全加载后恢复状态失败: {e}")
     
     def _load_template_data_protected(self):
         """受保护的模板数据加载（内部方法）"""
@@ -1494,55 +1674,31 @@ class BlendTemplateLoader:
             self.template_path = os.path.join(parent_dir, "templates", self.template_name)
         
         if not self.template_path or not os.path.exists(self.template_path):
-            print(f"⚠ 模板文件不存在: {self.template_path}")
+            logger.warning("⚠ 模板文件不存在: %s", self.template_path)
             return None
         
         try:
-            print(f"📁 加载模板文件: {self.template_path}")
+            logger.info("📁 加载模板文件: %s", self.template_path)
             
-            # 检查模板文件是否已经被链接
-            existing_template = None
-            for obj in bpy.data.objects:
-                if (obj.type == 'ARMATURE' and 
-                    ('Nebysse_FaceUP_Tem' in obj.name or 'FaceUP_Tem' in obj.name)):
-                    existing_template = obj
-                    break
+            # 检查模板rig是否已经加载
+            existing_template = find_template_rig()
             
             if existing_template:
-                print(f"✅ 使用已存在的模板对象: {existing_template.name}")
+                logger.info("✅ 使用已存在的模板对象: %s", existing_template.name)
                 return {'armature': existing_template}
             
-            # 使用append模式加载（而不是link，避免依赖问题）
-            with bpy.data.libraries.load(self.template_path, link=False) as (data_from, data_to):
-                # 查找armature
-                armature_names = [name for name in data_from.objects if any(
-                    pattern in name for pattern in ['Nebysse_FaceUP_Tem', 'FaceUP_Tem']
-                )]
-                
-                if armature_names:
-                    data_to.objects = armature_names
-                    print(f"📦 准备加载armature: {armature_names}")
-                else:
-                    print("⚠ 模板文件中未找到armature对象")
-                    return None
-            
-            # 获取加载的对象
-            loaded_armature = None
-            for obj in data_to.objects:
-                if obj and obj.type == 'ARMATURE':
-                    loaded_armature = obj
-                    self.loaded_objects.append(obj)
-                    break
+            # 使用append模式选择性加载（而不是link，避免依赖问题）
+            loaded_armature = self._append_template_rig(self.template_path)
             
             if loaded_armature:
-                print(f"✅ 模板armature加载成功: {loaded_armature.name}")
+                logger.info("✅ 模板armature加载成功: %s", loaded_armature.name)
                 return {'armature': loaded_armature}
             else:
-                print("❌ 加载的对象中没有有效的armature")
+                logger.error("❌ 加载的对象中没有有效的armature")
                 return None
                 
         except Exception as e:
-            print(f"❌ 受保护加载失败: {e}")
+            logger.error("❌ 受保护加载失败: %s", e)
             import traceback
             traceback.print_exc()
             return None
@@ -1569,44 +1725,36 @@ class BlendTemplateLoader:
             if target_bone_name is None:
                 target_bone_name = neboffset_bone_name
                 
-            print(f"🎯 开始复制NebOffset骨骼数据:")
-            print(f"   📂 模板rig: {template_rig_name}")
-            print(f"   🦴 源骨骼: {neboffset_bone_name}")
-            print(f"   🎯 目标骨骼: {target_bone_name}")
+            logger.debug("🎯 开始复制NebOffset骨骼数据:")
+            logger.debug("   📂 模板rig: %s", template_rig_name)
+            logger.debug("   🦴 源骨骼: %s", neboffset_bone_name)
+            logger.debug("   🎯 目标骨骼: %s", target_bone_name)
             
-            # 查找模板rig对象
-            template_rig_obj = self._find_template_rig_object(template_rig_name)
+            # 获取模板快照（优先使用预编译快照）
+            bone_data = self._resolve_template_snapshot(template_rig_name)['bones']
             
             # 检查源骨骼是否存在
-            if neboffset_bone_name not in template_rig_obj.pose.bones:
+            if neboffset_bone_name not in bone_data:
                 error_msg = f"模板rig中不存在NebOffset骨骼: {neboffset_bone_name}"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
             # 检查目标骨骼是否存在
             if target_bone_name not in target_rig.pose.bones:
                 error_msg = f"目标rig中不存在目标骨骼: {target_bone_name}"
-                print(f"❌ {error_msg}")
-                raise RuntimeError(error_msg)
-            
-            # 提取源骨骼的完整数据
-            bone_data = self._extract_bone_data(template_rig_obj, [neboffset_bone_name])
-            
-            if neboffset_bone_name not in bone_data:
-                error_msg = f"提取骨骼数据失败: {neboffset_bone_name}"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
             source_bone_data = bone_data[neboffset_bone_name]
-            print(f"✅ 成功提取源骨骼数据")
+            logger.debug("✅ 成功提取源骨骼数据")
             
             # 应用数据到目标骨骼
-            success = self._apply_neboffset_bone_data(target_rig, target_bone_name, source_bone_data, template_rig_obj)
+            success = self._apply_neboffset_bone_data(target_rig, target_bone_name, source_bone_data, None)
             
             if success:
-                print(f"✅ NebOffset骨骼数据复制完成: {neboffset_bone_name} -> {target_bone_name}")
+                logger.debug("✅ NebOffset骨骼数据复制完成: %s -> %s", neboffset_bone_name, target_bone_name)
             else:
-                print(f"⚠ NebOffset骨骼数据复制部分失败")
+                logger.warning("⚠ NebOffset骨骼数据复制部分失败")
             
             return success
             
@@ -1615,15 +1763,82 @@ class BlendTemplateLoader:
             raise
         except Exception as e:
             error_msg = f"复制NebOffset骨骼数据时发生意外错误: {e}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             import traceback
             traceback.print_exc()
             raise RuntimeError(error_msg)
     
+    def copy_neboffset_bones_batch(self, template_rig, target_rig, bone_names: List[str],
+                                   bone_folds: Dict[str, str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        批量复制模板rig中NebOffset骨骼的约束、驱动器和自定义属性到目标rig的同名骨骼
+        
+        整个批次共享一份模板快照，并且只在最后更新一次依赖图。
+        
+        Args:
+            template_rig: 模板rig对象或其名称（传入名称且预编译快照有效时不会加载 .blend）
+            target_rig: 目标rig对象
+            bone_names: 要复制的NebOffset骨骼名称列表
+            bone_folds: 细节级别折叠的骨骼 {被折叠的骨骼名称: 保留的骨骼名称}，
+                        模板中引用被折叠骨骼的约束子目标和驱动器变量改为引用保留的骨骼
+            
+        Returns:
+            每个骨骼的复制结果: {骨骼名称: {'success', 'constraints', 'drivers',
+            'custom_properties', 'failed', 'error'}}
+            
+        Raises:
+            RuntimeError: 如果模板rig对象不存在
+        """
+        logger.info("🎯 批量复制NebOffset骨骼数据: %s 个骨骼", len(bone_names))
+        
+        # 传入名称时优先使用预编译快照，无需模板rig对象
+        snapshot = self._resolve_template_snapshot(template_rig)
+        snapshot_bones = snapshot['bones']
+        if isinstance(template_rig, str):
+            template_rig = None
+        
+        # 整个批次共享一张ID映射表，约束和驱动器目标在创建时直接指向生成结果
+        self.build_id_remap(target_rig, template_rig, snapshot)
+        results = {}
+        
+        for bone_name in bone_names:
+            result = {
+                'success': False,
+                'constraints': 0,
+                'drivers': 0,
+                'custom_properties': 0,
+                'failed': 0,
+                'error': None,
+            }
+            results[bone_name] = result
+            
+            if bone_name not in snapshot_bones:
+                result['error'] = f"模板rig中不存在NebOffset骨骼: {bone_name}"
+                logger.error("❌ %s", result['error'])
+                continue
+            
+            if bone_name not in target_rig.pose.bones:
+                result['error'] = f"目标rig中不存在目标骨骼: {bone_name}"
+                logger.error("❌ %s", result['error'])
+                continue
+            
+            bone_data = fold_bone_references(snapshot_bones[bone_name], bone_folds)
+            result.update(self._apply_neboffset_bone_data_detailed(
+                target_rig, bone_name, bone_data, template_rig
+            ))
+        
+        # 整个批次只更新一次依赖图
+        bpy.context.view_layer.update()
+        
+        succeeded = sum(1 for result in results.values() if result['success'])
+        logger.info("✅ 批量复制完成: %s/%s 个骨骼成功", succeeded, len(bone_names))
+        
+        return results
+    
     def _apply_neboffset_bone_data(self, target_rig, target_bone_name: str, 
                                   source_bone_data: Dict, template_rig_obj) -> bool:
         """
-        将提取的NebOffset骨骼数据应用到目标骨骼
+        将提取的NebOffset骨骼数据应用到目标骨骼，并更新依赖图
         
         Args:
             target_rig: 目标rig对象
@@ -1634,74 +1849,100 @@ class BlendTemplateLoader:
         Returns:
             应用是否成功
         """
+        result = self._apply_neboffset_bone_data_detailed(
+            target_rig, target_bone_name, source_bone_data, template_rig_obj
+        )
+        
+        # 更新依赖图
+        bpy.context.view_layer.update()
+        
+        return result['success']
+    
+    def _apply_neboffset_bone_data_detailed(self, target_rig, target_bone_name: str,
+                                           source_bone_data: Dict, template_rig_obj) -> Dict[str, Any]:
+        """
+        将提取的NebOffset骨骼数据应用到目标骨骼（不更新依赖图）
+        
+        Returns:
+            应用结果: {'success', 'constraints', 'drivers', 'custom_properties', 'failed', 'error'}
+        """
+        result = {
+            'success': False,
+            'constraints': 0,
+            'drivers': 0,
+            'custom_properties': 0,
+            'failed': 0,
+            'error': None,
+        }
+        
         try:
             target_pose_bone = target_rig.pose.bones[target_bone_name]
-            print(f"📋 开始应用NebOffset骨骼数据到: {target_bone_name}")
-            
-            success_count = 0
-            total_operations = 0
+            logger.debug("📋 开始应用NebOffset骨骼数据到: %s", target_bone_name)
             
             # 1. 应用约束
             constraints_data = source_bone_data.get('constraints', [])
             if constraints_data:
-                print(f"🔗 应用约束: {len(constraints_data)} 个")
-                total_operations += len(constraints_data)
+                logger.debug("🔗 应用约束: %s 个", len(constraints_data))
                 
                 for constraint_data in constraints_data:
                     if self._apply_single_constraint(target_pose_bone, constraint_data, template_rig_obj, target_rig):
-                        success_count += 1
-                        print(f"  ✅ 约束: {constraint_data.get('name', 'unknown')}")
+                        result['constraints'] += 1
+                        logger.debug("  ✅ 约束: %s", constraint_data.get('name', 'unknown'))
                     else:
-                        print(f"  ❌ 约束失败: {constraint_data.get('name', 'unknown')}")
+                        result['failed'] += 1
+                        logger.error("  ❌ 约束失败: %s", constraint_data.get('name', 'unknown'))
             
             # 2. 应用驱动器
             drivers_data = source_bone_data.get('drivers', [])
             if drivers_data:
-                print(f"🔄 应用驱动器: {len(drivers_data)} 个")
-                total_operations += len(drivers_data)
+                logger.debug("🔄 应用驱动器: %s 个", len(drivers_data))
                 
                 # 创建骨骼映射（源骨骼名称 -> 目标骨骼名称）
                 bone_mapping = {source_bone_data['name']: target_bone_name}
                 
                 for driver_data in drivers_data:
                     if self._apply_single_driver(target_rig, target_bone_name, driver_data, bone_mapping):
-                        success_count += 1
-                        print(f"  ✅ 驱动器: {driver_data.get('data_path', 'unknown')}")
+                        result['drivers'] += 1
+                        logger.debug("  ✅ 驱动器: %s", driver_data.get('data_path', 'unknown'))
                     else:
-                        print(f"  ❌ 驱动器失败: {driver_data.get('data_path', 'unknown')}")
+                        result['failed'] += 1
+                        logger.error("  ❌ 驱动器失败: %s", driver_data.get('data_path', 'unknown'))
             
             # 3. 应用自定义属性（如果有）
             custom_props = source_bone_data.get('custom_properties', {})
             if custom_props:
-                print(f"📝 应用自定义属性: {len(custom_props)} 个")
-                total_operations += len(custom_props)
+                logger.debug("📝 应用自定义属性: %s 个", len(custom_props))
                 
                 for prop_name, prop_data in custom_props.items():
                     if self._apply_single_custom_property(target_pose_bone, prop_name, prop_data):
-                        success_count += 1
-                        print(f"  ✅ 属性: {prop_name} = {prop_data.get('value', 'unknown')}")
+                        result['custom_properties'] += 1
+                        logger.debug("  ✅ 属性: %s = %s", prop_name, prop_data.get('value', 'unknown'))
                     else:
-                        print(f"  ❌ 属性失败: {prop_name}")
+                        result['failed'] += 1
+                        logger.error("  ❌ 属性失败: %s", prop_name)
             
-            print(f"📊 NebOffset骨骼数据应用统计:")
-            print(f"   ✅ 成功: {success_count}/{total_operations} 个操作")
-            print(f"   📈 成功率: {(success_count/total_operations*100):.1f}%" if total_operations > 0 else "   📈 成功率: 100%")
+            success_count = result['constraints'] + result['drivers'] + result['custom_properties']
+            total_operations = success_count + result['failed']
             
-            # 更新依赖图
-            bpy.context.view_layer.update()
+            logger.debug("📊 NebOffset骨骼数据应用统计:")
+            logger.debug("   ✅ 成功: %s/%s 个操作", success_count, total_operations)
+            logger.debug("   📈 成功率: %.1f%%", success_count / total_operations * 100 if total_operations > 0 else 100.0)
             
-            return success_count > 0 or total_operations == 0
+            result['success'] = success_count > 0 or total_operations == 0
             
         except Exception as e:
-            print(f"❌ 应用NebOffset骨骼数据失败: {e}")
+            result['error'] = str(e)
+            logger.error("❌ 应用NebOffset骨骼数据失败: %s", e)
             import traceback
             traceback.print_exc()
-            return False
+        
+        return result
     
     def _apply_single_constraint(self, target_pose_bone, constraint_data: Dict, 
                                 template_rig_obj, target_rig) -> bool:
-        """应用单个约束"""
+        """应用单个约束（目标和动作通过ID映射表设置）"""
         try:
+            remap = self.get_id_remap(target_rig)
             constraint_type = constraint_data.get('type')
             constraint_name = constraint_data.get('name', f"约束_{constraint_type}")
             
@@ -1719,7 +1960,7 @@ class BlendTemplateLoader:
             if constraint_type == 'COPY_TRANSFORMS':
                 # 重定向目标对象
                 if properties.get('target'):
-                    new_constraint.target = target_rig  # 重定向到当前rig
+                    new_constraint.target = remap.lookup('OBJECT', properties['target'])
                     new_constraint.subtarget = properties.get('subtarget', '')
                 
                 new_constraint.mix_mode = properties.get('mix_mode', 'BEFORE')
@@ -1728,15 +1969,17 @@ class BlendTemplateLoader:
                 
             elif constraint_type == 'ACTION':
                 # ACTION 约束（动作约束）
-                print(f"      🎬 配置ACTION约束: {constraint_name}")
+                logger.debug("      🎬 配置ACTION约束: %s", constraint_name)
                 
                 # 设置动作
                 action_name = properties.get('action')
-                if action_name and action_name in bpy.data.actions:
-                    new_constraint.action = bpy.data.actions[action_name]
-                    print(f"        ✓ 动作: {action_name}")
+                action = remap.lookup('ACTION', action_name)
+                if action is not None:
+                    # 映射表同时释放动作的所有权，清理模板数据时保留
+                    new_constraint.action = action
+                    logger.debug("        ✓ 动作: %s", action_name)
                 else:
-                    print(f"        ⚠ 动作不存在或为空: {action_name}")
+                    logger.warning("        ⚠ 动作不存在或为空: %s", action_name)
                 
                 # 设置帧范围
                 if properties.get('frame_start') is not None:
@@ -1756,10 +1999,10 @@ class BlendTemplateLoader:
                 
                 # 设置目标对象
                 if properties.get('target'):
-                    new_constraint.target = target_rig  # 重定向到当前rig
+                    new_constraint.target = remap.lookup('OBJECT', properties['target'])
                     new_constraint.subtarget = properties.get('subtarget', '')
                 
-                print(f"        ✓ ACTION约束配置完成")
+                logger.debug("        ✓ ACTION约束配置完成")
                 
             elif constraint_type == 'LIMIT_ROTATION':
                 # 限制旋转约束
@@ -1783,7 +2026,7 @@ class BlendTemplateLoader:
             elif constraint_type == 'DAMPED_TRACK':
                 # 阻尼跟踪约束
                 if properties.get('target'):
-                    new_constraint.target = target_rig
+                    new_constraint.target = remap.lookup('OBJECT', properties['target'])
                     new_constraint.subtarget = properties.get('subtarget', '')
                 new_constraint.track_axis = properties.get('track_axis', 'TRACK_Y')
                 if 'head_tail' in properties:
@@ -1795,17 +2038,17 @@ class BlendTemplateLoader:
                     if hasattr(new_constraint, attr_name):
                         try:
                             if attr_name == 'target' and attr_value:
-                                # 目标对象重定向
-                                setattr(new_constraint, attr_name, target_rig)
+                                # 目标对象通过ID映射表重定向
+                                setattr(new_constraint, attr_name, remap.lookup('OBJECT', attr_value))
                             else:
                                 setattr(new_constraint, attr_name, attr_value)
                         except Exception as e:
-                            print(f"        ⚠ 设置属性失败 {attr_name}: {e}")
+                            logger.warning("        ⚠ 设置属性失败 %s: %s", attr_name, e)
             
             return True
             
         except Exception as e:
-            print(f"    ❌ 应用约束失败: {e}")
+            logger.error("    ❌ 应用约束失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -1817,31 +2060,22 @@ class BlendTemplateLoader:
             data_path = driver_data.get('data_path', '')
             array_index = driver_data.get('array_index', 0)
             
-            # 替换骨骼名称路径
+            # 替换骨骼名称路径（未映射的骨骼重定向到目标骨骼）
             original_data_path = data_path
+            path = parse_data_path(data_path, array_index).remap(bone_mapping, target_bone_name)
+            data_path = path.render()
             
-            # 使用正则表达式替换骨骼名称
-            import re
-            pattern = r'pose\.bones\[(["\'])([^"\']+)\1\]'
-            def replace_bone_name(match):
-                quote = match.group(1)
-                old_bone_name = match.group(2)
-                new_bone_name = bone_mapping.get(old_bone_name, target_bone_name)
-                return f'pose.bones[{quote}{new_bone_name}{quote}]'
-            
-            data_path = re.sub(pattern, replace_bone_name, data_path)
-            
-            print(f"        📍 驱动器路径: {original_data_path}")
+            logger.debug("        📍 驱动器路径: %s", original_data_path)
             if data_path != original_data_path:
-                print(f"        🔄 重定向路径: {data_path}")
+                logger.debug("        🔄 重定向路径: %s", data_path)
             
             # 检查驱动器类型
-            if self._is_constraint_property_driver(data_path):
+            if path.is_constraint_property:
                 # 约束属性驱动器（如 constraints["name"].influence）
                 return self._apply_constraint_property_driver(
                     target_rig, target_bone_name, data_path, driver_data, bone_mapping
                 )
-            elif self._is_custom_property_driver(driver_data):
+            elif path.is_custom_property:
                 # 自定义属性驱动器
                 target_pose_bone = target_rig.pose.bones[target_bone_name]
                 return self._apply_custom_property_driver(
@@ -1855,93 +2089,81 @@ class BlendTemplateLoader:
                 )
                 
         except Exception as e:
-            print(f"    ❌ 应用驱动器失败: {e}")
+            logger.error("    ❌ 应用驱动器失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
     
     def _is_constraint_property_driver(self, data_path: str) -> bool:
         """检查是否是约束属性驱动器"""
-        # 检查路径是否包含 constraints["name"].property 格式
-        import re
-        constraint_pattern = r'\.constraints\[["\'][^"\']+["\']\]\.[a-zA-Z_]+'
-        return bool(re.search(constraint_pattern, data_path))
+        return self._is_constraint_property_driver_data(data_path)
     
     def _apply_constraint_property_driver(self, target_rig, target_bone_name: str, 
                                         data_path: str, driver_data: Dict, bone_mapping: Dict) -> bool:
         """应用约束属性驱动器（如：约束的influence属性）"""
         try:
-            print(f"        🔗 约束属性驱动器: {data_path}")
-            
-            # 解析约束名称和属性名称
-            import re
+            logger.debug("        🔗 约束属性驱动器: %s", data_path)
             
-            # 匹配模式：constraints["constraint_name"].property_name
-            constraint_match = re.search(r'\.constraints\[(["\'])([^"\']+)\1\]\.([a-zA-Z_]+)', data_path)
+            # 解析约束名称和属性名称：constraints["constraint_name"].property_name
+            path = parse_data_path(data_path, driver_data.get('array_index', 0))
             
-            if not constraint_match:
-                print(f"        ❌ 无法解析约束路径: {data_path}")
+            if not path.is_constraint_property:
+                logger.error("        ❌ 无法解析约束路径: %s", data_path)
                 return False
             
-            constraint_name = constraint_match.group(2)
-            property_name = constraint_match.group(3)
+            constraint_name = path.constraint
+            property_name = path.property
             
-            print(f"        📋 约束名称: {constraint_name}")
-            print(f"        🎯 属性名称: {property_name}")
+            logger.debug("        📋 约束名称: %s", constraint_name)
+            logger.debug("        🎯 属性名称: %s", property_name)
             
             # 检查目标骨骼是否存在
             if target_bone_name not in target_rig.pose.bones:
-                print(f"        ❌ 目标骨骼不存在: {target_bone_name}")
+                logger.error("        ❌ 目标骨骼不存在: %s", target_bone_name)
                 return False
             
             target_pose_bone = target_rig.pose.bones[target_bone_name]
             
             # 检查约束是否存在
-            target_constraint = None
-            for constraint in target_pose_bone.constraints:
-                if constraint.name == constraint_name:
-                    target_constraint = constraint
-                    break
+            target_constraint = target_pose_bone.constraints.get(constraint_name)
             
             if not target_constraint:
-                print(f"        ❌ 约束不存在: {constraint_name}")
-                print(f"        📋 可用约束: {[c.name for c in target_pose_bone.constraints]}")
+                logger.error("        ❌ 约束不存在: %s", constraint_name)
+                logger.debug("        📋 可用约束: %s", [c.name for c in target_pose_bone.constraints])
                 return False
             
             # 检查属性是否存在
             if not hasattr(target_constraint, property_name):
-                print(f"        ❌ 约束属性不存在: {property_name}")
+                logger.error("        ❌ 约束属性不存在: %s", property_name)
                 return False
             
             # 构建完整的驱动器路径（针对目标rig对象）
             # 格式：pose.bones["bone_name"].constraints["constraint_name"].property_name
-            full_data_path = f'pose.bones["{target_bone_name}"].constraints["{constraint_name}"].{property_name}'
+            full_data_path = path.render(bone=target_bone_name)
             
-            print(f"        🎯 最终路径: {full_data_path}")
+            logger.debug("        🎯 最终路径: %s", full_data_path)
             
             # 创建驱动器
             try:
-                driver = target_rig.driver_add(full_data_path)
-                if hasattr(driver, '__len__'):  # 如果返回列表，取第一个
-                    driver = driver[0]
+                driver = add_driver(target_rig, full_data_path, path.index)
                 
                 # 配置驱动器
                 self._configure_driver(driver, driver_data, bone_mapping, target_rig)
                 
                 # 验证驱动器创建
                 if self._validate_constraint_driver(target_constraint, property_name, driver, driver_data):
-                    print(f"        ✅ 约束属性驱动器创建成功: {constraint_name}.{property_name}")
+                    logger.debug("        ✅ 约束属性驱动器创建成功: %s.%s", constraint_name, property_name)
                     return True
                 else:
-                    print(f"        ⚠ 约束属性驱动器验证失败")
+                    logger.warning("        ⚠ 约束属性驱动器验证失败")
                     return False
                     
             except Exception as driver_error:
-                print(f"        ❌ 创建约束驱动器失败: {driver_error}")
+                logger.error("        ❌ 创建约束驱动器失败: %s", driver_error)
                 return False
                 
         except Exception as e:
-            print(f"        ❌ 约束属性驱动器应用失败: {e}")
+            logger.error("        ❌ 约束属性驱动器应用失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -1956,30 +2178,30 @@ class BlendTemplateLoader:
             # 检查驱动器类型
             expected_type = driver_data.get('driver_type', 'SCRIPTED')
             if driver.driver.type != expected_type:
-                print(f"          ⚠ 驱动器类型不匹配: 期望 {expected_type}, 实际 {driver.driver.type}")
+                logger.warning("          ⚠ 驱动器类型不匹配: 期望 %s, 实际 %s", expected_type, driver.driver.type)
             
             # 检查表达式
             expected_expression = driver_data.get('expression', '')
             if driver.driver.expression != expected_expression:
-                print(f"          ⚠ 表达式不匹配: 期望 '{expected_expression}', 实际 '{driver.driver.expression}'")
+                logger.warning("          ⚠ 表达式不匹配: 期望 '%s', 实际 '%s'", expected_expression, driver.driver.expression)
             
             # 检查变量数量
             expected_vars = len(driver_data.get('variables', []))
             actual_vars = len(driver.driver.variables)
             if actual_vars != expected_vars:
-                print(f"          ⚠ 变量数量不匹配: 期望 {expected_vars}, 实际 {actual_vars}")
+                logger.warning("          ⚠ 变量数量不匹配: 期望 %s, 实际 %s", expected_vars, actual_vars)
             
             # 基本验证：约束属性应该是可驱动的
             if hasattr(constraint, property_name):
                 current_value = getattr(constraint, property_name)
-                print(f"          📊 当前属性值: {property_name} = {current_value}")
+                logger.debug("          📊 当前属性值: %s = %s", property_name, current_value)
                 return True
             else:
-                print(f"          ❌ 约束属性不存在: {property_name}")
+                logger.error("          ❌ 约束属性不存在: %s", property_name)
                 return False
                 
         except Exception as e:
-            print(f"          ❌ 验证约束驱动器失败: {e}")
+            logger.error("          ❌ 验证约束驱动器失败: %s", e)
             return False
     
     def _apply_single_custom_property(self, target_pose_bone, prop_name: str, prop_data: Dict) -> bool:
@@ -2003,7 +2225,7 @@ class BlendTemplateLoader:
             return True
             
         except Exception as e:
-            print(f"    ❌ 应用自定义属性失败: {e}")
+            logger.error("    ❌ 应用自定义属性失败: %s", e)
             return False
 
 
@@ -2033,7 +2255,6 @@ def apply_template_to_rig(target_rig, template_name: str, bone_mapping: Dict[str
 # 测试和调试函数
 def test_constraint_driver_parsing():
     """测试约束属性驱动器路径解析"""
-    loader = BlendTemplateLoader()
     
     # 测试路径示例
     test_paths = [
@@ -2044,30 +2265,21 @@ def test_constraint_driver_parsing():
         'pose.bones["NebOffset-lip.T"]["custom_prop"]',  # 自定义属性
     ]
     
-    print("🧪 测试约束属性驱动器路径解析:")
+    logger.info("🧪 测试约束属性驱动器路径解析:")
     
     for path in test_paths:
-        is_constraint = loader._is_constraint_property_driver_data(path)
-        is_custom = loader._is_custom_property_driver({'data_path': path})
-        
-        if is_constraint:
-            # 解析约束名称和属性
-            import re
-            constraint_match = re.search(r'\.constraints\[(["\'])([^"\']+)\1\]\.([a-zA-Z_]+)', path)
-            if constraint_match:
-                constraint_name = constraint_match.group(2)
-                property_name = constraint_match.group(3)
-                print(f"  🔗 约束驱动器: {path}")
-                print(f"      约束: {constraint_name}")
-                print(f"      属性: {property_name}")
-            else:
-                print(f"  ❌ 约束路径解析失败: {path}")
-        elif is_custom:
-            print(f"  🎯 自定义属性驱动器: {path}")
+        parsed = parse_data_path(path)
+        
+        if parsed.is_constraint_property:
+            logger.debug("  🔗 约束驱动器: %s", path)
+            logger.debug("      约束: %s", parsed.constraint)
+            logger.debug("      属性: %s", parsed.property)
+        elif parsed.is_custom_property:
+            logger.debug("  🎯 自定义属性驱动器: %s", path)
         else:
-            print(f"  🔄 变换驱动器: {path}")
+            logger.debug("  🔄 变换驱动器: %s", path)
     
-    print("🧪 测试完成")
+    logger.info("🧪 测试完成")
 
 if __name__ == "__main__":
     # 运行测试
@@ -0,0 +1,191 @@
+"""
+上下文保护 - 通过数据API保存和恢复活动对象、选择状态和模式
+
+功能：
+- 只用 view_layer.objects.active 和 select_set 保存/恢复活动对象和选择状态，
+  不调用 bpy.ops.object.select_all 等运算符（运算符会触发上下文校验、撤销记录和依赖图更新）
+- 模式已经符合要求时不切换；只有确实需要时才调用 bpy.ops.object.mode_set
+- 可嵌套：只有最外层保护保存并恢复完整状态，内层保护只撤销自己做出的改动，
+  生成过程中faceup、加载器和TemplateManager不再各自重复保存和恢复同一份状态
+
+用法：
+    with ContextGuard(active=rig, mode='OBJECT', leave_active=rig):
+        ...
+"""
+
+from typing import List, Optional
+
+import bpy
+
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 当前生效的保护（由外到内）
+_active_guards: List['ContextGuard'] = []
+
+
+def is_alive(obj) -> bool:
+    """对象引用是否仍然有效（已删除的对象访问属性时抛出ReferenceError）"""
+    if obj is None:
+        return False
+    try:
+        return bpy.data.objects.get(obj.name) == obj
+    except ReferenceError:
+        return False
+
+
+def get_active_object():
+    return bpy.context.view_layer.objects.active
+
+
+def set_active_object(obj) -> bool:
+    """
+    通过数据API设置活动对象
+
+    Returns:
+        是否实际改变了活动对象
+    """
+    view_layer_objects = bpy.context.view_layer.objects
+    if view_layer_objects.active == obj:
+        return False
+    view_layer_objects.active = obj
+    return True
+
+
+def ensure_mode(mode: str, obj=None) -> bool:
+    """
+    确保对象处于指定模式，已经符合时不调用运算符
+
+    Args:
+        mode: 'OBJECT'、'POSE' 或 'EDIT'
+        obj: 目标对象，None表示当前活动对象（切换模式的对象必须是活动对象）
+
+    Returns:
+        是否实际切换了模式
+    """
+    if obj is None:
+        obj = get_active_object()
+    elif obj != get_active_object():
+        set_active_object(obj)
+
+    if obj is None or obj.mode == mode:
+        return False
+
+    logger.debug("🔁 模式切换: %s %s -> %s", obj.name, obj.mode, mode)
+    bpy.ops.object.mode_set(mode=mode)
+    return True
+
+
+def restore_selection(selected_objects) -> int:
+    """
+    恢复选择状态：只对状态与期望不同的对象调用 select_set，跳过已删除的对象
+
+    Returns:
+        改变了选择状态的对象数量
+    """
+    wanted = {obj for obj in selected_objects if is_alive(obj)}
+    changed = 0
+    for obj in bpy.context.selected_objects:
+        if obj not in wanted:
+            obj.select_set(False)
+            changed += 1
+    for obj in wanted:
+        try:
+            if not obj.select_get():
+                obj.select_set(True)
+                changed += 1
+        except RuntimeError:
+            # 对象不在当前视图层中
+            pass
+    return changed
+
+
+class ContextGuard:
+    """
+    活动对象/选择/模式保护（上下文管理器）
+
+    最外层保护在进入时保存活动对象、选择状态和活动对象的模式，退出时恢复；
+    内层保护只记录并撤销自己切换的活动对象和模式。
+    """
+
+    def __init__(self, active=None, mode: Optional[str] = None, leave_active=None):
+        """
+        Args:
+            active: 进入时设为活动对象的对象（None表示保持当前活动对象）
+            mode: 进入时活动对象需要的模式（None表示不检查）
+            leave_active: 退出时设为活动对象的对象（如Rigify正在生成的rig），优先于恢复原活动对象
+        """
+        self.active = active
+        self.mode = mode
+        self.leave_active = leave_active
+
+        self.outermost = False
+        self._saved_active = None
+        self._saved_mode = None
+        self._saved_selection = None
+        self._changed_active = False
+        self._mode_object = None
+        self._mode_before = None
+
+    @staticmethod
+    def depth() -> int:
+        """当前嵌套深度"""
+        return len(_active_guards)
+
+    def __enter__(self):
+        self.outermost = not _active_guards
+        self._saved_active = get_active_object()
+        self._saved_mode = self._saved_active.mode if self._saved_active else None
+        if self.outermost:
+            self._saved_selection = list(bpy.context.selected_objects)
+        _active_guards.append(self)
+
+        try:
+            if self.active is not None:
+                self._changed_active = set_active_object(self.active)
+            if self.mode is not None:
+                # 记下被切换模式的对象及其原始模式，退出时恢复
+                target = get_active_object()
+                before = target.mode if target else None
+                if ensure_mode(self.mode, target):
+                    self._mode_object = target
+                    self._mode_before = before
+        except Exception:
+            _active_guards.remove(self)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self in _active_guards:
+            _active_guards.remove(self)
+        try:
+            self._restore()
+        except Exception as e:
+            logger.warning("⚠ 恢复上下文失败: %s", e)
+            # 至少保证Rigify期望的活动对象
+            if is_alive(self.leave_active):
+                bpy.context.view_layer.objects.active = self.leave_active
+        return False
+
+    def _restore(self):
+        # 先在切换过的对象上恢复模式（模式切换需要该对象是活动对象）
+        if is_alive(self._mode_object):
+            ensure_mode(self._mode_before, self._mode_object)
+
+        if self.outermost:
+            restore_selection(self._saved_selection or [])
+
+        # 活动对象：leave_active 优先，其次恢复进入时的活动对象
+        if is_alive(self.leave_active):
+            set_active_object(self.leave_active)
+            self.leave_active.select_set(True)
+        elif (self.outermost or self._changed_active) and is_alive(self._saved_active):
+            # 原活动对象已被删除时保留受保护代码设置的活动对象
+            set_active_object(self._saved_active)
+
+        if self.outermost and is_alive(self._saved_active) and self._saved_mode:
+            saved_object = self._saved_active
+            if get_active_object() == saved_object and saved_object.mode != self._saved_mode:
+                ensure_mode(self._saved_mode, saved_object)
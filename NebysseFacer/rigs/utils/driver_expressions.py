@@ -0,0 +1,502 @@
+"""
+驱动器表达式分析 - 让面部驱动器保持在Blender简单表达式快速路径上
+
+SCRIPTED 驱动器的表达式只要落在Blender的简单表达式子集内，就由内置求值器直接计算；
+子集之外的表达式每帧都要走完整的Python求值，多角色镜头中会严重拖慢播放。
+
+分析器把每个驱动器归为三类：
+- TYPED  : 可以改为 SUM / AVERAGE / MIN / MAX 驱动器类型（完全不求值表达式）
+- SIMPLE : 表达式在简单表达式子集内（可能经过改写）
+- PYTHON : 仍需Python求值，附带原因
+
+常见写法的改写（语义保持不变）：
+- math.sin(x) / np.clip(...) 等模块前缀     -> sin(x) / clamp(...)
+- a ** b / a // b                           -> pow(a, b) / floor(a / b)
+- min(max(x, 0), 1) / max(min(x, 1), 0)     -> clamp(x, 0, 1)（常量上下限且下限不大于上限）
+- a + (b - a) * t / a * (1 - t) + b * t     -> lerp(a, b, t)
+- min(a, min(b, c)) 等嵌套链                 -> min(a, b, c)
+- var / a + b + c / (a + b) / 2 / min(a, b) -> AVERAGE / SUM / AVERAGE / MIN 驱动器类型
+  （要求每个变量恰好使用一次，且没有其他变量）
+
+模板快照编译时和生成时都会运行分析；生成中仍需Python求值的驱动器记入报告，
+模板会话释放时统一输出。纯Python实现，不依赖bpy。
+"""
+
+import ast
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 分析结果类型
+TYPED = 'TYPED'
+SIMPLE = 'SIMPLE'
+PYTHON = 'PYTHON'
+
+# 简单表达式支持的函数 -> 允许的参数个数（None表示任意个，至少一个）
+SIMPLE_FUNCTIONS = {
+    'radians': (1,), 'degrees': (1,),
+    'abs': (1,), 'fabs': (1,), 'floor': (1,), 'ceil': (1,), 'trunc': (1,), 'round': (1,), 'int': (1,),
+    'sin': (1,), 'cos': (1,), 'tan': (1,), 'asin': (1,), 'acos': (1,), 'atan': (1,), 'atan2': (2,),
+    'exp': (1,), 'log': (1, 2), 'sqrt': (1,), 'pow': (2,), 'fmod': (2,),
+    'min': None, 'max': None,
+    'clamp': (1, 3), 'lerp': (3,), 'inverse_lerp': (3,), 'smoothstep': (3,),
+}
+
+# 简单表达式中除驱动器变量外可以使用的名称
+SIMPLE_NAMES = frozenset({'frame', 'pi', 'True', 'False'})
+
+# 可以去掉前缀的模块（函数在驱动器命名空间中同名可用）
+MODULE_PREFIXES = frozenset({'math', 'numpy', 'np'})
+
+# 模块函数 -> 简单表达式函数
+MODULE_FUNCTION_ALIASES = {'clip': 'clamp', 'power': 'pow', 'arctan2': 'atan2', 'arcsin': 'asin',
+                           'arccos': 'acos', 'arctan': 'atan', 'absolute': 'abs'}
+
+# 可以改写为驱动器类型的函数
+TYPED_FUNCTIONS = {'min': 'MIN', 'max': 'MAX'}
+
+_SIMPLE_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_SIMPLE_UNARYOPS = (ast.UAdd, ast.USub, ast.Not)
+_SIMPLE_CMPOPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+
+class DriverAnalysis:
+    """一个驱动器的分析结果（不可变记录）"""
+
+    __slots__ = ('status', 'driver_type', 'expression', 'rewritten', 'reason')
+
+    def __init__(self, status: str, driver_type: str, expression: str,
+                 rewritten: bool = False, reason: Optional[str] = None):
+        self.status = status
+        self.driver_type = driver_type
+        self.expression = expression
+        # 驱动器类型或表达式是否与原驱动器不同
+        self.rewritten = rewritten
+        # PYTHON 时为不能走快速路径的原因
+        self.reason = reason
+
+    @property
+    def needs_python(self) -> bool:
+        return self.status == PYTHON
+
+    def __repr__(self):
+        return (f"DriverAnalysis({self.status}, {self.driver_type}, {self.expression!r}, "
+                f"rewritten={self.rewritten}, reason={self.reason!r})")
+
+
+# ==================== 改写 ====================
+
+def _number(node) -> Optional[float]:
+    """数值常量（含负号）的值，不是数值常量时返回None"""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _number(node.operand)
+        return None if value is None else -value
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    return None
+
+
+def _same(a, b) -> bool:
+    return ast.dump(a) == ast.dump(b)
+
+
+def _call(name: str, args: List) -> ast.Call:
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+
+def _call_name(node) -> Optional[str]:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        return node.func.id
+    return None
+
+
+def _split_bound(args: List) -> Tuple[Any, Optional[float]]:
+    """两个参数中一个是数值常量时返回 (另一个参数, 常量值)"""
+    if len(args) == 2:
+        for value_node, bound_node in ((args[0], args[1]), (args[1], args[0])):
+            bound = _number(bound_node)
+            if bound is not None and _number(value_node) is None:
+                return value_node, bound
+    return None, None
+
+
+def _as_clamp(node) -> Optional[ast.Call]:
+    """min(max(x, lo), hi) / max(min(x, hi), lo) -> clamp(x, lo, hi)"""
+    outer = _call_name(node)
+    if outer not in ('min', 'max'):
+        return None
+    inner_call, outer_bound = _split_bound(node.args)
+    inner = _call_name(inner_call)
+    if inner is None or {outer, inner} != {'min', 'max'}:
+        return None
+    value, inner_bound = _split_bound(inner_call.args)
+    if value is None:
+        return None
+    low, high = (inner_bound, outer_bound) if outer == 'min' else (outer_bound, inner_bound)
+    # 下限大于上限时两种写法结果不同，保持原样
+    if low > high:
+        return None
+    return _call('clamp', [value, ast.Constant(low), ast.Constant(high)])
+
+
+def _as_lerp(node) -> Optional[ast.Call]:
+    """a + (b - a) * t / a + t * (b - a) / a * (1 - t) + b * t -> lerp(a, b, t)"""
+    if not (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add)):
+        return None
+
+    for start, product in ((node.left, node.right), (node.right, node.left)):
+        if not (isinstance(product, ast.BinOp) and isinstance(product.op, ast.Mult)):
+            continue
+        for delta, factor in ((product.left, product.right), (product.right, product.left)):
+            if (isinstance(delta, ast.BinOp) and isinstance(delta.op, ast.Sub)
+                    and _same(delta.right, start)):
+                return _call('lerp', [start, delta.left, factor])
+
+    # a * (1 - t) + b * t
+    left, right = node.left, node.right
+    if not all(isinstance(side, ast.BinOp) and isinstance(side.op, ast.Mult) for side in (left, right)):
+        return None
+    for a, inverse in ((left.left, left.right), (left.right, left.left)):
+        if not (isinstance(inverse, ast.BinOp) and isinstance(inverse.op, ast.Sub)
+                and _number(inverse.left) == 1):
+            continue
+        factor = inverse.right
+        for b, other in ((right.left, right.right), (right.right, right.left)):
+            if _same(other, factor):
+                return _call('lerp', [a, b, factor])
+    return None
+
+
+class _SimplifyTransformer(ast.NodeTransformer):
+    """把常见的Python写法改写为简单表达式写法"""
+
+    def visit_Attribute(self, node):
+        self.generic_visit(node)
+        # math.pi -> pi
+        if (isinstance(node.value, ast.Name) and node.value.id in MODULE_PREFIXES
+                and node.attr == 'pi'):
+            return ast.copy_location(ast.Name(id='pi', ctx=ast.Load()), node)
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+
+        # math.sin(x) -> sin(x)，np.clip(x, lo, hi) -> clamp(x, lo, hi)
+        func = node.func
+        if (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                and func.value.id in MODULE_PREFIXES and not node.keywords):
+            name = MODULE_FUNCTION_ALIASES.get(func.attr, func.attr)
+            if name in SIMPLE_FUNCTIONS:
+                if name == 'clamp' and len(node.args) == 3:
+                    # clip 的上下限不一定满足 lo <= hi，改写为等价的 min/max 链再尝试 clamp
+                    value, low, high = node.args
+                    node = _call('min', [_call('max', [value, low]), high])
+                else:
+                    node = _call(name, node.args)
+
+        name = _call_name(node)
+        if name in ('min', 'max'):
+            clamp = _as_clamp(node)
+            if clamp is not None:
+                return clamp
+            # min(a, min(b, c)) -> min(a, b, c)
+            args = []
+            for arg in node.args:
+                if _call_name(arg) == name and arg.args:
+                    args.extend(arg.args)
+                else:
+                    args.append(arg)
+            node = _call(name, args)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return _call('pow', [node.left, node.right])
+        if isinstance(node.op, ast.FloorDiv):
+            return _call('floor', [ast.BinOp(left=node.left, op=ast.Div(), right=node.right)])
+        lerp = _as_lerp(node)
+        if lerp is not None:
+            return lerp
+        return node
+
+
+# ==================== 检查 ====================
+
+def _unsupported(node, variable_names: frozenset) -> Optional[str]:
+    """返回表达式中第一个不在简单表达式子集内的结构，全部支持时返回None"""
+    for child in ast.walk(node):
+        if isinstance(child, (ast.Expression, ast.Load, ast.And, ast.Or)
+                      + _SIMPLE_BINOPS + _SIMPLE_UNARYOPS + _SIMPLE_CMPOPS):
+            continue
+        if isinstance(child, ast.BinOp):
+            if not isinstance(child.op, _SIMPLE_BINOPS):
+                return f"运算符 {type(child.op).__name__}"
+        elif isinstance(child, ast.UnaryOp):
+            if not isinstance(child.op, _SIMPLE_UNARYOPS):
+                return f"运算符 {type(child.op).__name__}"
+        elif isinstance(child, ast.Compare):
+            unsupported = [op for op in child.ops if not isinstance(op, _SIMPLE_CMPOPS)]
+            if unsupported:
+                return f"比较 {type(unsupported[0]).__name__}"
+        elif isinstance(child, (ast.BoolOp, ast.IfExp)):
+            continue
+        elif isinstance(child, ast.Constant):
+            if type(child.value) not in (int, float, bool):
+                return f"常量 {child.value!r}"
+        elif isinstance(child, ast.Name):
+            if child.id not in variable_names and child.id not in SIMPLE_NAMES and child.id not in SIMPLE_FUNCTIONS:
+                return f"名称 {child.id}"
+        elif isinstance(child, ast.Call):
+            name = _call_name(child)
+            if name is None or any(isinstance(arg, ast.Starred) for arg in child.args):
+                return "函数调用 " + ast.unparse(child.func)
+            if name not in SIMPLE_FUNCTIONS:
+                return f"函数 {name}"
+            arity = SIMPLE_FUNCTIONS[name]
+            if (arity is None and not child.args) or (arity is not None and len(child.args) not in arity):
+                return f"函数 {name} 的参数个数 {len(child.args)}"
+        elif isinstance(child, ast.Attribute):
+            return "属性访问 " + ast.unparse(child)
+        elif isinstance(child, ast.Subscript):
+            return "下标 " + ast.unparse(child)
+        else:
+            return type(child).__name__
+    return None
+
+
+def _typed_driver(node, variable_names: frozenset) -> Optional[str]:
+    """表达式恰好使用每个变量一次并且是求和/平均/最小/最大时返回对应的驱动器类型"""
+    if not variable_names:
+        return None
+
+    def names_of(args) -> Optional[List[str]]:
+        names = [arg.id for arg in args if isinstance(arg, ast.Name)]
+        return names if len(names) == len(args) else None
+
+    def covers(names) -> bool:
+        return names is not None and len(names) == len(variable_names) and set(names) == variable_names
+
+    def sum_terms(expr) -> Optional[List]:
+        if isinstance(expr, ast.BinOp) and isinstance(expr.op, ast.Add):
+            left, right = sum_terms(expr.left), sum_terms(expr.right)
+            return None if left is None or right is None else left + right
+        return [expr] if isinstance(expr, ast.Name) else None
+
+    body = node.body
+    if isinstance(body, ast.Name):
+        return 'AVERAGE' if covers([body.id]) else None
+
+    name = _call_name(body)
+    if name in TYPED_FUNCTIONS:
+        return TYPED_FUNCTIONS[name] if covers(names_of(body.args)) else None
+
+    terms = sum_terms(body)
+    if terms is not None:
+        return 'SUM' if covers(names_of(terms)) else None
+
+    if isinstance(body, ast.BinOp) and isinstance(body.op, ast.Div):
+        terms = sum_terms(body.left)
+        if terms is not None and _number(body.right) == len(variable_names) and covers(names_of(terms)):
+            return 'AVERAGE'
+    return None
+
+
+@lru_cache(maxsize=1024)
+def analyze_expression(expression: str, variable_names: Tuple[str, ...] = (),
+                       driver_type: str = 'SCRIPTED', use_self: bool = False) -> DriverAnalysis:
+    """
+    分析驱动器表达式并给出快速路径形式
+
+    Args:
+        expression: 驱动器表达式
+        variable_names: 驱动器变量名称
+        driver_type: 当前驱动器类型，非 SCRIPTED 时不需要求值表达式
+        use_self: 驱动器是否启用了 use_self（启用时总是Python求值）
+
+    Returns:
+        DriverAnalysis
+    """
+    if driver_type != 'SCRIPTED':
+        return DriverAnalysis(TYPED, driver_type, expression)
+    if use_self:
+        return DriverAnalysis(PYTHON, driver_type, expression, reason="启用了 use_self")
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        return DriverAnalysis(PYTHON, driver_type, expression, reason="无法解析的表达式")
+
+    names = frozenset(variable_names)
+    simplified = ast.fix_missing_locations(_SimplifyTransformer().visit(tree))
+    rewritten = not _same(simplified, ast.parse(expression.strip(), mode='eval'))
+    new_expression = ast.unparse(simplified) if rewritten else expression
+
+    reason = _unsupported(simplified, names)
+    if reason is not None:
+        # 改写后仍需Python求值时保留原表达式，不做无意义的修改
+        return DriverAnalysis(PYTHON, driver_type, expression, reason=reason)
+
+    typed = _typed_driver(simplified, names)
+    if typed is not None:
+        return DriverAnalysis(TYPED, typed, expression, rewritten=True)
+
+    return DriverAnalysis(SIMPLE, driver_type, new_expression, rewritten=rewritten)
+
+
+def _variable_names(variables: Iterable) -> Tuple[str, ...]:
+    return tuple(var['name'] if isinstance(var, dict) else var.name for var in variables)
+
+
+def optimize_driver_data(driver_data: Dict[str, Any]) -> DriverAnalysis:
+    """
+    分析并就地改写快照中的驱动器数据（driver_type / expression）
+
+    改写时原表达式保存在 'source_expression' 中；重复调用结果不变。
+    """
+    analysis = analyze_expression(
+        driver_data.get('expression', ''),
+        _variable_names(driver_data.get('variables', [])),
+        driver_data.get('driver_type', 'SCRIPTED'),
+        driver_data.get('use_self', False),
+    )
+    if analysis.rewritten:
+        driver_data.setdefault('source_expression', driver_data.get('expression', ''))
+        driver_data['driver_type'] = analysis.driver_type
+        driver_data['expression'] = analysis.expression
+    return analysis
+
+
+def optimize_driver(driver) -> DriverAnalysis:
+    """
+    分析并就地改写一个驱动器（fcurve.driver）
+
+    Returns:
+        DriverAnalysis
+    """
+    analysis = analyze_expression(
+        driver.expression,
+        _variable_names(driver.variables),
+        driver.type,
+        getattr(driver, 'use_self', False),
+    )
+    if analysis.rewritten:
+        if driver.type != analysis.driver_type:
+            driver.type = analysis.driver_type
+        if driver.expression != analysis.expression:
+            driver.expression = analysis.expression
+    return analysis
+
+
+# ==================== 报告 ====================
+
+# 生成中分析过的驱动器：{结果类型 / 'rewritten': 数量}，以及仍需Python求值的 [(标签, 表达式, 原因), ...]
+_counts: Dict[str, int] = {}
+_python_drivers: List[Tuple[str, str, str]] = []
+
+
+def record_analysis(label: str, analysis: DriverAnalysis):
+    """记录一次生成时的分析结果（label 一般为 ID名称 + 数据路径）"""
+    _counts[analysis.status] = _counts.get(analysis.status, 0) + 1
+    if analysis.rewritten:
+        _counts['rewritten'] = _counts.get('rewritten', 0) + 1
+    if analysis.needs_python:
+        _python_drivers.append((label, analysis.expression, analysis.reason))
+
+
+def python_drivers() -> List[Tuple[str, str, str]]:
+    """本次生成中仍需Python求值的驱动器"""
+    return list(_python_drivers)
+
+
+def clear_expression_report():
+    _counts.clear()
+    _python_drivers.clear()
+
+
+def log_python_drivers(entries: List[Tuple[str, str, str]], limit: int = 20):
+    for label, expression, reason in entries[:limit]:
+        logger.warning("  🐍 %s: '%s'（%s）", label, expression, reason)
+    if len(entries) > limit:
+        logger.warning("  ... 另有 %s 个", len(entries) - limit)
+
+
+def log_expression_report(clear: bool = True) -> Dict[str, Any]:
+    """
+    输出生成中的驱动器表达式分析报告
+
+    Returns:
+        {'TYPED', 'SIMPLE', 'PYTHON', 'rewritten', 'python_drivers'}
+    """
+    report: Dict[str, Any] = {key: _counts.get(key, 0) for key in (TYPED, SIMPLE, PYTHON, 'rewritten')}
+    report['python_drivers'] = python_drivers()
+
+    if report[TYPED] + report[SIMPLE] + report[PYTHON]:
+        logger.info("🧮 驱动器表达式: 驱动器类型 %s 个, 简单表达式 %s 个, Python求值 %s 个（改写 %s 个）",
+                    report[TYPED], report[SIMPLE], report[PYTHON], report['rewritten'])
+        if report['python_drivers']:
+            logger.warning("⚠ 以下驱动器仍需Python求值（每帧都会调用Python）:")
+            log_python_drivers(report['python_drivers'])
+    if clear:
+        clear_expression_report()
+    return report
+
+
+def analyze_snapshot_drivers(bones: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    分析（并就地改写）快照中全部骨骼的驱动器，模板编译时使用
+
+    Returns:
+        {'TYPED', 'SIMPLE', 'PYTHON', 'rewritten', 'python_drivers'}
+    """
+    report: Dict[str, Any] = {TYPED: 0, SIMPLE: 0, PYTHON: 0, 'rewritten': 0, 'python_drivers': []}
+    for bone_info in bones.values():
+        for driver_data in bone_info.get('drivers', []):
+            analysis = optimize_driver_data(driver_data)
+            report[analysis.status] += 1
+            report['rewritten'] += analysis.rewritten
+            if analysis.needs_python:
+                report['python_drivers'].append(
+                    (driver_data.get('data_path', ''), analysis.expression, analysis.reason))
+    return report
+
+
+def analyze_id_drivers(datablocks: Iterable, rewrite: bool = False) -> Dict[str, Any]:
+    """
+    分析（可选改写）一组ID上的全部驱动器，供操作器 nebysse.analyze_driver_expressions 使用
+
+    Args:
+        datablocks: 带动画数据的ID
+        rewrite: 是否把可以改写的驱动器改为简单表达式或驱动器类型
+
+    Returns:
+        {'TYPED', 'SIMPLE', 'PYTHON', 'rewritable', 'rewritten', 'python_drivers'}
+    """
+    report: Dict[str, Any] = {TYPED: 0, SIMPLE: 0, PYTHON: 0, 'rewritable': 0, 'rewritten': 0,
+                              'python_drivers': []}
+    for datablock in datablocks:
+        animation_data = getattr(datablock, 'animation_data', None)
+        if not animation_data:
+            continue
+        for fcurve in animation_data.drivers:
+            driver = fcurve.driver
+            if rewrite:
+                analysis = optimize_driver(driver)
+                report['rewritten'] += analysis.rewritten
+            else:
+                analysis = analyze_expression(driver.expression, _variable_names(driver.variables),
+                                              driver.type, getattr(driver, 'use_self', False))
+            report[analysis.status] += 1
+            report['rewritable'] += analysis.rewritten
+            if analysis.needs_python:
+                report['python_drivers'].append(
+                    (f"{datablock.name} {fcurve.data_path}[{fcurve.array_index}]",
+                     analysis.expression, analysis.reason))
+
+    logger.info("🧮 驱动器表达式分析: 驱动器类型 %s 个, 简单表达式 %s 个, Python求值 %s 个, 可改写 %s 个, 已改写 %s 个",
+                report[TYPED], report[SIMPLE], report[PYTHON], report['rewritable'], report['rewritten'])
+    return report
@@ -0,0 +1,232 @@
+"""
+驱动器数据路径解析 - 结构化的 data_path 记录
+
+将驱动器的 data_path 一次性解析为 DriverPath 记录（骨骼、约束、属性名称、索引），
+并支持以新的骨骼名称快速渲染回字符串。模板加载器、face-root 模板应用以及
+Rig.copy_bone_drivers / copy_driver 共用此模块，不再各自使用正则或字符串启发式分类。
+
+支持的路径形式：
+- pose.bones["骨骼"].location                      -> TRANSFORM
+- pose.bones["骨骼"]["属性"]                        -> CUSTOM_PROPERTY
+- pose.bones["骨骼"].constraints["约束"].influence  -> CONSTRAINT_PROPERTY
+- ["属性"] / location 等不属于骨骼的路径             -> 同上分类，bone 为 None
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+# 路径类型
+TRANSFORM = 'TRANSFORM'
+CUSTOM_PROPERTY = 'CUSTOM_PROPERTY'
+CONSTRAINT_PROPERTY = 'CONSTRAINT_PROPERTY'
+OTHER = 'OTHER'
+
+_POSE_BONES_PREFIX = 'pose.bones['
+_CONSTRAINTS_PREFIX = 'constraints['
+
+
+def escape_name(name: str) -> str:
+    """转义名称，使其可以放入 data_path 的双引号中"""
+    return name.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _read_quoted(path: str, pos: int):
+    """
+    从 path[pos] 处读取一个带引号的名称（支持单/双引号和反斜杠转义）
+
+    Returns:
+        (名称, 结束引号之后的位置)，格式错误时返回 (None, pos)
+    """
+    if pos >= len(path) or path[pos] not in '"\'':
+        return None, pos
+
+    quote = path[pos]
+    chars = []
+    i = pos + 1
+    while i < len(path):
+        char = path[i]
+        if char == '\\' and i + 1 < len(path):
+            chars.append(path[i + 1])
+            i += 2
+            continue
+        if char == quote:
+            return ''.join(chars), i + 1
+        chars.append(char)
+        i += 1
+
+    return None, pos
+
+
+def _read_subscript(path: str, pos: int):
+    """读取 ["名称"] 形式的下标，返回 (名称, 结束位置)"""
+    if not path.startswith('[', pos):
+        return None, pos
+    name, end = _read_quoted(path, pos + 1)
+    if name is None or not path.startswith(']', end):
+        return None, pos
+    return name, end + 1
+
+
+class DriverPath:
+    """解析后的驱动器数据路径（不可变记录）"""
+
+    __slots__ = ('bone', 'constraint', 'property', 'index', 'kind', 'data_path')
+
+    # property 字段：TRANSFORM/CONSTRAINT_PROPERTY 为RNA属性名，CUSTOM_PROPERTY 为自定义属性名，
+    # OTHER 为去掉骨骼前缀后的原始剩余路径
+
+    def __init__(self, bone: Optional[str], constraint: Optional[str], property: Optional[str],
+                 index: int, kind: str, data_path: str):
+        self.bone = bone
+        self.constraint = constraint
+        self.property = property
+        self.index = index
+        self.kind = kind
+        self.data_path = data_path
+
+    def __repr__(self):
+        return (f"DriverPath(kind={self.kind!r}, bone={self.bone!r}, constraint={self.constraint!r}, "
+                f"property={self.property!r}, index={self.index})")
+
+    def __eq__(self, other):
+        return isinstance(other, DriverPath) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def key(self):
+        """用于比较和建立索引的元组键"""
+        return (self.kind, self.bone, self.constraint, self.property, self.index)
+
+    @property
+    def is_custom_property(self) -> bool:
+        return self.kind == CUSTOM_PROPERTY
+
+    @property
+    def is_constraint_property(self) -> bool:
+        return self.kind == CONSTRAINT_PROPERTY
+
+    def bone_relative_path(self) -> str:
+        """相对于姿态骨骼的路径（用于 pose_bone.driver_add）"""
+        if self.kind == CUSTOM_PROPERTY:
+            return f'["{escape_name(self.property)}"]'
+        if self.kind == CONSTRAINT_PROPERTY:
+            return f'constraints["{escape_name(self.constraint)}"].{self.property}'
+        # TRANSFORM 为RNA属性名；无法结构化的路径（OTHER）保存去掉骨骼前缀后的原始剩余部分
+        return self.property
+
+    def render(self, bone: str = None) -> str:
+        """
+        渲染回完整的 data_path
+
+        Args:
+            bone: 替换后的骨骼名称，为None时使用原骨骼名称
+        """
+        bone = bone if bone is not None else self.bone
+        if bone is None:
+            return self.bone_relative_path()
+
+        relative = self.bone_relative_path()
+        separator = '' if relative.startswith('[') else '.'
+        return f'pose.bones["{escape_name(bone)}"]{separator}{relative}'
+
+    def remap(self, bone_mapping: Dict[str, str] = None, default_bone: str = None) -> 'DriverPath':
+        """
+        按骨骼映射返回新的记录
+
+        Args:
+            bone_mapping: {源骨骼名称: 目标骨骼名称}
+            default_bone: 映射中没有源骨骼时使用的骨骼名称，为None时保持原名
+        """
+        if self.bone is None:
+            return self
+
+        new_bone = (bone_mapping or {}).get(self.bone, default_bone if default_bone is not None else self.bone)
+        if new_bone == self.bone:
+            return self
+
+        remapped = DriverPath(new_bone, self.constraint, self.property, self.index, self.kind, '')
+        remapped.data_path = remapped.render()
+        return remapped
+
+    def to_dict(self) -> Dict:
+        """转换为纯Python字典（用于快照和日志）"""
+        return {
+            'kind': self.kind,
+            'bone': self.bone,
+            'constraint': self.constraint,
+            'property': self.property,
+            'index': self.index,
+        }
+
+
+# 容量按大型模板（1000骨骼约5000条不同路径）留足余量：容量小于路径数量时，
+# 按顺序遍历全部驱动器（build_driver_index）会让LRU每次都淘汰即将用到的路径。
+# 缓存只在一次生成内有意义，TemplateSession 释放时调用 parse_data_path.cache_clear()
+@lru_cache(maxsize=16384)
+def parse_data_path(data_path: str, index: int = 0) -> DriverPath:
+    """
+    将驱动器 data_path 解析为 DriverPath（结果按路径缓存）
+
+    Args:
+        data_path: fcurve.data_path
+        index: fcurve.array_index
+    """
+    bone = None
+    rest_start = 0
+
+    if data_path.startswith(_POSE_BONES_PREFIX):
+        name, end = _read_quoted(data_path, len(_POSE_BONES_PREFIX))
+        if name is not None and data_path.startswith(']', end):
+            bone = name
+            rest_start = end + 1
+
+    rest = data_path[rest_start:]
+    if bone is not None and rest.startswith('.'):
+        rest = rest[1:]
+
+    # ["属性"]
+    if rest.startswith('['):
+        name, end = _read_subscript(rest, 0)
+        if name is not None and end == len(rest):
+            return DriverPath(bone, None, name, index, CUSTOM_PROPERTY, data_path)
+        return DriverPath(bone, None, rest, index, OTHER, data_path)
+
+    # constraints["约束"].属性
+    if rest.startswith(_CONSTRAINTS_PREFIX):
+        name, end = _read_subscript(rest, len('constraints'))
+        if name is not None and rest.startswith('.', end) and rest[end + 1:].isidentifier():
+            return DriverPath(bone, name, rest[end + 1:], index, CONSTRAINT_PROPERTY, data_path)
+        return DriverPath(bone, None, rest, index, OTHER, data_path)
+
+    # location / rotation_euler 等RNA属性
+    if rest.isidentifier():
+        return DriverPath(bone, None, rest, index, TRANSFORM, data_path)
+
+    return DriverPath(bone, None, rest, index, OTHER, data_path)
+
+
+def add_driver(owner, data_path: str, index: int = -1):
+    """
+    在 owner 上创建驱动器：数组属性只创建指定通道，标量属性忽略索引
+
+    Args:
+        owner: 拥有属性的对象（ID或姿态骨骼）
+        data_path: 相对 owner 的路径
+        index: 数组通道索引
+
+    Returns:
+        新建的驱动器FCurve
+    """
+    if index >= 0:
+        try:
+            return owner.driver_add(data_path, index)
+        except TypeError:
+            # 标量属性不接受索引
+            pass
+
+    fcurve = owner.driver_add(data_path)
+    if isinstance(fcurve, list):
+        fcurve = fcurve[max(index, 0)]
+    return fcurve
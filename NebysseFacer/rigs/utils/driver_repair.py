@@ -0,0 +1,136 @@
+"""
+驱动器修复 - 只检查加载器创建或重定向过的驱动器
+
+加载器每配置一个驱动器（创建或把变量目标重定向到生成的rig），就把
+(所属ID, 数据路径, 数组索引) 记入账本。生成结束后的修复只遍历账本涉及的ID，
+并只对账本中的FCurve调用 path_resolve，删除路径无法解析的驱动器。
+
+整个文件的审计（遍历 bpy.data 中所有ID的全部驱动器）仍然保留为
+audit_broken_drivers，由美术通过操作器 nebysse.audit_broken_drivers 显式执行。
+"""
+
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import bpy
+
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# {session_uid: (ID, {(数据路径, 数组索引), ...})}
+_recorded: Dict[int, Tuple[Any, Set[Tuple[str, int]]]] = {}
+
+
+def record_driver(fcurve, owner=None):
+    """
+    记录加载器创建或重定向的驱动器
+
+    Args:
+        fcurve: 驱动器FCurve
+        owner: 驱动器所属的ID，默认为 fcurve.id_data
+    """
+    if owner is None:
+        owner = fcurve.id_data
+    entry = _recorded.get(owner.session_uid)
+    if entry is None or entry[0] != owner:
+        entry = _recorded[owner.session_uid] = (owner, set())
+    entry[1].add((fcurve.data_path, fcurve.array_index))
+
+
+def recorded_driver_count() -> int:
+    """账本中的驱动器数量"""
+    return sum(len(keys) for _, keys in _recorded.values())
+
+
+def clear_driver_ledger():
+    _recorded.clear()
+
+
+def _is_broken(owner, fcurve) -> bool:
+    try:
+        owner.path_resolve(fcurve.data_path)
+    except ValueError:
+        return True
+    return False
+
+
+def _remove_drivers(owner, fcurves) -> int:
+    drivers = owner.animation_data.drivers
+    for fcurve in fcurves:
+        logger.debug("  🗑️ 删除损坏的驱动器: %s %s[%s]", owner.name, fcurve.data_path, fcurve.array_index)
+        drivers.remove(fcurve)
+    return len(fcurves)
+
+
+def repair_recorded_drivers() -> int:
+    """
+    检查账本中的驱动器，删除数据路径无法解析的驱动器，然后清空账本
+
+    每个涉及的ID只遍历一次其驱动器列表，不访问其他ID。
+
+    Returns:
+        删除的驱动器数量
+    """
+    removed = 0
+    checked = 0
+    for session_uid, (owner, keys) in list(_recorded.items()):
+        try:
+            if owner.session_uid != session_uid:
+                continue
+            animation_data = owner.animation_data
+        except ReferenceError:
+            # ID已被删除，其驱动器随之消失
+            continue
+        if not animation_data:
+            continue
+
+        recorded = [fcurve for fcurve in animation_data.drivers
+                    if (fcurve.data_path, fcurve.array_index) in keys]
+        checked += len(recorded)
+        removed += _remove_drivers(owner, [fcurve for fcurve in recorded if _is_broken(owner, fcurve)])
+
+    _recorded.clear()
+    if removed:
+        logger.info("🧹 修复驱动器: 检查 %s 个，删除 %s 个损坏的驱动器", checked, removed)
+    else:
+        logger.info("✓ 驱动器检查完成: %s 个驱动器均有效", checked)
+    return removed
+
+
+def iter_animated_ids() -> Iterable:
+    """遍历 bpy.data 中所有带动画数据的ID（整个文件）"""
+    collections = [
+        getattr(bpy.data, name) for name in dir(bpy.data)
+        if isinstance(getattr(bpy.data, name, None), bpy.types.bpy_prop_collection)
+    ]
+    for collection in collections:
+        for datablock in collection:
+            if getattr(datablock, 'animation_data', None):
+                yield datablock
+
+
+def audit_broken_drivers(remove: bool = False) -> Dict[str, Any]:
+    """
+    审计整个文件的驱动器（遍历所有ID），只在显式请求时使用
+
+    Args:
+        remove: 是否删除损坏的驱动器
+
+    Returns:
+        {'checked_ids', 'checked_drivers', 'broken': [(ID名称, 数据路径, 数组索引), ...], 'removed'}
+    """
+    report = {'checked_ids': 0, 'checked_drivers': 0, 'broken': [], 'removed': 0}
+    for datablock in iter_animated_ids():
+        fcurves: List = list(datablock.animation_data.drivers)
+        report['checked_ids'] += 1
+        report['checked_drivers'] += len(fcurves)
+
+        broken = [fcurve for fcurve in fcurves if _is_broken(datablock, fcurve)]
+        report['broken'].extend((datablock.name, fcurve.data_path, fcurve.array_index) for fcurve in broken)
+        if remove and broken:
+            report['removed'] += _remove_drivers(datablock, broken)
+
+    logger.info("🔎 驱动器审计: %s 个ID, %s 个驱动器, %s 个损坏, 删除 %s 个",
+                report['checked_ids'], report['checked_drivers'], len(report['broken']), report['removed'])
+    return report
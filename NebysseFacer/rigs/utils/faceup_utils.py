@@ -12,6 +12,15 @@ import os
 import bpy
 from rigify.utils.bones import BoneDict
 from .blend_template_loader import BlendTemplateLoader, apply_template_to_rig
+from .context_guard import ContextGuard
+from .driver_expressions import optimize_driver_data, record_analysis
+from .driver_paths import parse_data_path
+from .driver_repair import record_driver, repair_recorded_drivers
+from .template_ownership import adopt_tagged_ids, remove_owned_ids
+from .template_registry import find_template_rig, get_registered_template_rigs
+from ...utils.log import get_logger, log_count
+
+logger = get_logger(__name__)
 
 
 # ================================
@@ -21,10 +30,16 @@ from .blend_template_loader import BlendTemplateLoader, apply_template_to_rig
 class TemplateManager:
     """模板管理器 - 处理所有模板相关功能"""
     
-    def __init__(self, rig_instance):
+    def __init__(self, rig_instance, template_session=None):
+        """
+        Args:
+            rig_instance: faceup rig实例
+            template_session: 生成级模板会话（见 template_session）；为None时自行加载和清理模板
+        """
         self.rig = rig_instance
         self.template_data_to_cleanup = None
-        self.blend_loader = None
+        self.template_session = template_session
+        self.blend_loader = template_session.loader if template_session else None
     
     def find_template_rig_object(self):
         """查找模板rig对象（增强版：支持主动加载）
@@ -32,90 +47,56 @@ class TemplateManager:
         Returns:
             模板rig对象，如果没找到返回None
         """
-        print("🔍 TemplateManager: 开始查找模板rig对象...")
-        
-        # 方法1: 查找场景中名称包含"template"或"Template"的armature对象
-        print("🔍 方法1：按名称查找模板rig...")
-        for obj in bpy.context.scene.objects:
-            if (obj.type == 'ARMATURE' and 
-                obj != self.rig.obj and
-                ('template' in obj.name.lower() or 'Template' in obj.name)):
-                print(f"✅ 找到模板rig（按名称）: {obj.name}")
-                return obj
-        
-        # 方法2: 精确查找特定的模板rig名称
-        print("🔍 方法2：精确名称匹配...")
-        target_names = [
-            "Nebysse_FaceUP_Tem.Rig",
-            "Nebysse_FaceUP_Tem",
-            "FaceUP_Tem.Rig", 
-            "FaceUP_Tem"
-        ]
-        
-        for target_name in target_names:
-            if target_name in bpy.data.objects:
-                obj = bpy.data.objects[target_name]
-                if obj.type == 'ARMATURE':
-                    print(f"✅ 找到模板rig（精确匹配）: {obj.name}")
-                    return obj
-        
-        # 方法3: 查找场景中其他包含NebOffset骨骼的armature对象
-        print("🔍 方法3：按NebOffset骨骼查找...")
-        for obj in bpy.context.scene.objects:
-            if (obj.type == 'ARMATURE' and 
-                obj != self.rig.obj):
-                # 检查是否包含NebOffset骨骼
-                neboffset_bones = [bone for bone in obj.pose.bones if bone.name.startswith('NebOffset-')]
-                if len(neboffset_bones) > 5:  # 至少有5个NebOffset骨骼才认为是模板
-                    print(f"✅ 找到模板rig（按NebOffset骨骼）: {obj.name} (包含{len(neboffset_bones)}个NebOffset骨骼)")
-                    return obj
-        
-        # 方法4: 从已有的blend_loader查找模板armature
-        print("🔍 方法4：从blend_loader查找...")
-        if hasattr(self, 'blend_loader') and self.blend_loader:
-            template_obj = self.blend_loader.get_template_armature()
-            if template_obj:
-                print(f"✅ 找到模板rig（从blend文件）: {template_obj.name}")
-                return template_obj
-        
-        # 方法5: 主动加载模板文件
-        print("🔍 方法5：主动加载模板文件...")
+        logger.info("🔍 TemplateManager: 开始查找模板rig对象...")
+        
+        # 生成过程中使用共享的模板会话（整个生成只打开一次模板文件）
+        if self.template_session is not None:
+            return self.template_session.get_template_rig()
+        
+        # 方法1: 查询模板rig注册表（加载器追加的模板rig都会登记）
+        template_obj = find_template_rig(exclude=self.rig.obj)
+        if template_obj:
+            logger.info("✅ 找到模板rig（注册表）: %s", template_obj.name)
+            return template_obj
+        
+        # 方法2: 主动加载模板文件
+        logger.info("🔍 方法2：主动加载模板文件...")
         try:
             # 如果还没有blend_loader，创建一个
             if not hasattr(self, 'blend_loader') or not self.blend_loader:
-                print("🔧 创建新的blend_loader...")
+                logger.info("🔧 创建新的blend_loader...")
                 self.blend_loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
             
             # 尝试加载模板数据
-            print("📂 加载模板数据...")
+            logger.info("📂 加载模板数据...")
             template_data = self.blend_loader.load_template_data()
             
             if template_data and 'armature' in template_data:
                 template_armature = template_data['armature']
-                print(f"✅ 找到模板rig（主动加载）: {template_armature.name}")
+                logger.info("✅ 找到模板rig（主动加载）: %s", template_armature.name)
                 
                 # 确保模板对象在场景中可见
                 if template_armature.name not in bpy.context.scene.collection.objects:
                     try:
                         bpy.context.scene.collection.objects.link(template_armature)
-                        print(f"🔗 将模板rig链接到场景: {template_armature.name}")
+                        logger.info("🔗 将模板rig链接到场景: %s", template_armature.name)
                     except Exception as link_error:
-                        print(f"⚠ 链接模板rig到场景失败: {link_error}")
+                        logger.warning("⚠ 链接模板rig到场景失败: %s", link_error)
                 
                 return template_armature
             else:
-                print("⚠ 模板数据加载失败或没有armature对象")
+                logger.warning("⚠ 模板数据加载失败或没有armature对象")
                 
         except Exception as e:
-            print(f"⚠ 主动加载模板文件失败: {e}")
+            logger.warning("⚠ 主动加载模板文件失败: %s", e)
             import traceback
             traceback.print_exc()
         
-        print("⚠ 未找到模板rig对象")
+        logger.warning("⚠ 未找到模板rig对象")
         
         # 显示调试信息
         current_armatures = [obj.name for obj in bpy.context.scene.objects if obj.type == 'ARMATURE']
-        print(f"🔧 当前场景armature对象 ({len(current_armatures)} 个): {current_armatures}")
+        logger.info("🔧 当前场景armature对象 (%s 个): %s", len(current_armatures), current_armatures)
         
         return None
     
@@ -127,13 +108,13 @@ class TemplateManager:
         parent_dir = os.path.dirname(os.path.dirname(current_dir))
         template_path = os.path.join(parent_dir, "templates", "Nebysse_FaceUP_Tem.blend")
         
-        print(f"查找 Blender 模板文件: {template_path}")
+        logger.info("查找 Blender 模板文件: %s", template_path)
         
         if os.path.exists(template_path):
-            print(f"✓ 找到 Blender 模板文件: {template_path}")
+            logger.info("✓ 找到 Blender 模板文件: %s", template_path)
             return template_path
         else:
-            print(f"✗ Blender 模板文件不存在: {template_path}")
+            logger.warning("✗ Blender 模板文件不存在: %s", template_path)
             return None
     
     def load_faceroot_data_from_blend(self) -> bool:
@@ -144,7 +125,7 @@ class TemplateManager:
             加载是否成功
         """
         try:
-            print("🎯 开始从Blender模板文件加载Neb_face-root数据...")
+            logger.info("🎯 开始从Blender模板文件加载Neb_face-root数据...")
             
             # 创建blend模板加载器
             self.blend_loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
@@ -153,28 +134,28 @@ class TemplateManager:
             template_data = self.blend_loader.load_template_data(target_bone_names=["Neb_face-root"])
             
             if not template_data or not template_data.get('bone_data'):
-                print("⚠ 从Blender模板加载失败")
+                logger.warning("⚠ 从Blender模板加载失败")
                 return False
             
             bone_data = template_data['bone_data']
             
             if 'Neb_face-root' not in bone_data:
-                print("⚠ 模板中没有Neb_face-root骨骼数据")
+                logger.warning("⚠ 模板中没有Neb_face-root骨骼数据")
                 return False
             
             face_root_data = bone_data['Neb_face-root']
             custom_props = face_root_data.get('custom_properties', {})
             drivers = face_root_data.get('drivers', [])
             
-            print(f"✅ 从Blender模板加载成功:")
-            print(f"   📝 自定义属性: {len(custom_props)} 个")
+            logger.info("✅ 从Blender模板加载成功:")
+            logger.info("   📝 自定义属性: %s 个", len(custom_props))
             # print(f"   🔄 驱动器: {len(drivers)} 个") # 删除debug打印
             
             # 应用到当前绑定
             return self._apply_blend_template_data(face_root_data)
             
         except Exception as e:
-            print(f"❌ 从Blender模板加载失败: {e}")
+            logger.error("❌ 从Blender模板加载失败: %s", e)
             import traceback
             traceback.print_exc()
             return False
@@ -182,7 +163,7 @@ class TemplateManager:
     def _apply_blend_template_data(self, face_root_data: dict) -> bool:
         """应用从Blender模板加载的数据"""
         if not hasattr(self.rig, 'faceroot_bone') or not self.rig.faceroot_bone:
-            print("⚠ faceroot_bone 不存在，跳过数据应用")
+            logger.warning("⚠ faceroot_bone 不存在，跳过数据应用")
             return False
         
         try:
@@ -196,7 +177,7 @@ class TemplateManager:
             return success
             
         except Exception as e:
-            print(f"❌ 应用Blender模板数据失败: {e}")
+            logger.error("❌ 应用Blender模板数据失败: %s", e)
             return False
     
     def _apply_custom_properties_from_blend(self, custom_props: dict) -> bool:
@@ -228,13 +209,13 @@ class TemplateManager:
                     applied_count += 1
                     
                 except Exception as e:
-                    print(f"⚠ 设置属性失败 {prop_name}: {e}")
+                    logger.warning("⚠ 设置属性失败 %s: %s", prop_name, e)
                     continue
             
             return applied_count > 0
             
         except Exception as e:
-            print(f"❌ 应用自定义属性失败: {e}")
+            logger.error("❌ 应用自定义属性失败: %s", e)
             return False
     
     def _apply_drivers_from_blend(self, drivers: list) -> bool:
@@ -244,26 +225,28 @@ class TemplateManager:
         
         try:
             pose_bone = self.rig.obj.pose.bones[self.rig.faceroot_bone]
+            # 驱动器变量目标通过加载器的ID映射表重定向
+            remap = self.blend_loader.get_id_remap(self.rig.obj)
             
             applied_count = 0
             for driver_data in drivers:
                 try:
-                    # 解析data_path，提取属性名
-                    data_path = driver_data['data_path']
+                    # 解析data_path，提取自定义属性名
+                    path = parse_data_path(driver_data['data_path'])
                     
-                    # 提取属性名称
-                    if '["' in data_path and '"]' in data_path:
-                        start = data_path.find('["') + 2
-                        end = data_path.find('"]', start)
-                        prop_name = data_path[start:end]
+                    if path.is_custom_property:
+                        prop_name = path.property
                         
                         # 确保属性存在
                         if prop_name not in pose_bone.keys():
                             pose_bone[prop_name] = 0.0
                         
                         # 创建驱动器 - 自定义属性不需要array_index参数
-                        driver = pose_bone.driver_add(f'["{prop_name}"]')
+                        driver = pose_bone.driver_add(path.bone_relative_path())
                         if driver:
+                            record_driver(driver)
+                            record_analysis(f"{self.rig.obj.name} {driver_data['data_path']}",
+                                            optimize_driver_data(driver_data))
                             driver.driver.type = driver_data.get('driver_type', 'SCRIPTED')
                             driver.driver.expression = driver_data.get('expression', '')
                             
@@ -282,7 +265,7 @@ class TemplateManager:
                                         break
                                     
                                     target = var.targets[i]
-                                    target.id = self.rig.obj
+                                    remap.set_driver_target(var, target, target_data)
                                     target.bone_target = target_data.get('bone_target', '')
                                     target.data_path = target_data.get('data_path', '')
                                     target.transform_type = target_data.get('transform_type', 'LOC_X')
@@ -305,17 +288,17 @@ class TemplateManager:
         success = self.load_faceroot_data_from_template_rig()
         
         if success:
-            print("✅ 使用模板rig对象加载成功")
+            logger.info("✅ 使用模板rig对象加载成功")
             return {'source': 'template_rig', 'success': True}
         else:
             # 不再提供回退机制，直接报错
             error_msg = "❌ 模板rig对象加载失败，无法继续生成绑定"
-            print(error_msg)
-            print("💡 可能的解决方案：")
-            print("   1. 检查模板文件是否存在且有效")
-            print("   2. 确认模板rig对象名称正确")
-            print("   3. 检查Blender版本兼容性")
-            print("   4. 重新安装或修复模板文件")
+            logger.info("%s", error_msg)
+            logger.info("💡 可能的解决方案：")
+            logger.info("   1. 检查模板文件是否存在且有效")
+            logger.info("   2. 确认模板rig对象名称正确")
+            logger.info("   3. 检查Blender版本兼容性")
+            logger.info("   4. 重新安装或修复模板文件")
             
             # 抛出异常终止生成过程
             raise RuntimeError(f"模板加载失败: {error_msg}")
@@ -337,57 +320,56 @@ class TemplateManager:
             复制是否成功
         """
         try:
-            print("🎯 开始从模板rig对象加载Neb_face-root数据...")
+            logger.info("🎯 开始从模板rig对象加载Neb_face-root数据...")
             
             # ==================== 防重复加载检查 ====================
-            print("\n🔍 === 预检查阶段：防重复加载机制 ===")
+            if self.template_session is not None:
+                # 模板会话中的模板rig与其他rig共享，不清理也不重新加载
+                logger.info("♻️ 使用生成级模板会话")
+                self.blend_loader = self.template_session.loader
+                self.template_session.get_template_rig()
+            else:
+                logger.info("\n🔍 === 预检查阶段：防重复加载机制 ===")
             
-            # 检查是否已经有blend模板加载器实例
-            if hasattr(self, 'blend_loader') and self.blend_loader:
-                print("⚠ 发现已存在的blend模板加载器，先清理...")
-                try:
-                    self.blend_loader.cleanup()
-                    self.blend_loader = None
-                    print("✓ 已清理现有的blend模板加载器")
-                except Exception as e:
-                    print(f"⚠ 清理现有加载器失败: {e}")
-            
-            # 检查场景中是否已存在模板对象
-            existing_template_objects = []
-            for obj in bpy.data.objects:
-                if obj.type == 'ARMATURE' and self._is_template_object(obj.name):
-                    existing_template_objects.append(obj)
-            
-            if existing_template_objects:
-                print(f"⚠ 发现 {len(existing_template_objects)} 个已存在的模板对象:")
-                for obj in existing_template_objects:
-                    print(f"  📍 {obj.name}")
-                print("🧹 清理现有模板对象以防重复...")
+                # 检查是否已经有blend模板加载器实例
+                if hasattr(self, 'blend_loader') and self.blend_loader:
+                    logger.warning("⚠ 发现已存在的blend模板加载器，先清理...")
+                    try:
+                        self.blend_loader.cleanup()
+                        self.blend_loader = None
+                        logger.info("✓ 已清理现有的blend模板加载器")
+                    except Exception as e:
+                        logger.warning("⚠ 清理现有加载器失败: %s", e)
+            
+                # 检查是否已存在登记过的模板对象
+                existing_template_objects = [obj for obj in get_registered_template_rigs()
+                                             if obj != self.rig.obj]
+            
+                if existing_template_objects:
+                    logger.warning("⚠ 发现 %s 个已存在的模板对象:", len(existing_template_objects))
+                    for obj in existing_template_objects:
+                        logger.debug("  📍 %s", obj.name)
+                    logger.info("🧹 清理现有模板对象以防重复...")
                 
-                # 清理现有模板对象
-                for obj in existing_template_objects:
+                    # 清理现有模板对象及其加载会话追加的全部数据块（一次 batch_remove）
                     try:
-                        print(f"  🗑️ 清理现有模板对象: {obj.name}")
-                        if obj == bpy.context.view_layer.objects.active:
-                            bpy.context.view_layer.objects.active = None
-                        obj.select_set(False)
-                        bpy.data.objects.remove(obj)
+                        remove_owned_ids(adopt_tagged_ids(existing_template_objects))
                     except Exception as e:
-                        print(f"  ⚠ 清理对象失败 {obj.name}: {e}")
+                        logger.warning("  ⚠ 清理现有模板对象失败: %s", e)
                 
-                print("✓ 现有模板对象清理完成")
-            else:
-                print("✓ 未发现重复的模板对象")
+                    logger.info("✓ 现有模板对象清理完成")
+                else:
+                    logger.info("✓ 未发现重复的模板对象")
             
-            # 创建新的blend模板加载器
-            print("🔧 创建新的blend模板加载器...")
-            self.blend_loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
+                # 创建新的blend模板加载器
+                logger.info("🔧 创建新的blend模板加载器...")
+                self.blend_loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
             
             # ==================== 自定义属性处理流程 ====================
-            print("\n📝 === 第一阶段：自定义属性处理流程 ===")
+            logger.info("\n📝 === 第一阶段：自定义属性处理流程 ===")
             
             # 1. 搜索和获取自定义属性信息
-            print("🔍 1. 搜索自定义属性...")
+            logger.info("🔍 1. 搜索自定义属性...")
             properties_success = self.blend_loader.copy_properties_from_template_rig(
                 template_rig_name="Nebysse_FaceUP_Tem.Rig",
                 source_bone_name="Neb_face-root", 
@@ -397,17 +379,17 @@ class TemplateManager:
             
             # 2. 验证自定义属性复制结果
             if properties_success:
-                print("✅ 2. 自定义属性复制成功，验证结果...")
+                logger.info("✅ 2. 自定义属性复制成功，验证结果...")
                 self._verify_properties_after_copy()
             else:
-                print("❌ 2. 自定义属性复制失败")
+                logger.error("❌ 2. 自定义属性复制失败")
                 
                 # 严格模式：自定义属性复制失败直接报错
                 error_msg = "自定义属性复制失败，模板rig对象可能不存在或无效"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
-            print("✅ 自定义属性处理流程完成\n")
+            logger.info("✅ 自定义属性处理流程完成\n")
             
             # ==================== 驱动器处理流程 ====================
             # print("🔄 === 第二阶段：驱动器处理流程（在自定义属性完成后）===") # 删除debug打印
@@ -434,7 +416,7 @@ class TemplateManager:
             else:
                 # 不应该到达这里，因为上面已经抛出异常了
                 error_msg = "从模板rig对象复制数据完全失败"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 raise RuntimeError(error_msg)
             
         except RuntimeError:
@@ -442,7 +424,7 @@ class TemplateManager:
             raise
         except Exception as e:
             error_msg = f"从模板rig对象加载过程中发生意外错误: {e}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             import traceback
             traceback.print_exc()
             raise RuntimeError(error_msg)
@@ -453,7 +435,7 @@ class TemplateManager:
             pose_bone = self.rig.obj.pose.bones[self.rig.faceroot_bone]
             custom_props = [key for key in pose_bone.keys() if not key.startswith('_')]
             
-            print(f"✓ 自定义属性复制验证: 发现 {len(custom_props)} 个属性")
+            logger.info("✓ 自定义属性复制验证: 发现 %s 个属性", len(custom_props))
             
             if custom_props:
                 # 显示属性值分布
@@ -469,21 +451,21 @@ class TemplateManager:
                         non_zero_count += 1
                         sample_props.append((prop_name, value))
                 
-                print(f"  📊 属性值分布: {non_zero_count} 个非零, {zero_count} 个零值")
+                logger.info("  📊 属性值分布: %s 个非零, %s 个零值", non_zero_count, zero_count)
                 
                 if sample_props:
-                    print(f"  📝 非零属性示例:")
+                    logger.info("  📝 非零属性示例:")
                     for prop_name, value in sample_props[:3]:
-                        print(f"    • {prop_name}: {value}")
+                        logger.debug("    • %s: %s", prop_name, value)
                     if len(sample_props) > 3:
-                        print(f"    ... 还有 {len(sample_props) - 3} 个非零属性")
+                        logger.info("    ... 还有 %s 个非零属性", len(sample_props) - 3)
                 
-                print("✅ 自定义属性复制验证通过")
+                logger.info("✅ 自定义属性复制验证通过")
             else:
-                print("❌ 自定义属性复制验证失败：没有发现属性")
+                logger.error("❌ 自定义属性复制验证失败：没有发现属性")
                 
         except Exception as e:
-            print(f"⚠ 自定义属性复制验证失败: {e}")
+            logger.warning("⚠ 自定义属性复制验证失败: %s", e)
     
     def _verify_properties_after_drivers(self):
         """驱动器复制后验证自定义属性完整性"""
@@ -542,231 +524,64 @@ class TemplateManager:
     
     def find_existing_template_data(self):
         """查找已存在的模板数据"""
-        for obj in bpy.data.objects:
-            if obj.type == 'ARMATURE' and ("Nebysse_FaceUP_Tem" in obj.name or "FaceUP" in obj.name):
-                return obj.data, obj
+        obj = find_template_rig(exclude=self.rig.obj)
+        if obj:
+            return obj.data, obj
         return None
     
     def cleanup_template_data_complete(self):
         """完整清理所有模板数据"""
-        print("🧹 执行完整的模板数据清理...")
+        logger.info("🧹 执行完整的模板数据清理...")
         
-        # 保存当前上下文状态
         original_active = bpy.context.view_layer.objects.active
-        original_selected = list(bpy.context.selected_objects)
-        original_mode = bpy.context.mode
         
         # 获取当前绑定对象（正在生成的rig，不是metarig）
         current_rig = self.rig.obj if hasattr(self.rig, 'obj') else None
         current_rig_name = current_rig.name if current_rig else None
         
-        print(f"🛡️ 保护当前生成中的绑定对象: {current_rig_name}")
-        print(f"📊 当前活动对象: {original_active.name if original_active else 'None'}")
-        
-        # 清理blend模板加载器
-        if self.blend_loader:
-            try:
-                self.blend_loader.cleanup()
-                self.blend_loader = None
-                print("✓ Blend模板加载器已清理")
-            except Exception as e:
-                print(f"⚠ 清理blend模板加载器失败: {e}")
-        
-        cleaned_objects = 0
-        cleaned_armatures = 0
+        logger.info("🛡️ 保护当前生成中的绑定对象: %s", current_rig_name)
+        logger.info("📊 当前活动对象: %s", original_active.name if original_active else 'None')
         
-        try:
-            # 安全的清理所有模板相关的对象
-            objects_to_remove = []
-            for obj in bpy.data.objects:
-                # 只清理明确的模板对象，保护当前正在生成的rig
-                if (obj != current_rig and  # 不删除当前正在生成的rig对象
-                    self._is_template_object(obj.name)):
-                    objects_to_remove.append(obj)
-            
-            for obj in objects_to_remove:
-                try:
-                    print(f"  🗑️ 删除模板对象: {obj.name}")
-                    # 如果对象是活动对象，先切换到当前rig对象
-                    if obj == bpy.context.view_layer.objects.active:
-                        if current_rig and current_rig.name in bpy.data.objects:
-                            bpy.context.view_layer.objects.active = current_rig
-                            print(f"    🔄 活动对象切换到当前rig: {current_rig.name}")
-                        else:
-                            bpy.context.view_layer.objects.active = None
-                    
-                    # 确保对象未被选中
-                    obj.select_set(False)
-                    
-                    # 删除对象
-                    bpy.data.objects.remove(obj)
-                    cleaned_objects += 1
-                except Exception as e:
-                    print(f"⚠ 删除对象失败 {obj.name}: {e}")
-            
-            # 安全的清理所有模板相关的骨架数据
-            armatures_to_remove = []
-            for armature in bpy.data.armatures:
-                # 只清理明确的模板骨架，保护当前rig的骨架
-                if (armature != (current_rig.data if current_rig else None) and
-                    self._is_template_armature(armature.name)):
-                    armatures_to_remove.append(armature)
-            
-            for armature in armatures_to_remove:
+        # 删除只使用数据API；退出时当前rig保持为活动对象并恢复选择状态，
+        # 加载器清理中的嵌套保护不再重复保存和恢复
+        with ContextGuard(leave_active=current_rig):
+            # 清理blend模板加载器
+            if self.blend_loader:
                 try:
-                    print(f"  🗑️ 删除模板骨架: {armature.name}")
-                    bpy.data.armatures.remove(armature)
-                    cleaned_armatures += 1
+                    self.blend_loader.cleanup()
+                    self.blend_loader = None
+                    logger.info("✓ Blend模板加载器已清理")
                 except Exception as e:
-                    print(f"⚠ 删除骨架失败 {armature.name}: {e}")
-            
-            print(f"✓ 清理完成: {cleaned_objects} 个对象, {cleaned_armatures} 个骨架")
-            
-            # 清理损坏的驱动器
-            self._cleanup_broken_drivers()
-            
-        except Exception as e:
-            print(f"⚠ 清理模板数据时出错: {e}")
-            import traceback
-            traceback.print_exc()
+                    logger.warning("⚠ 清理blend模板加载器失败: %s", e)
         
-        finally:
-            # 智能恢复上下文：优先确保Rigify期望的活动对象状态
             try:
-                # 最重要：确保当前正在生成的rig对象是活动的
-                if current_rig and current_rig.name in bpy.data.objects:
-                    # 设置当前rig为活动对象（Rigify生成过程的要求）
-                    bpy.context.view_layer.objects.active = current_rig
-                    current_rig.select_set(True)
-                    print(f"✅ 确保当前rig为活动对象: {current_rig.name}")
-                elif original_active and original_active.name in bpy.data.objects:
-                    # 如果当前rig不存在，恢复原始活动对象
-                    bpy.context.view_layer.objects.active = original_active
-                    print(f"🔄 恢复原始活动对象: {original_active.name}")
-                
-                # 恢复选择状态（但不影响活动对象）
-                for obj in original_selected:
-                    # 安全检查：确保对象仍然存在且有效
-                    try:
-                        if obj and hasattr(obj, 'name') and obj.name in bpy.data.objects:
-                            obj_ref = bpy.data.objects[obj.name]
-                            obj_ref.select_set(True)
-                    except (ReferenceError, AttributeError):
-                        # 对象已被删除或引用已失效，跳过
-                        pass
-                    except Exception as e:
-                        print(f"⚠ 恢复对象选择状态时出错: {e}")
-                        pass
-                
-                # 更新视图层
-                bpy.context.view_layer.update()
-                
-                final_active = bpy.context.view_layer.objects.active
-                print(f"✓ 最终活动对象: {final_active.name if final_active else 'None'}")
-                
-            except Exception as restore_error:
-                print(f"⚠ 清理后恢复上下文时出错: {restore_error}")
+                # 只删除加载器标记的数据块（对象、骨架/网格数据、材质、动作），不按名称扫描 bpy.data；
+                # 保存在文件中、重新打开后的模板rig通过注册表找回其标记的数据块
+                adopt_tagged_ids(get_registered_template_rigs())
+                removed = remove_owned_ids()
+                logger.info("✓ 清理完成: %s 个模板数据块", removed)
+            
+                # 清理损坏的驱动器
+                self._cleanup_broken_drivers()
+            
+            except Exception as e:
+                logger.warning("⚠ 清理模板数据时出错: %s", e)
                 import traceback
                 traceback.print_exc()
-                
-                # 最后的安全措施：确保有活动对象且是当前rig
-                try:
-                    if current_rig and current_rig.name in bpy.data.objects:
-                        bpy.context.view_layer.objects.active = current_rig
-                        current_rig.select_set(True)
-                        print(f"🆘 紧急确保rig为活动对象: {current_rig.name}")
-                    elif not bpy.context.view_layer.objects.active:
-                        # 如果没有活动对象，找一个骨架作为活动对象
-                        for obj in bpy.data.objects:
-                            if obj.type == 'ARMATURE':
-                                bpy.context.view_layer.objects.active = obj
-                                obj.select_set(True)
-                                print(f"🆘 紧急设置活动对象: {obj.name}")
-                                break
-                except:
-                    pass
+        
+        final_active = bpy.context.view_layer.objects.active
+        logger.info("✓ 最终活动对象: %s", final_active.name if final_active else 'None')
 
     def _cleanup_broken_drivers(self):
-        """清理损坏的驱动器（基于Blender社区最佳实践）"""
+        """修复加载器创建或重定向的驱动器中损坏的部分（不遍历整个文件）
+        
+        整个文件的审计见操作器 nebysse.audit_broken_drivers。
+        """
         try:
-            # print("🔧 开始清理损坏的驱动器...") # 删除debug打印
-            
-            # 获取所有包含bpy_prop_collection的数据集合
-            from bpy.types import bpy_prop_collection
-            colls = [
-                p for p in dir(bpy.data)
-                if isinstance(getattr(bpy.data, p), bpy_prop_collection)
-            ]
-            
-            total_removed = 0
-            processed_objects = 0
-            
-            for collection_name in colls:
-                collection = getattr(bpy.data, collection_name, [])
-                for obj in collection:
-                    animation_data = getattr(obj, "animation_data", None)
-                    if not animation_data:
-                        continue
-                    
-                    processed_objects += 1
-                    broken_drivers = []
-                    
-                    # 查找损坏的驱动器
-                    for driver in animation_data.drivers:
-                        try:
-                            # 尝试解析驱动器的数据路径
-                            obj.path_resolve(driver.data_path)
-                        except ValueError:
-                            # 路径解析失败，说明驱动器已损坏
-                            broken_drivers.append(driver)
-                    
-                    # 删除损坏的驱动器
-                    while broken_drivers:
-                        broken_driver = broken_drivers.pop()
-                        animation_data.drivers.remove(broken_driver)
-                        total_removed += 1
-            
-            if total_removed > 0:
-                # print(f"🧹 清理完成: 删除了 {total_removed} 个损坏的驱动器") # 删除debug打印
-                # print(f"📊 检查了 {processed_objects} 个包含动画数据的对象") # 删除debug打印
-                pass
-            else:
-                # print(f"✓ 驱动器检查完成: 未发现损坏的驱动器") # 删除debug打印
-                # print(f"📊 检查了 {processed_objects} 个包含动画数据的对象") # 删除debug打印
-                pass
-                
+            return repair_recorded_drivers()
         except Exception as e:
-            # print(f"⚠ 清理损坏驱动器时出错: {e}") # 删除debug打印
-            import traceback
-            traceback.print_exc()
-
-    def _is_template_object(self, obj_name: str) -> bool:
-        """判断是否为模板对象"""
-        template_patterns = [
-            "Nebysse_FaceUP_Tem",      # 主要模板模式
-            "Nebysse_FaceUP_Tem.Rig",  # 特定的rig对象
-            "TemplateFaceRig",         # 备用模板模式  
-            "FaceUP_Tem",              # 简化模板模式
-            "FaceUP_Template",         # 完整模板模式
-        ]
-        
-        for pattern in template_patterns:
-            if pattern in obj_name:
-                return True
-        return False
-    
-    def _is_template_armature(self, armature_name: str) -> bool:
-        """判断是否为模板骨架"""
-        template_patterns = [
-            "Nebysse_FaceUP_Tem",      # 主要模板模式
-            "FaceUP_Tem",              # 简化模板模式
-            "FaceUP_Template",         # 完整模板模式
-        ]
-        
-        for pattern in template_patterns:
-            if pattern in armature_name:
-                return True
-        return False
+            logger.warning("⚠ 修复损坏驱动器时出错: %s", e)
+            return 0
 
     def find_template_rig_object_safe(self, current_rig_obj):
         """安全地查找模板rig对象（专为Rigify生成过程设计）
@@ -777,102 +592,37 @@ class TemplateManager:
         Returns:
             模板rig对象，如果没找到返回None
         """
-        print("🔍 TemplateManager: 安全查找模板rig对象...")
+        logger.info("🔍 TemplateManager: 安全查找模板rig对象...")
         
-        # === 保护当前状态 ===
-        original_active = bpy.context.view_layer.objects.active
-        original_mode = bpy.context.mode
+        # 生成过程中使用共享的模板会话（整个生成只打开一次模板文件）
+        if self.template_session is not None:
+            with ContextGuard(leave_active=current_rig_obj):
+                return self.template_session.get_template_rig()
         
+        # 当前rig在退出时保持为活动对象；嵌套在faceup的保护中时不重复保存和恢复状态
         try:
-            # 方法1: 在当前场景中查找已存在的模板rig
-            print("🔍 方法1：在当前场景查找已存在模板...")
-            
-            # 精确名称匹配
-            target_names = [
-                "Nebysse_FaceUP_Tem.Rig",
-                "Nebysse_FaceUP_Tem",
-                "FaceUP_Tem.Rig"
-            ]
-            
-            for target_name in target_names:
-                if target_name in bpy.data.objects:
-                    obj = bpy.data.objects[target_name]
-                    if (obj.type == 'ARMATURE' and 
-                        obj != current_rig_obj and
-                        obj.name in bpy.context.scene.collection.objects):
-                        print(f"✅ 找到现有模板rig: {obj.name}")
-                        return obj
-            
-            # 方法2: 按NebOffset骨骼数量判断
-            print("🔍 方法2：按NebOffset骨骼查找...")
-            for obj in bpy.context.scene.objects:
-                if (obj.type == 'ARMATURE' and 
-                    obj != current_rig_obj):
-                    try:
-                        neboffset_bones = [bone for bone in obj.pose.bones if bone.name.startswith('NebOffset-')]
-                        if len(neboffset_bones) > 5:
-                            print(f"✅ 找到模板rig（按NebOffset骨骼）: {obj.name} ({len(neboffset_bones)}个)")
-                            return obj
-                    except:
-                        continue
-            
-            # 方法3: 尝试从已加载的blend_loader获取（如果存在）
-            print("🔍 方法3：从blend_loader查找...")
-            if hasattr(self, 'blend_loader') and self.blend_loader:
-                try:
-                    template_obj = self.blend_loader.get_template_armature()
-                    if template_obj and template_obj != current_rig_obj:
-                        print(f"✅ 从blend_loader找到: {template_obj.name}")
-                        return template_obj
-                except Exception as e:
-                    print(f"⚠ blend_loader查找失败: {e}")
-            
-            # 方法4: 作为最后手段，尝试安全地加载模板文件
-            print("🔍 方法4：安全加载模板文件...")
-            return self._safe_load_template_file(current_rig_obj)
+            with ContextGuard(leave_active=current_rig_obj):
+                # 方法1: 查询模板rig注册表（O(1)，不扫描场景对象）
+                logger.info("🔍 方法1：查询模板rig注册表...")
+                template_obj = find_template_rig(exclude=current_rig_obj)
+                if template_obj:
+                    logger.info("✅ 找到现有模板rig: %s", template_obj.name)
+                    return template_obj
+            
+                # 方法2: 作为最后手段，尝试安全地加载模板文件
+                logger.info("🔍 方法2：安全加载模板文件...")
+                return self._safe_load_template_file(current_rig_obj)
             
         except Exception as e:
-            print(f"❌ 安全查找过程出错: {e}")
+            logger.error("❌ 安全查找过程出错: %s", e)
             return None
-            
-        finally:
-            # === 确保恢复原始状态 ===
-            try:
-                # 优先确保当前rig是活动的
-                if current_rig_obj and current_rig_obj.name in bpy.data.objects:
-                    bpy.context.view_layer.objects.active = current_rig_obj
-                elif original_active and original_active.name in bpy.data.objects:
-                    bpy.context.view_layer.objects.active = original_active
-                
-                # 恢复模式
-                if bpy.context.mode != original_mode:
-                    if original_mode == 'EDIT_ARMATURE':
-                        bpy.ops.object.mode_set(mode='EDIT')
-                    elif original_mode == 'POSE':
-                        bpy.ops.object.mode_set(mode='POSE')
-                    else:
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                
-                # 更新视图层
-                bpy.context.view_layer.update()
-                
-            except Exception as restore_error:
-                print(f"⚠ 恢复状态时出错: {restore_error}")
-                # 紧急恢复
-                try:
-                    bpy.context.view_layer.objects.active = current_rig_obj
-                except:
-                    pass
     
     def _safe_load_template_file(self, current_rig_obj):
         """安全地加载模板文件（最小化状态影响）"""
         try:
-            print("📂 尝试安全加载模板文件...")
-            
-            # 确保在对象模式
-            if bpy.context.mode != 'OBJECT':
-                bpy.ops.object.mode_set(mode='OBJECT')
+            logger.info("📂 尝试安全加载模板文件...")
             
+            # 对象模式由 load_template_data_safe 的上下文保护确保
             # 如果还没有blend_loader，创建一个
             if not hasattr(self, 'blend_loader') or not self.blend_loader:
                 self.blend_loader = BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
@@ -887,18 +637,18 @@ class TemplateManager:
                 if template_armature.name not in bpy.context.scene.collection.objects:
                     try:
                         bpy.context.scene.collection.objects.link(template_armature)
-                        print(f"🔗 模板rig已链接到场景: {template_armature.name}")
+                        logger.info("🔗 模板rig已链接到场景: %s", template_armature.name)
                     except:
-                        print("⚠ 链接模板rig到场景失败")
+                        logger.warning("⚠ 链接模板rig到场景失败")
                 
-                print(f"✅ 安全加载成功: {template_armature.name}")
+                logger.info("✅ 安全加载成功: %s", template_armature.name)
                 return template_armature
             else:
-                print("⚠ 模板文件加载失败或无效")
+                logger.warning("⚠ 模板文件加载失败或无效")
                 return None
                 
         except Exception as e:
-            print(f"⚠ 安全加载模板文件失败: {e}")
+            logger.warning("⚠ 安全加载模板文件失败: %s", e)
             return None
         
         finally:
@@ -969,25 +719,25 @@ class BoneDetector:
             return False
         
         # 🚫 新规则：跳过face骨骼存在性检测，默认用户已经设置
-        print("🚫 新规则：跳过face骨骼存在性检测")
-        print("💡 假设用户已经正确设置了face骨骼")
-        print("✅ 直接返回True，判断为rigify骨架")
+        logger.info("🚫 新规则：跳过face骨骼存在性检测")
+        logger.info("💡 假设用户已经正确设置了face骨骼")
+        logger.info("✅ 直接返回True，判断为rigify骨架")
         
         return True
     
     @staticmethod
     def detect_rigify_face_bones(armature_obj):
         """检测骨架中是否存在原生rigify face骨骼，并返回映射关系"""
-        print("🔍 开始检测原生rigify face骨骼...")
+        logger.info("🔍 开始检测原生rigify face骨骼...")
         
         if not armature_obj or armature_obj.type != 'ARMATURE':
-            print("❌ 当前对象不是骨架或为空")
+            logger.error("❌ 当前对象不是骨架或为空")
             return {}
         
         # 🚫 新规则：跳过所有rigify面部骨骼检测
-        print("🚫 新规则：跳过rigify面部骨骼检测，默认用户已经设置")
-        print("💡 假设用户已经正确配置了rigify面部骨架")
-        print("🎯 直接返回空映射，继续后续处理流程")
+        logger.info("🚫 新规则：跳过rigify面部骨骼检测，默认用户已经设置")
+        logger.info("💡 假设用户已经正确配置了rigify面部骨架")
+        logger.info("🎯 直接返回空映射，继续后续处理流程")
         
         return {}
     
@@ -997,26 +747,26 @@ class BoneDetector:
         detected_bones = {}
         
         # 1. 首先尝试标准映射
-        print("🔍 尝试标准rigify面部骨骼映射...")
+        logger.info("🔍 尝试标准rigify面部骨骼映射...")
         rigify_face_mapping = BoneDetector.get_default_face_bone_mapping()
         missing_bones = []
         
         for rigify_name, neb_name in rigify_face_mapping.items():
             if rigify_name in existing_bones:
                 detected_bones[rigify_name] = neb_name
-                print(f"✓ 检测到标准骨骼: {rigify_name} -> 将生成: {neb_name}")
+                logger.debug("✓ 检测到标准骨骼: %s -> 将生成: %s", rigify_name, neb_name)
             else:
                 missing_bones.append(rigify_name)
         
         # 2. 如果标准映射找到了骨骼，直接返回
         if detected_bones:
-            print(f"✅ 标准映射成功，发现 {len(detected_bones)} 个骨骼")
+            logger.info("✅ 标准映射成功，发现 %s 个骨骼", len(detected_bones))
             if missing_bones[:5]:
-                print(f"  缺失示例: {', '.join(missing_bones[:5])}")
+                logger.info("  缺失示例: %s", ', '.join(missing_bones[:5]))
             return detected_bones
         
         # 3. 如果标准映射失败，使用智能模式检测
-        print("🧠 标准映射未找到骨骼，启用智能检测模式...")
+        logger.info("🧠 标准映射未找到骨骼，启用智能检测模式...")
         return BoneDetector.intelligent_pattern_detection(existing_bones)
     
     @staticmethod
@@ -1077,15 +827,15 @@ class BoneDetector:
                         # 生成对应的Neb_前缀名称
                         neb_name = f"Neb_{bone_name.replace('.', '_').replace('-', '_')}"
                         detected_bones[bone_name] = neb_name
-                        print(f"✓ 智能检测到: {bone_name} -> {neb_name} (类别: {category})")
+                        logger.debug("✓ 智能检测到: %s -> %s (类别: %s)", bone_name, neb_name, category)
                         break
                 if bone_name in [k for k in detected_bones.keys()]:
                     break
         
         if detected_bones:
-            print(f"🧠 智能检测完成，发现 {len(detected_bones)} 个面部骨骼")
+            logger.info("🧠 智能检测完成，发现 %s 个面部骨骼", len(detected_bones))
         else:
-            print("❌ 智能检测也未找到面部骨骼")
+            logger.error("❌ 智能检测也未找到面部骨骼")
         
         return detected_bones
     
@@ -1099,10 +849,10 @@ class BoneDetector:
         
         for bone_name in possible_head_bones:
             if bone_name in armature_obj.data.bones:
-                print(f"✓ 检测到原生rigify head骨骼: {bone_name}")
+                logger.debug("✓ 检测到原生rigify head骨骼: %s", bone_name)
                 return bone_name
         
-        print("⚠ 未检测到原生rigify head骨骼")
+        logger.warning("⚠ 未检测到原生rigify head骨骼")
         return None
 
 
@@ -1118,12 +868,12 @@ class GenerationManager:
     
     def get_manual_generation_mapping(self):
         """根据参数获取手动生成的骨骼映射"""
-        print("\n🎯 === 手动生成模式 ===")
+        logger.info("\n🎯 === 手动生成模式 ===")
         
         # 🚫 新规则：跳过所有rigify面部骨骼检测
-        print("🚫 新规则：跳过rigify面部骨骼检测，默认用户已经设置")
-        print("💡 假设用户已经正确配置了rigify面部骨架")
-        print("🎯 直接返回空映射，继续后续处理流程")
+        logger.info("🚫 新规则：跳过rigify面部骨骼检测，默认用户已经设置")
+        logger.info("💡 假设用户已经正确配置了rigify面部骨架")
+        logger.info("🎯 直接返回空映射，继续后续处理流程")
         
         return {}
         
@@ -1150,17 +900,17 @@ class GenerationManager:
     
     def get_manual_bone_mapping(self):
         """获取手动模式的骨骼映射"""
-        print("📝 使用手动选择模式")
+        logger.info("📝 使用手动选择模式")
         
         manual_list = getattr(self.rig.params, 'manual_bone_list', "")
         if not manual_list.strip():
-            print("⚠ 手动骨骼列表为空，使用默认列表")
+            logger.warning("⚠ 手动骨骼列表为空，使用默认列表")
             manual_list = "jaw_master,teeth.B,teeth.T,lip.T,lip.B,brow.T.L.002,brow.T.R.002"
         
         bone_names = parse_bone_list(manual_list)
-        print(f"📋 手动指定的骨骼列表 ({len(bone_names)} 个):")
+        logger.info("📋 手动指定的骨骼列表 (%s 个):", len(bone_names))
         for i, name in enumerate(bone_names):
-            print(f"  {i+1:2d}. {name}")
+            logger.debug("  %2d. %s", i + 1, name)
         
         manual_mapping = {}
         existing_bones = set(self.rig.obj.data.bones.keys())
@@ -1169,51 +919,51 @@ class GenerationManager:
             if rigify_name in existing_bones:
                 neb_name = f"Neb_{rigify_name}"
                 manual_mapping[rigify_name] = neb_name
-                print(f"✓ 映射: {rigify_name} -> {neb_name}")
+                logger.debug("✓ 映射: %s -> %s", rigify_name, neb_name)
             else:
-                print(f"⚠ 跳过不存在的骨骼: {rigify_name}")
+                logger.warning("⚠ 跳过不存在的骨骼: %s", rigify_name)
         
-        print(f"✅ 手动模式映射完成：{len(manual_mapping)} 个有效映射")
+        logger.info("✅ 手动模式映射完成：%s 个有效映射", len(manual_mapping))
         return manual_mapping
     
     def get_hybrid_bone_mapping(self):
         """获取混合模式的骨骼映射"""
-        print("🔄 使用混合模式")
+        logger.info("🔄 使用混合模式")
         
         auto_mapping = BoneDetector.detect_rigify_face_bones(self.rig.obj)
-        print(f"📊 自动检测到 {len(auto_mapping)} 个骨骼")
+        logger.info("📊 自动检测到 %s 个骨骼", len(auto_mapping))
         
         # 处理排除列表
         exclude_list = getattr(self.rig.params, 'exclude_bones', "")
         if exclude_list.strip():
             exclude_bones = parse_bone_list(exclude_list)
-            print(f"🚫 排除骨骼列表 ({len(exclude_bones)} 个): {exclude_bones}")
+            logger.info("🚫 排除骨骼列表 (%s 个): %s", len(exclude_bones), exclude_bones)
             
             for exclude_name in exclude_bones:
                 if exclude_name in auto_mapping:
                     del auto_mapping[exclude_name]
-                    print(f"  ✓ 已排除: {exclude_name}")
+                    logger.debug("  ✓ 已排除: %s", exclude_name)
                 else:
-                    print(f"  ⚠ 排除失败（不存在）: {exclude_name}")
+                    logger.warning("  ⚠ 排除失败（不存在）: %s", exclude_name)
         
         # 处理额外添加列表
         add_list = getattr(self.rig.params, 'add_bones', "")
         if add_list.strip():
             add_bones = parse_bone_list(add_list)
-            print(f"➕ 额外添加列表 ({len(add_bones)} 个): {add_bones}")
+            logger.info("➕ 额外添加列表 (%s 个): %s", len(add_bones), add_bones)
             
             existing_bones = set(self.rig.obj.data.bones.keys())
             for add_name in add_bones:
                 if add_name in existing_bones and add_name not in auto_mapping:
                     neb_name = f"Neb_{add_name}"
                     auto_mapping[add_name] = neb_name
-                    print(f"  ✓ 已添加: {add_name} -> {neb_name}")
+                    logger.debug("  ✓ 已添加: %s -> %s", add_name, neb_name)
                 elif add_name in auto_mapping:
-                    print(f"  ⚠ 已存在，跳过: {add_name}")
+                    logger.warning("  ⚠ 已存在，跳过: %s", add_name)
                 else:
-                    print(f"  ⚠ 添加失败（不存在）: {add_name}")
+                    logger.warning("  ⚠ 添加失败（不存在）: %s", add_name)
         
-        print(f"✅ 混合模式映射完成：{len(auto_mapping)} 个有效映射")
+        logger.info("✅ 混合模式映射完成：%s 个有效映射", len(auto_mapping))
         return auto_mapping
 
 
@@ -1229,11 +979,11 @@ class ConstraintManager:
     
     def setup_copy_transform_constraints(self, bone_mapping):
         """为原生rigify骨骼设置复制变换约束到对应的Neb_前缀骨骼"""
-        print("\n🔗 开始设置复制变换约束系统...")
+        logger.info("\n🔗 开始设置复制变换约束系统...")
         
         # 检查输入
         if not bone_mapping:
-            print("❌ 骨骼映射表为空，无法设置约束")
+            logger.error("❌ 骨骼映射表为空，无法设置约束")
             return
         
         # 获取约束参数
@@ -1243,24 +993,24 @@ class ConstraintManager:
         target_space = getattr(params, 'constraint_target_space', 'LOCAL')
         owner_space = getattr(params, 'constraint_owner_space', 'LOCAL')
         
-        print(f"⚙️ 约束参数设置:")
-        print(f"   🎯 影响权重: {constraint_influence}")
-        print(f"   🔀 混合模式: {mix_mode}")
-        print(f"   📍 目标空间: {target_space}")
-        print(f"   🏠 拥有者空间: {owner_space}")
+        logger.info("⚙️ 约束参数设置:")
+        logger.info("   🎯 影响权重: %s", constraint_influence)
+        logger.info("   🔀 混合模式: %s", mix_mode)
+        logger.info("   📍 目标空间: %s", target_space)
+        logger.info("   🏠 拥有者空间: %s", owner_space)
         
         # 统计信息
         total_mapping = len(bone_mapping)
-        print(f"🗂️ 骨骼映射表包含 {total_mapping} 个映射关系")
-        print(f"🎯 约束方向：原生rigify骨骼 跟随 -> Neb_前缀骨骼")
-        print(f"🛠️ 策略：使用rigify标准API，直接创建约束对象")
+        logger.info("🗂️ 骨骼映射表包含 %s 个映射关系", total_mapping)
+        logger.info("🎯 约束方向：原生rigify骨骼 跟随 -> Neb_前缀骨骼")
+        logger.info("🛠️ 策略：使用rigify标准API，直接创建约束对象")
         
         # 预检查阶段：验证骨骼存在性
-        print(f"\n🔍 === 预检查阶段：分析骨骼可用性 ===")
+        logger.info("\n🔍 === 预检查阶段：分析骨骼可用性 ===")
         
         # 检查生成的Neb_前缀骨骼
         neb_bones_count = len(self.rig.bones.neb_face_bones)
-        print(f"🏗️ 已生成 {neb_bones_count} 个Neb_前缀骨骼")
+        logger.info("🏗️ 已生成 %s 个Neb_前缀骨骼", neb_bones_count)
         
         # 验证映射中的骨骼可用性
         valid_mappings = []
@@ -1284,49 +1034,56 @@ class ConstraintManager:
         missing_rigify_count = len(missing_rigify_bones)
         missing_neb_count = len(missing_neb_bones)
         
-        print(f"\n🔍 预检查结果：")
-        print(f"   ✅ 可用映射: {valid_count} 个")
-        print(f"   ❌ 缺失原生骨骼: {missing_rigify_count} 个")
-        print(f"   ❌ 缺失目标骨骼: {missing_neb_count} 个")
+        logger.info("\n🔍 预检查结果：")
+        logger.info("   ✅ 可用映射: %s 个", valid_count)
+        log_count(logger, "   ❌ 缺失原生骨骼: %s 个", missing_rigify_count)
+        log_count(logger, "   ❌ 缺失目标骨骼: %s 个", missing_neb_count)
         
         if missing_rigify_bones:
-            print(f"   📋 缺失的原生骨骼: {missing_rigify_bones[:5]}")
+            logger.info("   📋 缺失的原生骨骼: %s", missing_rigify_bones[:5])
             if len(missing_rigify_bones) > 5:
-                print(f"       ... 还有 {len(missing_rigify_bones) - 5} 个")
+                logger.info("       ... 还有 %s 个", len(missing_rigify_bones) - 5)
         
         if missing_neb_bones:
-            print(f"   �� 缺失的目标骨骼: {missing_neb_bones[:5]}")
+            logger.info("   �� 缺失的目标骨骼: %s", missing_neb_bones[:5])
             if len(missing_neb_bones) > 5:
-                print(f"       ... 还有 {len(missing_neb_bones) - 5} 个")
+                logger.info("       ... 还有 %s 个", len(missing_neb_bones) - 5)
         
         if valid_count == 0:
-            print("❌ 没有可用的映射关系，跳过约束设置")
+            logger.error("❌ 没有可用的映射关系，跳过约束设置")
             return
         
-        print(f"\n✅ 将为 {valid_count} 个有效映射设置约束")
+        logger.info("\n✅ 将为 %s 个有效映射设置约束", valid_count)
         expected_success_rate = (valid_count / total_mapping) * 100
-        print(f"🎯 预期成功率: {valid_count}/{total_mapping} ({expected_success_rate:.1f}%)")
+        logger.info("🎯 预期成功率: %s/%s (%.1f%%)", valid_count, total_mapping, expected_success_rate)
         
         # 约束设置阶段：使用rigify标准API
-        print(f"\n🔗 === 约束设置阶段：使用rigify标准API ===")
+        logger.info("\n🔗 === 约束设置阶段：使用rigify标准API ===")
         
         constraint_count = 0
         updated_count = 0
+        unchanged_count = 0
         failed_count = 0
         
         for i, (rigify_name, neb_name) in enumerate(valid_mappings, 1):
-            print(f"\n  🔸 [{i}/{valid_count}] 处理映射: {rigify_name} -> {neb_name}")
+            logger.debug("\n  🔸 [%s/%s] 处理映射: %s -> %s", i, valid_count, rigify_name, neb_name)
             
             try:
                 # 获取姿态骨骼
                 rigify_pbone = self.rig.obj.pose.bones[rigify_name]
                 neb_bone_name = self.rig.bones.neb_face_bones[neb_name]
                 
-                print(f"    📌 原生骨骼: {rigify_pbone.name}")
-                print(f"    📌 目标骨骼: {neb_bone_name}")
+                logger.debug("    📌 原生骨骼: %s", rigify_pbone.name)
+                logger.debug("    📌 目标骨骼: %s", neb_bone_name)
                 
-                # 检查现有约束
-                existing_constraint = self._find_existing_constraint(rigify_pbone, neb_bone_name)
+                # 检查现有约束（按约束名称O(1)查找）
+                existing_constraint = self._find_existing_constraint(rigify_pbone, f"Copy_{neb_name}", neb_bone_name)
+                
+                if existing_constraint and self._constraint_matches(
+                        existing_constraint, constraint_influence, mix_mode, target_space, owner_space):
+                    # 参数完全相同，无需写入
+                    unchanged_count += 1
+                    continue
                 
                 if existing_constraint:
                     # 更新现有约束的所有参数
@@ -1336,10 +1093,10 @@ class ConstraintManager:
                     existing_constraint.target_space = target_space
                     existing_constraint.owner_space = owner_space
                     updated_count += 1
-                    print(f"    ✅ 更新现有约束: 影响权重 {old_influence:.2f} -> {constraint_influence:.2f}")
-                    print(f"       混合模式: {mix_mode}")
-                    print(f"       目标空间: {target_space}")
-                    print(f"       拥有者空间: {owner_space}")
+                    logger.debug("    ✅ 更新现有约束: 影响权重 %.2f -> %.2f", old_influence, constraint_influence)
+                    logger.debug("       混合模式: %s", mix_mode)
+                    logger.debug("       目标空间: %s", target_space)
+                    logger.debug("       拥有者空间: %s", owner_space)
                     continue
                 
                 # 使用rigify标准API直接创建约束
@@ -1353,72 +1110,80 @@ class ConstraintManager:
                 constraint.influence = constraint_influence
                 
                 constraint_count += 1
-                print(f"    ✅ 新建约束: '{constraint.name}'")
-                print(f"       目标: {constraint.target.name}.{constraint.subtarget}")
-                print(f"       权重: {constraint.influence:.2f}")
-                print(f"       混合模式: {constraint.mix_mode}")
-                print(f"       目标空间: {constraint.target_space}")
-                print(f"       拥有者空间: {constraint.owner_space}")
+                logger.debug("    ✅ 新建约束: '%s'", constraint.name)
+                logger.debug("       目标: %s.%s", constraint.target.name, constraint.subtarget)
+                logger.debug("       权重: %.2f", constraint.influence)
+                logger.debug("       混合模式: %s", constraint.mix_mode)
+                logger.debug("       目标空间: %s", constraint.target_space)
+                logger.debug("       拥有者空间: %s", constraint.owner_space)
                 
             except Exception as e:
-                print(f"    ❌ 约束设置失败: {e}")
-                print(f"    🔧 跳过当前骨骼，继续处理下一个骨骼...")
+                logger.error("    ❌ 约束设置失败: %s", e)
+                logger.debug("    🔧 跳过当前骨骼，继续处理下一个骨骼...")
                 import traceback
                 traceback.print_exc()
                 failed_count += 1
                 continue
         
         # 最终结果统计
-        successful_constraints = constraint_count + updated_count
+        successful_constraints = constraint_count + updated_count + unchanged_count
         processed_mappings = successful_constraints + failed_count
         actual_success_rate = (successful_constraints / valid_count) * 100 if valid_count > 0 else 0
         overall_success_rate = (successful_constraints / total_mapping) * 100
         
-        print(f"\n📊 === 约束设置结果汇总 ===")
-        print(f"   🆕 新建约束: {constraint_count} 个")
-        print(f"   🔄 更新约束: {updated_count} 个")
-        print(f"   ❌ 设置失败: {failed_count} 个")
-        print(f"   ⚠ 跳过骨骼: {total_mapping - valid_count} 个（骨骼缺失）")
-        print(f"   📋 总计映射: {total_mapping} 个")
-        print(f"   ✅ 有效处理成功率: {successful_constraints}/{valid_count} ({actual_success_rate:.1f}%)")
-        print(f"   📊 总体成功率: {successful_constraints}/{total_mapping} ({overall_success_rate:.1f}%)")
-        
-        print(f"\n⚙️ 最终约束参数:")
-        print(f"   📐 混合模式: {mix_mode}")
-        print(f"   🎯 目标空间: {target_space}")
-        print(f"   🏠 拥有者空间: {owner_space}")
+        logger.info("\n📊 === 约束设置结果汇总 ===")
+        logger.info("   🆕 新建约束: %s 个", constraint_count)
+        logger.info("   🔄 更新约束: %s 个", updated_count)
+        logger.info("   ⚡ 未变化: %s 个", unchanged_count)
+        log_count(logger, "   ❌ 设置失败: %s 个", failed_count)
+        log_count(logger, "   ⚠ 跳过骨骼: %s 个（骨骼缺失）", total_mapping - valid_count, "WARNING")
+        logger.info("   📋 总计映射: %s 个", total_mapping)
+        logger.info("   ✅ 有效处理成功率: %s/%s (%.1f%%)", successful_constraints, valid_count, actual_success_rate)
+        logger.info("   📊 总体成功率: %s/%s (%.1f%%)", successful_constraints, total_mapping, overall_success_rate)
+        
+        logger.info("\n⚙️ 最终约束参数:")
+        logger.info("   📐 混合模式: %s", mix_mode)
+        logger.info("   🎯 目标空间: %s", target_space)
+        logger.info("   🏠 拥有者空间: %s", owner_space)
         
         if successful_constraints > 0:
-            print(f"\n✅ 约束系统激活：{successful_constraints} 个原生rigify骨骼现在会跟随Neb_前缀骨骼的变换")
+            logger.info("\n✅ 约束系统激活：%s 个原生rigify骨骼现在会跟随Neb_前缀骨骼的变换", successful_constraints)
             
             if failed_count > 0:
-                print(f"⚠ 注意：{failed_count} 个映射在约束设置时失败")
-                print(f"💡 建议检查失败骨骼的具体错误信息")
+                logger.warning("⚠ 注意：%s 个映射在约束设置时失败", failed_count)
+                logger.info("💡 建议检查失败骨骼的具体错误信息")
             
             if total_mapping - valid_count > 0:
                 skipped_due_to_missing = total_mapping - valid_count
-                print(f"💡 兼容提示：{skipped_due_to_missing} 个映射由于骨骼缺失而被跳过")
-                print(f"   这是正常的兼容性行为，不影响已设置约束的正常运行")
+                logger.info("💡 兼容提示：%s 个映射由于骨骼缺失而被跳过", skipped_due_to_missing)
+                logger.info("   这是正常的兼容性行为，不影响已设置约束的正常运行")
                 
         else:
-            print(f"\n⚠ 警告：没有成功设置任何约束")
-            print(f"💡 可能原因：")
-            print(f"   1. 所有目标骨骼都缺失或无效")
-            print(f"   2. 约束设置过程中发生技术错误")
-            print(f"   3. Rigify系统或FaceUP系统生成不完整")
+            logger.warning("\n⚠ 警告：没有成功设置任何约束")
+            logger.info("💡 可能原因：")
+            logger.info("   1. 所有目标骨骼都缺失或无效")
+            logger.info("   2. 约束设置过程中发生技术错误")
+            logger.info("   3. Rigify系统或FaceUP系统生成不完整")
         
-        print(f"\n🎯 约束设置完成！rigify标准API确保了最大兼容性。")
+        logger.info("\n🎯 约束设置完成！rigify标准API确保了最大兼容性。")
     
-    def _find_existing_constraint(self, pose_bone, target_bone_name):
-        """查找现有的复制变换约束"""
-        for constraint in pose_bone.constraints:
-            if (constraint.type == 'COPY_TRANSFORMS' and 
-                hasattr(constraint, 'target') and 
+    def _find_existing_constraint(self, pose_bone, constraint_name, target_bone_name):
+        """按名称查找现有的复制变换约束（名称相同但类型或目标不同时视为不存在）"""
+        constraint = pose_bone.constraints.get(constraint_name)
+        if (constraint is not None and
+                constraint.type == 'COPY_TRANSFORMS' and
                 constraint.target == self.rig.obj and
-                hasattr(constraint, 'subtarget') and
                 constraint.subtarget == target_bone_name):
-                return constraint
+            return constraint
         return None
+    
+    @staticmethod
+    def _constraint_matches(constraint, influence, mix_mode, target_space, owner_space):
+        """现有约束参数是否与期望一致"""
+        return (abs(constraint.influence - influence) < 1e-6 and
+                constraint.mix_mode == mix_mode and
+                constraint.target_space == target_space and
+                constraint.owner_space == owner_space)
 
 
 # ================================
@@ -1467,10 +1232,10 @@ def validate_bone_existence(armature_obj, bone_names):
 def copy_bone_transforms_from_rigify(rig_instance, bone_mapping):
     """从原生rigify骨骼复制变换到对应的Neb_前缀骨骼"""
     if not hasattr(rig_instance.bones, 'neb_face_bones'):
-        print("⚠ Neb_前缀骨骼未生成")
+        logger.warning("⚠ Neb_前缀骨骼未生成")
         return
     
-    print("📍 开始复制原生rigify骨骼变换到Neb_前缀骨骼...")
+    logger.info("📍 开始复制原生rigify骨骼变换到Neb_前缀骨骼...")
     
     armature = rig_instance.obj
     copied_count = 0
@@ -1479,7 +1244,7 @@ def copy_bone_transforms_from_rigify(rig_instance, bone_mapping):
         if neb_name in rig_instance.bones.neb_face_bones:
             try:
                 if rigify_name not in armature.data.bones:
-                    print(f"⚠ 跳过不存在的原生骨骼: {rigify_name}")
+                    logger.warning("⚠ 跳过不存在的原生骨骼: %s", rigify_name)
                     continue
                 
                 rigify_bone = armature.data.bones[rigify_name]
@@ -1494,6 +1259,6 @@ def copy_bone_transforms_from_rigify(rig_instance, bone_mapping):
                     copied_count += 1
                     
             except Exception as e:
-                print(f"❌ 复制变换失败 {rigify_name} -> {neb_name}: {e}")
+                logger.error("❌ 复制变换失败 %s -> %s: %s", rigify_name, neb_name, e)
     
-    print(f"📍 变换复制完成：成功复制 {copied_count} 个骨骼的变换") 
\ No newline at end of file
+    logger.info("📍 变换复制完成：成功复制 %s 个骨骼的变换", copied_count) 
\ No newline at end of file
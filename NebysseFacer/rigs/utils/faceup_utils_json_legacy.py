@@ -11,6 +11,9 @@ FaceUP Utils - JSON模板加载功能（遗留/备份版本）
 import os
 import json
 import bpy
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class JSONTemplateManagerLegacy:
@@ -28,10 +31,10 @@ class JSONTemplateManagerLegacy:
             
             template_path = os.path.join(parent_dir, "templates", "faceUP_faceroot.json")
             template_path = os.path.normpath(template_path)
-            print(f"JSON模板文件路径: {template_path}")
+            logger.info("JSON模板文件路径: %s", template_path)
             
             if not os.path.exists(template_path):
-                print(f"✗ JSON模板文件不存在: {template_path}")
+                logger.warning("✗ JSON模板文件不存在: %s", template_path)
                 # 尝试备用路径
                 alternative_paths = [
                     os.path.join(current_dir, "templates", "faceUP_faceroot.json"),
@@ -40,10 +43,10 @@ class JSONTemplateManagerLegacy:
                 
                 for alt_path in alternative_paths:
                     alt_path = os.path.normpath(alt_path)
-                    print(f"尝试备用路径: {alt_path}")
+                    logger.debug("尝试备用路径: %s", alt_path)
                     if os.path.exists(alt_path):
                         template_path = alt_path
-                        print(f"✓ 找到JSON模板文件: {template_path}")
+                        logger.debug("✓ 找到JSON模板文件: %s", template_path)
                         break
                 else:
                     raise FileNotFoundError(f"找不到JSON模板文件: {template_path}")
@@ -55,7 +58,7 @@ class JSONTemplateManagerLegacy:
             return template_data
             
         except Exception as e:
-            print(f"✗ JSON模板加载失败: {e}")
+            logger.warning("✗ JSON模板加载失败: %s", e)
             return None
 
     def apply_drivers_from_json_template(self, template_data):
@@ -218,18 +221,18 @@ def load_faceroot_template_json_legacy():
             with open(template_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         else:
-            print(f"JSON模板文件不存在: {template_path}")
+            logger.info("JSON模板文件不存在: %s", template_path)
             return None
             
     except Exception as e:
-        print(f"加载JSON模板失败: {e}")
+        logger.info("加载JSON模板失败: %s", e)
         return None
 
 
 def apply_json_drivers_to_bone_legacy(armature_obj, bone_name, drivers_data):
     """将JSON驱动器数据应用到指定骨骼（遗留函数）"""
     if bone_name not in armature_obj.pose.bones:
-        print(f"骨骼 {bone_name} 不存在")
+        logger.info("骨骼 %s 不存在", bone_name)
         return False
     
     pose_bone = armature_obj.pose.bones[bone_name]
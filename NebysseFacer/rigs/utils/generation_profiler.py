@@ -0,0 +1,419 @@
+"""
+生成性能分析器 - 按Rigify阶段统计生成耗时
+
+默认关闭，开启后对标记的rig类的阶段方法计时并统计：
+- 墙钟时间（含嵌套调用的总时间和扣除嵌套阶段后的自身时间）
+- 调用次数
+- depsgraph 更新次数（depsgraph_update_post 回调）
+- 模式切换次数（bpy.ops.object.mode_set 等实际改变了模式的调用，以及全部调用次数）
+
+一次生成中所有被分析的rig都完成 finalize 后，输出汇总表并写出JSON报告，
+报告中包含插件版本、Blender版本和模板文件哈希，便于跨版本比较。
+
+开启方式:
+    NEBYSSE_PROFILE=1                 启动Blender前设置环境变量
+    NEBYSSE_PROFILE_OUTPUT=<路径>      JSON报告路径（.json文件或目录），默认为Blender临时目录
+    或在运行时调用 enable_profiling(True, output_path)
+
+在rig类上使用:
+    @profile_stages('copy_template_constraints_and_drivers')
+    class Rig(BaseRig):
+        ...
+"""
+
+import functools
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import bpy
+
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+PROFILE_ENV = "NEBYSSE_PROFILE"
+PROFILE_OUTPUT_ENV = "NEBYSSE_PROFILE_OUTPUT"
+
+PROFILE_FORMAT = "nebysse-generation-profile"
+PROFILE_VERSION = 1
+
+# Rigify 标准阶段方法（按执行顺序）
+STAGE_METHODS = (
+    'initialize',
+    'prepare_bones',
+    'generate_bones',
+    'parent_bones',
+    'configure_bones',
+    'preapply_bones',
+    'apply_bones',
+    'rig_bones',
+    'generate_widgets',
+    'finalize',
+)
+
+# 会切换对象模式的操作符 (模块, 函数)
+_MODE_OPERATORS = {
+    ('object', 'mode_set'),
+    ('object', 'editmode_toggle'),
+    ('object', 'posemode_toggle'),
+}
+
+_PROFILED_MARKER = "_nebysse_profiled"
+
+_enabled_override: Optional[bool] = None
+_output_override: Optional[str] = None
+_session: Optional['GenerationProfile'] = None
+
+
+def is_profiling_enabled() -> bool:
+    """是否开启了生成性能分析"""
+    if _enabled_override is not None:
+        return _enabled_override
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def enable_profiling(enabled: bool = True, output_path: str = None):
+    """
+    运行时开启或关闭性能分析（覆盖环境变量）
+
+    Args:
+        enabled: 是否开启
+        output_path: JSON报告路径（.json文件或目录），为None时使用环境变量或临时目录
+    """
+    global _enabled_override, _output_override
+    _enabled_override = bool(enabled)
+    _output_override = output_path
+
+
+def _rig_type(rig) -> str:
+    """rig实例的类型名（模块名最后一段，如 nebysse_faceup_con）"""
+    return type(rig).__module__.rpartition('.')[2]
+
+
+class _StageFrame:
+    """一次阶段方法调用的计数帧"""
+    __slots__ = ('key', 'rig_type', 'stage', 'start', 'child_time',
+                 'depsgraph_updates', 'mode_switches', 'mode_set_calls')
+
+    def __init__(self, key: str, rig_type: str, stage: str):
+        self.key = key
+        self.rig_type = rig_type
+        self.stage = stage
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.depsgraph_updates = 0
+        self.mode_switches = 0
+        self.mode_set_calls = 0
+
+
+class GenerationProfile:
+    """一次Rigify生成的性能统计"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.stack: List[_StageFrame] = []
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.finished_rigs = set()
+        self.seen_rigs = set()
+        self._original_op_call = None
+        self._install_hooks()
+
+    # ---- 计数钩子 ----
+
+    def _install_hooks(self):
+        """安装depsgraph回调和模式切换计数"""
+        if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+
+        # bpy.ops 每次属性访问都会创建新的操作符对象，只能在其类上包装调用
+        op_class = getattr(bpy.ops, '_BPyOpsSubModOp', None)
+        if op_class is None:
+            logger.debug("⚠ 当前Blender版本不支持统计模式切换")
+            return
+
+        original_call = op_class.__call__
+        profile = self
+
+        @functools.wraps(original_call)
+        def counting_call(op, *args, **kwargs):
+            key = (getattr(op, '_module', None), getattr(op, '_func', None))
+            if key not in _MODE_OPERATORS or not profile.stack:
+                return original_call(op, *args, **kwargs)
+            mode_before = bpy.context.mode
+            result = original_call(op, *args, **kwargs)
+            profile.count('mode_set_calls')
+            if bpy.context.mode != mode_before:
+                profile.count('mode_switches')
+            return result
+
+        self._original_op_call = original_call
+        op_class.__call__ = counting_call
+
+    def _remove_hooks(self):
+        """移除计数钩子"""
+        if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+        if self._original_op_call is not None:
+            bpy.ops._BPyOpsSubModOp.__call__ = self._original_op_call
+            self._original_op_call = None
+
+    def count(self, counter: str):
+        """把计数累加到当前所有嵌套的阶段帧（包含式统计）"""
+        for frame in self.stack:
+            setattr(frame, counter, getattr(frame, counter) + 1)
+
+    # ---- 阶段计时 ----
+
+    def enter(self, rig, stage: str) -> _StageFrame:
+        """开始一次阶段方法调用"""
+        rig_type = _rig_type(rig)
+        self.seen_rigs.add(id(rig))
+        frame = _StageFrame(f"{rig_type}.{stage}", rig_type, stage)
+        self.stack.append(frame)
+        return frame
+
+    def exit(self, frame: _StageFrame):
+        """结束一次阶段方法调用并累加统计"""
+        elapsed = time.perf_counter() - frame.start
+        if self.stack and self.stack[-1] is frame:
+            self.stack.pop()
+        if self.stack:
+            self.stack[-1].child_time += elapsed
+
+        entry = self.stages.setdefault(frame.key, {
+            'name': frame.key,
+            'rig': frame.rig_type,
+            'stage': frame.stage,
+            'calls': 0,
+            'wall_time': 0.0,
+            'self_time': 0.0,
+            'depsgraph_updates': 0,
+            'mode_switches': 0,
+            'mode_set_calls': 0,
+        })
+        entry['calls'] += 1
+        entry['wall_time'] += elapsed
+        entry['self_time'] += elapsed - frame.child_time
+        entry['depsgraph_updates'] += frame.depsgraph_updates
+        entry['mode_switches'] += frame.mode_switches
+        entry['mode_set_calls'] += frame.mode_set_calls
+
+    def rig_finished(self, rig) -> bool:
+        """记录rig完成了finalize，所有被分析的rig都完成时返回True"""
+        self.finished_rigs.add(id(rig))
+        rig_list = getattr(self.generator, 'rig_list', None)
+        if rig_list is not None:
+            expected = {id(item) for item in rig_list if getattr(type(item), _PROFILED_MARKER, False)}
+        else:
+            expected = self.seen_rigs
+        return expected <= self.finished_rigs
+
+    # ---- 报告 ----
+
+    def to_dict(self, status: str = "complete") -> Dict[str, Any]:
+        """生成可序列化的报告"""
+        template_path, template_hash = _template_info(self.generator)
+        target = getattr(self.generator, 'obj', None)
+        return {
+            'format': PROFILE_FORMAT,
+            'version': PROFILE_VERSION,
+            'status': status,
+            'timestamp': self.started_at.isoformat(timespec='seconds'),
+            'addon_version': _addon_version(),
+            'blender_version': bpy.app.version_string,
+            'template_path': template_path,
+            'template_hash': template_hash,
+            'rig_object': target.name if target is not None else None,
+            'background': bool(bpy.app.background),
+            'total_wall_time': time.perf_counter() - self.start,
+            'stages': list(self.stages.values()),
+        }
+
+    def finish(self, status: str = "complete") -> Optional[str]:
+        """移除钩子，输出汇总表并写出JSON报告，返回报告路径"""
+        self._remove_hooks()
+        report = self.to_dict(status)
+
+        for line in format_profile_table(report).splitlines():
+            logger.info(line)
+
+        path = _resolve_output_path(report)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logger.info("📊 性能报告已写入: %s", path)
+            return path
+        except OSError as e:
+            logger.error("❌ 写入性能报告失败: %s", e)
+            return None
+
+
+def _on_depsgraph_update(scene, depsgraph=None):
+    """depsgraph_update_post 回调：计入当前阶段"""
+    if _session is not None and _session.stack:
+        _session.count('depsgraph_updates')
+
+
+def _addon_version() -> Optional[str]:
+    """插件版本号"""
+    try:
+        from ... import rigify_info
+        return ".".join(str(part) for part in rigify_info['version'])
+    except (ImportError, KeyError, TypeError):
+        return None
+
+
+def _template_info(generator=None):
+    """
+    模板文件路径和哈希
+
+    生成器上有模板会话时使用会话加载器实际使用的模板文件（如metarig中选择的模板），
+    没有会话时才回退到默认模板文件。
+    """
+    try:
+        from .faceup_utils import find_blend_template_file
+        from .template_snapshot import compute_template_hash
+        session = _find_template_session(generator)
+        if session is not None:
+            template_path = session.loader.template_path
+        else:
+            template_path = find_blend_template_file()
+        return template_path, compute_template_hash(template_path) if template_path else None
+    except Exception as e:
+        logger.debug("⚠ 无法获取模板信息: %s", e)
+        return None, None
+
+
+def _find_template_session(generator):
+    """生成器上已有的模板会话（不创建新会话），没有时返回None"""
+    plugin_map = getattr(generator, 'plugin_map', None)
+    if not plugin_map:
+        return None
+    from .template_session import TemplateSession
+    return plugin_map.get(TemplateSession)
+
+
+def _resolve_output_path(report: Dict[str, Any]) -> str:
+    """JSON报告的输出路径"""
+    output = _output_override or os.environ.get(PROFILE_OUTPUT_ENV, "")
+    if output.lower().endswith('.json'):
+        return bpy.path.abspath(output)
+
+    directory = bpy.path.abspath(output) if output else (bpy.app.tempdir or tempfile.gettempdir())
+    stamp = report['timestamp'].replace(':', '').replace('-', '')
+    name = bpy.path.clean_name(report['rig_object'] or "rig")
+    return os.path.join(directory, f"nebysse_profile_{name}_{stamp}.json")
+
+
+def format_profile_table(report: Dict[str, Any]) -> str:
+    """
+    把报告格式化为按阶段汇总的文本表格
+
+    Args:
+        report: GenerationProfile.to_dict() 或读取的JSON报告
+
+    Returns:
+        多行文本
+    """
+    total = report.get('total_wall_time') or 0.0
+    header = f"{'阶段':<52} {'次数':>4} {'总时间(s)':>10} {'自身(s)':>9} {'占比':>6} {'depsgraph':>9} {'模式切换':>8}"
+    lines = [
+        f"⏱️ === 生成性能分析 ({report.get('rig_object')}, 总耗时 {total:.3f}s) ===",
+        header,
+        "-" * len(header),
+    ]
+    for entry in report.get('stages', []):
+        share = entry['self_time'] / total * 100 if total > 0 else 0.0
+        lines.append(
+            f"{entry['name']:<52} {entry['calls']:>4} {entry['wall_time']:>10.3f} "
+            f"{entry['self_time']:>9.3f} {share:>5.1f}% {entry['depsgraph_updates']:>9} "
+            f"{entry['mode_switches']:>4}/{entry['mode_set_calls']:<3}"
+        )
+    lines.append(f"💡 模板: {report.get('template_hash')}  插件: {report.get('addon_version')}  "
+                 f"Blender: {report.get('blender_version')}")
+    return "\n".join(lines)
+
+
+def _get_session(rig) -> 'GenerationProfile':
+    """获取当前生成的统计会话（新的生成开始时创建）"""
+    global _session
+    generator = getattr(rig, 'generator', None)
+    if _session is not None and _session.generator is not generator:
+        # 上一次生成未正常结束（例如生成出错）
+        logger.warning("⚠ 上一次生成的性能分析未完成，输出部分报告")
+        _session.finish(status="incomplete")
+        _session = None
+    if _session is None:
+        _session = GenerationProfile(generator)
+    return _session
+
+
+def _finish_session():
+    """结束当前统计会话"""
+    global _session
+    session, _session = _session, None
+    if session is not None:
+        session.finish()
+
+
+def _wrap_stage(function, stage: str):
+    """包装阶段方法，未开启分析时直接调用原方法"""
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        if not is_profiling_enabled():
+            return function(self, *args, **kwargs)
+
+        session = _get_session(self)
+        frame = session.enter(self, stage)
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            session.exit(frame)
+            if stage == 'finalize' and not session.stack and session.rig_finished(self):
+                _finish_session()
+
+    setattr(wrapper, _PROFILED_MARKER, True)
+    return wrapper
+
+
+def profile_stages(*extra_methods: str):
+    """
+    类装饰器：为rig类的阶段方法加上性能统计
+
+    包装类中（包括继承自本插件基类的）Rigify标准阶段方法，以及 extra_methods 中
+    额外指定的方法（如 @stage 装饰的方法或阶段内部调用的重要步骤）。
+    Rigify按名称调用阶段方法，因此在类创建后替换属性不影响阶段注册。
+
+    Args:
+        extra_methods: 需要额外统计的方法名
+
+    Returns:
+        装饰器
+    """
+    def decorator(cls):
+        for name in STAGE_METHODS + tuple(extra_methods):
+            function = getattr(cls, name, None)
+            if function is None or getattr(function, _PROFILED_MARKER, False):
+                continue
+            # 跳过Rigify基类的空阶段方法；finalize始终包装，用于判断生成结束
+            if name != 'finalize' and getattr(function, '__module__', '').startswith('rigify'):
+                continue
+            setattr(cls, name, _wrap_stage(function, name))
+        setattr(cls, _PROFILED_MARKER, True)
+        return cls
+
+    return decorator
+
+
+def get_active_profile() -> Optional[GenerationProfile]:
+    """当前正在进行的统计会话（未开启或不在生成中时为None）"""
+    return _session
@@ -0,0 +1,202 @@
+"""
+ID重映射 - 应用模板数据时把模板中的ID一次性映射到生成结果中的ID
+
+每次加载（批量复制）只建立一次完整的 旧ID → 新ID 映射表：
+- 模板rig对象 → 正在生成的rig
+- 模板rig的骨架数据 → 生成的rig的骨架数据
+- 模板中的辅助对象和动作 → 本次追加得到的实际数据块（追加时被重命名也能对应上）
+
+创建约束和驱动器变量时直接查表设置目标，生成结果中不会留下指向模板数据的指针，
+也就不需要在生成后扫描并修复目标。被生成结果引用的加载器数据块会释放所有权，清理模板数据时保留。
+
+表外的名称只回退到 bpy.data 中来自模板的数据块（带所有权标记，或追加时记录了模板中的名称），
+恰好同名的用户数据不会被绑定；找不到时返回None并只警告一次。
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+import bpy
+
+from .template_ownership import find_marked_template_id, is_template_id, release_owned_id
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 驱动器目标 id_type → bpy.data 集合名称
+ID_TYPE_COLLECTIONS = {
+    'OBJECT': 'objects',
+    'ARMATURE': 'armatures',
+    'MESH': 'meshes',
+    'ACTION': 'actions',
+    'MATERIAL': 'materials',
+    'KEY': 'shape_keys',
+    'TEXT': 'texts',
+    'IMAGE': 'images',
+    'NODETREE': 'node_groups',
+    'COLLECTION': 'collections',
+    'SCENE': 'scenes',
+    'WORLD': 'worlds',
+    'CAMERA': 'cameras',
+    'LIGHT': 'lights',
+    'CURVE': 'curves',
+}
+
+
+def find_id(id_type: str, name: str):
+    """按类型和名称在 bpy.data 中查找数据块，不存在时返回None"""
+    collection = getattr(bpy.data, ID_TYPE_COLLECTIONS.get(id_type, ''), None)
+    if collection is None or not name:
+        return None
+    return collection.get(name)
+
+
+def find_template_id(id_type: str, name: str):
+    """
+    按模板中的名称查找来自模板的数据块（不遍历 bpy.data）
+
+    先查模板名称索引（加载器追加时记录，追加时被重命名也能找到），
+    再看同名数据块是否来自模板；同名的用户数据不返回。
+
+    Returns:
+        数据块，不存在时返回None
+    """
+    collection = getattr(bpy.data, ID_TYPE_COLLECTIONS.get(id_type, ''), None)
+    if collection is None or not name:
+        return None
+    datablock = find_marked_template_id(id_type, name)
+    if datablock is not None:
+        return datablock
+    datablock = collection.get(name)
+    if datablock is not None and is_template_id(datablock, name):
+        return datablock
+    return None
+
+
+class IDRemap:
+    """
+    旧ID → 新ID 映射表
+
+    同时按 session_uid（持有模板ID引用时，如faceup直接从模板rig复制）
+    和 (id_type, 名称)（快照中只有名称时）查找。
+    """
+
+    def __init__(self, target=None):
+        """
+        Args:
+            target: 接收模板数据的rig对象（用于判断映射表是否适用于当前rig）
+        """
+        self.target = target
+        self._by_uid: Dict[int, Any] = {}
+        self._by_name: Dict[Tuple[str, str], Any] = {}
+        self._missing: Set[Tuple[str, str]] = set()
+        self._adopted: Set[int] = set()
+
+    @classmethod
+    def for_template(cls, target_rig, template_rig=None, template_rig_names: Iterable[str] = (),
+                     template_data_names: Iterable[str] = ()) -> 'IDRemap':
+        """
+        建立模板rig → 目标rig的映射表
+
+        Args:
+            target_rig: 正在生成的rig对象
+            template_rig: 模板rig对象（使用预编译快照时为None）
+            template_rig_names: 快照中记录的模板rig名称
+            template_data_names: 快照中记录的模板骨架数据名称
+        """
+        remap = cls(target_rig)
+        if template_rig is not None:
+            remap.add(template_rig, target_rig)
+            if template_rig.data is not None and target_rig.data is not None:
+                remap.add(template_rig.data, target_rig.data)
+        for name in template_rig_names:
+            remap.add_name('OBJECT', name, target_rig)
+        if target_rig.data is not None:
+            for name in template_data_names:
+                remap.add_name(target_rig.data.id_type, name, target_rig.data)
+        return remap
+
+    def add(self, old_id, new_id):
+        """登记一对ID（同时按 session_uid 和名称）"""
+        self._by_uid[old_id.session_uid] = new_id
+        self._by_name[(old_id.id_type, old_id.name)] = new_id
+
+    def add_name(self, id_type: str, name: str, new_id):
+        """登记快照中的名称对应的ID（已登记的名称不覆盖）"""
+        if name and new_id is not None:
+            self._by_name.setdefault((id_type, name), new_id)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def remap(self, datablock):
+        """
+        映射一个ID引用
+
+        Returns:
+            映射后的ID；不在表中的ID原样返回（并保留，不随模板数据清理）
+        """
+        if datablock is None:
+            return None
+        mapped = self._by_uid.get(datablock.session_uid)
+        if mapped is None:
+            mapped = self._by_name.get((datablock.id_type, datablock.name), datablock)
+        self._adopt(mapped)
+        return mapped
+
+    def lookup(self, id_type: Optional[str], name: Optional[str]):
+        """
+        映射快照中按名称记录的ID引用
+
+        Args:
+            id_type: 驱动器目标的 id_type，None表示 'OBJECT'
+            name: 模板中的数据块名称
+
+        Returns:
+            映射后的ID，名称为空或找不到来自模板的数据块时返回None
+        """
+        if not name:
+            return None
+        key = (id_type or 'OBJECT', name)
+        mapped = self._by_name.get(key)
+        if mapped is None:
+            datablock = find_template_id(*key)
+            if datablock is None:
+                if key not in self._missing:
+                    self._missing.add(key)
+                    if find_id(*key) is not None:
+                        logger.warning("⚠ 模板引用的数据块缺失（同名的 %s '%s' 不是模板数据，不绑定）", key[0], name)
+                    else:
+                        logger.warning("⚠ 模板引用的数据块不存在: %s '%s'", key[0], name)
+                return None
+            # 名称回退找到的可能是模板rig本身（如追加时被重命名），仍按ID映射
+            mapped = self._by_uid.get(datablock.session_uid, datablock)
+            self._by_name[key] = mapped
+
+        self._adopt(mapped)
+        return mapped
+
+    def set_driver_target(self, variable, target, target_data: Dict[str, Any]):
+        """
+        按快照中的目标数据设置驱动器变量目标的 id_type 和 id
+
+        Args:
+            variable: 驱动器变量（只有 SINGLE_PROP 变量可以修改 id_type）
+            target: 变量目标
+            target_data: {'id_type', 'id', ...}
+        """
+        id_type = target_data.get('id_type')
+        if id_type and variable.type == 'SINGLE_PROP' and target.id_type != id_type:
+            target.id_type = id_type
+        if 'id' in target_data:
+            target.id = self.lookup(id_type, target_data['id'])
+        else:
+            # 旧格式数据没有记录目标ID，指向接收模板数据的rig
+            target.id = self.target
+
+    def _adopt(self, datablock):
+        """被生成结果引用的加载器数据块释放所有权，清理模板数据时保留（每个ID只处理一次）"""
+        session_uid = datablock.session_uid
+        if session_uid not in self._adopted:
+            self._adopted.add(session_uid)
+            release_owned_id(datablock)
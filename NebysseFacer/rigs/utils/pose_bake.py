@@ -0,0 +1,366 @@
+"""
+烘焙与剥离 - 把面部rig的求值结果烘焙为动作，渲染时只播放动画曲线
+
+动画定稿后，渲染农场的每一帧仍然要求值每张脸的整个驱动器网络。烘焙：
+
+1. 逐帧求值rig，读取 NebOffset 骨骼和它们驱动的rigify骨骼（COPY_TRANSFORMS 约束指向
+   NebOffset 骨骼的骨骼）的姿态矩阵，换算为局部变换
+2. 复制rig当前的动作（保留身体等其他骨骼的动画），替换这些骨骼的变换曲线，
+   每条曲线用 keyframe_points.foreach_set 一次写入全部关键帧
+3. 静音这些骨骼上的模板驱动器（变换通道和约束属性），停用它们的约束
+
+剥离采用静音/停用而不是删除，原来的状态写入rig对象的还原记录（下划线前缀的ID属性，JSON字符串），
+restore_face_rig 按记录恢复驱动器、约束和原动作。自定义属性上的驱动器不静音（可能被其他骨骼读取）。
+
+多个rig在同一次逐帧求值中采样（bake_face_rigs），场景每帧只求值一次。
+由操作器 nebysse.bake_face_rig / nebysse.restore_face_rig 或后台命令 tools/bake_face_rig.py 调用。
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import bpy
+
+from .driver_paths import CONSTRAINT_PROPERTY, TRANSFORM, escape_name, parse_data_path
+from ..neboffset_bones import NEBOFFSET_BONE_MAPPING
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# rig对象上的还原记录
+BAKE_RECORD_PROPERTY = "_nebysse_bake"
+
+# 烘焙动作的名称后缀
+BAKED_ACTION_SUFFIX = "_FaceBake"
+
+# 烘焙写入的变换通道
+_TRANSFORM_PROPERTIES = frozenset({
+    'location', 'rotation_quaternion', 'rotation_euler', 'rotation_axis_angle', 'scale',
+})
+
+
+def read_bake_record(rig) -> Optional[Dict[str, Any]]:
+    """读取rig的还原记录，未烘焙或记录损坏时返回None"""
+    raw = rig.get(BAKE_RECORD_PROPERTY)
+    if not isinstance(raw, str):
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def is_baked(rig) -> bool:
+    """rig是否已经烘焙（存在还原记录）"""
+    return read_bake_record(rig) is not None
+
+
+def find_bake_bones(rig) -> List[str]:
+    """
+    需要烘焙的骨骼：rig中存在的NebOffset骨骼，以及 COPY_TRANSFORMS 约束指向它们的rigify骨骼
+
+    Returns:
+        骨骼名称列表（按rig中的骨骼顺序）
+    """
+    neboffset_bones = {name for name in NEBOFFSET_BONE_MAPPING.values() if name in rig.pose.bones}
+
+    bones = []
+    for pose_bone in rig.pose.bones:
+        if pose_bone.name in neboffset_bones:
+            bones.append(pose_bone.name)
+            continue
+        for constraint in pose_bone.constraints:
+            if (constraint.type == 'COPY_TRANSFORMS' and constraint.target == rig
+                    and constraint.subtarget in neboffset_bones):
+                bones.append(pose_bone.name)
+                break
+    return bones
+
+
+def _rotation_channel(pose_bone):
+    """骨骼旋转模式对应的 (属性名, 通道数)"""
+    if pose_bone.rotation_mode == 'QUATERNION':
+        return 'rotation_quaternion', 4
+    if pose_bone.rotation_mode == 'AXIS_ANGLE':
+        return 'rotation_axis_angle', 4
+    return 'rotation_euler', 3
+
+
+def _sample_poses(bake_bones: Dict[Any, List[str]], scene,
+                  frames: List[int]) -> Dict[Any, Dict[str, Dict[str, List[List[float]]]]]:
+    """
+    逐帧求值场景，同时采样多个rig的骨骼局部变换（每帧只求值一次场景）
+
+    Args:
+        bake_bones: {rig对象: 骨骼名称列表}
+
+    Returns:
+        {rig对象: {骨骼名称: {属性名: [[通道0的值...], [通道1的值...], ...]}}}
+    """
+    samples = {}
+    sampled_bones = []
+    for rig, bone_names in bake_bones.items():
+        rig_samples = samples[rig] = {}
+        for bone_name in bone_names:
+            pose_bone = rig.pose.bones[bone_name]
+            rotation_property, rotation_channels = _rotation_channel(pose_bone)
+            bone_samples = rig_samples[bone_name] = {
+                'location': [[] for _ in range(3)],
+                rotation_property: [[] for _ in range(rotation_channels)],
+                'scale': [[] for _ in range(3)],
+            }
+            sampled_bones.append((rig, pose_bone, bone_samples, rotation_property))
+
+    previous_rotation = {}
+    for frame in frames:
+        scene.frame_set(frame)
+        for rig, pose_bone, bone_samples, rotation_property in sampled_bones:
+            # 与 bpy_extras.anim_utils 的烘焙相同：姿态空间矩阵换算为不带约束的局部变换
+            basis = rig.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix,
+                                      from_space='POSE', to_space='LOCAL')
+            location, quaternion, scale = basis.decompose()
+            previous = previous_rotation.get(pose_bone)
+
+            if pose_bone.rotation_mode == 'QUATERNION':
+                # 保持相邻帧四元数同号，避免插值时绕远路
+                if previous is not None:
+                    quaternion.make_compatible(previous)
+                rotation = quaternion
+            elif pose_bone.rotation_mode == 'AXIS_ANGLE':
+                axis, angle = quaternion.to_axis_angle()
+                rotation = (angle, *axis)
+            elif previous is not None:
+                # 与上一帧兼容的欧拉角，避免 ±180° 处跳变
+                rotation = quaternion.to_euler(pose_bone.rotation_mode, previous)
+            else:
+                rotation = quaternion.to_euler(pose_bone.rotation_mode)
+            previous_rotation[pose_bone] = rotation
+
+            for property_name, values in (('location', location), (rotation_property, rotation), ('scale', scale)):
+                for channel, value in zip(bone_samples[property_name], values):
+                    channel.append(value)
+
+    return samples
+
+
+def _write_fcurve(action, data_path: str, index: int, group: str, frames: List[float], values: List[float]):
+    """用 foreach_set 一次写入一条动画曲线的全部关键帧"""
+    fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+    fcurve.keyframe_points.add(len(frames))
+    fcurve.keyframe_points.foreach_set('co', [c for pair in zip(frames, values) for c in pair])
+    fcurve.update()
+
+
+def _is_baked_channel(path, bone_names) -> bool:
+    """数据路径是否为烘焙骨骼的变换通道"""
+    return path.bone in bone_names and path.kind == TRANSFORM and path.property in _TRANSFORM_PROPERTIES
+
+
+def mute_bone_evaluation(rig, bone_names: List[str]) -> Dict[str, List[list]]:
+    """
+    静音骨骼的变换和约束属性驱动器，停用骨骼的约束（骨骼之后只由局部变换决定）
+
+    Returns:
+        原状态 {'drivers': [[data_path, array_index, mute], ...],
+                'constraints': [[骨骼名称, 约束名称, enabled], ...]}，用于 restore_bone_evaluation
+    """
+    bone_set = set(bone_names)
+    muted_drivers = []
+    animation_data = rig.animation_data
+    for fcurve in animation_data.drivers if animation_data else ():
+        path = parse_data_path(fcurve.data_path, fcurve.array_index)
+        if _is_baked_channel(path, bone_set) or (path.bone in bone_set and path.kind == CONSTRAINT_PROPERTY):
+            muted_drivers.append([fcurve.data_path, fcurve.array_index, fcurve.mute])
+            fcurve.mute = True
+
+    disabled_constraints = []
+    for bone_name in bone_names:
+        for constraint in rig.pose.bones[bone_name].constraints:
+            disabled_constraints.append([bone_name, constraint.name, constraint.enabled])
+            constraint.enabled = False
+
+    return {'drivers': muted_drivers, 'constraints': disabled_constraints}
+
+
+def restore_bone_evaluation(rig, state: Dict[str, List[list]]) -> Tuple[int, int, int]:
+    """
+    按 mute_bone_evaluation 记录的原状态恢复驱动器和约束
+
+    Returns:
+        (恢复的驱动器数, 恢复的约束数, 已不存在的项数)
+    """
+    missing = 0
+    drivers_restored = 0
+    animation_data = rig.animation_data
+    for data_path, array_index, mute in state.get('drivers', []):
+        fcurve = animation_data.drivers.find(data_path, index=array_index) if animation_data else None
+        if fcurve is None:
+            missing += 1
+            continue
+        fcurve.mute = mute
+        drivers_restored += 1
+
+    constraints_restored = 0
+    for bone_name, constraint_name, enabled in state.get('constraints', []):
+        pose_bone = rig.pose.bones.get(bone_name)
+        constraint = pose_bone.constraints.get(constraint_name) if pose_bone else None
+        if constraint is None:
+            missing += 1
+            continue
+        constraint.enabled = enabled
+        constraints_restored += 1
+
+    return drivers_restored, constraints_restored, missing
+
+
+def bake_face_rigs(rigs, frame_start: int = None, frame_end: int = None, scene=None) -> List[Dict[str, Any]]:
+    """
+    烘焙多个面部rig并剥离模板驱动器和约束（所有rig在同一次逐帧求值中采样）
+
+    Args:
+        rigs: 生成的面部rig对象列表
+        frame_start: 起始帧，默认为场景起始帧
+        frame_end: 结束帧（包含），默认为场景结束帧
+        scene: 用于求值的场景，默认为当前场景
+
+    Returns:
+        每个rig的统计: {'rig', 'action', 'bones', 'frames', 'fcurves', 'drivers_muted',
+        'constraints_disabled', 'seconds'}，seconds 为整个批次的耗时
+
+    Raises:
+        RuntimeError: 帧范围无效，rig已经烘焙，或rig中没有可烘焙的骨骼
+    """
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    if frame_end < frame_start:
+        raise RuntimeError(f"帧范围无效: {frame_start} - {frame_end}")
+
+    from .pose_cache import is_pose_cached
+
+    bake_bones = {}
+    for rig in rigs:
+        if is_baked(rig):
+            raise RuntimeError(f"{rig.name} 已经烘焙，请先还原")
+        if is_pose_cached(rig):
+            raise RuntimeError(f"{rig.name} 正在播放姿态缓存，请先卸载")
+        bone_names = find_bake_bones(rig)
+        if not bone_names:
+            raise RuntimeError(f"{rig.name} 中没有可烘焙的NebOffset骨骼")
+        bake_bones[rig] = bone_names
+
+    start_time = time.perf_counter()
+    original_frame = scene.frame_current
+    frames = list(range(frame_start, frame_end + 1))
+    logger.info("🔥 烘焙 %s 个rig，帧 %s - %s", len(bake_bones), frame_start, frame_end)
+
+    try:
+        samples = _sample_poses(bake_bones, scene, frames)
+    finally:
+        scene.frame_set(original_frame)
+
+    frame_values = [float(frame) for frame in frames]
+    results = [_apply_bake(rig, bone_names, samples[rig], frame_values) for rig, bone_names in bake_bones.items()]
+
+    seconds = time.perf_counter() - start_time
+    for stats in results:
+        stats['seconds'] = seconds
+        logger.info("✅ 烘焙完成 %s: %s 条曲线，静音 %s 个驱动器，停用 %s 个约束",
+                    stats['rig'], stats['fcurves'], stats['drivers_muted'], stats['constraints_disabled'])
+    logger.info("⏱️ 烘焙耗时 %.2fs", seconds)
+    return results
+
+
+def bake_face_rig(rig, frame_start: int = None, frame_end: int = None, scene=None) -> Dict[str, Any]:
+    """烘焙单个面部rig（见 bake_face_rigs）"""
+    return bake_face_rigs([rig], frame_start, frame_end, scene)[0]
+
+
+def _apply_bake(rig, bone_names: List[str], samples, frame_values: List[float]) -> Dict[str, Any]:
+    """写入烘焙动作，静音驱动器、停用约束，并写出还原记录"""
+    # 复制原动作以保留其他骨骼的动画，替换烘焙骨骼的变换曲线
+    animation_data = rig.animation_data or rig.animation_data_create()
+    original_action = animation_data.action
+    if original_action is not None:
+        action = original_action.copy()
+        action.name = original_action.name + BAKED_ACTION_SUFFIX
+    else:
+        action = bpy.data.actions.new(rig.name + BAKED_ACTION_SUFFIX)
+    bone_set = set(bone_names)
+    for fcurve in list(action.fcurves):
+        if _is_baked_channel(parse_data_path(fcurve.data_path, fcurve.array_index), bone_set):
+            action.fcurves.remove(fcurve)
+
+    fcurve_count = 0
+    for bone_name in bone_names:
+        bone_path = f'pose.bones["{escape_name(bone_name)}"]'
+        for property_name, channels in samples[bone_name].items():
+            for index, values in enumerate(channels):
+                _write_fcurve(action, f"{bone_path}.{property_name}", index, bone_name, frame_values, values)
+                fcurve_count += 1
+
+    state = mute_bone_evaluation(rig, bone_names)
+    animation_data.action = action
+    rig[BAKE_RECORD_PROPERTY] = json.dumps({
+        'action': original_action.name if original_action is not None else None,
+        'baked_action': action.name,
+        'frame_range': [int(frame_values[0]), int(frame_values[-1])],
+        'bones': bone_names,
+        **state,
+    }, ensure_ascii=False)
+
+    return {
+        'rig': rig.name,
+        'action': action.name,
+        'bones': len(bone_names),
+        'frames': len(frame_values),
+        'fcurves': fcurve_count,
+        'drivers_muted': len(state['drivers']),
+        'constraints_disabled': len(state['constraints']),
+    }
+
+
+def restore_face_rig(rig, remove_baked_action: bool = True) -> Dict[str, Any]:
+    """
+    按还原记录恢复烘焙前的驱动器、约束和动作
+
+    Args:
+        rig: 已烘焙的面部rig对象
+        remove_baked_action: 烘焙动作没有其他使用者时删除
+
+    Returns:
+        统计: {'rig', 'action', 'drivers_restored', 'constraints_restored', 'missing'}
+
+    Raises:
+        RuntimeError: rig没有还原记录
+    """
+    record = read_bake_record(rig)
+    if record is None:
+        raise RuntimeError(f"{rig.name} 没有烘焙还原记录")
+
+    drivers_restored, constraints_restored, missing = restore_bone_evaluation(rig, record)
+
+    animation_data = rig.animation_data_create()
+    baked_action = bpy.data.actions.get(record.get('baked_action') or '')
+    original_action = bpy.data.actions.get(record['action']) if record.get('action') else None
+    if record.get('action') and original_action is None:
+        logger.warning("⚠ 找不到烘焙前的动作: %s", record['action'])
+        missing += 1
+    animation_data.action = original_action
+    if remove_baked_action and baked_action is not None and baked_action.users == 0:
+        bpy.data.actions.remove(baked_action)
+
+    del rig[BAKE_RECORD_PROPERTY]
+
+    if missing:
+        logger.warning("⚠ 还原 %s 时有 %s 项已不存在", rig.name, missing)
+    logger.info("♻️ 已还原 %s: %s 个驱动器，%s 个约束", rig.name, drivers_restored, constraints_restored)
+    return {
+        'rig': rig.name,
+        'action': original_action.name if original_action is not None else None,
+        'drivers_restored': drivers_restored,
+        'constraints_restored': constraints_restored,
+        'missing': missing,
+    }
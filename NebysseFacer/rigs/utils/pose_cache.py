@@ -0,0 +1,451 @@
+"""
+姿态缓存 - 把面部骨骼的逐帧局部变换写入float32文件，回放时从内存映射读取，不再求值驱动器
+
+布局和灯光审阅不需要实时的面部驱动器。写入器逐帧求值场景，记录每个rig的面部姿态骨骼
+（NebOffset骨骼和 Neb_ 前缀的面部骨骼，见 neboffset_bones.is_face_pose_bone）的局部变换；
+回放时 frame_change_pre 回调从文件的内存映射视图中取出当前帧，用 foreach_set 写入骨骼，
+这些骨骼上的驱动器被静音、约束被停用（与烘焙相同，见 pose_bake）。
+
+文件格式（小端序，每个rig一个 .nebpose 文件）：
+
+    头部     HEADER: 魔数 b"NEBPOSE1", 版本, 起始帧, 帧数, 骨骼数, 索引字节数
+    索引     UTF-8 JSON {'rig': rig名称, 'bones': [骨骼名称, ...]}，补齐到 DATA_ALIGNMENT 字节
+    数据     每帧 10 × 骨骼数 个float32: 全部骨骼的位置(3)、四元数(4)、缩放(3) 依次排列
+
+局部矩阵按 位置/四元数/缩放 存储（不含切变时无损），回放时三个通道各用一次 foreach_set，
+其他骨骼的通道原样写回（原始数组，往返无损）。缓存期间这些骨骼的旋转模式切换为四元数，卸载时恢复。
+回放只访问当前帧所在的页，几十张脸的镜头也不需要把缓存读入内存。
+回调都标记为 persistent；Feature Set 启用时 load_post 回调在打开文件后按rig上的记录自动恢复回放。
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import bpy
+
+from .pose_bake import is_baked, mute_bone_evaluation, restore_bone_evaluation
+from ..neboffset_bones import is_face_pose_bone
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+POSE_CACHE_MAGIC = b"NEBPOSE1"
+POSE_CACHE_VERSION = 1
+POSE_CACHE_EXTENSION = ".nebpose"
+
+# 魔数, 版本, 起始帧, 帧数, 骨骼数, 索引字节数
+HEADER = struct.Struct('<8sIiIII')
+DATA_ALIGNMENT = 64
+
+# 每个骨骼每帧的通道: (属性名, 通道数)，数据按通道分块存放
+CHANNELS = (('location', 3), ('rotation_quaternion', 4), ('scale', 3))
+FLOATS_PER_BONE = sum(size for _, size in CHANNELS)
+
+# rig对象上的缓存记录（缓存文件路径和被静音的驱动器/约束）
+POSE_CACHE_PROPERTY = "_nebysse_pose_cache"
+
+
+def _data_offset(index_size: int) -> int:
+    """数据区在文件中的偏移（对齐到 DATA_ALIGNMENT）"""
+    offset = HEADER.size + index_size
+    return (offset + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+
+def find_pose_cache_bones(rig) -> List[str]:
+    """rig中需要缓存的面部姿态骨骼（按rig中的骨骼顺序）"""
+    return [pose_bone.name for pose_bone in rig.pose.bones if is_face_pose_bone(pose_bone.name)]
+
+
+def pose_cache_path(directory: str, rig) -> str:
+    """rig在缓存目录中的缓存文件路径"""
+    return os.path.join(bpy.path.abspath(directory), bpy.path.clean_name(rig.name) + POSE_CACHE_EXTENSION)
+
+
+# ==================== 写入 ====================
+def write_pose_caches(rigs, directory: str, frame_start: int = None, frame_end: int = None,
+                      scene=None) -> List[Dict[str, Any]]:
+    """
+    逐帧求值场景，把每个rig的面部姿态骨骼局部变换写入缓存文件（所有rig共享同一次逐帧求值）
+
+    每帧求值后直接追加到文件，不在内存中累积。
+
+    Args:
+        rigs: 面部rig对象列表
+        directory: 缓存目录（支持 // 相对路径）
+        frame_start: 起始帧，默认为场景起始帧
+        frame_end: 结束帧（包含），默认为场景结束帧
+        scene: 用于求值的场景，默认为当前场景
+
+    Returns:
+        每个rig的统计: {'rig', 'path', 'bones', 'frames', 'bytes', 'seconds'}
+
+    Raises:
+        RuntimeError: 帧范围无效，rig正在回放缓存，或rig中没有面部姿态骨骼
+    """
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    if frame_end < frame_start:
+        raise RuntimeError(f"帧范围无效: {frame_start} - {frame_end}")
+
+    cache_bones = {}
+    for rig in rigs:
+        if is_pose_cached(rig):
+            raise RuntimeError(f"{rig.name} 正在回放姿态缓存，请先卸载")
+        bone_names = find_pose_cache_bones(rig)
+        if not bone_names:
+            raise RuntimeError(f"{rig.name} 中没有面部姿态骨骼")
+        cache_bones[rig] = bone_names
+
+    os.makedirs(bpy.path.abspath(directory), exist_ok=True)
+    start_time = time.perf_counter()
+    frame_count = frame_end - frame_start + 1
+    original_frame = scene.frame_current
+
+    writers = []
+    try:
+        for rig, bone_names in cache_bones.items():
+            path = pose_cache_path(directory, rig)
+            index = json.dumps({'rig': rig.name, 'bones': bone_names}, ensure_ascii=False).encode('utf-8')
+            cache_file = open(path, 'wb')
+            cache_file.write(HEADER.pack(POSE_CACHE_MAGIC, POSE_CACHE_VERSION, frame_start,
+                                         frame_count, len(bone_names), len(index)))
+            cache_file.write(index)
+            cache_file.write(b"\0" * (_data_offset(len(index)) - HEADER.size - len(index)))
+            pose_bones = [rig.pose.bones[name] for name in bone_names]
+            writers.append((rig, path, cache_file, pose_bones, {}))
+
+        logger.info("💾 写入姿态缓存: %s 个rig，帧 %s - %s", len(writers), frame_start, frame_end)
+        for frame in range(frame_start, frame_end + 1):
+            scene.frame_set(frame)
+            for rig, path, cache_file, pose_bones, previous_rotation in writers:
+                blocks = {name: array('f') for name, _ in CHANNELS}
+                for pose_bone in pose_bones:
+                    # 姿态空间矩阵换算为不带约束的局部变换（与烘焙相同）
+                    basis = rig.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix,
+                                              from_space='POSE', to_space='LOCAL')
+                    location, quaternion, scale = basis.decompose()
+                    # 保持相邻帧四元数同号
+                    previous = previous_rotation.get(pose_bone.name)
+                    if previous is not None:
+                        quaternion.make_compatible(previous)
+                    previous_rotation[pose_bone.name] = quaternion
+                    blocks['location'].extend(location)
+                    blocks['rotation_quaternion'].extend(quaternion)
+                    blocks['scale'].extend(scale)
+                for name, _ in CHANNELS:
+                    blocks[name].tofile(cache_file)
+    finally:
+        for _, _, cache_file, _, _ in writers:
+            cache_file.close()
+        scene.frame_set(original_frame)
+
+    seconds = time.perf_counter() - start_time
+    results = []
+    for rig, path, _, pose_bones, _ in writers:
+        results.append({
+            'rig': rig.name,
+            'path': path,
+            'bones': len(pose_bones),
+            'frames': frame_count,
+            'bytes': os.path.getsize(path),
+            'seconds': seconds,
+        })
+        logger.info("✅ %s: %s 个骨骼 × %s 帧 -> %s", rig.name, len(pose_bones), frame_count, path)
+    logger.info("⏱️ 写入耗时 %.2fs", seconds)
+    return results
+
+
+# ==================== 读取 ====================
+class PoseCacheReader:
+    """姿态缓存文件的内存映射视图"""
+
+    def __init__(self, path: str):
+        """
+        打开缓存文件并映射到内存（只读，按需换页）
+
+        Raises:
+            ValueError: 文件不是姿态缓存、版本不支持或数据不完整
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"姿态缓存文件为空: {path}")
+
+        try:
+            magic, version, self.frame_start, self.frame_count, self.bone_count, index_size = \
+                HEADER.unpack_from(self._mmap, 0)
+            if magic != POSE_CACHE_MAGIC:
+                raise ValueError(f"不是姿态缓存文件: {path}")
+            if version != POSE_CACHE_VERSION:
+                raise ValueError(f"不支持的姿态缓存版本 {version}: {path}")
+
+            index = json.loads(self._mmap[HEADER.size:HEADER.size + index_size].decode('utf-8'))
+            self.rig_name = index['rig']
+            self.bone_names = index['bones']
+
+            data_offset = _data_offset(index_size)
+            self.frame_floats = FLOATS_PER_BONE * self.bone_count
+            data_size = self.frame_count * self.frame_floats * 4
+            if len(self._mmap) < data_offset + data_size:
+                raise ValueError(f"姿态缓存文件不完整: {path}")
+        except (struct.error, ValueError, KeyError):
+            self.close()
+            raise
+
+        self._bytes = memoryview(self._mmap)[data_offset:data_offset + data_size]
+        self._floats = self._bytes.cast('f')
+
+    @property
+    def frame_end(self) -> int:
+        return self.frame_start + self.frame_count - 1
+
+    def frame_view(self, frame: int) -> memoryview:
+        """一帧的数据（不复制），超出范围时使用最近的首帧/尾帧"""
+        frame = min(max(frame, self.frame_start), self.frame_end)
+        offset = (frame - self.frame_start) * self.frame_floats
+        return self._floats[offset:offset + self.frame_floats]
+
+    def close(self):
+        """释放内存映射和文件"""
+        for view in (getattr(self, '_floats', None), getattr(self, '_bytes', None)):
+            if view is not None:
+                view.release()
+        self._floats = self._bytes = None
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+class _RigPlayback:
+    """一个rig的缓存回放：缓存骨骼到姿态骨骼的连续区段映射和通道缓冲区"""
+
+    def __init__(self, rig, reader: PoseCacheReader):
+        self.rig_name = rig.name
+        self.reader = reader
+
+        bone_indices = {pose_bone.name: i for i, pose_bone in enumerate(rig.pose.bones)}
+        missing = [name for name in reader.bone_names if name not in bone_indices]
+        if missing:
+            logger.warning("⚠ %s 中缺少 %s 个缓存骨骼（如 %s），这些骨骼不回放", rig.name, len(missing), missing[0])
+
+        # 合并缓存和rig中都连续的骨骼为区段: (rig骨骼起点, 缓存骨骼起点, 数量)
+        self.runs: List[Tuple[int, int, int]] = []
+        for cache_index, name in enumerate(reader.bone_names):
+            bone_index = bone_indices.get(name)
+            if bone_index is None:
+                continue
+            if self.runs:
+                run_bone, run_cache, count = self.runs[-1]
+                if run_bone + count == bone_index and run_cache + count == cache_index:
+                    self.runs[-1] = (run_bone, run_cache, count + 1)
+                    continue
+            self.runs.append((bone_index, cache_index, 1))
+
+        bone_count = len(rig.pose.bones)
+        self.buffers = {name: array('f', bytes(4 * size * bone_count)) for name, size in CHANNELS}
+
+    def apply(self, rig, frame: int):
+        """把一帧缓存写入rig的姿态骨骼"""
+        pose_bones = rig.pose.bones
+        frame_data = self.reader.frame_view(frame)
+        block_start = 0
+        for name, size in CHANNELS:
+            buffer = self.buffers[name]
+            # 先读回全部骨骼的当前值，只覆盖缓存骨骼，其他骨骼原样写回
+            pose_bones.foreach_get(name, buffer)
+            view = memoryview(buffer)
+            for bone_start, cache_start, count in self.runs:
+                source = block_start + cache_start * size
+                view[bone_start * size:(bone_start + count) * size] = frame_data[source:source + count * size]
+            view.release()
+            pose_bones.foreach_set(name, buffer)
+            block_start += size * self.reader.bone_count
+        frame_data.release()
+        rig.update_tag(refresh={'DATA'})
+
+
+# 正在回放的rig: {rig名称: _RigPlayback}
+_playbacks: Dict[str, _RigPlayback] = {}
+
+
+def read_pose_cache_record(rig) -> Optional[Dict[str, Any]]:
+    """读取rig的缓存记录，未挂载或记录损坏时返回None"""
+    raw = rig.get(POSE_CACHE_PROPERTY)
+    if not isinstance(raw, str):
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def is_pose_cached(rig) -> bool:
+    """rig是否挂载了姿态缓存（驱动器已静音，骨骼由缓存驱动）"""
+    return read_pose_cache_record(rig) is not None
+
+
+def apply_pose_caches(frame: int):
+    """把所有正在回放的缓存的指定帧写入对应rig"""
+    for rig_name, playback in list(_playbacks.items()):
+        rig = bpy.data.objects.get(rig_name)
+        # 每帧只检查记录是否存在，不解析JSON
+        if rig is None or POSE_CACHE_PROPERTY not in rig:
+            # rig已被删除、改名、卸载缓存或打开了其他文件
+            _close_playback(rig_name)
+            continue
+        playback.apply(rig, frame)
+
+
+@bpy.app.handlers.persistent
+def _on_frame_change_pre(scene, depsgraph=None):
+    apply_pose_caches(scene.frame_current)
+
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    # 旧文件的回放全部关闭，再按新文件中的记录重新挂载
+    for rig_name in list(_playbacks):
+        _close_playback(rig_name)
+    resume_pose_caches()
+
+
+def _close_playback(rig_name: str):
+    playback = _playbacks.pop(rig_name, None)
+    if playback is not None:
+        playback.reader.close()
+    if not _playbacks and _on_frame_change_pre in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(_on_frame_change_pre)
+
+
+def _open_playback(rig, path: str) -> _RigPlayback:
+    _close_playback(rig.name)
+    playback = _RigPlayback(rig, PoseCacheReader(path))
+    _playbacks[rig.name] = playback
+    if _on_frame_change_pre not in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.append(_on_frame_change_pre)
+    return playback
+
+
+def attach_pose_cache(rig, path: str = None) -> Dict[str, Any]:
+    """
+    挂载姿态缓存：静音缓存骨骼的驱动器、停用约束、旋转模式切换为四元数，之后每帧从缓存回放
+
+    rig已经挂载时（如重新打开文件后）只按记录重新打开缓存文件，不重复静音。
+
+    Args:
+        rig: 面部rig对象
+        path: 缓存文件路径（已挂载时忽略），保存的 .blend 中记录为相对路径
+
+    Returns:
+        统计: {'rig', 'path', 'bones', 'frame_range', 'drivers_muted', 'constraints_disabled'}
+
+    Raises:
+        RuntimeError: rig已经烘焙，或没有指定缓存文件
+        OSError, ValueError: 缓存文件无法打开或无效
+    """
+    record = read_pose_cache_record(rig)
+    if record is not None:
+        path = record['path']
+    elif is_baked(rig):
+        raise RuntimeError(f"{rig.name} 已经烘焙，请先还原")
+    elif not path:
+        raise RuntimeError(f"{rig.name} 没有指定姿态缓存文件")
+    elif bpy.data.filepath:
+        path = bpy.path.relpath(bpy.path.abspath(path))
+
+    playback = _open_playback(rig, bpy.path.abspath(path))
+    reader = playback.reader
+    if reader.rig_name != rig.name:
+        logger.warning("⚠ 缓存文件记录的rig为 %s，挂载到 %s", reader.rig_name, rig.name)
+
+    if record is None:
+        bone_names = [name for name in reader.bone_names if name in rig.pose.bones]
+        record = {'path': path, **mute_bone_evaluation(rig, bone_names), 'rotation_modes': []}
+        for name in bone_names:
+            pose_bone = rig.pose.bones[name]
+            if pose_bone.rotation_mode != 'QUATERNION':
+                record['rotation_modes'].append([name, pose_bone.rotation_mode])
+                pose_bone.rotation_mode = 'QUATERNION'
+        rig[POSE_CACHE_PROPERTY] = json.dumps(record, ensure_ascii=False)
+
+    playback.apply(rig, bpy.context.scene.frame_current)
+    logger.info("📼 %s 挂载姿态缓存: %s（帧 %s - %s）", rig.name, path, reader.frame_start, reader.frame_end)
+    return {
+        'rig': rig.name,
+        'path': path,
+        'bones': reader.bone_count,
+        'frame_range': (reader.frame_start, reader.frame_end),
+        'drivers_muted': len(record['drivers']),
+        'constraints_disabled': len(record['constraints']),
+    }
+
+
+def resume_pose_caches() -> List[Dict[str, Any]]:
+    """重新打开文件中所有已挂载rig的缓存（打开 .blend 后回调和内存映射需要重新建立）"""
+    results = []
+    for obj in bpy.data.objects:
+        if obj.type == 'ARMATURE' and is_pose_cached(obj):
+            try:
+                results.append(attach_pose_cache(obj, None))
+            except (OSError, ValueError) as e:
+                logger.error("❌ 无法重新打开 %s 的姿态缓存: %s", obj.name, e)
+    return results
+
+
+def detach_pose_cache(rig) -> Dict[str, Any]:
+    """
+    卸载姿态缓存：停止回放，恢复驱动器、约束和旋转模式
+
+    Returns:
+        统计: {'rig', 'drivers_restored', 'constraints_restored', 'missing'}
+
+    Raises:
+        RuntimeError: rig没有挂载姿态缓存
+    """
+    record = read_pose_cache_record(rig)
+    if record is None:
+        raise RuntimeError(f"{rig.name} 没有挂载姿态缓存")
+
+    _close_playback(rig.name)
+    drivers_restored, constraints_restored, missing = restore_bone_evaluation(rig, record)
+    for name, rotation_mode in record.get('rotation_modes', []):
+        pose_bone = rig.pose.bones.get(name)
+        if pose_bone is not None:
+            pose_bone.rotation_mode = rotation_mode
+    del rig[POSE_CACHE_PROPERTY]
+    rig.update_tag(refresh={'DATA'})
+
+    logger.info("⏏️ %s 已卸载姿态缓存: 恢复 %s 个驱动器，%s 个约束", rig.name, drivers_restored, constraints_restored)
+    return {
+        'rig': rig.name,
+        'drivers_restored': drivers_restored,
+        'constraints_restored': constraints_restored,
+        'missing': missing,
+    }
+
+
+def register_handlers():
+    """注册打开文件后恢复回放的 load_post 回调（Feature Set 注册时调用）"""
+    if _on_load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister_handlers():
+    """停止所有回放并移除 frame_change_pre / load_post 回调（Feature Set 注销时调用）"""
+    for rig_name in list(_playbacks):
+        _close_playback(rig_name)
+    if _on_frame_change_pre in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(_on_frame_change_pre)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
@@ -0,0 +1,353 @@
+"""
+驱动器与约束依赖图 - 分析生成的面部rig中的依赖环、求值链和热点
+
+生成的rig把三类依赖组合在一起：
+- Neb_face-root 自定义属性上的模板驱动器
+- NebOffset 骨骼上的驱动器
+- rigify骨骼 → NebOffset骨骼 的 COPY_TRANSFORMS 约束
+
+本模块从生成的rig建立完整的依赖图（边表示 “被依赖者 → 依赖者”）：
+
+    属性 → 驱动器 → 骨骼/属性/约束 → 骨骼 → 子骨骼
+
+并报告：
+- 依赖环（Tarjan强连通分量）
+- 最长求值链（环缩点后的最长路径）
+- 扇入热点（被最多节点依赖的输入和依赖最多输入的节点）
+- 每个骨骼上仍需Python求值的驱动器数量
+
+依赖以骨骼为粒度（不区分局部/世界空间），报告的环是潜在环，需要结合 depsgraph 警告确认。
+由操作器 nebysse.analyze_rig_graph 或后台命令 tools/analyze_rig_graph.py 调用。
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .driver_expressions import analyze_expression
+from .driver_paths import CONSTRAINT_PROPERTY, CUSTOM_PROPERTY, escape_name, parse_data_path
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 节点类型
+BONE = 'BONE'
+PROPERTY = 'PROPERTY'
+DRIVER = 'DRIVER'
+CONSTRAINT = 'CONSTRAINT'
+EXTERNAL = 'EXTERNAL'
+
+# 变换类驱动器变量（目标为骨骼变换，而不是数据路径）
+TRANSFORM_VARIABLE_TYPES = frozenset({'TRANSFORMS', 'ROTATION_DIFF', 'LOC_DIFF'})
+
+
+def bone_node(bone: str) -> str:
+    return f'pose.bones["{escape_name(bone)}"]'
+
+
+def property_node(bone: Optional[str], name: str) -> str:
+    prefix = bone_node(bone) if bone is not None else ''
+    return f'{prefix}["{escape_name(name)}"]'
+
+
+def constraint_node(bone: str, name: str) -> str:
+    return f'{bone_node(bone)}.constraints["{escape_name(name)}"]'
+
+
+def driver_node(data_path: str, array_index: int) -> str:
+    return f'driver:{data_path}[{array_index}]'
+
+
+def external_node(datablock) -> str:
+    return f'{getattr(datablock, "id_type", "ID")}:{datablock.name}'
+
+
+class RigGraph:
+    """依赖图：节点为字符串标签，边为 被依赖者 → 依赖者"""
+
+    def __init__(self, rig_name: str = ''):
+        self.rig_name = rig_name
+        self.kinds: Dict[str, str] = {}
+        self.edges: Dict[str, Set[str]] = defaultdict(set)
+        # 驱动器节点 → (所在骨骼, 是否需要Python求值, 表达式, 原因)
+        self.drivers: Dict[str, Tuple[Optional[str], bool, str, Optional[str]]] = {}
+
+    def add_node(self, node: str, kind: str) -> str:
+        self.kinds.setdefault(node, kind)
+        return node
+
+    def add_edge(self, source: str, target: str):
+        self.edges[source].add(target)
+
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.edges.values())
+
+    def fan_in(self) -> Dict[str, int]:
+        """每个节点的输入数量"""
+        counts: Dict[str, int] = defaultdict(int)
+        for targets in self.edges.values():
+            for target in targets:
+                counts[target] += 1
+        return counts
+
+
+# ==================== 建图 ====================
+
+def _path_node(graph: RigGraph, data_path: str, array_index: int = 0) -> str:
+    """rig自身上的数据路径对应的节点（属性、约束或骨骼）"""
+    path = parse_data_path(data_path, array_index)
+    if path.kind == CUSTOM_PROPERTY:
+        return graph.add_node(property_node(path.bone, path.property), PROPERTY)
+    if path.kind == CONSTRAINT_PROPERTY:
+        return graph.add_node(constraint_node(path.bone, path.constraint), CONSTRAINT)
+    if path.bone is not None:
+        return graph.add_node(bone_node(path.bone), BONE)
+    # 对象级的变换等属性
+    return graph.add_node(f'object:{data_path}', PROPERTY)
+
+
+def _target_nodes(graph: RigGraph, rig, variable) -> Iterable[str]:
+    """驱动器变量读取的节点"""
+    for target in variable.targets:
+        datablock = target.id
+        if variable.type in TRANSFORM_VARIABLE_TYPES:
+            if datablock == rig and target.bone_target:
+                yield graph.add_node(bone_node(target.bone_target), BONE)
+            elif datablock is not None:
+                yield graph.add_node(external_node(datablock), EXTERNAL)
+        elif variable.type == 'SINGLE_PROP' and datablock is not None:
+            if datablock == rig and target.data_path:
+                yield _path_node(graph, target.data_path)
+            else:
+                yield graph.add_node(external_node(datablock), EXTERNAL)
+
+
+def _constraint_targets(constraint) -> Iterable[Tuple[Any, str]]:
+    """约束的 (目标对象, 子目标骨骼)"""
+    for attr, sub_attr in (('target', 'subtarget'), ('pole_target', 'pole_subtarget')):
+        target = getattr(constraint, attr, None)
+        if target is not None:
+            yield target, getattr(constraint, sub_attr, '')
+    # ARMATURE 约束的多个目标
+    for target in getattr(constraint, 'targets', ()) or ():
+        if getattr(target, 'target', None) is not None:
+            yield target.target, getattr(target, 'subtarget', '')
+
+
+def build_rig_graph(rig) -> RigGraph:
+    """
+    从生成的rig对象建立驱动器和约束依赖图
+
+    Args:
+        rig: 骨架对象
+
+    Returns:
+        RigGraph
+    """
+    graph = RigGraph(rig.name)
+
+    # 骨骼层级和约束
+    for pose_bone in rig.pose.bones:
+        bone = graph.add_node(bone_node(pose_bone.name), BONE)
+        if pose_bone.parent is not None:
+            graph.add_edge(graph.add_node(bone_node(pose_bone.parent.name), BONE), bone)
+
+        for constraint in pose_bone.constraints:
+            node = graph.add_node(constraint_node(pose_bone.name, constraint.name), CONSTRAINT)
+            graph.add_edge(node, bone)
+            for target, subtarget in _constraint_targets(constraint):
+                if target == rig and subtarget:
+                    source = graph.add_node(bone_node(subtarget), BONE)
+                elif target == rig:
+                    continue
+                else:
+                    source = graph.add_node(external_node(target), EXTERNAL)
+                graph.add_edge(source, node)
+
+    # 驱动器
+    animation_data = rig.animation_data
+    for fcurve in (animation_data.drivers if animation_data else ()):
+        driver = fcurve.driver
+        node = graph.add_node(driver_node(fcurve.data_path, fcurve.array_index), DRIVER)
+        graph.add_edge(node, _path_node(graph, fcurve.data_path, fcurve.array_index))
+
+        for variable in driver.variables:
+            for source in _target_nodes(graph, rig, variable):
+                graph.add_edge(source, node)
+
+        analysis = analyze_expression(driver.expression, tuple(var.name for var in driver.variables),
+                                      driver.type, getattr(driver, 'use_self', False))
+        graph.drivers[node] = (parse_data_path(fcurve.data_path).bone, analysis.needs_python,
+                               driver.expression, analysis.reason)
+
+    logger.debug("🕸️ 依赖图: %s 个节点, %s 条边", len(graph.kinds), graph.edge_count())
+    return graph
+
+
+# ==================== 分析 ====================
+
+def strongly_connected_components(graph: RigGraph) -> List[List[str]]:
+    """
+    Tarjan强连通分量（迭代实现，深层rig不会触发递归上限）
+
+    Returns:
+        分量列表，按逆拓扑顺序（依赖者在前）
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    counter = 0
+
+    for root in graph.kinds:
+        if root in index_of:
+            continue
+        work = [(root, iter(graph.edges.get(root, ())))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def find_cycles(graph: RigGraph, components: List[List[str]] = None) -> List[List[str]]:
+    """依赖环（多于一个节点的强连通分量，或自环）"""
+    if components is None:
+        components = strongly_connected_components(graph)
+    return [sorted(component) for component in components
+            if len(component) > 1 or component[0] in graph.edges.get(component[0], ())]
+
+
+def longest_chain(graph: RigGraph, components: List[List[str]] = None) -> List[str]:
+    """
+    最长求值链（环缩成一个节点后的最长路径）
+
+    Returns:
+        链上的节点（每个环取一个代表节点），从输入到输出
+    """
+    if components is None:
+        components = strongly_connected_components(graph)
+    component_of = {node: i for i, component in enumerate(components) for node in component}
+
+    # Tarjan按逆拓扑顺序输出分量：依赖者先完成，因此正序遍历时后继的深度已经确定
+    depth = [1] * len(components)
+    successor: List[Optional[int]] = [None] * len(components)
+    for i, component in enumerate(components):
+        for node in component:
+            for target in graph.edges.get(node, ()):
+                j = component_of[target]
+                if j != i and depth[j] + 1 > depth[i]:
+                    depth[i] = depth[j] + 1
+                    successor[i] = j
+
+    if not components:
+        return []
+    current: Optional[int] = max(range(len(components)), key=depth.__getitem__)
+    chain = []
+    while current is not None:
+        chain.append(components[current][0])
+        current = successor[current]
+    return chain
+
+
+def analyze_rig_graph(rig, limit: int = 10) -> Dict[str, Any]:
+    """
+    分析生成的rig的依赖图
+
+    Args:
+        rig: 骨架对象
+        limit: 热点和骨骼列表的最大条数
+
+    Returns:
+        {'rig', 'nodes', 'edges', 'node_kinds', 'cycles', 'longest_chain', 'chain_depth',
+         'fan_in_hotspots', 'fan_out_hotspots', 'python_drivers_per_bone', 'python_drivers', 'drivers'}
+    """
+    graph = build_rig_graph(rig)
+    components = strongly_connected_components(graph)
+    chain = longest_chain(graph, components)
+
+    fan_in = graph.fan_in()
+    fan_out = {node: len(targets) for node, targets in graph.edges.items()}
+
+    python_per_bone: Dict[str, int] = defaultdict(int)
+    python_drivers = []
+    for node, (bone, needs_python, expression, reason) in graph.drivers.items():
+        if needs_python:
+            python_per_bone[bone or rig.name] += 1
+            python_drivers.append((node, expression, reason))
+
+    node_kinds: Dict[str, int] = defaultdict(int)
+    for kind in graph.kinds.values():
+        node_kinds[kind] += 1
+
+    def top(counts: Dict[str, int]) -> List[Tuple[str, int]]:
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    return {
+        'rig': rig.name,
+        'nodes': len(graph.kinds),
+        'edges': graph.edge_count(),
+        'node_kinds': dict(node_kinds),
+        'drivers': len(graph.drivers),
+        'cycles': find_cycles(graph, components),
+        'longest_chain': chain,
+        'chain_depth': len(chain),
+        # 被最多节点依赖的输入（改动影响面最大）
+        'fan_out_hotspots': top(fan_out),
+        # 依赖最多输入的节点（求值时等待最多）
+        'fan_in_hotspots': top(fan_in),
+        'python_drivers_per_bone': top(python_per_bone),
+        'python_drivers': python_drivers,
+    }
+
+
+def log_graph_report(report: Dict[str, Any], limit: int = 10):
+    """把 analyze_rig_graph 的报告写入日志"""
+    logger.info("🕸️ 依赖图 %s: %s 个节点, %s 条边, %s 个驱动器, 最长求值链 %s",
+                report['rig'], report['nodes'], report['edges'], report['drivers'], report['chain_depth'])
+
+    for cycle in report['cycles'][:limit]:
+        logger.warning("  🔁 依赖环（%s 个节点）: %s", len(cycle), ", ".join(cycle[:8]))
+    if not report['cycles']:
+        logger.info("  ✓ 没有依赖环")
+
+    logger.info("  ⛓️ 最长求值链: %s", " → ".join(report['longest_chain']))
+    for node, count in report['fan_in_hotspots'][:limit]:
+        logger.info("  📥 扇入 %s: %s", count, node)
+    for node, count in report['fan_out_hotspots'][:limit]:
+        logger.info("  📤 扇出 %s: %s", count, node)
+    for bone, count in report['python_drivers_per_bone'][:limit]:
+        logger.warning("  🐍 %s: %s 个驱动器需要Python求值", bone, count)
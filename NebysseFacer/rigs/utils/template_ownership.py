@@ -0,0 +1,307 @@
+"""
+模板数据块所有权 - 标记加载器追加的ID并精确清理
+
+加载器每次追加模板（一次加载会话）都会：
+- 在追加前记录 session_uid 水位（新建的ID的 session_uid 总是更大）
+- 从追加的对象和动作出发遍历依赖（骨架/网格数据、材质、自定义形状、约束目标和动作、驱动器目标），
+  只收集水位之后新建的ID，写入所有权标记属性（值为加载会话ID）并登记
+- 清理时只删除登记（或带标记）的ID，通过一次 bpy.data.batch_remove 完成
+
+不再按名称子串（"FaceUP_Tem" 等）扫描 bpy.data 猜测模板数据，也不会删除恰好同名的用户数据。
+被生成的rig采用的数据块（如ACTION约束使用的动作）通过 release_owned_id 释放所有权，清理时保留。
+按名称追加的数据块另外记录模板中的名称（mark_template_name），按名称查找模板数据时只接受这些数据块。
+"""
+
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import bpy
+
+from .template_registry import unregister_template_rig
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+# ID上的所有权标记属性，值为加载会话ID
+OWNER_PROPERTY = "nebysse_template_owner"
+
+# 加载器按名称追加的数据块上记录的模板中的名称（追加时可能被重命名），释放所有权后仍保留，
+# 供之后的生成按模板名称找回，而不是绑定到恰好同名的用户数据
+TEMPLATE_NAME_PROPERTY = "nebysse_template_name"
+
+# 用于读取 session_uid 水位的临时文本数据块名称
+_PROBE_NAME = ".nebysse_uid_probe"
+
+# {加载会话ID: [(ID, session_uid), ...]}
+_owned_by_session: Dict[str, List[Tuple[object, int]]] = {}
+
+# 记录了模板名称的数据块索引：{(id_type, 模板中的名称): (ID, session_uid)}，按名称查找时不遍历 bpy.data
+_ids_by_template_name: Dict[Tuple[str, str], Tuple[object, int]] = {}
+
+
+def new_load_session() -> str:
+    """生成新的加载会话ID"""
+    return uuid.uuid4().hex[:12]
+
+
+def session_uid_watermark() -> int:
+    """
+    当前会话中最新ID的 session_uid
+
+    session_uid 单调递增，之后新建（包括追加）的ID都大于此值。
+    """
+    probe = bpy.data.texts.new(_PROBE_NAME)
+    try:
+        return probe.session_uid
+    finally:
+        bpy.data.texts.remove(probe)
+
+
+def _is_alive(datablock, session_uid: int) -> bool:
+    try:
+        return datablock.session_uid == session_uid
+    except ReferenceError:
+        return False
+
+
+def _animation_references(datablock) -> Iterable:
+    """动画数据引用的ID：当前动作和驱动器变量目标"""
+    animation_data = getattr(datablock, 'animation_data', None)
+    if not animation_data:
+        return
+    if animation_data.action:
+        yield animation_data.action
+    for fcurve in animation_data.drivers:
+        for variable in fcurve.driver.variables:
+            for target in variable.targets:
+                if target.id:
+                    yield target.id
+
+
+def _constraint_references(constraints) -> Iterable:
+    for constraint in constraints:
+        for attribute in ('target', 'action'):
+            value = getattr(constraint, attribute, None)
+            if value is not None:
+                yield value
+
+
+def _id_references(datablock) -> Iterable:
+    """一个ID直接引用的其他ID"""
+    yield from _animation_references(datablock)
+
+    if isinstance(datablock, bpy.types.Object):
+        if datablock.data is not None:
+            yield datablock.data
+        if datablock.parent is not None:
+            yield datablock.parent
+        for slot in getattr(datablock, 'material_slots', ()):
+            if slot.material:
+                yield slot.material
+        yield from _constraint_references(datablock.constraints)
+        if datablock.pose:
+            for pose_bone in datablock.pose.bones:
+                if pose_bone.custom_shape:
+                    yield pose_bone.custom_shape
+                yield from _constraint_references(pose_bone.constraints)
+        return
+
+    for material in getattr(datablock, 'materials', ()) or ():
+        if material:
+            yield material
+
+    node_tree = getattr(datablock, 'node_tree', None)
+    if node_tree:
+        yield from _animation_references(node_tree)
+        for node in node_tree.nodes:
+            image = getattr(node, 'image', None)
+            if image is not None:
+                yield image
+
+
+def collect_dependencies(roots: Iterable, accept: Callable[[object], bool]) -> List[object]:
+    """
+    从根ID出发遍历依赖，收集满足 accept 的ID（不满足的ID不再向下遍历）
+
+    Args:
+        roots: 根ID（追加的对象和动作）
+        accept: 判断ID是否属于本次加载
+
+    Returns:
+        按发现顺序排列的ID列表
+    """
+    collected = []
+    seen = set()
+    pending = [root for root in roots if root is not None]
+    while pending:
+        datablock = pending.pop()
+        key = datablock.session_uid
+        if key in seen:
+            continue
+        seen.add(key)
+        if not accept(datablock):
+            continue
+        collected.append(datablock)
+        pending.extend(_id_references(datablock))
+    return collected
+
+
+def collect_appended_ids(roots: Iterable, watermark: int) -> List[object]:
+    """收集 session_uid 大于水位（即本次追加新建）的依赖ID"""
+    return collect_dependencies(roots, lambda datablock: datablock.session_uid > watermark)
+
+
+def tag_owned_ids(ids: Iterable, load_session: str) -> int:
+    """
+    写入所有权标记并登记
+
+    Returns:
+        标记的ID数量
+    """
+    owned = _owned_by_session.setdefault(load_session, [])
+    count = 0
+    for datablock in ids:
+        datablock[OWNER_PROPERTY] = load_session
+        owned.append((datablock, datablock.session_uid))
+        count += 1
+    return count
+
+
+def get_owner(datablock) -> Optional[str]:
+    """ID所属的加载会话，未被加载器拥有时返回None"""
+    try:
+        return datablock.get(OWNER_PROPERTY)
+    except (ReferenceError, AttributeError, TypeError):
+        return None
+
+
+def mark_template_name(datablock, name: str):
+    """记录数据块在模板中的名称，并登记到模板名称索引"""
+    datablock[TEMPLATE_NAME_PROPERTY] = name
+    _ids_by_template_name[(datablock.id_type, name)] = (datablock, datablock.session_uid)
+
+
+def find_marked_template_id(id_type: str, name: str):
+    """
+    按模板中的名称查询索引中登记的数据块（O(1)）
+
+    只包含本进程中加载器追加并记录了名称的数据块；文件重新打开后索引为空。
+
+    Returns:
+        仍然有效且名称记录未变的数据块，否则返回None
+    """
+    entry = _ids_by_template_name.get((id_type, name))
+    if entry is None:
+        return None
+    datablock, session_uid = entry
+    if _is_alive(datablock, session_uid) and datablock.get(TEMPLATE_NAME_PROPERTY) == name:
+        return datablock
+    del _ids_by_template_name[(id_type, name)]
+    return None
+
+
+def is_template_id(datablock, name: Optional[str] = None) -> bool:
+    """
+    数据块是否来自模板（带所有权标记，或记录了模板中的名称）
+
+    Args:
+        datablock: 数据块
+        name: 模板中的名称，提供时要求记录的名称一致
+    """
+    if get_owner(datablock) is not None:
+        return True
+    try:
+        template_name = datablock.get(TEMPLATE_NAME_PROPERTY)
+    except (ReferenceError, AttributeError, TypeError):
+        return False
+    return template_name is not None and (name is None or template_name == name)
+
+
+def release_owned_id(datablock) -> bool:
+    """
+    释放所有权（数据块被生成的rig采用，清理时保留）
+
+    Returns:
+        是否原本由加载器拥有
+    """
+    load_session = get_owner(datablock)
+    if load_session is None:
+        return False
+    del datablock[OWNER_PROPERTY]
+    owned = _owned_by_session.get(load_session)
+    if owned:
+        session_uid = datablock.session_uid
+        owned[:] = [entry for entry in owned if entry[1] != session_uid]
+    logger.debug("🔓 释放模板数据块所有权: %s", datablock.name)
+    return True
+
+
+def get_owned_ids(load_sessions: Optional[Iterable[str]] = None) -> List[object]:
+    """
+    获取登记的仍然有效且仍带标记的ID
+
+    Args:
+        load_sessions: 加载会话ID，None表示全部
+    """
+    sessions = list(_owned_by_session) if load_sessions is None else list(load_sessions)
+    result = []
+    for load_session in sessions:
+        owned = _owned_by_session.get(load_session)
+        if not owned:
+            continue
+        alive = [(datablock, uid) for datablock, uid in owned
+                 if _is_alive(datablock, uid) and get_owner(datablock) == load_session]
+        owned[:] = alive
+        result.extend(datablock for datablock, _ in alive)
+    return result
+
+
+def adopt_tagged_ids(roots: Iterable) -> List[str]:
+    """
+    登记从根ID可达、带有所有权标记但未登记的ID（如保存在 .blend 中、重新打开后的模板数据）
+
+    Returns:
+        涉及的加载会话ID
+    """
+    registered = {uid for owned in _owned_by_session.values() for _, uid in owned}
+    tagged = collect_dependencies(roots, lambda datablock: get_owner(datablock) is not None)
+    sessions = []
+    for datablock in tagged:
+        load_session = get_owner(datablock)
+        if load_session not in sessions:
+            sessions.append(load_session)
+        if datablock.session_uid not in registered:
+            _owned_by_session.setdefault(load_session, []).append((datablock, datablock.session_uid))
+    return sessions
+
+
+def remove_owned_ids(load_sessions: Optional[Iterable[str]] = None) -> int:
+    """
+    通过一次 bpy.data.batch_remove 删除加载器拥有的ID（只删除带加载会话标记的ID）
+
+    Args:
+        load_sessions: 要清理的加载会话ID，None表示全部
+
+    Returns:
+        删除的ID数量
+    """
+    sessions = list(_owned_by_session) if load_sessions is None else list(load_sessions)
+    ids = get_owned_ids(sessions)
+
+    for datablock in ids:
+        if isinstance(datablock, bpy.types.Object):
+            unregister_template_rig(datablock)
+
+    if ids:
+        bpy.data.batch_remove(ids)
+    for load_session in sessions:
+        _owned_by_session.pop(load_session, None)
+
+    logger.info("🗑️ 已删除模板数据块: %s 个（%s 个加载会话）", len(ids), len(sessions))
+    return len(ids)
+
+
+def clear_ownership_registry():
+    """清空登记（不修改ID上的标记属性）"""
+    _owned_by_session.clear()
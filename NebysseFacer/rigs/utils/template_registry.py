@@ -0,0 +1,146 @@
+"""
+模板rig注册表 - 记录加载器追加的模板骨架
+
+加载器每追加一个模板rig，就在对象上写入标记属性（模板rig名称和模板文件哈希），
+并按 session_uid 登记到注册表。之后的查找都是字典查询：
+- 按 session_uid 校验对象仍然有效（对象被删除或文件重新加载后自动失效）
+- 按 (模板rig名称, 模板哈希) 或模板rig名称取最近登记的对象
+
+不再按名称后缀、关键词计数或NebOffset骨骼数量猜测模板对象。
+注册表未命中时只做一次 bpy.data.objects 的精确名称查询（用于已保存到 .blend 中、
+重新打开后尚未登记的模板rig），仍然是O(1)；只接受带加载会话所有权标记的对象，
+恰好同名的用户对象不会被登记（也就不会被当作模板数据清理）。
+"""
+
+import bpy
+from typing import Dict, List, Optional, Tuple
+
+
+# 模板rig对象上的标记属性
+TEMPLATE_TAG_PROPERTY = "nebysse_template"
+TEMPLATE_HASH_PROPERTY = "nebysse_template_hash"
+
+# {session_uid: 对象}
+_objects_by_uid: Dict[int, object] = {}
+# {(模板rig名称, 模板哈希): session_uid}
+_uid_by_key: Dict[Tuple[str, Optional[str]], int] = {}
+# {模板rig名称: [session_uid, ...]}，按登记顺序，最后一个为最新
+_uids_by_name: Dict[str, List[int]] = {}
+
+
+def _is_alive(obj, session_uid: int) -> bool:
+    """检查登记的对象是否仍然有效"""
+    try:
+        return obj.session_uid == session_uid and obj.name in bpy.data.objects
+    except ReferenceError:
+        return False
+
+
+def _forget(session_uid: int):
+    """从注册表中移除失效的登记"""
+    _objects_by_uid.pop(session_uid, None)
+    for key in [key for key, uid in _uid_by_key.items() if uid == session_uid]:
+        del _uid_by_key[key]
+    for uids in _uids_by_name.values():
+        if session_uid in uids:
+            uids.remove(session_uid)
+
+
+def _lookup_uid(session_uid: Optional[int]):
+    """按 session_uid 取出仍然有效的对象"""
+    if session_uid is None:
+        return None
+    obj = _objects_by_uid.get(session_uid)
+    if obj is not None and _is_alive(obj, session_uid):
+        return obj
+    _forget(session_uid)
+    return None
+
+
+def register_template_rig(obj, template_rig_name: str, template_hash: str = None):
+    """
+    登记模板rig对象并写入标记属性
+
+    Args:
+        obj: 模板骨架对象
+        template_rig_name: 模板中的rig名称（对象追加后可能被重命名为 .001 等）
+        template_hash: 模板文件哈希，未知时为None
+    """
+    obj[TEMPLATE_TAG_PROPERTY] = template_rig_name
+    if template_hash:
+        obj[TEMPLATE_HASH_PROPERTY] = template_hash
+
+    session_uid = obj.session_uid
+    _objects_by_uid[session_uid] = obj
+    _uid_by_key[(template_rig_name, template_hash)] = session_uid
+
+    uids = _uids_by_name.setdefault(template_rig_name, [])
+    if session_uid in uids:
+        uids.remove(session_uid)
+    uids.append(session_uid)
+
+
+def unregister_template_rig(obj):
+    """取消登记（对象删除前调用）"""
+    try:
+        session_uid = obj.session_uid
+    except ReferenceError:
+        return
+    _forget(session_uid)
+
+
+def is_template_rig(obj) -> bool:
+    """对象是否是加载器登记或带有模板标记的模板rig"""
+    try:
+        return obj.session_uid in _objects_by_uid or TEMPLATE_TAG_PROPERTY in obj.keys()
+    except (ReferenceError, AttributeError, TypeError):
+        return False
+
+
+def find_template_rig(template_rig_name: str = "Nebysse_FaceUP_Tem.Rig",
+                      template_hash: str = None, exclude=None):
+    """
+    查找模板rig对象（O(1)，不按关键词猜测）
+
+    Args:
+        template_rig_name: 模板rig名称
+        template_hash: 模板文件哈希；指定时只返回同一模板文件版本的对象
+        exclude: 需要排除的对象（如正在生成的rig）
+
+    Returns:
+        模板骨架对象，未找到返回None
+    """
+    if template_hash is not None:
+        obj = _lookup_uid(_uid_by_key.get((template_rig_name, template_hash)))
+    else:
+        obj = None
+        uids = _uids_by_name.get(template_rig_name, ())
+        while uids and obj is None:
+            obj = _lookup_uid(uids[-1])
+
+    if obj is not None and obj != exclude:
+        return obj
+
+    # 未登记：按精确名称查询保存在文件中的模板rig，只接受加载器追加（带所有权标记）的对象
+    from .template_ownership import get_owner
+    obj = bpy.data.objects.get(template_rig_name)
+    if obj is None or obj == exclude or obj.type != 'ARMATURE' or get_owner(obj) is None:
+        return None
+    if template_hash is not None and obj.get(TEMPLATE_HASH_PROPERTY) not in (None, template_hash):
+        return None
+
+    register_template_rig(obj, obj.get(TEMPLATE_TAG_PROPERTY, template_rig_name),
+                          obj.get(TEMPLATE_HASH_PROPERTY, template_hash))
+    return obj
+
+
+def get_registered_template_rigs() -> List[object]:
+    """获取所有仍然有效的已登记模板rig对象"""
+    return [obj for obj in (_lookup_uid(uid) for uid in list(_objects_by_uid)) if obj is not None]
+
+
+def clear_template_registry():
+    """清空注册表（不修改对象上的标记属性）"""
+    _objects_by_uid.clear()
+    _uid_by_key.clear()
+    _uids_by_name.clear()
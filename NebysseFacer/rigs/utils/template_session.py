@@ -0,0 +1,110 @@
+"""
+生成级模板会话 - 一次Rigify生成中所有NebysseFacer rig共享同一份模板
+
+以Rigify生成器插件（GeneratorPlugin）实现，每个生成器只有一个实例：
+faceup主控和眼睑等定位器在 __init__ 中调用 TemplateSession(self.generator) 得到同一个会话。
+
+- 模板rig在第一次需要时打开一次（注册表中已有模板rig时直接接管），之后所有rig共享
+- 共享一个 BlendTemplateLoader：快照、ID映射表和追加数据块的所有权都在同一处
+- 插件的 finalize 在所有rig的 finalize 之后运行，一步释放本次生成追加的全部模板数据并修复记录的驱动器，
+  输出本次生成的驱动器表达式报告（仍需Python求值的驱动器），并清空 data_path 解析缓存
+"""
+
+from rigify.base_generate import GeneratorPlugin
+
+from .blend_template_loader import BlendTemplateLoader
+from .context_guard import ContextGuard, is_alive
+from .driver_expressions import log_expression_report
+from .driver_paths import parse_data_path
+from .driver_repair import repair_recorded_drivers
+from .template_registry import find_template_rig
+from .template_snapshot import compute_template_hash
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+TEMPLATE_FILE_NAME = "Nebysse_FaceUP_Tem.blend"
+TEMPLATE_RIG_NAME = "Nebysse_FaceUP_Tem.Rig"
+
+
+class TemplateSession(GeneratorPlugin):
+    """一次生成共享的模板会话（每个生成器一个实例）"""
+
+    def __init__(self, generator):
+        super().__init__(generator)
+        self.loader = BlendTemplateLoader(template_name=TEMPLATE_FILE_NAME)
+        self.template_rig = None
+        # 模板文件实际打开（追加）的次数，正常情况下整个生成最多一次
+        self.open_count = 0
+        self.released = False
+        self._load_failed = False
+
+    def use_template_file(self, template_path: str) -> bool:
+        """
+        指定本次生成使用的模板文件（如metarig中选择的模板），必须在第一次获取模板rig之前调用
+
+        Returns:
+            是否已采用（模板已经打开时不再切换）
+        """
+        if self.template_rig is not None or self.open_count:
+            logger.warning("⚠ 模板会话已打开模板，忽略模板文件: %s", template_path)
+            return False
+        self.loader.template_path = template_path
+        logger.info("📄 模板会话使用模板文件: %s", template_path)
+        return True
+
+    def get_template_rig(self):
+        """
+        获取模板rig对象（整个生成只打开一次模板文件）
+
+        Returns:
+            模板rig对象，模板文件缺失或无效时返回None（之后的调用不再重试）
+        """
+        if is_alive(self.template_rig):
+            return self.template_rig
+        if self._load_failed or self.released:
+            return None
+
+        # 指定了模板文件时只接管同一文件版本的模板rig
+        template_path = self.loader.template_path
+        template_hash = compute_template_hash(template_path) if template_path else None
+        template_rig = find_template_rig(TEMPLATE_RIG_NAME, template_hash=template_hash, exclude=self.generator.obj)
+        if template_rig is not None:
+            # 之前留下的模板rig（如中断的生成）由本会话接管，生成结束时一并释放
+            logger.info("♻️ 模板会话接管已有模板rig: %s", template_rig.name)
+            self.loader.adopt_template_rig(template_rig)
+        else:
+            template_rig = self.loader.load_template_rig(TEMPLATE_RIG_NAME)
+            self.open_count += 1
+            if template_rig is None:
+                self._load_failed = True
+                logger.error("❌ 模板会话无法打开模板rig: %s", TEMPLATE_RIG_NAME)
+                return None
+            logger.info("📂 模板会话已打开模板: %s", template_rig.name)
+
+        self.template_rig = template_rig
+        return template_rig
+
+    def release(self):
+        """一步释放本次生成追加的全部模板数据，并修复记录的驱动器（只执行一次）"""
+        if self.released:
+            return
+        self.released = True
+
+        # 删除只使用数据API；退出时生成的rig保持为活动对象
+        with ContextGuard(leave_active=self.generator.obj):
+            try:
+                self.loader.cleanup()
+            except Exception as e:
+                logger.warning("⚠ 释放模板会话时出错: %s", e)
+            repair_recorded_drivers()
+        log_expression_report()
+        # 解析缓存只服务于本次生成，不在会话之间累积
+        parse_data_path.cache_clear()
+
+        self.template_rig = None
+        logger.info("✓ 模板会话已释放（模板文件打开 %s 次）", self.open_count)
+
+    def finalize(self):
+        self.release()
@@ -0,0 +1,196 @@
+"""
+模板快照文件 - 预编译的模板骨骼数据
+
+将模板rig的骨骼数据（约束、驱动器、自定义属性）编译为带版本号的紧凑JSON文件，
+保存在模板 .blend 文件旁边（如 templates/Nebysse_FaceUP_Tem.blend.snapshot.json）。
+
+快照中记录了源 .blend 文件的内容哈希；生成绑定时若哈希一致则直接读取快照，
+无需追加 .blend、创建ID数据块以及事后清理。哈希不一致（模板被修改）时视为过期，
+由调用方回退到 .blend 并重新编译。
+
+此模块不依赖 bpy，可以在Blender之外读取和检查快照。
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+from ...utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+SNAPSHOT_FORMAT = "nebysse-template-snapshot"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = ".snapshot.json"
+
+# 文件哈希缓存：{规范化路径: ((mtime_ns, size), sha256)}，文件未变化时不重复计算
+_hash_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+
+def get_snapshot_path(template_path: str) -> str:
+    """获取模板文件对应的快照文件路径"""
+    return template_path + SNAPSHOT_SUFFIX
+
+
+def compute_template_hash(template_path: str) -> Optional[str]:
+    """
+    计算模板文件内容的SHA-256哈希（按 mtime/size 缓存）
+
+    Returns:
+        十六进制哈希字符串，文件不存在时返回None
+    """
+    try:
+        stat = os.stat(template_path)
+    except OSError:
+        return None
+
+    cache_key = os.path.normcase(os.path.abspath(template_path))
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _hash_cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(template_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    source_hash = digest.hexdigest()
+    _hash_cache[cache_key] = (stamp, source_hash)
+    return source_hash
+
+
+def read_template_snapshot(template_path: str, template_rig_name: str = None,
+                           check_hash: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    读取模板快照文件
+
+    Args:
+        template_path: 模板 .blend 文件路径
+        template_rig_name: 期望的模板rig名称，为None时不检查
+        check_hash: 是否校验源文件哈希；只需要依赖提示（如选择性追加）时可关闭
+
+    Returns:
+        快照字典；快照不存在、格式/版本不符或哈希过期时返回None
+    """
+    snapshot_path = get_snapshot_path(template_path)
+    if not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("⚠ 模板快照读取失败 %s: %s", snapshot_path, e)
+        return None
+
+    if snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('version') != SNAPSHOT_VERSION:
+        logger.warning("⚠ 模板快照版本不兼容，忽略: %s", snapshot_path)
+        return None
+
+    if template_rig_name and snapshot.get('template_rig') != template_rig_name:
+        return None
+
+    if check_hash and snapshot.get('source_hash') != compute_template_hash(template_path):
+        logger.warning("⚠ 模板快照已过期（模板文件已修改）: %s", os.path.basename(snapshot_path))
+        return None
+
+    snapshot['template_path'] = template_path
+    return snapshot
+
+
+def write_template_snapshot(template_path: str, template_rig_name: str,
+                            bones: Dict[str, Any], dependencies: Dict[str, Any] = None) -> Optional[str]:
+    """
+    将模板骨骼数据写入快照文件（先写临时文件再替换，避免留下半写入的快照）
+
+    Args:
+        template_path: 模板 .blend 文件路径
+        template_rig_name: 模板rig名称
+        bones: 纯Python值的骨骼数据字典
+        dependencies: 骨骼数据引用的其他数据块，如 {'actions': [...]}
+
+    Returns:
+        快照文件路径，写入失败返回None
+    """
+    source_hash = compute_template_hash(template_path)
+    if not source_hash:
+        return None
+
+    snapshot = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'source_file': os.path.basename(template_path),
+        'source_hash': source_hash,
+        'template_rig': template_rig_name,
+        'dependencies': dependencies or {},
+        'bones': bones,
+    }
+
+    snapshot_path = get_snapshot_path(template_path)
+    temp_path = snapshot_path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'), default=str)
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        logger.warning("⚠ 模板快照写入失败 %s: %s", snapshot_path, e)
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return None
+
+    return snapshot_path
+
+
+def collect_snapshot_dependencies(bones: Dict[str, Any], template_rig_name: str = None,
+                                  template_data_name: str = None) -> Dict[str, Any]:
+    """
+    收集骨骼数据中按名称引用的外部数据块
+
+    Args:
+        bones: 纯Python值的骨骼数据字典
+        template_rig_name: 模板rig名称（指向模板rig自身的引用会被重定向，不计入依赖）
+        template_data_name: 模板rig骨架数据的名称（记录下来，供ID映射表重定向到生成的rig的骨架数据）
+
+    Returns:
+        {'actions': ACTION约束使用的动作, 'objects': 约束目标和驱动器变量引用的其他对象,
+        'ids': 驱动器变量引用的其他类型数据块 [[id_type, 名称], ...],
+        'template_data': 模板rig骨架数据名称（提供时）}
+    """
+    actions = set()
+    objects = set()
+    other_ids = set()
+    for bone_info in bones.values():
+        for constraint_data in bone_info.get('constraints', []):
+            properties = constraint_data.get('properties', {})
+            if constraint_data.get('type') == 'ACTION' and properties.get('action'):
+                actions.add(properties['action'])
+            if properties.get('target'):
+                objects.add(properties['target'])
+
+        for driver_data in bone_info.get('drivers', []):
+            for var_data in driver_data.get('variables', []):
+                for target_data in var_data.get('targets', []):
+                    if not target_data.get('id'):
+                        continue
+                    id_type = target_data.get('id_type') or 'OBJECT'
+                    if id_type == 'OBJECT':
+                        objects.add(target_data['id'])
+                    elif id_type == 'ACTION':
+                        actions.add(target_data['id'])
+                    else:
+                        other_ids.add((id_type, target_data['id']))
+
+    objects.discard(template_rig_name)
+    other_ids.discard(('ARMATURE', template_data_name))
+    dependencies = {
+        'actions': sorted(actions),
+        'objects': sorted(objects),
+        'ids': [list(key) for key in sorted(other_ids)],
+    }
+    if template_data_name:
+        dependencies['template_data'] = template_data_name
+    return dependencies
@@ -51,6 +51,24 @@ class NEBYSSE_PT_face_rig_tools(Panel):
         
         row = box.row()
         row.operator("nebysse.mirror_face_bones", text="镜像面部设置")
+        
+        # 维护工具
+        box = layout.box()
+        box.label(text="文件维护", icon='DRIVER')
+        
+        row = box.row()
+        row.operator("nebysse.audit_broken_drivers", text="审计损坏的驱动器")
+        row = box.row()
+        row.operator("nebysse.analyze_driver_expressions", text="分析驱动器表达式")
+        row = box.row()
+        row.operator("nebysse.analyze_rig_graph", text="分析依赖图")
+        row = box.row(align=True)
+        row.operator("nebysse.bake_face_rig", text="烘焙面部rig")
+        row.operator("nebysse.restore_face_rig", text="还原")
+        row = box.row(align=True)
+        row.operator("nebysse.write_pose_cache", text="写入姿态缓存")
+        row.operator("nebysse.attach_pose_cache", text="挂载")
+        row.operator("nebysse.detach_pose_cache", text="卸载")
 
 
 class NEBYSSE_PT_face_rig_info(Panel):
@@ -4,6 +4,9 @@ Blender 4.1+ 骨骼集合模块
 """
 
 import bpy
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 # 颜色主题映射
 BONE_COLLECTION_COLORS = {
@@ -48,7 +51,7 @@ def set_bone_collection_color(collection, color_theme):
     if hasattr(collection, 'color_set'):
         collection.color_set = color_theme
     else:
-        print(f"警告: 无法为集合 {collection.name} 设置颜色")
+        logger.info("警告: 无法为集合 %s 设置颜色", collection.name)
 
 def create_bone_collection_with_color(rig, name, color_theme):
     """创建带颜色的骨骼集合
@@ -88,7 +91,7 @@ def assign_bone_to_collection(rig, bone_name, collection_name):
     try:
         # 检查骨骼是否存在
         if bone_name not in rig.data.bones:
-            print(f"警告: 骨骼 {bone_name} 不存在")
+            logger.info("警告: 骨骼 %s 不存在", bone_name)
             return False
         
         # 获取或创建骨骼集合
@@ -104,14 +107,14 @@ def assign_bone_to_collection(rig, bone_name, collection_name):
         # 检查骨骼是否已在集合中
         if collection not in bone.collections:
             collection.assign(bone)
-            print(f"✓ 成功分配骨骼 '{bone_name}' 到集合 '{collection_name}'")
+            logger.info("✓ 成功分配骨骼 '%s' 到集合 '%s'", bone_name, collection_name)
         else:
-            print(f"ℹ 骨骼 '{bone_name}' 已在集合 '{collection_name}' 中")
+            logger.info("ℹ 骨骼 '%s' 已在集合 '%s' 中", bone_name, collection_name)
         
         return True
         
     except Exception as e:
-        print(f"❌ 分配骨骼失败: {bone_name} -> {collection_name}: {e}")
+        logger.error("❌ 分配骨骼失败: %s -> %s: %s", bone_name, collection_name, e)
         return False
 
 def get_bones_in_collection(rig, collection):
@@ -133,7 +136,7 @@ def get_bones_in_collection(rig, collection):
                 bones_in_collection.append(bone)
         return bones_in_collection
     except Exception as e:
-        print(f"获取集合中的骨骼时出错: {e}")
+        logger.info("获取集合中的骨骼时出错: %s", e)
     
     return bones_in_collection
 
@@ -143,15 +146,15 @@ def print_bone_collections_info(rig):
     Args:
         rig: 骨架对象
     """
-    print(f"骨架 {rig.name} 的骨骼集合信息:")
+    logger.info("骨架 %s 的骨骼集合信息:", rig.name)
     
     if hasattr(rig.data, 'collections'):
-        print(f"骨骼集合数量: {len(rig.data.collections)}")
+        logger.info("骨骼集合数量: %s", len(rig.data.collections))
         for i, collection in enumerate(rig.data.collections):
             bones_count = len(get_bones_in_collection(rig, collection))
-            print(f"  {i+1}. {collection.name}: {bones_count} 个骨骼")
+            logger.debug("  %s. %s: %s 个骨骼", i + 1, collection.name, bones_count)
     else:
-        print("错误: Blender 版本不支持骨骼集合")
+        logger.info("错误: Blender 版本不支持骨骼集合")
 
 def create_all_face_collections(rig):
     """创建所有面部骨骼集合
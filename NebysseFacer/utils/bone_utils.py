@@ -7,6 +7,9 @@ import bpy
 from mathutils import Vector, Matrix
 from rigify.utils.naming import make_derived_name
 from rigify.utils.bones import align_bone_orientation, put_bone
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 
 def create_control_bone(rig, org_bone, suffix='ctrl', scale=1.0):
@@ -269,7 +272,7 @@ def assign_bone_to_face_collection(rig, bone_name, collection_name):
     from .blender_compatibility import assign_bone_to_collection, create_all_face_collections
     
     if bone_name not in rig.data.bones:
-        print(f"警告: 骨骼 {bone_name} 不存在")
+        logger.info("警告: 骨骼 %s 不存在", bone_name)
         return False
     
     # 确保所有面部集合已创建
@@ -0,0 +1,132 @@
+"""
+NebysseFacer 日志系统
+基于标准库 logging 的包级日志，支持级别、延迟格式化和按模块设置详细程度
+
+用法:
+    from ..utils.log import get_logger
+    logger = get_logger(__name__)
+    logger.info("✓ 找到模板文件: %s", template_path)   # 参数只在消息实际输出时才格式化
+    logger.debug("📍 %s", bone_name)                   # 逐骨骼的详细信息
+
+级别配置（环境变量，启动Blender前设置）:
+    NEBYSSE_LOG_LEVEL    全局级别: DEBUG / INFO / WARNING / ERROR，默认交互模式为 INFO，
+                         后台（blender -b，如渲染农场）为 WARNING
+    NEBYSSE_LOG_MODULES  按模块覆盖，逗号分隔，模块名相对于包根目录，如
+                         "rigs.nebysse_faceup_con=DEBUG,rigs.utils.blend_template_loader=WARNING"
+
+运行时也可以调用 set_log_level() 调整。
+"""
+
+import logging
+import os
+import sys
+
+
+LOGGER_NAME = "NebysseFacer"
+LOG_LEVEL_ENV = "NEBYSSE_LOG_LEVEL"
+LOG_MODULES_ENV = "NEBYSSE_LOG_MODULES"
+
+_configured = False
+
+
+def _is_background() -> bool:
+    """是否在后台模式（无界面）下运行"""
+    try:
+        import bpy
+        return bool(bpy.app.background)
+    except (ImportError, AttributeError):
+        return False
+
+
+def _parse_level(value, default: int) -> int:
+    """将级别名称或数字解析为 logging 级别"""
+    if value is None:
+        return default
+    if isinstance(value, int):
+        return value
+    value = str(value).strip().upper()
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else default
+
+
+def _qualify(name: str) -> str:
+    """将模块的 __name__ 转换为包根日志器下的名称"""
+    if not name or name == LOGGER_NAME:
+        return LOGGER_NAME
+
+    # 作为扩展安装时 __name__ 可能带有前缀（如 bl_ext.user_default.NebysseFacer.rigs...）
+    marker = LOGGER_NAME + "."
+    position = name.find(marker)
+    if position >= 0:
+        return name[position:]
+    if name.endswith("." + LOGGER_NAME):
+        return LOGGER_NAME
+    return marker + name
+
+
+def _configure():
+    """配置包根日志器（只执行一次）"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    root = logging.getLogger(LOGGER_NAME)
+    default_level = logging.WARNING if _is_background() else logging.INFO
+    root.setLevel(_parse_level(os.environ.get(LOG_LEVEL_ENV), default_level))
+
+    # 输出到Blender控制台，保持原有的纯消息格式
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(handler)
+    root.propagate = False
+
+    for entry in os.environ.get(LOG_MODULES_ENV, "").split(","):
+        module, _, level = entry.partition("=")
+        if module.strip() and level.strip():
+            logging.getLogger(_qualify(module.strip())).setLevel(_parse_level(level, logging.NOTSET))
+
+
+def get_logger(name: str = None) -> logging.Logger:
+    """
+    获取 NebysseFacer 包内模块的日志器
+
+    Args:
+        name: 模块的 __name__
+
+    Returns:
+        位于 "NebysseFacer" 日志器之下的 logging.Logger
+    """
+    _configure()
+    return logging.getLogger(_qualify(name or LOGGER_NAME))
+
+
+def set_log_level(level, module: str = None):
+    """
+    运行时设置日志级别
+
+    Args:
+        level: 级别名称（如 "DEBUG"）或 logging 级别数字
+        module: 模块名（相对于包根目录，如 "rigs.nebysse_faceup_con"），为None时设置全局级别
+    """
+    _configure()
+    logger = logging.getLogger(_qualify(module) if module else LOGGER_NAME)
+    logger.setLevel(_parse_level(level, logging.INFO))
+
+
+def log_count(logger: logging.Logger, message: str, count: int, level="ERROR"):
+    """
+    输出统计中的失败/跳过数量行：数量为0时按 INFO 输出，大于0时才按指定级别输出
+
+    后台默认的 WARNING 级别下，没有失败的生成不会输出任何错误统计行。
+
+    Args:
+        logger: 模块日志器
+        message: 带一个 %s 占位符的消息
+        count: 数量
+        level: 数量大于0时的级别名称或 logging 级别数字，默认 "ERROR"
+    """
+    logger.log(_parse_level(level, logging.ERROR) if count else logging.INFO, message, count)
@@ -0,0 +1,69 @@
+"""
+模板加载器微基准测试（普通CPython，使用 standin 替身）
+
+    pip install pytest pytest-benchmark
+    cd benchmarks && python -m pytest --benchmark-sort=mean
+
+测量的是插件Python代码本身的开销（路径解析、快照提取和批量复制），
+不包含Blender内部的RNA和依赖图开销，结果只用于比较同一环境下的改动前后。
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import synthetic  # noqa: E402
+
+
+SAMPLE_PATHS = (
+    'pose.bones["NebOffset-syn.0001"].location',
+    'pose.bones["NebOffset-syn.0001"]["syn_prop_2"]',
+    'pose.bones["NebOffset-syn.0001"].constraints["syn_copy_location_0"].influence',
+    'pose.bones["name \\"quoted\\""].scale',
+    '["rig_prop"]',
+)
+
+
+@pytest.mark.benchmark(group="driver_paths")
+def bench_parse_data_path_cold(benchmark, driver_paths_module):
+    """解析缓存清空后的路径解析"""
+    parse = driver_paths_module.parse_data_path
+
+    def run():
+        parse.cache_clear()
+        for path in SAMPLE_PATHS:
+            parse(path, 0)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="driver_paths")
+def bench_parse_data_path_cached(benchmark, driver_paths_module):
+    parse = driver_paths_module.parse_data_path
+
+    def run():
+        for path in SAMPLE_PATHS:
+            parse(path, 0)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="driver_index")
+def bench_build_driver_index(benchmark, loader_module, template_rig):
+    index = benchmark(loader_module.build_driver_index, template_rig)
+    assert len(index) == len(template_rig.pose.bones)
+
+
+@pytest.mark.benchmark(group="extract")
+def bench_extract_bone_data(benchmark, loader_module, template_rig):
+    loader = loader_module.BlendTemplateLoader()
+    data = benchmark(loader._extract_bone_data, template_rig)
+    assert len(data) == len(template_rig.pose.bones)
+
+
+@pytest.mark.benchmark(group="copy")
+def bench_copy_bones_batch_full(benchmark, loader_module, rig_pair):
+    template, target, bone_names = rig_pair
+    loader = loader_module.BlendTemplateLoader()
+    results = benchmark(loader.copy_neboffset_bones_batch, template, target, bone_names)
+    assert all(result['success'] for result in results.values())
@@ -0,0 +1,269 @@
+"""
+Rigify 生成基准测试（在Blender中运行）
+
+构建参考metarig（Rigify人体metarig + nebysse_faceup_con 主控和眉毛/眼睑/嘴部定位器），
+重复执行Rigify生成，记录每次迭代的：
+- 墙钟时间
+- 进程峰值内存（RSS）及本次增量
+- 各类ID数据块数量
+- depsgraph 更新次数
+- 生成rig的骨骼、驱动器和约束数量
+
+通常通过 run_benchmarks.py 启动（它负责准备Feature Set和Blender参数）:
+    blender --background --factory-startup --python benchmarks/blender_generation.py -- \\
+        --iterations 5 --output results.json [--baseline baseline.json]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import traceback
+from datetime import datetime
+
+import addon_utils
+import bpy
+from mathutils import Vector
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import results  # noqa: E402
+
+
+FEATURE_SET_NAME = "NebysseFacer"
+
+# (骨骼名称, rig模块, 相对头部骨骼的偏移（以头部骨骼长度为单位）, 父级)
+REFERENCE_BONES = (
+    ("faceup-con", "nebysse_faceup_con", (0.0, -0.6, 0.3), None),
+    ("mouth-con", "nebysse_mouth_con", (0.0, -0.9, 0.05), "faceup-con"),
+    ("eyelip-con.L", "nebysse_eyelip_con_l", (0.3, -0.8, 0.45), "faceup-con"),
+    ("eyelip-con.R", "nebysse_eyelip_con_r", (-0.3, -0.8, 0.45), "faceup-con"),
+    ("brow-con.L", "nebysse_brow_con_l", (0.3, -0.85, 0.6), "faceup-con"),
+    ("brow-con.R", "nebysse_brow_con_r", (-0.3, -0.85, 0.6), "faceup-con"),
+)
+
+HEAD_BONE = "spine.006"
+
+# 统计数量的 bpy.data 集合
+ID_COLLECTIONS = (
+    'objects', 'armatures', 'meshes', 'curves', 'actions', 'collections',
+    'materials', 'node_groups', 'texts', 'libraries', 'images',
+)
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer Rigify生成基准测试")
+    parser.add_argument('--iterations', type=int, default=5, help="生成次数（第一次为新建，其余为重新生成）")
+    parser.add_argument('--fresh', action='store_true', help="每次迭代前删除生成的rig，全部按新建计时")
+    parser.add_argument('--feature-set', default=FEATURE_SET_NAME, help="Feature Set模块名")
+    parser.add_argument('--output', default="benchmark_results.json", help="结果JSON路径")
+    parser.add_argument('--baseline', help="基线结果JSON，指定时输出比较并按退化设置退出码")
+    parser.add_argument('--threshold', type=float, default=0.1, help="退化阈值（相对变化）")
+    return parser.parse_args(argv)
+
+
+# ---- 环境准备 ----
+
+def enable_feature_set(name: str):
+    """启用Rigify并启用指定的Feature Set"""
+    addon_utils.enable('rigify', default_set=True, persistent=True)
+    prefs = bpy.context.preferences.addons['rigify'].preferences
+
+    if hasattr(prefs, 'refresh_installed_feature_sets'):
+        prefs.refresh_installed_feature_sets()
+    for feature_set in getattr(prefs, 'rigify_feature_sets', ()):
+        if feature_set.module_name == name and not feature_set.enabled:
+            feature_set.enabled = True
+    if hasattr(prefs, 'update_external_rigs'):
+        prefs.update_external_rigs()
+
+    from rigify import rig_lists
+    rig_type = f"{name}.nebysse_faceup_con"
+    if rig_type not in rig_lists.rigs:
+        raise RuntimeError(f"Feature Set未安装或未启用: {name}（找不到rig类型 {rig_type}）")
+
+
+def feature_set_module(name: str, submodule: str = None):
+    """导入Feature Set（或其子模块），模块名与Rigify加载时一致"""
+    try:
+        from rigify import feature_set_list
+        module = feature_set_list.get_module(name)
+    except (ImportError, AttributeError):
+        module = importlib.import_module(f"rigify.feature_sets.{name}")
+    return importlib.import_module(f"{module.__name__}.{submodule}") if submodule else module
+
+
+def build_reference_metarig(feature_set: str):
+    """构建参考metarig：Rigify人体metarig加上面部主控和定位器"""
+    bpy.ops.object.armature_human_metarig_add()
+    metarig = bpy.context.active_object
+    metarig.name = "nebysse_benchmark_metarig"
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = metarig.data.edit_bones
+    head = edit_bones[HEAD_BONE]
+    origin, length = head.head.copy(), head.length
+
+    for name, _, offset, parent in REFERENCE_BONES:
+        bone = edit_bones.new(name)
+        bone.head = origin + Vector(offset) * length
+        bone.tail = bone.head + Vector((0.0, 0.0, length * 0.15))
+        bone.parent = edit_bones[parent] if parent else head
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    for name, module, _, _ in REFERENCE_BONES:
+        metarig.pose.bones[name].rigify_type = f"{feature_set}.{module}"
+    return metarig
+
+
+# ---- 测量 ----
+
+def peak_rss_mb():
+    """进程峰值RSS（MB），平台不支持时返回None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux为KB，macOS为字节
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def count_ids():
+    """各类ID数据块数量"""
+    return {name: len(getattr(bpy.data, name)) for name in ID_COLLECTIONS if hasattr(bpy.data, name)}
+
+
+def rig_statistics(rig):
+    """生成rig的骨骼、驱动器和约束数量"""
+    if rig is None:
+        return {'bones': 0, 'drivers': 0, 'constraints': 0}
+    animation_data = rig.animation_data
+    return {
+        'bones': len(rig.data.bones),
+        'drivers': len(animation_data.drivers) if animation_data else 0,
+        'constraints': sum(len(pose_bone.constraints) for pose_bone in rig.pose.bones),
+    }
+
+
+class DepsgraphCounter:
+    """统计 depsgraph_update_post 回调次数"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, scene, depsgraph=None):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        bpy.app.handlers.depsgraph_update_post.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        bpy.app.handlers.depsgraph_update_post.remove(self)
+        return False
+
+
+def remove_generated_rig(metarig):
+    """删除上一次生成的rig（--fresh 模式）"""
+    rig = metarig.data.rigify_target_rig
+    if rig is not None:
+        bpy.data.objects.remove(rig, do_unlink=True)
+        metarig.data.rigify_target_rig = None
+
+
+def run_iteration(metarig, index: int, fresh: bool):
+    """执行一次生成并测量"""
+    if fresh:
+        remove_generated_rig(metarig)
+    mode = 'create' if metarig.data.rigify_target_rig is None else 'regenerate'
+
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+    bpy.context.view_layer.objects.active = metarig
+    metarig.select_set(True)
+
+    rss_before = peak_rss_mb()
+    result = {'iteration': index, 'mode': mode, 'status': 'ok'}
+
+    with DepsgraphCounter() as depsgraph_counter:
+        start = time.perf_counter()
+        try:
+            bpy.ops.pose.rigify_generate()
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = str(e)
+            traceback.print_exc()
+        result['wall_time'] = time.perf_counter() - start
+
+    rss_after = peak_rss_mb()
+    ids = count_ids()
+    result.update({
+        'peak_rss_mb': rss_after,
+        'rss_delta_mb': (rss_after - rss_before) if rss_after is not None and rss_before is not None else None,
+        'depsgraph_updates': depsgraph_counter.count,
+        'ids': ids,
+        'id_total': sum(ids.values()),
+    })
+    result.update(rig_statistics(metarig.data.rigify_target_rig))
+    return result
+
+
+def feature_set_version(name: str):
+    """Feature Set 版本号"""
+    try:
+        return ".".join(str(part) for part in feature_set_module(name).rigify_info['version'])
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    bpy.ops.wm.read_homefile(use_empty=True)
+    enable_feature_set(args.feature_set)
+    metarig = build_reference_metarig(args.feature_set)
+
+    iterations = []
+    for index in range(args.iterations):
+        result = run_iteration(metarig, index, args.fresh)
+        iterations.append(result)
+        print(f"⏱️ 迭代 {index + 1}/{args.iterations} [{result['mode']}]: {result['wall_time']:.3f}s, "
+              f"depsgraph {result['depsgraph_updates']}, 驱动器 {result['drivers']}, "
+              f"约束 {result['constraints']}, ID {result['id_total']}, 状态 {result['status']}")
+
+    report = {
+        'format': results.RESULTS_FORMAT,
+        'version': results.RESULTS_VERSION,
+        'benchmark': 'generation',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'blender_version': bpy.app.version_string,
+        'feature_set_version': feature_set_version(args.feature_set),
+        'platform': platform.platform(),
+        'settings': {'iterations': args.iterations, 'fresh': args.fresh},
+        'iterations': iterations,
+        'summary': results.summarize(iterations),
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 结果已写入: {args.output}")
+
+    exit_code = 0 if all(item['status'] == 'ok' for item in iterations) else 2
+    if args.baseline:
+        rows = results.compare(report, results.load_results(args.baseline), args.threshold)
+        print(results.format_comparison(rows))
+        if any(row['status'] == 'regression' for row in rows):
+            exit_code = exit_code or 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""
+播放性能基准测试（在Blender中运行）
+
+对生成的 NebysseFacer rig 在 Neb_face-root 自定义属性和定位器控制骨骼上打入随机但确定的动画，
+逐帧执行 scene.frame_set，测量每帧求值耗时。为了把耗时分摊到驱动器、约束和Python驱动器上，
+同一段动画按以下变体各测量若干遍：
+
+| 变体 | 内容 |
+|------|------|
+| `full` | 完整rig |
+| `no_python_drivers` | 静音需要Python求值的驱动器 |
+| `no_drivers` | 静音全部驱动器 |
+| `no_constraints` | 静音全部驱动器并禁用全部骨骼约束（只剩动画曲线和骨骼层级） |
+
+相邻变体的差值即为Python驱动器、全部驱动器和约束各自的每帧开销。
+
+默认构建参考metarig并生成一次（与 blender_generation.py 相同），也可以指定已有的 .blend 和rig：
+    python benchmarks/run_benchmarks.py --benchmark playback --frames 1-250 --passes 3 \\
+        --output playback.json [--baseline playback_baseline.json]
+    python benchmarks/run_benchmarks.py --benchmark playback --blend shot.blend --rig RIG-Hero
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import results  # noqa: E402
+from blender_generation import (  # noqa: E402
+    FEATURE_SET_NAME,
+    build_reference_metarig,
+    enable_feature_set,
+    feature_set_version,
+    rig_statistics,
+)
+
+
+FACEROOT_BONE = "Neb_face-root"
+ACTION_NAME = "nebysse_playback_benchmark"
+
+VARIANTS = ('full', 'no_python_drivers', 'no_drivers', 'no_constraints')
+
+# 变换类驱动器变量（读取骨骼变换）
+TRANSFORM_VARIABLE_TYPES = {'TRANSFORMS', 'ROTATION_DIFF', 'LOC_DIFF'}
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer 播放性能基准测试")
+    parser.add_argument('--blend', help="包含生成rig的 .blend 文件，不指定时生成参考rig")
+    parser.add_argument('--rig', help="rig对象名称，默认为第一个带 Neb_face-root 骨骼的骨架")
+    parser.add_argument('--frames', default="1-250", help="帧范围，如 1-250")
+    parser.add_argument('--passes', type=int, default=3, help="每个变体测量的遍数（另有一遍预热）")
+    parser.add_argument('--key-step', type=int, default=4, help="关键帧间隔（帧）")
+    parser.add_argument('--seed', type=int, default=1234, help="随机动画种子")
+    parser.add_argument('--amplitude', type=float, default=0.25, help="控制骨骼位移幅度（以骨骼长度为单位）")
+    parser.add_argument('--control-bones', help="打关键帧的控制骨骼，逗号分隔；默认为驱动器读取的输入骨骼")
+    parser.add_argument('--feature-set', default=FEATURE_SET_NAME, help="Feature Set模块名")
+    parser.add_argument('--output', default="playback_results.json", help="结果JSON路径")
+    parser.add_argument('--baseline', help="基线结果JSON，指定时输出比较并按退化设置退出码")
+    parser.add_argument('--threshold', type=float, default=0.1, help="退化阈值（相对变化）")
+    return parser.parse_args(argv)
+
+
+# ---- 准备rig ----
+
+def generate_reference_rig(feature_set: str):
+    """构建参考metarig并生成一次，返回生成的rig"""
+    bpy.ops.wm.read_homefile(use_empty=True)
+    enable_feature_set(feature_set)
+    metarig = build_reference_metarig(feature_set)
+    bpy.context.view_layer.objects.active = metarig
+    metarig.select_set(True)
+    bpy.ops.pose.rigify_generate()
+    return metarig.data.rigify_target_rig
+
+
+def find_rig(name: str = None):
+    if name:
+        return bpy.data.objects.get(name)
+    for obj in bpy.data.objects:
+        if obj.type == 'ARMATURE' and FACEROOT_BONE in obj.pose.bones:
+            return obj
+    return None
+
+
+def is_python_driver(driver) -> bool:
+    """驱动器是否每帧需要Python求值"""
+    return driver.type == 'SCRIPTED' and not driver.is_simple_expression
+
+
+def driven_paths(rig) -> set:
+    animation_data = rig.animation_data
+    return {fcurve.data_path for fcurve in animation_data.drivers} if animation_data else set()
+
+
+def input_bones(rig) -> list:
+    """驱动器读取、自身既没有驱动器也没有约束的骨骼（定位器控制骨骼等输入）"""
+    animation_data = rig.animation_data
+    if not animation_data:
+        return []
+
+    read = set()
+    for fcurve in animation_data.drivers:
+        for variable in fcurve.driver.variables:
+            for target in variable.targets:
+                if target.id != rig:
+                    continue
+                if variable.type in TRANSFORM_VARIABLE_TYPES and target.bone_target:
+                    read.add(target.bone_target)
+                elif variable.type == 'SINGLE_PROP' and target.data_path.startswith('pose.bones["'):
+                    read.add(target.data_path.split('"')[1])
+
+    driven = driven_paths(rig)
+    return sorted(
+        name for name in read
+        if name in rig.pose.bones and name != FACEROOT_BONE
+        and not rig.pose.bones[name].constraints
+        and not any(path.startswith(f'pose.bones["{name}"].') for path in driven)
+    )
+
+
+def faceroot_properties(rig) -> list:
+    """Neb_face-root 上可以打关键帧的数值属性（被驱动的属性除外）: [(名称, 最小值, 最大值)]"""
+    pose_bone = rig.pose.bones.get(FACEROOT_BONE)
+    if pose_bone is None:
+        return []
+
+    driven = driven_paths(rig)
+    properties = []
+    for key in pose_bone.keys():
+        value = pose_bone[key]
+        if key.startswith('_') or isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if f'pose.bones["{FACEROOT_BONE}"]["{key}"]' in driven:
+            continue
+        ui = pose_bone.id_properties_ui(key).as_dict()
+        low = ui.get('soft_min', ui.get('min', 0.0))
+        high = ui.get('soft_max', ui.get('max', 1.0))
+        properties.append((key, float(low), float(high)))
+    return properties
+
+
+def add_curve(action, data_path: str, index: int, group: str, frames: list, values: list):
+    """用 foreach_set 一次写入一条动画曲线的全部关键帧"""
+    fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+    fcurve.keyframe_points.add(len(frames))
+    fcurve.keyframe_points.foreach_set('co', [c for pair in zip(frames, values) for c in pair])
+    fcurve.update()
+
+
+def key_random_animation(rig, args, frame_start: int, frame_end: int) -> dict:
+    """在 Neb_face-root 属性和控制骨骼上打入随机但确定的动画"""
+    rng = random.Random(args.seed)
+    frames = [float(frame) for frame in range(frame_start, frame_end + 1, max(1, args.key_step))]
+
+    if rig.animation_data is None:
+        rig.animation_data_create()
+    action = bpy.data.actions.get(ACTION_NAME)
+    if action is not None:
+        bpy.data.actions.remove(action)
+    action = bpy.data.actions.new(ACTION_NAME)
+    rig.animation_data.action = action
+
+    properties = faceroot_properties(rig)
+    for key, low, high in properties:
+        add_curve(action, f'pose.bones["{FACEROOT_BONE}"]["{key}"]', 0, FACEROOT_BONE,
+                  frames, [rng.uniform(low, high) for _ in frames])
+
+    if args.control_bones:
+        controls = [name for name in args.control_bones.split(',') if name in rig.pose.bones]
+    else:
+        controls = input_bones(rig)
+    for name in controls:
+        amplitude = rig.data.bones[name].length * args.amplitude
+        for axis in range(3):
+            add_curve(action, f'pose.bones["{name}"].location', axis, name,
+                      frames, [rng.uniform(-amplitude, amplitude) for _ in frames])
+
+    return {'animated_properties': len(properties), 'animated_controls': len(controls), 'keys_per_curve': len(frames)}
+
+
+# ---- 变体 ----
+
+def apply_variant(rig, variant: str):
+    """按变体静音驱动器和约束"""
+    drivers = rig.animation_data.drivers if rig.animation_data else ()
+    for fcurve in drivers:
+        if variant == 'no_python_drivers':
+            fcurve.mute = is_python_driver(fcurve.driver)
+        else:
+            fcurve.mute = variant in ('no_drivers', 'no_constraints')
+    for pose_bone in rig.pose.bones:
+        for constraint in pose_bone.constraints:
+            constraint.enabled = variant != 'no_constraints'
+
+
+def snapshot_state(rig):
+    """记录驱动器静音和约束启用状态，测量后恢复"""
+    drivers = rig.animation_data.drivers if rig.animation_data else ()
+    return ([(fcurve, fcurve.mute) for fcurve in drivers],
+            [(constraint, constraint.enabled) for pose_bone in rig.pose.bones for constraint in pose_bone.constraints])
+
+
+def restore_state(state):
+    drivers, constraints = state
+    for fcurve, mute in drivers:
+        fcurve.mute = mute
+    for constraint, enabled in constraints:
+        constraint.enabled = enabled
+
+
+def measure_pass(scene, frame_start: int, frame_end: int) -> list:
+    """逐帧 frame_set，返回每帧耗时（毫秒）"""
+    times = []
+    for frame in range(frame_start, frame_end + 1):
+        start = time.perf_counter()
+        scene.frame_set(frame)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return times
+
+
+def frame_statistics(times: list) -> dict:
+    ordered = sorted(times)
+    mean = statistics.fmean(times)
+    return {
+        'frame_time_ms': mean,
+        'frame_time_median_ms': statistics.median(times),
+        'frame_time_p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'fps': 1000.0 / mean if mean else None,
+    }
+
+
+def breakdown(summary: dict, drivers: int, python_drivers: int, constraints: int) -> dict:
+    """按变体的中位数把每帧耗时分摊到Python驱动器、全部驱动器和约束"""
+    median = {variant: summary.get(variant, {}).get('frame_time_ms', {}).get('median') for variant in VARIANTS}
+    if any(value is None for value in median.values()):
+        return {}
+
+    driver_ms = median['full'] - median['no_drivers']
+    python_ms = median['full'] - median['no_python_drivers']
+    constraint_ms = median['no_drivers'] - median['no_constraints']
+    return {
+        'total_ms': median['full'],
+        'fps': 1000.0 / median['full'] if median['full'] else None,
+        'drivers_ms': driver_ms,
+        'python_drivers_ms': python_ms,
+        'constraints_ms': constraint_ms,
+        'base_ms': median['no_constraints'],
+        'us_per_driver': driver_ms * 1000.0 / drivers if drivers else None,
+        'us_per_python_driver': python_ms * 1000.0 / python_drivers if python_drivers else None,
+        'us_per_constraint': constraint_ms * 1000.0 / constraints if constraints else None,
+        'python_driver_share': python_drivers / drivers if drivers else 0.0,
+        'python_time_share': python_ms / driver_ms if driver_ms > 0 else 0.0,
+    }
+
+
+def main():
+    args = parse_args()
+    frame_start, frame_end = (int(part) for part in args.frames.split('-', 1))
+
+    if args.blend:
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(args.blend))
+        rig = find_rig(args.rig)
+    else:
+        rig = generate_reference_rig(args.feature_set)
+    if rig is None:
+        print("❌ 找不到生成的面部rig")
+        sys.exit(2)
+
+    scene = bpy.context.scene
+    animation = key_random_animation(rig, args, frame_start, frame_end)
+    stats = rig_statistics(rig)
+    drivers = rig.animation_data.drivers if rig.animation_data else ()
+    stats['python_drivers'] = sum(1 for fcurve in drivers if is_python_driver(fcurve.driver))
+    print(f"🎬 {rig.name}: 驱动器 {stats['drivers']}（Python {stats['python_drivers']}），约束 {stats['constraints']}，"
+          f"动画属性 {animation['animated_properties']}，控制骨骼 {animation['animated_controls']}")
+
+    iterations = []
+    state = snapshot_state(rig)
+    try:
+        for variant in VARIANTS:
+            apply_variant(rig, variant)
+            # 预热：第一遍包含驱动器编译和缓存建立
+            measure_pass(scene, frame_start, frame_end)
+            for index in range(args.passes):
+                result = {'iteration': index, 'mode': variant, 'status': 'ok', **stats}
+                result.update(frame_statistics(measure_pass(scene, frame_start, frame_end)))
+                iterations.append(result)
+                print(f"⏱️ {variant} 第 {index + 1}/{args.passes} 遍: {result['frame_time_ms']:.3f} ms/帧 "
+                      f"(p95 {result['frame_time_p95_ms']:.3f} ms, {result['fps']:.1f} fps)")
+    finally:
+        restore_state(state)
+
+    summary = results.summarize(iterations)
+    split = breakdown(summary, stats['drivers'], stats['python_drivers'], stats['constraints'])
+    if split:
+        print(f"📊 每帧 {split['total_ms']:.3f} ms ({split['fps']:.1f} fps): 驱动器 {split['drivers_ms']:.3f} ms "
+              f"(其中Python {split['python_drivers_ms']:.3f} ms)，约束 {split['constraints_ms']:.3f} ms，"
+              f"其余 {split['base_ms']:.3f} ms")
+
+    report = {
+        'format': results.RESULTS_FORMAT,
+        'version': results.RESULTS_VERSION,
+        'benchmark': 'playback',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'blender_version': bpy.app.version_string,
+        'feature_set_version': None if args.blend else feature_set_version(args.feature_set),
+        'platform': platform.platform(),
+        'settings': {'blend': args.blend, 'rig': rig.name, 'frames': [frame_start, frame_end],
+                     'passes': args.passes, 'key_step': args.key_step, 'seed': args.seed,
+                     'amplitude': args.amplitude},
+        'animation': animation,
+        'iterations': iterations,
+        'summary': summary,
+        'breakdown': split,
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 结果已写入: {args.output}")
+
+    exit_code = 0
+    if args.baseline:
+        rows = results.compare(report, results.load_results(args.baseline), args.threshold)
+        print(results.format_comparison(rows))
+        if any(row['status'] == 'regression' for row in rows):
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
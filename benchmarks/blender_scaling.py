@@ -0,0 +1,207 @@
+"""
+规模扫描基准测试（在Blender中运行）
+
+对一组规模（骨骼数量）分别生成合成模板rig、目标rig和场景填充对象，测量：
+- BlendTemplateLoader._extract_bone_data
+- BlendTemplateLoader._find_template_rig_object（注册表为空 / 已登记）
+- TemplateManager.cleanup_template_data_complete
+- TemplateManager._cleanup_broken_drivers（定向修复）和 driver_repair.audit_broken_drivers（全文件审计）
+- 可选：合成metarig的完整Rigify生成（--generate）
+
+并按对数坐标拟合每个函数的规模指数，指数明显大于1的路径会被标出。
+绘图使用 plot_scaling.py（Blender自带的Python通常没有matplotlib）。
+
+    python benchmarks/run_benchmarks.py --benchmark scaling --sizes 100,500,1000,2000,3000 \\
+        --drivers-per-bone 4 --constraints-per-bone 2 --output scaling.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import results  # noqa: E402
+import synthetic  # noqa: E402
+from blender_generation import FEATURE_SET_NAME, enable_feature_set, feature_set_module, feature_set_version  # noqa: E402
+
+
+# 规模指数超过该值视为超线性（可能的 O(n²) 路径）
+SUPERLINEAR_EXPONENT = 1.5
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer 规模扫描基准测试")
+    parser.add_argument('--sizes', default="100,250,500,1000,2000,3000", help="骨骼数量列表，逗号分隔")
+    parser.add_argument('--drivers-per-bone', type=int, default=4, help="模板每个骨骼的驱动器数量")
+    parser.add_argument('--constraints-per-bone', type=int, default=2, help="模板每个骨骼的约束数量")
+    parser.add_argument('--target-drivers-per-bone', type=int, default=1, help="目标rig每个骨骼的驱动器数量")
+    parser.add_argument('--broken-ratio', type=float, default=0.05, help="目标rig中损坏驱动器的比例")
+    parser.add_argument('--objects-per-bone', type=float, default=0.25, help="场景填充对象数量与骨骼数量之比")
+    parser.add_argument('--repeat', type=int, default=3, help="每个测量重复次数（取最小值）")
+    parser.add_argument('--generate', action='store_true', help="同时测量合成metarig的完整Rigify生成")
+    parser.add_argument('--feature-set', default=FEATURE_SET_NAME, help="Feature Set模块名")
+    parser.add_argument('--output', default="scaling_results.json", help="结果JSON路径")
+    return parser.parse_args(argv)
+
+
+def reset_scene():
+    """清空场景数据（注册表中登记的模板rig随之失效）"""
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+
+def build_scene(args, size: int):
+    """按规模构建合成场景，返回 (模板rig, 目标rig)"""
+    reset_scene()
+    synthetic.build_scene_objects(int(size * args.objects_per_bone))
+    target_rig = synthetic.build_target_rig(size, args.target_drivers_per_bone, args.broken_ratio)
+    template_rig = synthetic.build_template_rig(size, args.drivers_per_bone, args.constraints_per_bone)
+    return template_rig, target_rig
+
+
+def measure(function, setup=None, repeat: int = 3) -> float:
+    """重复执行并返回最短耗时（秒）；setup 在每次执行前调用且不计时，返回值作为 function 的参数"""
+    best = float('inf')
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument) if setup else function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(args, size: int, modules) -> dict:
+    """测量一个规模下的全部函数"""
+    loader_module, faceup_utils, registry, ownership, driver_repair = modules
+    timings = {}
+
+    template_rig, target_rig = build_scene(args, size)
+    bone_names = [bone.name for bone in template_rig.pose.bones]
+    loader = loader_module.BlendTemplateLoader(template_name="Nebysse_FaceUP_Tem.blend")
+
+    timings['_extract_bone_data'] = measure(
+        lambda: loader._extract_bone_data(template_rig, bone_names), repeat=args.repeat)
+
+    def cold_registry():
+        registry.clear_template_registry()
+
+    timings['_find_template_rig_object (cold)'] = measure(
+        lambda _: loader._find_template_rig_object(synthetic.TEMPLATE_RIG_NAME), cold_registry, args.repeat)
+    timings['_find_template_rig_object (warm)'] = measure(
+        lambda: loader._find_template_rig_object(synthetic.TEMPLATE_RIG_NAME), repeat=args.repeat)
+
+    # 定向修复：目标rig的全部驱动器记入账本（模拟加载器创建）；全文件审计只报告不删除
+    def record_target_drivers():
+        for fcurve in target_rig.animation_data.drivers:
+            driver_repair.record_driver(fcurve, target_rig)
+
+    manager = faceup_utils.TemplateManager(SimpleNamespace(obj=target_rig))
+    timings['audit_broken_drivers (full file)'] = measure(
+        lambda: driver_repair.audit_broken_drivers(remove=False), repeat=args.repeat)
+    timings['_cleanup_broken_drivers'] = measure(
+        lambda _: manager._cleanup_broken_drivers(), record_target_drivers, repeat=1)
+
+    def fresh_scene():
+        template, rig = build_scene(args, size)
+        # 模拟加载器追加：标记合成模板rig及其依赖为加载器拥有
+        ownership.tag_owned_ids(ownership.collect_dependencies([template], lambda datablock: datablock != rig),
+                                ownership.new_load_session())
+        return faceup_utils.TemplateManager(SimpleNamespace(obj=rig))
+
+    timings['cleanup_template_data_complete'] = measure(
+        lambda manager: manager.cleanup_template_data_complete(), fresh_scene, args.repeat)
+
+    if args.generate:
+        def fresh_metarig():
+            reset_scene()
+            return synthetic.build_metarig(size, args.feature_set)
+
+        def generate(metarig):
+            bpy.context.view_layer.objects.active = metarig
+            metarig.select_set(True)
+            bpy.ops.pose.rigify_generate()
+
+        timings['rigify_generate'] = measure(generate, fresh_metarig, 1)
+
+    return {
+        'size': size,
+        'scene_objects': int(size * args.objects_per_bone),
+        'template_drivers': size * args.drivers_per_bone,
+        'template_constraints': size * args.constraints_per_bone,
+        'timings': timings,
+    }
+
+
+def analyze(points):
+    """拟合每个函数的规模指数"""
+    names = sorted({name for point in points for name in point['timings']})
+    analysis = {}
+    for name in names:
+        sizes = [point['size'] for point in points if name in point['timings']]
+        times = [point['timings'][name] for point in points if name in point['timings']]
+        exponent = results.fit_scaling_exponent(sizes, times)
+        analysis[name] = {
+            'exponent': exponent,
+            'superlinear': exponent == exponent and exponent > SUPERLINEAR_EXPONENT,
+        }
+    return analysis
+
+
+def format_table(points, analysis) -> str:
+    """输出规模-耗时表"""
+    names = list(analysis)
+    lines = [f"{'函数':<36}" + "".join(f"{point['size']:>10}" for point in points) + f"{'指数':>8}"]
+    for name in names:
+        cells = "".join(f"{point['timings'].get(name, float('nan')) * 1000:>9.1f}m" for point in points)
+        mark = " ⚠" if analysis[name]['superlinear'] else ""
+        lines.append(f"{name:<36}{cells}{analysis[name]['exponent']:>8.2f}{mark}")
+    lines.append("（单位: 毫秒，各规模取最短耗时；⚠ 表示规模指数 > %.1f）" % SUPERLINEAR_EXPONENT)
+    return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(',') if value.strip()]
+
+    enable_feature_set(args.feature_set)
+    modules = (
+        feature_set_module(args.feature_set, "rigs.utils.blend_template_loader"),
+        feature_set_module(args.feature_set, "rigs.utils.faceup_utils"),
+        feature_set_module(args.feature_set, "rigs.utils.template_registry"),
+        feature_set_module(args.feature_set, "rigs.utils.template_ownership"),
+        feature_set_module(args.feature_set, "rigs.utils.driver_repair"),
+    )
+
+    points = []
+    for size in sizes:
+        point = run_size(args, size, modules)
+        points.append(point)
+        print(f"📏 规模 {size}: " + ", ".join(f"{name} {value * 1000:.1f}ms" for name, value in point['timings'].items()))
+
+    analysis = analyze(points)
+    print(format_table(points, analysis))
+
+    report = {
+        'format': results.RESULTS_FORMAT,
+        'version': results.RESULTS_VERSION,
+        'benchmark': 'scaling',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'blender_version': bpy.app.version_string,
+        'feature_set_version': feature_set_version(args.feature_set),
+        'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+        'points': points,
+        'analysis': analysis,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 结果已写入: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
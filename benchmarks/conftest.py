@@ -0,0 +1,56 @@
+"""
+加载器微基准测试的公共fixture（普通CPython + pytest-benchmark）
+
+在收集任何 bench_*.py 之前安装 bpy / mathutils 替身（standin），
+每个fixture都从空的 bpy.data 开始构建合成数据。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('NEBYSSE_LOG_LEVEL', 'WARNING')
+
+import standin  # noqa: E402
+
+standin.install()
+
+import synthetic  # noqa: E402
+
+
+# 生产规模和演示规模
+SIZES = (100, 1000)
+
+
+@pytest.fixture(scope='session')
+def loader_module():
+    return standin.import_addon_module("rigs.utils.blend_template_loader")
+
+
+@pytest.fixture(scope='session')
+def driver_paths_module():
+    return standin.import_addon_module("rigs.utils.driver_paths")
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size}bones")
+def bone_count(request):
+    return request.param
+
+
+@pytest.fixture
+def template_rig(bone_count):
+    """合成模板rig：每骨骼4个自定义属性驱动器、1个变换驱动器、2个约束"""
+    standin.reset()
+    return synthetic.build_template_rig(bone_count, drivers_per_bone=5, constraints_per_bone=2)
+
+
+@pytest.fixture
+def rig_pair(bone_count):
+    """(模板rig, 目标rig, 骨骼名称列表)"""
+    standin.reset()
+    template = synthetic.build_template_rig(bone_count, drivers_per_bone=5, constraints_per_bone=2)
+    target = synthetic.build_target_rig(bone_count, drivers_per_bone=1, broken_ratio=0.0)
+    bone_names = [synthetic.template_bone_name(index) for index in range(bone_count)]
+    return template, target, bone_names
@@ -0,0 +1,67 @@
+"""
+绘制规模扫描结果（普通Python运行，需要matplotlib）
+
+    python benchmarks/plot_scaling.py scaling.json --output scaling.png
+
+对数坐标下绘制每个函数的耗时曲线，并画出 O(n) 和 O(n²) 参考线；
+没有matplotlib时只输出拟合的规模指数。
+"""
+
+import argparse
+import sys
+
+from results import fit_scaling_exponent, load_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="绘制规模扫描结果")
+    parser.add_argument('results', help="blender_scaling.py 输出的结果JSON")
+    parser.add_argument('--output', default="scaling.png", help="图片路径")
+    args = parser.parse_args(argv)
+
+    data = load_results(args.results)
+    points = data['points']
+    names = sorted({name for point in points for name in point['timings']})
+
+    series = {}
+    for name in names:
+        sizes = [point['size'] for point in points if name in point['timings']]
+        times = [point['timings'][name] for point in points if name in point['timings']]
+        series[name] = (sizes, times)
+        print(f"{name:<36} 规模指数 {fit_scaling_exponent(sizes, times):.2f}")
+
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠ 未安装matplotlib，跳过绘图（pip install matplotlib）")
+        return 0
+
+    figure, axes = plt.subplots(figsize=(9, 6))
+    for name, (sizes, times) in series.items():
+        axes.plot(sizes, [value * 1000 for value in times], marker='o', label=name)
+
+    # 参考线：从最小规模处的最慢函数出发
+    all_sizes = sorted({point['size'] for point in points})
+    if len(all_sizes) > 1:
+        start = max(times[0] for sizes, times in series.values() if times) * 1000
+        base = all_sizes[0]
+        axes.plot(all_sizes, [start * size / base for size in all_sizes], 'k--', linewidth=0.8, label='O(n)')
+        axes.plot(all_sizes, [start * (size / base) ** 2 for size in all_sizes], 'k:', linewidth=0.8, label='O(n²)')
+
+    axes.set_xscale('log')
+    axes.set_yscale('log')
+    axes.set_xlabel("bones")
+    axes.set_ylabel("time (ms)")
+    axes.set_title(f"NebysseFacer scaling ({data.get('feature_set_version')}, Blender {data.get('blender_version')})")
+    axes.legend(fontsize='small')
+    axes.grid(True, which='both', alpha=0.3)
+    figure.tight_layout()
+    figure.savefig(args.output, dpi=120)
+    print(f"📈 图表已保存: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
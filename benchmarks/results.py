@@ -0,0 +1,178 @@
+"""
+基准测试结果 - 汇总统计和与基线的比较
+
+纯Python模块，Blender内的基准脚本和命令行都使用它。
+
+命令行比较两次结果:
+    python benchmarks/results.py results.json baseline.json --threshold 0.1
+
+存在超过阈值的性能退化时退出码为1，便于在CI中使用。
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+from typing import Any, Dict, List
+
+
+RESULTS_FORMAT = "nebysse-benchmark-results"
+RESULTS_VERSION = 1
+
+# 越小越好的指标，超过阈值视为退化
+LOWER_IS_BETTER = (
+    'wall_time',
+    'peak_rss_mb',
+    'rss_delta_mb',
+    'depsgraph_updates',
+    'id_total',
+    'frame_time_ms',
+    'frame_time_p95_ms',
+)
+
+# 结构指标，数值变化说明生成结果不同（不论增减）
+STRUCTURE_METRICS = (
+    'bones',
+    'drivers',
+    'python_drivers',
+    'constraints',
+)
+
+SUMMARY_METRICS = LOWER_IS_BETTER + STRUCTURE_METRICS
+
+
+def summarize(iterations: List[Dict[str, Any]], metrics=SUMMARY_METRICS) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    按模式（生成为 create/regenerate，播放为变体）汇总各指标
+
+    Args:
+        iterations: 每次迭代的结果
+        metrics: 需要汇总的指标
+
+    Returns:
+        {模式: {指标: {'min', 'median', 'mean', 'max', 'stdev', 'count'}}}
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for item in iterations:
+        if item.get('status', 'ok') == 'ok':
+            grouped.setdefault(item.get('mode', 'default'), []).append(item)
+
+    summary = {}
+    for mode, items in grouped.items():
+        mode_summary = {}
+        for metric in metrics:
+            values = [item[metric] for item in items if isinstance(item.get(metric), (int, float))]
+            if not values:
+                continue
+            mode_summary[metric] = {
+                'min': min(values),
+                'median': statistics.median(values),
+                'mean': statistics.fmean(values),
+                'max': max(values),
+                'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+                'count': len(values),
+            }
+        summary[mode] = mode_summary
+    return summary
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    按中位数比较当前结果和基线
+
+    Args:
+        current: 当前结果（含 'summary'）
+        baseline: 基线结果（含 'summary'）
+        threshold: 相对变化阈值（0.1 = 10%）
+
+    Returns:
+        比较行列表，每行 status 为 'ok' / 'regression' / 'improvement' / 'changed'
+    """
+    rows = []
+    current_summary = current.get('summary', {})
+    baseline_summary = baseline.get('summary', {})
+
+    for mode in sorted(set(current_summary) & set(baseline_summary)):
+        for metric in SUMMARY_METRICS:
+            new = current_summary[mode].get(metric)
+            old = baseline_summary[mode].get(metric)
+            if new is None or old is None:
+                continue
+
+            new_value, old_value = new['median'], old['median']
+            delta = (new_value - old_value) / old_value if old_value else (0.0 if new_value == old_value else float('inf'))
+
+            if metric in STRUCTURE_METRICS:
+                status = 'ok' if new_value == old_value else 'changed'
+            elif delta > threshold:
+                status = 'regression'
+            elif delta < -threshold:
+                status = 'improvement'
+            else:
+                status = 'ok'
+
+            rows.append({
+                'mode': mode,
+                'metric': metric,
+                'baseline': old_value,
+                'current': new_value,
+                'delta': delta,
+                'status': status,
+            })
+    return rows
+
+
+def fit_scaling_exponent(sizes: List[float], times: List[float]) -> float:
+    """
+    按对数坐标最小二乘拟合 time ∝ size^k 的指数 k
+
+    k≈1 为线性，k≈2 说明存在 O(n²) 路径；有效数据点少于2个时返回NaN。
+    """
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, times) if size > 0 and value > 0]
+    if len(points) < 2:
+        return float('nan')
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return float('nan')
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """把比较结果格式化为文本表格"""
+    marks = {'ok': '  ', 'regression': '❌', 'improvement': '✅', 'changed': '⚠'}
+    lines = [f"{'':2} {'模式':<18} {'指标':<18} {'基线':>12} {'当前':>12} {'变化':>9}"]
+    for row in rows:
+        delta = f"{row['delta'] * 100:+.1f}%" if row['delta'] != float('inf') else "new"
+        lines.append(
+            f"{marks[row['status']]:2} {row['mode']:<18} {row['metric']:<18} "
+            f"{row['baseline']:>12.4g} {row['current']:>12.4g} {delta:>9}"
+        )
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """读取结果JSON并检查格式"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') != RESULTS_FORMAT:
+        raise ValueError(f"不是基准测试结果文件: {path}")
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="比较两次基准测试结果")
+    parser.add_argument('current', help="当前结果JSON")
+    parser.add_argument('baseline', help="基线结果JSON")
+    parser.add_argument('--threshold', type=float, default=0.1, help="退化阈值（相对变化，默认0.1）")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_results(args.current), load_results(args.baseline), args.threshold)
+    print(format_comparison(rows))
+    return 1 if any(row['status'] == 'regression' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+基准测试启动器（普通Python运行）
+
+准备一个临时的Blender用户脚本目录，把仓库中的 NebysseFacer 链接为Rigify Feature Set，
+然后以 --background --factory-startup 启动Blender运行基准脚本，不影响本机的Blender配置。
+
+用法:
+    python benchmarks/run_benchmarks.py --blender /path/to/blender --iterations 5 \\
+        --output results.json [--baseline baseline.json] [--profile]
+
+Blender可执行文件也可以通过环境变量 BLENDER 指定。
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+FEATURE_SET_DIR = os.path.join(REPO_ROOT, "NebysseFacer")
+
+BENCHMARKS = {
+    'generation': "blender_generation.py",
+    'scaling': "blender_scaling.py",
+    'playback': "blender_playback.py",
+}
+
+
+def install_feature_set(scripts_dir: str, name: str):
+    """把Feature Set链接（不支持符号链接时复制）到临时用户脚本目录的Rigify安装路径"""
+    install_dir = os.path.join(scripts_dir, "rigify")
+    os.makedirs(install_dir, exist_ok=True)
+    target = os.path.join(install_dir, name)
+    try:
+        os.symlink(FEATURE_SET_DIR, target, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        shutil.copytree(FEATURE_SET_DIR, target, ignore=shutil.ignore_patterns('__pycache__'))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="在后台Blender中运行NebysseFacer基准测试",
+                                     epilog="其余参数原样传给基准脚本（如 --iterations、--output、--baseline）")
+    parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'), help="Blender可执行文件")
+    parser.add_argument('--benchmark', choices=sorted(BENCHMARKS), default='generation', help="基准测试")
+    parser.add_argument('--feature-set', default="NebysseFacer", help="Feature Set模块名")
+    parser.add_argument('--profile', action='store_true', help="同时开启分阶段性能分析（NEBYSSE_PROFILE）")
+    parser.add_argument('--profile-dir', default="benchmark_profiles", help="分阶段性能报告目录")
+    args, script_args = parser.parse_known_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault('NEBYSSE_LOG_LEVEL', 'WARNING')
+    if args.profile:
+        env['NEBYSSE_PROFILE'] = '1'
+        env['NEBYSSE_PROFILE_OUTPUT'] = os.path.abspath(args.profile_dir)
+
+    with tempfile.TemporaryDirectory(prefix="nebysse_bench_") as scripts_dir:
+        install_feature_set(scripts_dir, args.feature_set)
+        env['BLENDER_USER_SCRIPTS'] = scripts_dir
+
+        command = [
+            args.blender, '--background', '--factory-startup',
+            '--python-exit-code', '2',
+            '--python', os.path.join(BENCHMARK_DIR, BENCHMARKS[args.benchmark]),
+            '--', '--feature-set', args.feature_set, *script_args,
+        ]
+        print("🚀 " + " ".join(command))
+        return subprocess.call(command, env=env)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+内存中的 bpy / mathutils 替身（普通CPython运行）
+
+只覆盖模板流程（blend_template_loader、driver_paths、template_registry、
+template_snapshot）用到的 bpy.types 子集：骨架、姿态骨骼、约束、FCurve、驱动器变量和ID属性。
+用于在没有Blender的环境中做加载器微基准测试和性能分析，不用于验证功能正确性。
+
+    from standin import install, reset, import_addon_module
+    install()                                   # 注册 sys.modules['bpy'] / ['mathutils']
+    loader = import_addon_module("rigs.utils.blend_template_loader")
+    reset()                                     # 每次测量前清空 bpy.data 和上下文
+
+替身不会加载插件包的 __init__（它依赖Rigify），import_addon_module 只加载指定的子模块。
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+from . import bpy_types
+from . import mathutils as mathutils_module
+from .bpy_types import (
+    Action, Armature, Collection, IDCollection, Mesh, Object, Scene, Text,
+)
+
+
+STANDIN_VERSION = (4, 1, 0)
+ADDON_PACKAGE = "NebysseFacer"
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         ADDON_PACKAGE)
+
+# 直接加载子模块时需要的包（只注册 __path__，不执行包的 __init__）
+_PACKAGE_STUBS = ("", ".rigs", ".rigs.utils", ".utils")
+
+
+# ---- bpy.data / bpy.context ----
+
+class BlendData:
+    """bpy.data"""
+
+    def __init__(self):
+        self.objects = IDCollection(Object)
+        self.armatures = IDCollection(Armature)
+        self.actions = IDCollection(Action)
+        self.meshes = IDCollection(Mesh)
+        self.texts = IDCollection(Text)
+        self.collections = IDCollection(Collection)
+        self.scenes = IDCollection(Scene)
+        self.libraries = _Libraries()
+        self.filepath = ""
+        self.is_dirty = False
+
+    def batch_remove(self, ids):
+        for datablock in list(ids):
+            for collection in (self.objects, self.armatures, self.actions, self.meshes, self.texts):
+                if datablock in collection._items:
+                    collection.remove(datablock)
+                    break
+
+
+class _Libraries(IDCollection):
+    def __init__(self):
+        super().__init__(lambda name: None)
+
+    def load(self, filepath, link=False, relative=False):
+        raise OSError(f"替身不能读取.blend文件: {filepath}")
+
+
+class LayerObjects:
+    def __init__(self, context):
+        self._context = context
+        self.active = None
+
+    def __iter__(self):
+        return iter(self._context.scene.collection.objects)
+
+    def __len__(self):
+        return len(self._context.scene.collection.objects)
+
+
+class ViewLayer:
+    def __init__(self, context):
+        self.objects = LayerObjects(context)
+        self.update_count = 0
+
+    def update(self):
+        self.update_count += 1
+
+
+class Context:
+    """bpy.context（单场景、单视图层）"""
+
+    def __init__(self, data: BlendData):
+        self.scene = data.scenes.new("Scene")
+        bpy_types._all_collections[:] = [self.scene.collection]
+        self.view_layer = ViewLayer(self)
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def selected_objects(self):
+        return [obj for obj in self.scene.collection.objects if obj.select_get()]
+
+    @property
+    def mode(self):
+        active = self.active_object
+        if active is None or active.mode == 'OBJECT':
+            return 'OBJECT'
+        if active.mode == 'EDIT':
+            return 'EDIT_ARMATURE' if active.type == 'ARMATURE' else 'EDIT_MESH'
+        return active.mode
+
+    @property
+    def preferences(self):
+        return types.SimpleNamespace(addons={})
+
+
+# ---- bpy.ops ----
+
+class _BPyOpsSubModOp:
+    """与Blender相同的类名，便于性能分析器替换 __call__ 统计模式切换"""
+
+    def __init__(self, module: str, func: str, implementation):
+        self._module = module
+        self._func = func
+        self._implementation = implementation
+
+    def __call__(self, *args, **kwargs):
+        return self._implementation(**kwargs)
+
+    def poll(self, *args):
+        return True
+
+    def idname_py(self):
+        return f"{self._module}.{self._func}"
+
+
+def _op_mode_set(mode='OBJECT', toggle=False):
+    obj = _bpy.context.view_layer.objects.active
+    if obj is None:
+        raise RuntimeError("Operator bpy.ops.object.mode_set.poll() failed, context is incorrect")
+    if obj.mode == mode:
+        return {'FINISHED'}
+    if obj.type == 'ARMATURE':
+        if obj.mode == 'EDIT':
+            obj.data._apply_edit_bones(obj)
+        if mode == 'EDIT':
+            obj.data._load_edit_bones()
+    obj.mode = mode
+    return {'FINISHED'}
+
+
+def _op_select_all(action='TOGGLE'):
+    objects = list(_bpy.context.scene.collection.objects)
+    if action == 'TOGGLE':
+        action = 'DESELECT' if any(obj.select_get() for obj in objects) else 'SELECT'
+    for obj in objects:
+        obj.select_set(action == 'SELECT' or (action == 'INVERT' and not obj.select_get()))
+    return {'FINISHED'}
+
+
+def _op_finished(**kwargs):
+    return {'FINISHED'}
+
+
+def _make_ops():
+    ops = types.ModuleType("bpy.ops")
+    ops._BPyOpsSubModOp = _BPyOpsSubModOp
+    ops.object = types.SimpleNamespace(
+        mode_set=_BPyOpsSubModOp("object", "mode_set", _op_mode_set),
+        select_all=_BPyOpsSubModOp("object", "select_all", _op_select_all),
+        editmode_toggle=_BPyOpsSubModOp("object", "editmode_toggle",
+                                        lambda: _op_mode_set(mode='OBJECT' if _bpy.context.mode.startswith('EDIT')
+                                                             else 'EDIT')),
+        posemode_toggle=_BPyOpsSubModOp("object", "posemode_toggle",
+                                        lambda: _op_mode_set(mode='OBJECT' if _bpy.context.mode == 'POSE'
+                                                             else 'POSE')),
+    )
+    ops.pose = types.SimpleNamespace(select_all=_BPyOpsSubModOp("pose", "select_all", _op_finished))
+    return ops
+
+
+# ---- bpy 模块 ----
+
+def _property_factory(kind: str):
+    def factory(**kwargs):
+        return (kind, kwargs)
+    factory.__name__ = kind
+    return factory
+
+
+def _make_bpy():
+    bpy = types.ModuleType("bpy")
+    bpy.__file__ = __file__
+
+    bpy.types = types.ModuleType("bpy.types")
+    for name in dir(bpy_types):
+        value = getattr(bpy_types, name)
+        if isinstance(value, type):
+            setattr(bpy.types, name, value)
+    for name in ("Operator", "Panel", "PropertyGroup", "AddonPreferences", "Menu", "UIList"):
+        setattr(bpy.types, name, type(name, (), {}))
+    bpy.types.PoseBone = bpy_types.PoseBone
+
+    bpy.props = types.ModuleType("bpy.props")
+    for kind in ("BoolProperty", "IntProperty", "FloatProperty", "StringProperty", "EnumProperty",
+                 "FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty",
+                 "PointerProperty", "CollectionProperty"):
+        setattr(bpy.props, kind, _property_factory(kind))
+
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.version = STANDIN_VERSION
+    bpy.app.version_string = ".".join(str(part) for part in STANDIN_VERSION) + " (standin)"
+    bpy.app.background = True
+    bpy.app.tempdir = tempfile.gettempdir()
+    bpy.app.handlers = types.SimpleNamespace(
+        depsgraph_update_pre=[], depsgraph_update_post=[], load_pre=[], load_post=[],
+        frame_change_pre=[], frame_change_post=[], save_pre=[], save_post=[],
+        persistent=lambda function: function,
+    )
+    bpy.app.timers = types.SimpleNamespace(register=lambda *args, **kwargs: None,
+                                           unregister=lambda *args, **kwargs: None,
+                                           is_registered=lambda *args: False)
+
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.register_class = lambda cls: None
+    bpy.utils.unregister_class = lambda cls: None
+    bpy.utils.user_resource = lambda kind, path="", create=False: os.path.join(tempfile.gettempdir(), path)
+
+    bpy.path = types.ModuleType("bpy.path")
+    bpy.path.abspath = lambda path, start=None, library=None: os.path.abspath(path[2:] if path.startswith("//")
+                                                                              else path)
+    bpy.path.clean_name = lambda name, replace="_": "".join(c if c.isalnum() else replace for c in name)
+    bpy.path.basename = lambda path: os.path.basename(path[2:] if path.startswith("//") else path)
+
+    bpy.ops = _make_ops()
+    return bpy
+
+
+_bpy = None
+
+
+def install():
+    """注册 bpy / mathutils 替身到 sys.modules；已经存在真正的bpy时抛出RuntimeError"""
+    global _bpy
+    existing = sys.modules.get("bpy")
+    if existing is not None and existing is not _bpy:
+        raise RuntimeError("当前进程已经加载了bpy，不能安装替身")
+    if _bpy is None:
+        _bpy = _make_bpy()
+    sys.modules["bpy"] = _bpy
+    for name in ("types", "props", "app", "utils", "path", "ops"):
+        sys.modules[f"bpy.{name}"] = getattr(_bpy, name)
+    sys.modules["mathutils"] = mathutils_module
+    reset()
+    return _bpy
+
+
+def reset():
+    """清空 bpy.data 并重建上下文"""
+    if _bpy is None:
+        raise RuntimeError("替身尚未安装，先调用 install()")
+    _bpy.data = BlendData()
+    _bpy.context = Context(_bpy.data)
+    for handlers in vars(_bpy.app.handlers).values():
+        if isinstance(handlers, list):
+            handlers.clear()
+    return _bpy
+
+
+def import_addon_module(name: str):
+    """
+    加载插件子模块（如 "rigs.utils.blend_template_loader"），不执行包的 __init__
+
+    Args:
+        name: 相对于 NebysseFacer 的模块路径
+
+    Returns:
+        模块对象
+    """
+    if _bpy is None:
+        install()
+    for suffix in _PACKAGE_STUBS:
+        package_name = ADDON_PACKAGE + suffix
+        if package_name in sys.modules:
+            continue
+        package = types.ModuleType(package_name)
+        package.__path__ = [os.path.join(ADDON_DIR, *suffix.split(".")[1:])]
+        package.__package__ = package_name
+        sys.modules[package_name] = package
+    return importlib.import_module(f"{ADDON_PACKAGE}.{name}")
@@ -0,0 +1,805 @@
+"""
+bpy.types 替身 - 模板流程用到的数据模型
+
+覆盖：ID数据块集合、骨架/骨骼/编辑骨骼/姿态骨骼、约束、动画数据、驱动器FCurve、
+驱动器变量和目标、ID属性（含 id_properties_ui）以及 path_resolve / driver_add。
+
+行为尽量与Blender一致，这样基准测试测到的是插件代码本身的开销：
+- 集合按名称取值，名称冲突时自动加 .001 后缀
+- drivers.find 线性查找（与Blender的 BKE_fcurve_find 相同）
+- 无法解析的路径抛出 ValueError；对标量属性指定数组索引时 driver_add 抛出 TypeError
+- driver_add 对已经有驱动器的通道返回现有的FCurve
+"""
+
+import itertools
+import re
+
+from .mathutils import Euler, Quaternion, Vector
+
+
+_session_uids = itertools.count(1)
+
+_PATH_TOKEN = re.compile(
+    r'\.?([A-Za-z_][A-Za-z0-9_]*)'
+    r'|\[\s*("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|-?\d+)\s*\]'
+)
+
+
+def _unquote(token: str) -> str:
+    return re.sub(r'\\(.)', r'\1', token[1:-1])
+
+
+def resolve_path(root, path: str):
+    """
+    按RNA路径语法解析属性值
+
+    Raises:
+        ValueError: 路径无法解析
+    """
+    value = root
+    position = 0
+    while position < len(path):
+        match = _PATH_TOKEN.match(path, position)
+        if not match or match.end() == position:
+            raise ValueError(f'path "{path}" could not be resolved')
+        attribute, key = match.groups()
+        try:
+            if attribute is not None:
+                if attribute.startswith('_'):
+                    raise AttributeError(attribute)
+                value = getattr(value, attribute)
+                if callable(value) and not isinstance(value, bpy_prop_collection):
+                    raise AttributeError(attribute)
+            elif key[0] in '"\'':
+                value = value[_unquote(key)]
+            else:
+                value = value[int(key)]
+        except (AttributeError, KeyError, IndexError, TypeError):
+            raise ValueError(f'path "{path}" could not be resolved') from None
+        position = match.end()
+    return value
+
+
+def _is_array(value) -> bool:
+    return isinstance(value, (Vector, list, tuple))
+
+
+# ---- 集合 ----
+
+class bpy_prop_collection:
+    """按名称和索引访问的有序集合"""
+
+    def __init__(self):
+        self._items = []
+        # 名称索引（Blender对骨骼和ID名称同样使用哈希查找）
+        self._index = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(f'bpy_prop_collection[key]: key "{key}" not found')
+            return item
+        if isinstance(key, slice):
+            return self._items[key]
+        return self._items[key]
+
+    def __contains__(self, key):
+        if not isinstance(key, str):
+            raise TypeError("bpy_prop_collection.__contains__: expected a string")
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        return self._index.get(key, default)
+
+    def find(self, key) -> int:
+        item = self._index.get(key)
+        return -1 if item is None else self._items.index(item)
+
+    def keys(self):
+        return [item.name for item in self._items]
+
+    def values(self):
+        return list(self._items)
+
+    def items(self):
+        return [(item.name, item) for item in self._items]
+
+    def _unique_name(self, name: str, exclude=None) -> str:
+        def taken(candidate):
+            owner = self._index.get(candidate)
+            return owner is not None and owner is not exclude
+
+        if not taken(name):
+            return name
+        base = re.sub(r'\.\d{3}$', '', name)
+        for number in itertools.count(1):
+            candidate = f"{base}.{number:03d}"
+            if not taken(candidate):
+                return candidate
+
+    def _append(self, item):
+        item._collection = self
+        item._name = self._unique_name(item._name)
+        self._items.append(item)
+        self._index[item._name] = item
+        return item
+
+    def _discard(self, item):
+        if item in self._items:
+            self._items.remove(item)
+            self._index.pop(item.name, None)
+
+    def _renamed(self, item, old_name: str):
+        if self._index.get(old_name) is item:
+            del self._index[old_name]
+        self._index[item.name] = item
+
+
+class NamedItem:
+    """集合中名称唯一的项"""
+    _collection = None
+
+    def __init__(self, name: str):
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        collection = self._collection
+        if collection is None:
+            self._name = value
+            return
+        old_name = self._name
+        self._name = collection._unique_name(value, exclude=self)
+        collection._renamed(self, old_name)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._name!r}>"
+
+
+# ---- ID属性 ----
+
+class IDPropertyUIManager:
+    """id_properties_ui() 返回的界面数据管理器"""
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def update(self, **kwargs):
+        self._data.update(kwargs)
+
+    def as_dict(self):
+        return dict(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+class IDPropertiesMixin:
+    """自定义属性（ID属性）支持"""
+
+    def _idprops(self):
+        props = self.__dict__.get('_id_properties')
+        if props is None:
+            props = self.__dict__['_id_properties'] = {}
+            self.__dict__['_id_properties_ui'] = {}
+        return props
+
+    def keys(self):
+        return list(self._idprops().keys())
+
+    def values(self):
+        return list(self._idprops().values())
+
+    def items(self):
+        return list(self._idprops().items())
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def pop(self, key, *default):
+        self.__dict__.get('_id_properties_ui', {}).pop(key, None)
+        return self._idprops().pop(key, *default)
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, str):
+            raise TypeError("ID属性名称必须是字符串")
+        if len(key.encode('utf-8')) > 63:
+            raise KeyError(f'the length of IDProperty names is limited to 63 characters: "{key}"')
+        if isinstance(value, (list, tuple, Vector)):
+            value = list(value)
+        self._idprops()[key] = value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+    def id_properties_ui(self, key):
+        if key not in self._idprops():
+            raise KeyError(f'key "{key}" not found')
+        return IDPropertyUIManager(self.__dict__['_id_properties_ui'].setdefault(key, {}))
+
+
+# ---- 动画数据和驱动器 ----
+
+class DriverTarget:
+    def __init__(self):
+        self.id_type = 'OBJECT'
+        self.id = None
+        self.data_path = ''
+        self.bone_target = ''
+        self.transform_type = 'LOC_X'
+        self.transform_space = 'WORLD_SPACE'
+        self.rotation_mode = 'AUTO'
+        self.context_property = 'ACTIVE_SCENE'
+
+
+_TARGET_COUNTS = {
+    'SINGLE_PROP': 1,
+    'TRANSFORMS': 1,
+    'CONTEXT_PROP': 1,
+    'ROTATION_DIFF': 2,
+    'LOC_DIFF': 2,
+}
+
+
+class DriverVariable(NamedItem):
+    def __init__(self, name: str = "var"):
+        super().__init__(name)
+        self._type = 'SINGLE_PROP'
+        self.targets = [DriverTarget()]
+        self.is_name_valid = True
+
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, value):
+        if value not in _TARGET_COUNTS:
+            raise TypeError(f'enum "{value}" not found in {tuple(_TARGET_COUNTS)}')
+        self._type = value
+        count = _TARGET_COUNTS[value]
+        self.targets = (self.targets + [DriverTarget() for _ in range(count)])[:count]
+
+
+class ChannelDriverVariables(bpy_prop_collection):
+    def new(self):
+        return self._append(DriverVariable("var"))
+
+    def remove(self, variable):
+        self._discard(variable)
+
+
+class Driver:
+    def __init__(self):
+        self.type = 'SCRIPTED'
+        self.expression = ''
+        self.variables = ChannelDriverVariables()
+        self.use_self = False
+        self.is_valid = True
+        self.is_simple_expression = False
+
+
+class FCurve:
+    def __init__(self, data_path: str, array_index: int, id_data):
+        self.data_path = data_path
+        self.array_index = array_index
+        self.driver = Driver()
+        self.id_data = id_data
+        self.mute = False
+        self.is_valid = True
+        self.modifiers = []
+        self.keyframe_points = []
+
+    def __repr__(self):
+        return f"<FCurve {self.data_path!r}[{self.array_index}]>"
+
+
+class AnimDataDrivers:
+    """AnimData.drivers：线性查找，与Blender一致"""
+
+    def __init__(self, id_data):
+        self._fcurves = []
+        self._id_data = id_data
+
+    def __len__(self):
+        return len(self._fcurves)
+
+    def __iter__(self):
+        return iter(list(self._fcurves))
+
+    def __getitem__(self, index):
+        return self._fcurves[index]
+
+    def __bool__(self):
+        return True
+
+    def new(self, data_path: str, index: int = 0):
+        if self.find(data_path, index=index) is not None:
+            raise RuntimeError(f"Driver '{data_path}[{index}]' already exists")
+        fcurve = FCurve(data_path, index, self._id_data)
+        self._fcurves.append(fcurve)
+        return fcurve
+
+    def find(self, data_path: str, index: int = 0):
+        for fcurve in self._fcurves:
+            if fcurve.data_path == data_path and fcurve.array_index == index:
+                return fcurve
+        return None
+
+    def remove(self, fcurve):
+        if fcurve not in self._fcurves:
+            raise RuntimeError("Driver not found in this animation data")
+        self._fcurves.remove(fcurve)
+
+
+class AnimData:
+    def __init__(self, id_data):
+        self.drivers = AnimDataDrivers(id_data)
+        self.action = None
+        self.nla_tracks = []
+
+
+class AnimatableMixin:
+    """driver_add / path_resolve 支持；子类提供 id_data 和 path_from_id"""
+
+    def path_resolve(self, path: str, coerce: bool = True):
+        return resolve_path(self, path)
+
+    def driver_add(self, path: str, index: int = -1):
+        value = self.path_resolve(path)
+        is_array = _is_array(value)
+        if index >= 0 and not is_array:
+            raise TypeError(f'bpy_struct.driver_add(): property "{path}" not an array, index {index} given')
+        if is_array and index >= len(value):
+            raise TypeError(f'bpy_struct.driver_add(): array index {index} out of range')
+
+        owner = self.id_data
+        if owner.animation_data is None:
+            owner.animation_data_create()
+        drivers = owner.animation_data.drivers
+        full_path = self.path_from_id(path)
+
+        def ensure(channel):
+            return drivers.find(full_path, index=channel) or drivers.new(full_path, channel)
+
+        if is_array and index < 0:
+            return [ensure(channel) for channel in range(len(value))]
+        return ensure(max(index, 0))
+
+    def driver_remove(self, path: str, index: int = -1) -> bool:
+        owner = self.id_data
+        if owner.animation_data is None:
+            return False
+        full_path = self.path_from_id(path)
+        removed = False
+        for fcurve in list(owner.animation_data.drivers):
+            if fcurve.data_path == full_path and (index < 0 or fcurve.array_index == index):
+                owner.animation_data.drivers.remove(fcurve)
+                removed = True
+        return removed
+
+
+# ---- 约束 ----
+
+_TARGETED = {'target': None, 'subtarget': '', 'head_tail': 0.0, 'use_bbone_shape': False,
+             'target_space': 'WORLD', 'owner_space': 'WORLD'}
+_AXES = ('x', 'y', 'z')
+
+CONSTRAINT_DEFAULTS = {
+    'COPY_TRANSFORMS': dict(_TARGETED, mix_mode='REPLACE', remove_target_shear=False),
+    'COPY_LOCATION': dict(_TARGETED, use_offset=False, invert_x=False, invert_y=False, invert_z=False,
+                          **{f'use_{axis}': True for axis in _AXES}),
+    'COPY_ROTATION': dict(_TARGETED, mix_mode='REPLACE', euler_order='AUTO', use_offset=False,
+                          **{f'use_{axis}': True for axis in _AXES}),
+    'COPY_SCALE': dict(_TARGETED, use_offset=False, use_add=False, power=1.0, use_make_uniform=False,
+                       **{f'use_{axis}': True for axis in _AXES}),
+    'DAMPED_TRACK': dict(_TARGETED, track_axis='TRACK_Y'),
+    'ACTION': dict(_TARGETED, action=None, frame_start=1, frame_end=2, use_eval_time=False, eval_time=0.0,
+                   transform_channel='ROTATION_Y', mix_mode='BEFORE_SPLIT', min=0.0, max=0.0,
+                   use_bone_object_action=False),
+    'TRANSFORM': dict(_TARGETED, map_from='LOCATION', map_to='LOCATION', mix_mode='ADD',
+                      use_motion_extrapolate=False,
+                      **{f'from_{bound}_{axis}': 0.0 for bound in ('min', 'max') for axis in _AXES},
+                      **{f'to_{bound}_{axis}': 0.0 for bound in ('min', 'max') for axis in _AXES}),
+    'LIMIT_LOCATION': dict(owner_space='WORLD', use_transform_limit=False,
+                           **{f'use_{bound}_{axis}': False for bound in ('min', 'max') for axis in _AXES},
+                           **{f'{bound}_{axis}': 0.0 for bound in ('min', 'max') for axis in _AXES}),
+    'LIMIT_ROTATION': dict(owner_space='WORLD', use_transform_limit=False, euler_order='AUTO',
+                           **{f'use_limit_{axis}': False for axis in _AXES},
+                           **{f'{bound}_{axis}': 0.0 for bound in ('min', 'max') for axis in _AXES}),
+    'LIMIT_SCALE': dict(owner_space='WORLD', use_transform_limit=False,
+                        **{f'use_{bound}_{axis}': False for bound in ('min', 'max') for axis in _AXES},
+                        **{f'{bound}_{axis}': 1.0 for bound in ('min', 'max') for axis in _AXES}),
+    'CHILD_OF': dict(_TARGETED, set_inverse_pending=False,
+                     **{f'use_{kind}_{axis}': True for kind in ('location', 'rotation', 'scale') for axis in _AXES}),
+    'STRETCH_TO': dict(_TARGETED, rest_length=0.0, bulge=1.0, volume='VOLUME_XZX', keep_axis='PLANE_X'),
+    'ARMATURE': dict(owner_space='WORLD', use_deform_preserve_volume=False, use_bone_envelopes=False),
+}
+
+
+class Constraint(NamedItem, AnimatableMixin):
+    """姿态骨骼约束；只接受该类型存在的属性"""
+
+    def __init__(self, constraint_type: str, owner):
+        super().__init__(constraint_type.replace('_', ' ').title())
+        object.__setattr__(self, '_owner', owner)
+        object.__setattr__(self, '_props', dict(CONSTRAINT_DEFAULTS[constraint_type]))
+        object.__setattr__(self, 'type', constraint_type)
+        object.__setattr__(self, 'mute', False)
+        object.__setattr__(self, 'influence', 1.0)
+        object.__setattr__(self, 'enabled', True)
+        object.__setattr__(self, 'show_expanded', True)
+        object.__setattr__(self, 'is_valid', True)
+
+    def __getattr__(self, name):
+        props = self.__dict__.get('_props', {})
+        if name in props:
+            return props[name]
+        raise AttributeError(f"'{self.__dict__.get('type')}' constraint has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name.startswith('_') or name in self.__dict__ or isinstance(getattr(type(self), name, None), property):
+            object.__setattr__(self, name, value)
+        elif name in self._props:
+            self._props[name] = value
+        else:
+            raise AttributeError(f"'{self.type}' constraint has no attribute '{name}'")
+
+    @property
+    def id_data(self):
+        return self._owner.id_data
+
+    def path_from_id(self, prop: str = '') -> str:
+        owner_path = self._owner.path_from_id()
+        base = f'{owner_path}.constraints["{self.name}"]' if owner_path else f'constraints["{self.name}"]'
+        return f"{base}.{prop}" if prop and not prop.startswith('[') else base + prop
+
+
+class PoseBoneConstraints(bpy_prop_collection):
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+
+    def new(self, constraint_type: str):
+        if constraint_type not in CONSTRAINT_DEFAULTS:
+            raise TypeError(f'enum "{constraint_type}" not found in constraint types')
+        return self._append(Constraint(constraint_type, self._owner))
+
+    def remove(self, constraint):
+        if constraint not in self._items:
+            raise RuntimeError(f"Constraint '{constraint.name}' not found")
+        self._discard(constraint)
+
+    def move(self, from_index: int, to_index: int):
+        item = self._items.pop(from_index)
+        self._items.insert(to_index, item)
+
+    def clear(self):
+        self._items.clear()
+        self._index.clear()
+
+
+# ---- 骨架 ----
+
+class EditBone(NamedItem):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.head = Vector((0.0, 0.0, 0.0))
+        self.tail = Vector((0.0, 1.0, 0.0))
+        self.roll = 0.0
+        self.parent = None
+        self.use_connect = False
+        self.use_deform = True
+
+    @property
+    def length(self):
+        return (self.tail - self.head).length
+
+
+class ArmatureEditBones(bpy_prop_collection):
+    def new(self, name: str):
+        return self._append(EditBone(name))
+
+    def remove(self, bone):
+        for other in self._items:
+            if other.parent is bone:
+                other.parent = bone.parent
+        self._discard(bone)
+
+
+class Bone(NamedItem, IDPropertiesMixin):
+    def __init__(self, name: str, armature):
+        super().__init__(name)
+        self.id_data = armature
+        self.head_local = Vector((0.0, 0.0, 0.0))
+        self.tail_local = Vector((0.0, 1.0, 0.0))
+        self.parent = None
+        self.use_connect = False
+        self.use_deform = True
+        self.hide = False
+        self.collections = []
+
+    @property
+    def children(self):
+        return [bone for bone in self.id_data.bones if bone.parent is self]
+
+    @property
+    def length(self):
+        return (self.tail_local - self.head_local).length
+
+
+class ArmatureBones(bpy_prop_collection):
+    pass
+
+
+class PoseBone(NamedItem, IDPropertiesMixin, AnimatableMixin):
+    def __init__(self, name: str, obj):
+        super().__init__(name)
+        self.id_data = obj
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.rotation_quaternion = Quaternion()
+        self.rotation_euler = Euler()
+        self.rotation_axis_angle = [0.0, 0.0, 1.0, 0.0]
+        self.scale = Vector((1.0, 1.0, 1.0))
+        self.rotation_mode = 'QUATERNION'
+        self.lock_location = [False, False, False]
+        self.lock_rotation = [False, False, False]
+        self.lock_rotation_w = False
+        self.lock_scale = [False, False, False]
+        self.custom_shape = None
+        self.constraints = PoseBoneConstraints(self)
+
+    @property
+    def bone(self):
+        return self.id_data.data.bones[self.name]
+
+    @property
+    def parent(self):
+        parent = self.bone.parent
+        return self.id_data.pose.bones[parent.name] if parent else None
+
+    def path_from_id(self, prop: str = '') -> str:
+        escaped = self.name.replace('\\', '\\\\').replace('"', '\\"')
+        base = f'pose.bones["{escaped}"]'
+        if not prop:
+            return base
+        return base + prop if prop.startswith('[') else f"{base}.{prop}"
+
+
+class PoseBones(bpy_prop_collection):
+    pass
+
+
+class Pose:
+    def __init__(self):
+        self.bones = PoseBones()
+
+
+# ---- ID数据块 ----
+
+class ID(NamedItem, IDPropertiesMixin, AnimatableMixin):
+    id_type = 'ID'
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.session_uid = next(_session_uids)
+        self.animation_data = None
+        self.use_fake_user = False
+        self.library = None
+
+    @property
+    def id_data(self):
+        return self
+
+    def path_from_id(self, prop: str = '') -> str:
+        return prop
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData(self)
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+    @property
+    def users(self):
+        return 1
+
+
+class Armature(ID):
+    id_type = 'ARMATURE'
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.bones = ArmatureBones()
+        self.edit_bones = ArmatureEditBones()
+        self.collections = []
+        self.collections_all = []
+        self.display_type = 'OCTAHEDRAL'
+
+    def _load_edit_bones(self):
+        """进入编辑模式：由骨骼生成编辑骨骼"""
+        self.edit_bones = ArmatureEditBones()
+        mapping = {}
+        for bone in self.bones:
+            edit_bone = self.edit_bones.new(bone.name)
+            edit_bone.head = bone.head_local.copy()
+            edit_bone.tail = bone.tail_local.copy()
+            edit_bone.use_connect = bone.use_connect
+            edit_bone.use_deform = bone.use_deform
+            mapping[bone.name] = edit_bone
+        for bone in self.bones:
+            if bone.parent is not None:
+                mapping[bone.name].parent = mapping[bone.parent.name]
+
+    def _apply_edit_bones(self, obj):
+        """退出编辑模式：由编辑骨骼重建骨骼，并同步姿态骨骼（保留已有姿态骨骼的数据）"""
+        old_bones = {bone.name: bone for bone in self.bones}
+        self.bones = ArmatureBones()
+        for edit_bone in self.edit_bones:
+            bone = old_bones.get(edit_bone.name) or Bone(edit_bone.name, self)
+            bone._collection = None
+            bone.head_local = edit_bone.head.copy()
+            bone.tail_local = edit_bone.tail.copy()
+            bone.use_connect = edit_bone.use_connect
+            bone.use_deform = edit_bone.use_deform
+            self.bones._append(bone)
+        for edit_bone in self.edit_bones:
+            self.bones[edit_bone.name].parent = self.bones[edit_bone.parent.name] if edit_bone.parent else None
+
+        if obj is not None and obj.pose is not None:
+            old_pose_bones = {pose_bone.name: pose_bone for pose_bone in obj.pose.bones}
+            obj.pose.bones = PoseBones()
+            for bone in self.bones:
+                pose_bone = old_pose_bones.get(bone.name) or PoseBone(bone.name, obj)
+                pose_bone._collection = None
+                obj.pose.bones._append(pose_bone)
+
+
+class Action(ID):
+    id_type = 'ACTION'
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.fcurves = []
+        self.frame_range = (1.0, 2.0)
+
+
+class Mesh(ID):
+    id_type = 'MESH'
+
+
+class Text(ID):
+    id_type = 'TEXT'
+
+
+class Object(ID):
+    id_type = 'OBJECT'
+
+    def __init__(self, name: str, data=None):
+        super().__init__(name)
+        self.data = data
+        self.type = 'EMPTY' if data is None else data.id_type
+        self.pose = Pose() if self.type == 'ARMATURE' else None
+        self.mode = 'OBJECT'
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.rotation_euler = Euler()
+        self.scale = Vector((1.0, 1.0, 1.0))
+        self.parent = None
+        self.hide_viewport = False
+        self._selected = False
+        self.constraints = PoseBoneConstraints(self)
+        self.material_slots = []
+        if self.pose is not None:
+            for bone in data.bones:
+                self.pose.bones._append(PoseBone(bone.name, self))
+
+    def select_set(self, state: bool):
+        self._selected = bool(state)
+
+    def select_get(self) -> bool:
+        return self._selected
+
+    def hide_set(self, state: bool):
+        self.hide_viewport = bool(state)
+
+
+class IDCollection(bpy_prop_collection):
+    """bpy.data 中的ID集合"""
+
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def new(self, name: str, *args):
+        return self._append(self._factory(name, *args))
+
+    def remove(self, datablock, do_unlink: bool = True, do_id_user: bool = True, do_ui_user: bool = True):
+        if datablock not in self._items:
+            raise ReferenceError(f"{datablock!r} is not in this collection")
+        self._discard(datablock)
+        datablock._collection = None
+        if do_unlink and isinstance(datablock, Object):
+            _unlink_object(datablock)
+
+    def __contains__(self, key):
+        if isinstance(key, ID):
+            raise TypeError("bpy_prop_collection.__contains__: expected a string")
+        return super().__contains__(key)
+
+
+class SceneObjects(bpy_prop_collection):
+    """Collection.objects（只保存引用，不改变对象名称；对象改名后仍能按新名称查找）"""
+
+    def get(self, key, default=None):
+        for obj in self._items:
+            if obj.name == key:
+                return obj
+        return default
+
+    def find(self, key) -> int:
+        for index, obj in enumerate(self._items):
+            if obj.name == key:
+                return index
+        return -1
+
+    def link(self, obj):
+        if obj in self._items:
+            raise RuntimeError(f"Object '{obj.name}' already in collection")
+        self._items.append(obj)
+
+    def unlink(self, obj):
+        self._discard(obj)
+
+
+class Collection(ID):
+    id_type = 'COLLECTION'
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.objects = SceneObjects()
+        self.children = []
+
+
+class Scene(ID):
+    id_type = 'SCENE'
+
+    def __init__(self, name: str = "Scene"):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.frame_current = 1
+        self.frame_start = 1
+        self.frame_end = 250
+
+    def frame_set(self, frame: int, subframe: float = 0.0):
+        self.frame_current = frame
+
+
+_all_collections = []
+
+
+def _unlink_object(obj):
+    for collection in _all_collections:
+        if obj in collection.objects._items:
+            collection.objects.unlink(obj)
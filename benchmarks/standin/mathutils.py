@@ -0,0 +1,180 @@
+"""
+mathutils 替身 - 只实现模板流程用到的子集（Vector / Quaternion / Euler / Matrix）
+"""
+
+import math
+
+
+class Vector:
+    """定长浮点向量"""
+    __slots__ = ('_values',)
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._values = [float(value) for value in values]
+
+    # ---- 序列协议 ----
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._values[index])
+        return self._values[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            values = list(self._values)
+            values[index] = [float(item) for item in value]
+            if len(values) != len(self._values):
+                raise ValueError("切片赋值不能改变向量长度")
+            self._values = values
+        else:
+            self._values[index] = float(value)
+
+    def __eq__(self, other):
+        try:
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(({', '.join(f'{value:.4f}' for value in self._values)}))"
+
+    # ---- 分量 ----
+
+    def _component(index):
+        def getter(self):
+            return self._values[index]
+
+        def setter(self, value):
+            self._values[index] = float(value)
+        return property(getter, setter)
+
+    x = _component(0)
+    y = _component(1)
+    z = _component(2)
+    del _component
+
+    # ---- 运算 ----
+
+    def _check(self, other):
+        if len(other) != len(self):
+            raise ValueError("向量长度不一致")
+        return other
+
+    def __add__(self, other):
+        return type(self)(a + b for a, b in zip(self, self._check(other)))
+
+    def __sub__(self, other):
+        return type(self)(a - b for a, b in zip(self, self._check(other)))
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, (int, float)):
+            return type(self)(a * scalar for a in self)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return type(self)(a / scalar for a in self)
+
+    def __neg__(self):
+        return type(self)(-a for a in self)
+
+    def copy(self):
+        return type(self)(self._values)
+
+    def to_tuple(self, precision=-1):
+        if precision < 0:
+            return tuple(self._values)
+        return tuple(round(value, precision) for value in self._values)
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self, self._check(other)))
+
+    def cross(self, other):
+        ax, ay, az = self
+        bx, by, bz = other
+        return Vector((ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx))
+
+    @property
+    def length(self):
+        return math.sqrt(self.dot(self))
+
+    def normalized(self):
+        length = self.length
+        return self.copy() if length == 0 else self / length
+
+    def lerp(self, other, factor):
+        return self + (type(self)(other) - self) * factor
+
+
+class Quaternion(Vector):
+    """四元数 (w, x, y, z)"""
+    __slots__ = ()
+
+    def __init__(self, values=(1.0, 0.0, 0.0, 0.0)):
+        super().__init__(values)
+
+    @property
+    def w(self):
+        return self._values[0]
+
+    @w.setter
+    def w(self, value):
+        self._values[0] = float(value)
+
+
+class Euler(Vector):
+    """欧拉角（只保存分量和旋转顺序）"""
+    __slots__ = ('order',)
+
+    def __init__(self, values=(0.0, 0.0, 0.0), order='XYZ'):
+        super().__init__(values)
+        self.order = order
+
+    def copy(self):
+        return Euler(self._values, self.order)
+
+
+class Matrix:
+    """方阵（只支持构造、比较、复制和与向量相乘）"""
+    __slots__ = ('rows',)
+
+    def __init__(self, rows=((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0),
+                             (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))):
+        self.rows = [Vector(row) for row in rows]
+
+    @classmethod
+    def Identity(cls, size):
+        return cls([[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)])
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self.rows == other.rows
+
+    __hash__ = None
+
+    def copy(self):
+        return Matrix(self.rows)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            columns = list(zip(*other.rows))
+            return Matrix([[sum(a * b for a, b in zip(row, column)) for column in columns] for row in self.rows])
+        values = list(other)
+        if len(values) == len(self.rows) - 1:
+            result = [sum(a * b for a, b in zip(row, values + [1.0])) for row in self.rows]
+            return Vector(result[:-1])
+        return Vector(sum(a * b for a, b in zip(row, values)) for row in self.rows)
@@ -0,0 +1,200 @@
+"""
+合成测试数据（在Blender中使用）
+
+按可配置的规模生成：
+- 合成模板rig（默认名称 Nebysse_FaceUP_Tem.Rig）：骨骼、每骨骼的自定义属性驱动器、变换驱动器和约束
+- 合成目标rig：模拟生成的绑定，带有指向模板骨骼的驱动器，其中一部分路径无效（损坏的驱动器）
+- 合成metarig：指定数量的骨骼链，加上 nebysse_faceup_con 主控和定位器
+- 场景填充对象：空物体，其中一部分带有驱动器
+
+生产角色有1500-3000个骨骼、模板有数百个驱动器，演示rig远小于这个规模，
+这些数据用于在真实资产之前暴露 O(n²) 的路径。
+"""
+
+import bpy
+from mathutils import Vector
+
+
+TEMPLATE_RIG_NAME = "Nebysse_FaceUP_Tem.Rig"
+TEMPLATE_BONE_PREFIX = "NebOffset-syn"
+TARGET_RIG_NAME = "RIG-synthetic"
+
+# 约束类型轮换使用
+CONSTRAINT_TYPES = ('COPY_LOCATION', 'COPY_ROTATION', 'COPY_SCALE', 'TRANSFORM', 'LIMIT_LOCATION')
+
+# 每个骨骼的自定义属性数量（驱动器优先挂在自定义属性上）
+PROPERTIES_PER_BONE = 4
+
+
+def template_bone_name(index: int) -> str:
+    return f"{TEMPLATE_BONE_PREFIX}.{index:04d}"
+
+
+def _new_armature_object(name: str, bone_names, spacing: float = 0.05):
+    """创建骨架对象并按网格排列骨骼，第 i 个骨骼的父级为第 i-1 个（每32个开始新链）"""
+    armature = bpy.data.armatures.new(name)
+    obj = bpy.data.objects.new(name, armature)
+    bpy.context.scene.collection.objects.link(obj)
+
+    for other in bpy.context.selected_objects:
+        other.select_set(False)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature.edit_bones
+    previous = None
+    for index, bone_name in enumerate(bone_names):
+        bone = edit_bones.new(bone_name)
+        bone.head = Vector(((index // 32) * spacing, 0.0, (index % 32) * spacing))
+        bone.tail = bone.head + Vector((0.0, 0.0, spacing * 0.8))
+        if previous is not None and index % 32:
+            bone.parent = previous
+        previous = bone
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return obj
+
+
+def _add_driver(owner, data_path: str, index: int, target_id, variable_path: str, expression: str):
+    """添加一个单变量驱动器"""
+    fcurve = owner.driver_add(data_path, index) if index >= 0 else owner.driver_add(data_path)
+    driver = fcurve.driver
+    driver.type = 'SCRIPTED'
+    variable = driver.variables.new()
+    variable.name = "var"
+    variable.type = 'SINGLE_PROP'
+    variable.targets[0].id = target_id
+    variable.targets[0].data_path = variable_path
+    driver.expression = expression
+    return fcurve
+
+
+def build_template_rig(bone_count: int, drivers_per_bone: int = 2, constraints_per_bone: int = 2,
+                       name: str = TEMPLATE_RIG_NAME):
+    """
+    创建合成模板rig
+
+    Args:
+        bone_count: 骨骼数量
+        drivers_per_bone: 每个骨骼的驱动器数量（前 PROPERTIES_PER_BONE 个挂在自定义属性上，其余挂在变换通道上）
+        constraints_per_bone: 每个骨骼的约束数量（目标为前一个骨骼）
+        name: 模板rig对象名称
+
+    Returns:
+        模板骨架对象
+    """
+    bone_names = [template_bone_name(index) for index in range(bone_count)]
+    obj = _new_armature_object(name, bone_names)
+
+    for index, bone_name in enumerate(bone_names):
+        pose_bone = obj.pose.bones[bone_name]
+        for prop_index in range(PROPERTIES_PER_BONE):
+            pose_bone[f"syn_prop_{prop_index}"] = 0.0
+
+        source = bone_names[index - 1] if index else bone_name
+        for driver_index in range(drivers_per_bone):
+            if driver_index < PROPERTIES_PER_BONE:
+                data_path, array_index = f'["syn_prop_{driver_index}"]', -1
+            else:
+                data_path, array_index = 'location', (driver_index - PROPERTIES_PER_BONE) % 3
+            _add_driver(pose_bone, data_path, array_index, obj,
+                        f'pose.bones["{source}"].location[{driver_index % 3}]', f"var * {0.1 + driver_index * 0.01:.2f}")
+
+        for constraint_index in range(constraints_per_bone):
+            constraint_type = CONSTRAINT_TYPES[constraint_index % len(CONSTRAINT_TYPES)]
+            constraint = pose_bone.constraints.new(constraint_type)
+            constraint.name = f"syn_{constraint_type.lower()}_{constraint_index}"
+            if hasattr(constraint, 'target'):
+                constraint.target = obj
+                constraint.subtarget = source
+            constraint.influence = 0.5
+    return obj
+
+
+def build_target_rig(bone_count: int, drivers_per_bone: int = 1, broken_ratio: float = 0.05,
+                     name: str = TARGET_RIG_NAME):
+    """
+    创建合成目标rig（模拟生成的绑定）
+
+    Args:
+        bone_count: 骨骼数量
+        drivers_per_bone: 每个骨骼的驱动器数量
+        broken_ratio: 数据路径指向不存在骨骼的驱动器比例
+        name: 对象名称
+
+    Returns:
+        目标骨架对象
+    """
+    bone_names = [template_bone_name(index) for index in range(bone_count)]
+    obj = _new_armature_object(name, bone_names)
+    broken_every = int(1 / broken_ratio) if broken_ratio > 0 else 0
+
+    if obj.animation_data is None:
+        obj.animation_data_create()
+    drivers = obj.animation_data.drivers
+
+    for index, bone_name in enumerate(bone_names):
+        pose_bone = obj.pose.bones[bone_name]
+        for driver_index in range(drivers_per_bone):
+            serial = index * drivers_per_bone + driver_index
+            if broken_every and serial % broken_every == 0:
+                # drivers.new 不校验路径，用于制造损坏的驱动器
+                fcurve = drivers.new(f'pose.bones["missing.{serial:05d}"].location', index=driver_index % 3)
+                fcurve.driver.expression = "0.0"
+                continue
+            _add_driver(pose_bone, 'location', driver_index % 3, obj,
+                        f'pose.bones["{bone_name}"].scale[{driver_index % 3}]', "var - 1.0")
+    return obj
+
+
+def build_scene_objects(count: int, with_drivers_every: int = 10, prefix: str = "Filler"):
+    """
+    创建场景填充对象（空物体），每隔 with_drivers_every 个带一个驱动器
+
+    Returns:
+        创建的对象列表
+    """
+    objects = []
+    collection = bpy.context.scene.collection
+    for index in range(count):
+        obj = bpy.data.objects.new(f"{prefix}.{index:05d}", None)
+        obj.location = (index * 0.01, 1.0, 0.0)
+        collection.objects.link(obj)
+        if with_drivers_every and index % with_drivers_every == 0:
+            _add_driver(obj, 'location', 2, obj, 'location[0]', "var")
+        objects.append(obj)
+    return objects
+
+
+def build_metarig(bone_count: int, feature_set: str, name: str = "metarig-synthetic"):
+    """
+    创建合成metarig：bone_count 个普通骨骼（无rigify类型，按原样复制到生成的rig），
+    加上 nebysse_faceup_con 主控和眉毛/眼睑/嘴部定位器
+
+    Returns:
+        metarig对象
+    """
+    locators = (
+        ("faceup-con", "nebysse_faceup_con", None),
+        ("mouth-con", "nebysse_mouth_con", "faceup-con"),
+        ("eyelip-con.L", "nebysse_eyelip_con_l", "faceup-con"),
+        ("eyelip-con.R", "nebysse_eyelip_con_r", "faceup-con"),
+        ("brow-con.L", "nebysse_brow_con_l", "faceup-con"),
+        ("brow-con.R", "nebysse_brow_con_r", "faceup-con"),
+    )
+    bone_names = [f"syn_bone.{index:04d}" for index in range(bone_count)]
+    obj = _new_armature_object(name, bone_names)
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = obj.data.edit_bones
+    for offset, (bone_name, _, parent) in enumerate(locators):
+        bone = edit_bones.new(bone_name)
+        bone.head = Vector((offset * 0.05, -0.2, 1.6))
+        bone.tail = bone.head + Vector((0.0, 0.0, 0.04))
+        if parent:
+            bone.parent = edit_bones[parent]
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    for bone_name, module, _ in locators:
+        obj.pose.bones[bone_name].rigify_type = f"{feature_set}.{module}"
+    return obj
@@ -0,0 +1,85 @@
+"""
+依赖图分析（在Blender中后台运行）
+
+打开包含生成的面部rig的 .blend 文件，对每个rig建立驱动器与约束依赖图，
+输出依赖环、最长求值链、扇入热点和每个骨骼需要Python求值的驱动器数量。
+
+    blender --background scene.blend --python tools/analyze_rig_graph.py -- \\
+        [--rig RIG] [--output graph.json] [--limit 10] [--fail-on-cycles]
+
+不指定 --rig 时分析所有带 Neb_face-root 骨骼的骨架对象。
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import addon_utils
+import bpy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+FACEROOT_BONE = "Neb_face-root"
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer 驱动器与约束依赖图分析")
+    parser.add_argument('--rig', action='append', help="要分析的rig对象名称（可重复），默认为所有面部rig")
+    parser.add_argument('--output', help="报告JSON路径")
+    parser.add_argument('--limit', type=int, default=10, help="热点和骨骼列表的最大条数")
+    parser.add_argument('--fail-on-cycles', action='store_true', help="存在依赖环时退出码为1")
+    return parser.parse_args(argv)
+
+
+def find_face_rigs(names=None):
+    if names:
+        missing = [name for name in names if name not in bpy.data.objects]
+        if missing:
+            print(f"❌ 找不到rig对象: {', '.join(missing)}")
+        return [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+    return [obj for obj in bpy.data.objects
+            if obj.type == 'ARMATURE' and FACEROOT_BONE in obj.pose.bones]
+
+
+def main():
+    args = parse_args()
+    # NebysseFacer 的包初始化依赖Rigify
+    addon_utils.enable('rigify', default_set=True)
+    from NebysseFacer.rigs.utils.rig_graph import analyze_rig_graph
+
+    rigs = find_face_rigs(args.rig)
+    if not rigs:
+        print("❌ 没有可分析的面部rig")
+        sys.exit(2)
+
+    reports = []
+    for rig in rigs:
+        report = analyze_rig_graph(rig, limit=args.limit)
+        reports.append(report)
+
+        print(f"🕸️ {report['rig']}: {report['nodes']} 个节点, {report['edges']} 条边, "
+              f"{report['drivers']} 个驱动器, 最长求值链 {report['chain_depth']}")
+        for cycle in report['cycles']:
+            print(f"  🔁 依赖环（{len(cycle)} 个节点）: {', '.join(cycle[:8])}")
+        print(f"  ⛓️ 最长求值链: {' → '.join(report['longest_chain'])}")
+        for node, count in report['fan_in_hotspots']:
+            print(f"  📥 扇入 {count}: {node}")
+        for node, count in report['fan_out_hotspots']:
+            print(f"  📤 扇出 {count}: {node}")
+        for bone, count in report['python_drivers_per_bone']:
+            print(f"  🐍 {bone}: {count} 个驱动器需要Python求值")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'blend_file': bpy.data.filepath, 'rigs': reports}, f, ensure_ascii=False, indent=2)
+        print(f"📊 报告已写入: {args.output}")
+
+    sys.exit(1 if args.fail_on_cycles and any(report['cycles'] for report in reports) else 0)
+
+
+if __name__ == '__main__':
+    main()
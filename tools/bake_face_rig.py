@@ -0,0 +1,97 @@
+"""
+烘焙面部rig（在Blender中后台运行，用于渲染农场）
+
+打开包含生成的面部rig的 .blend 文件，把 NebOffset 骨骼和它们驱动的rigify骨骼烘焙为动作，
+之后静音模板驱动器、停用这些骨骼的约束，渲染时每帧只播放动画曲线。所有rig在同一次逐帧求值中采样。
+
+    blender --background shot.blend --python tools/bake_face_rig.py -- \\
+        [--rig RIG] [--frame-start 1] [--frame-end 250] [--output baked.blend]
+
+    # 按还原记录恢复驱动器、约束和原动作
+    blender --background baked.blend --python tools/bake_face_rig.py -- --restore
+
+不指定 --rig 时处理所有带 Neb_face-root 骨骼的骨架对象；不指定 --output 时保存回打开的文件。
+"""
+
+import argparse
+import os
+import sys
+
+import addon_utils
+import bpy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+FACEROOT_BONE = "Neb_face-root"
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer 烘焙与剥离")
+    parser.add_argument('--rig', action='append', help="要处理的rig对象名称（可重复），默认为所有面部rig")
+    parser.add_argument('--frame-start', type=int, help="起始帧，默认为场景起始帧")
+    parser.add_argument('--frame-end', type=int, help="结束帧（包含），默认为场景结束帧")
+    parser.add_argument('--restore', action='store_true', help="还原之前的烘焙，而不是烘焙")
+    parser.add_argument('--output', help="另存为的 .blend 路径，默认保存回打开的文件")
+    return parser.parse_args(argv)
+
+
+def find_face_rigs(names=None):
+    if names:
+        missing = [name for name in names if name not in bpy.data.objects]
+        if missing:
+            print(f"❌ 找不到rig对象: {', '.join(missing)}")
+        return [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+    return [obj for obj in bpy.data.objects
+            if obj.type == 'ARMATURE' and FACEROOT_BONE in obj.pose.bones]
+
+
+def main():
+    args = parse_args()
+    # NebysseFacer 的包初始化依赖Rigify
+    addon_utils.enable('rigify', default_set=True)
+    from NebysseFacer.rigs.utils.pose_bake import bake_face_rigs, is_baked, restore_face_rig
+
+    rigs = find_face_rigs(args.rig)
+    if not rigs:
+        print("❌ 没有可处理的面部rig")
+        sys.exit(2)
+
+    if args.restore:
+        for rig in rigs:
+            if not is_baked(rig):
+                print(f"⏭️ {rig.name}: 没有烘焙记录，跳过")
+                continue
+            stats = restore_face_rig(rig)
+            print(f"♻️ {rig.name}: 还原 {stats['drivers_restored']} 个驱动器，"
+                  f"{stats['constraints_restored']} 个约束，缺失 {stats['missing']} 项")
+    else:
+        for rig in [rig for rig in rigs if is_baked(rig)]:
+            print(f"⏭️ {rig.name}: 已经烘焙，跳过")
+            rigs.remove(rig)
+        if not rigs:
+            print("❌ 没有需要烘焙的面部rig")
+            sys.exit(2)
+        try:
+            results = bake_face_rigs(rigs, args.frame_start, args.frame_end)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        for stats in results:
+            print(f"🔥 {stats['rig']}: {stats['bones']} 个骨骼 × {stats['frames']} 帧 → {stats['action']} "
+                  f"({stats['fcurves']} 条曲线)，静音 {stats['drivers_muted']} 个驱动器，"
+                  f"停用 {stats['constraints_disabled']} 个约束")
+        print(f"⏱️ 耗时 {results[0]['seconds']:.2f}s")
+
+    if args.output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output), copy=True)
+        print(f"💾 已保存: {args.output}")
+    else:
+        bpy.ops.wm.save_mainfile()
+        print(f"💾 已保存: {bpy.data.filepath}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+姿态缓存（在Blender中后台运行）
+
+写入：逐帧求值面部rig，把NebOffset和 Neb_ 面部骨骼的局部变换写入缓存目录（每个rig一个 .nebpose 文件），
+--attach 时挂载缓存（静音面部驱动器和约束）并保存文件，之后打开文件回放缓存即可：
+
+    blender --background shot.blend --python tools/pose_cache.py -- \\
+        --write //pose_cache/ [--rig RIG] [--frame-start 1] [--frame-end 250] [--attach] [--output review.blend]
+
+回放：打开已挂载缓存的文件后重新建立内存映射和帧回调（脚本在渲染参数之前运行）：
+
+    blender --background review.blend --python tools/pose_cache.py -a -- --resume
+
+卸载：恢复驱动器、约束和旋转模式并保存：
+
+    blender --background review.blend --python tools/pose_cache.py -- --detach
+
+不指定 --rig 时处理所有带 Neb_face-root 骨骼的骨架对象。
+"""
+
+import argparse
+import os
+import sys
+
+import addon_utils
+import bpy
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+FACEROOT_BONE = "Neb_face-root"
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="NebysseFacer 姿态缓存")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--write', metavar='DIR', help="写入缓存到指定目录（支持 // 相对路径）")
+    mode.add_argument('--resume', action='store_true', help="重新打开文件中已挂载rig的缓存（不保存）")
+    mode.add_argument('--detach', action='store_true', help="卸载缓存并保存")
+    parser.add_argument('--rig', action='append', help="要处理的rig对象名称（可重复），默认为所有面部rig")
+    parser.add_argument('--frame-start', type=int, help="起始帧，默认为场景起始帧")
+    parser.add_argument('--frame-end', type=int, help="结束帧（包含），默认为场景结束帧")
+    parser.add_argument('--attach', action='store_true', help="写入后挂载缓存")
+    parser.add_argument('--output', help="另存为的 .blend 路径，默认保存回打开的文件")
+    return parser.parse_args(argv)
+
+
+def find_face_rigs(names=None):
+    if names:
+        missing = [name for name in names if name not in bpy.data.objects]
+        if missing:
+            print(f"❌ 找不到rig对象: {', '.join(missing)}")
+        return [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+    return [obj for obj in bpy.data.objects
+            if obj.type == 'ARMATURE' and FACEROOT_BONE in obj.pose.bones]
+
+
+def save(output=None):
+    if output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(output), copy=True)
+        print(f"💾 已保存: {output}")
+    else:
+        bpy.ops.wm.save_mainfile()
+        print(f"💾 已保存: {bpy.data.filepath}")
+
+
+def main():
+    args = parse_args()
+    # NebysseFacer 的包初始化依赖Rigify
+    addon_utils.enable('rigify', default_set=True)
+    from NebysseFacer.rigs.utils.pose_cache import (
+        attach_pose_cache, detach_pose_cache, is_pose_cached, resume_pose_caches, write_pose_caches
+    )
+
+    if args.resume:
+        results = resume_pose_caches()
+        for stats in results:
+            print(f"📼 {stats['rig']}: {stats['path']}（帧 {stats['frame_range'][0]} - {stats['frame_range'][1]}）")
+        if not results:
+            print("⚠ 文件中没有挂载姿态缓存的rig")
+        return
+
+    rigs = find_face_rigs(args.rig)
+    if not rigs:
+        print("❌ 没有可处理的面部rig")
+        sys.exit(2)
+
+    if args.detach:
+        for rig in rigs:
+            if not is_pose_cached(rig):
+                print(f"⏭️ {rig.name}: 没有挂载姿态缓存，跳过")
+                continue
+            stats = detach_pose_cache(rig)
+            print(f"⏏️ {rig.name}: 恢复 {stats['drivers_restored']} 个驱动器，"
+                  f"{stats['constraints_restored']} 个约束，缺失 {stats['missing']} 项")
+        save(args.output)
+        return
+
+    try:
+        results = write_pose_caches(rigs, args.write, args.frame_start, args.frame_end)
+    except (RuntimeError, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for stats in results:
+        print(f"💾 {stats['rig']}: {stats['bones']} 个骨骼 × {stats['frames']} 帧 → {stats['path']} "
+              f"({stats['bytes'] / 1024:.0f} KB)")
+    print(f"⏱️ 耗时 {results[0]['seconds']:.2f}s")
+
+    if args.attach:
+        for stats in results:
+            attach_pose_cache(bpy.data.objects[stats['rig']], stats['path'])
+        save(args.output)
+
+
+if __name__ == '__main__':
+    main()